@@ -126,6 +126,7 @@ async function deployFreshSchema() {
     '001_foundation.sql',
     '002_travel_requirements.sql',
     '003_itineraries.sql',
+    '004_response_cache.sql',
   ]
 
   for (const migration of migrations) {
@@ -145,6 +146,7 @@ async function applyMissingMigrations(existingMigrations) {
     { file: '001_foundation.sql', version: '001_foundation' },
     { file: '002_travel_requirements.sql', version: '002_travel_requirements' },
     { file: '003_itineraries.sql', version: '003_itineraries' },
+    { file: '004_response_cache.sql', version: '004_response_cache' },
   ]
 
   const missingMigrations = allMigrations.filter(
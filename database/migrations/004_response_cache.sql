@@ -0,0 +1,76 @@
+-- ============================================================================
+-- CARDINAL DATABASE MIGRATION 004: RESPONSE CACHE
+-- Version: 1.3.0
+-- Description: Shared cache for generated itineraries and other LLM results
+-- Dependencies: 001_foundation
+-- ============================================================================
+
+-- ============================================================================
+-- RESPONSE CACHE
+-- ============================================================================
+
+-- Cached values keyed by a canonical request fingerprint. Entries are fresh
+-- until fresh_until and may be served while being refreshed until stale_until.
+CREATE TABLE response_cache (
+  cache_key TEXT PRIMARY KEY,
+  namespace TEXT NOT NULL,
+
+  -- Cached payload
+  value JSONB NOT NULL,
+
+  -- Freshness window
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  fresh_until TIMESTAMPTZ NOT NULL,
+  stale_until TIMESTAMPTZ NOT NULL,
+
+  -- Time it took to produce the value, reported as latency saved on hits
+  load_time_ms INTEGER NOT NULL DEFAULT 0 CHECK (load_time_ms >= 0),
+
+  CONSTRAINT stale_after_fresh CHECK (stale_until >= fresh_until)
+);
+
+-- ============================================================================
+-- INDEXES
+-- ============================================================================
+
+CREATE INDEX idx_response_cache_namespace ON response_cache (namespace);
+CREATE INDEX idx_response_cache_stale_until ON response_cache (stale_until);
+
+-- ============================================================================
+-- ROW LEVEL SECURITY POLICIES
+-- ============================================================================
+
+-- Only the service role reads and writes the cache
+ALTER TABLE response_cache ENABLE ROW LEVEL SECURITY;
+
+-- ============================================================================
+-- UTILITY FUNCTIONS
+-- ============================================================================
+
+-- Function to remove entries that can no longer be served
+CREATE OR REPLACE FUNCTION purge_expired_response_cache()
+RETURNS INTEGER AS $$
+DECLARE
+  deleted_count INTEGER;
+BEGIN
+  DELETE FROM response_cache WHERE stale_until < NOW();
+  GET DIAGNOSTICS deleted_count = ROW_COUNT;
+  RETURN deleted_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- ============================================================================
+-- MIGRATION COMPLETION
+-- ============================================================================
+
+-- Record this migration
+INSERT INTO schema_migrations (version, description) VALUES
+  ('004_response_cache', 'Shared response cache for itineraries and LLM results');
+
+-- Success message
+DO $$
+BEGIN
+  RAISE NOTICE 'Migration 004_response_cache completed successfully';
+  RAISE NOTICE 'Created table: response_cache';
+  RAISE NOTICE 'Added utility function purge_expired_response_cache';
+END $$;
@@ -164,6 +164,7 @@ async function validateMigrations() {
     '001_foundation',
     '002_travel_requirements',
     '003_itineraries',
+    '004_response_cache',
   ]
 
   try {
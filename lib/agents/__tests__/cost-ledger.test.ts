@@ -0,0 +1,129 @@
+/**
+ * Unit Tests for the per-request Cost Ledger
+ */
+
+import {
+  BUDGET_FALLBACK_MODEL,
+  CostLedger,
+  calculateCost,
+  getMinCacheableTokens,
+} from '../cost-ledger'
+
+const SONNET = 'claude-3-sonnet-20240229'
+
+describe('CostLedger', () => {
+  it('aggregates actual usage by agent, phase and model', () => {
+    const ledger = new CostLedger()
+
+    const planning = ledger.planCall({
+      model: BUDGET_FALLBACK_MODEL,
+      maxTokens: 1000,
+      inputTokens: 400,
+    })
+    ledger.record(planning, {
+      agentType: 'concierge',
+      phase: 'planning',
+      inputTokens: 400,
+      outputTokens: 300,
+    })
+
+    const assembly = ledger.planCall({
+      model: SONNET,
+      maxTokens: 4000,
+      inputTokens: 2000,
+    })
+    ledger.record(assembly, {
+      agentType: 'concierge',
+      phase: 'assembly',
+      inputTokens: 2000,
+      outputTokens: 1500,
+    })
+
+    const summary = ledger.getSummary()
+    const expectedAssemblyCost = calculateCost(SONNET, 2000, 1500)
+
+    expect(summary.totals.calls).toBe(2)
+    expect(summary.totals.inputTokens).toBe(2400)
+    expect(summary.byAgent.concierge?.calls).toBe(2)
+    expect(summary.byPhase.assembly?.costUsd).toBeCloseTo(expectedAssemblyCost)
+    expect(summary.byModel[SONNET]?.outputTokens).toBe(1500)
+    expect(ledger.getRemainingBudget()).toBeUndefined()
+  })
+
+  it('downgrades to the fallback model when the budget would be exceeded', () => {
+    // Enough for a Haiku call but not for Sonnet at 4000 output tokens
+    const ledger = new CostLedger(0.01)
+
+    const plan = ledger.planCall({
+      model: SONNET,
+      maxTokens: 4000,
+      inputTokens: 1000,
+    })
+
+    expect(plan.model).toBe(BUDGET_FALLBACK_MODEL)
+    expect(plan.downgraded).toBe(true)
+    expect(plan.trimmed).toBe(false)
+    expect(plan.maxTokens).toBe(4000)
+  })
+
+  it('trims max tokens once even the fallback model is too expensive', () => {
+    const ledger = new CostLedger(0.001)
+
+    const plan = ledger.planCall({
+      model: BUDGET_FALLBACK_MODEL,
+      maxTokens: 4000,
+      inputTokens: 1000,
+    })
+
+    expect(plan.trimmed).toBe(true)
+    expect(plan.maxTokens).toBeLessThan(4000)
+    expect(ledger.getSummary().trimmedCalls).toBe(1)
+  })
+
+  it('counts in-flight reservations against the budget', () => {
+    const ledger = new CostLedger(0.01)
+    const request = { model: SONNET, maxTokens: 400, inputTokens: 1000 }
+
+    // $0.003 + $0.006 fits on its own, but not twice concurrently
+    const first = ledger.planCall(request)
+    const second = ledger.planCall(request)
+
+    expect(first.model).toBe(SONNET)
+    expect(second.model).toBe(BUDGET_FALLBACK_MODEL)
+
+    ledger.release(first)
+    ledger.release(first)
+    expect(ledger.getRemainingBudget()).toBeCloseTo(0.01 - second.reservedUsd)
+  })
+
+  it('prices prompt cache reads and writes relative to input tokens', () => {
+    const ledger = new CostLedger()
+    const plan = ledger.planCall({
+      model: SONNET,
+      maxTokens: 500,
+      inputTokens: 3000,
+    })
+
+    const entry = ledger.record(plan, {
+      agentType: 'quality-validator',
+      phase: 'validation',
+      inputTokens: 100,
+      outputTokens: 200,
+      cacheReadTokens: 2000,
+      cacheWriteTokens: 1000,
+    })
+
+    // 100 + 2000 * 0.1 + 1000 * 1.25 = 1550 input-equivalent tokens
+    expect(entry.costUsd).toBeCloseTo(calculateCost(SONNET, 1550, 200))
+    expect(ledger.getSummary().totals).toMatchObject({
+      inputTokens: 100,
+      cacheReadTokens: 2000,
+      cacheWriteTokens: 1000,
+    })
+  })
+
+  it('requires longer cacheable prefixes for Haiku than Sonnet', () => {
+    expect(getMinCacheableTokens(BUDGET_FALLBACK_MODEL)).toBe(2048)
+    expect(getMinCacheableTokens(SONNET)).toBe(1024)
+  })
+})
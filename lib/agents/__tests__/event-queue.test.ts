@@ -0,0 +1,63 @@
+/**
+ * Unit Tests for the Async Event Queue
+ */
+
+import { AsyncEventQueue } from '../event-queue'
+
+async function collect<T>(queue: AsyncEventQueue<T>): Promise<T[]> {
+  const items: T[] = []
+  for await (const item of queue) {
+    items.push(item)
+  }
+  return items
+}
+
+describe('AsyncEventQueue', () => {
+  it('delivers buffered and waited-for items in push order', async () => {
+    const queue = new AsyncEventQueue<number>()
+    queue.push(1)
+    queue.push(2)
+
+    const items = collect(queue)
+    await new Promise(resolve => setTimeout(resolve, 0))
+    queue.push(3)
+    queue.close()
+
+    await expect(items).resolves.toEqual([1, 2, 3])
+  })
+
+  it('drains the buffer before ending and ignores later pushes', async () => {
+    const queue = new AsyncEventQueue<string>()
+    queue.push('phase')
+    queue.push('complete')
+    queue.close()
+    queue.push('late')
+
+    await expect(collect(queue)).resolves.toEqual(['phase', 'complete'])
+    expect(queue.isClosed()).toBe(true)
+  })
+
+  it('ends waiting consumers when closed', async () => {
+    const queue = new AsyncEventQueue<string>()
+    const next = queue[Symbol.asyncIterator]().next()
+
+    queue.close()
+
+    await expect(next).resolves.toEqual({ value: undefined, done: true })
+  })
+
+  it('closes when the consumer stops early', async () => {
+    const queue = new AsyncEventQueue<number>()
+    queue.push(1)
+    queue.push(2)
+
+    for await (const item of queue) {
+      expect(item).toBe(1)
+      break
+    }
+
+    expect(queue.isClosed()).toBe(true)
+    queue.push(3)
+    await expect(collect(queue)).resolves.toEqual([])
+  })
+})
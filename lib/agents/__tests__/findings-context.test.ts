@@ -0,0 +1,151 @@
+/**
+ * Unit Tests for the token-budgeted findings context
+ */
+
+import {
+  buildFindingsContext,
+  compactRecommendation,
+  restoreRecommendations,
+} from '../findings-context'
+import type { Itinerary, Recommendation, ResearchOutput } from '../types'
+
+const recommendation = (name: string, personaFit: number): Recommendation => ({
+  name,
+  category: 'restaurant',
+  description: 'A long description. '.repeat(20),
+  whyRecommended: 'Fits the persona',
+  personaFit,
+  placeId: `place-${name}`,
+  photos: ['a.jpg', 'b.jpg'],
+  mustTry: ['one', 'two', 'three', 'four'],
+})
+
+const output = (
+  agentType: ResearchOutput['agentType'],
+  recommendations: Recommendation[]
+): ResearchOutput => ({
+  agentType,
+  status: 'success',
+  recommendations,
+  confidence: 0.8,
+  reasoning: 'Research summary',
+})
+
+describe('compactRecommendation', () => {
+  it('keeps planning fields and truncates long text', () => {
+    const compact = compactRecommendation(recommendation('Cafe', 90))
+
+    expect(compact.name).toBe('Cafe')
+    expect(compact.description!.length).toBeLessThanOrEqual(160)
+    expect(compact.mustTry).toEqual(['one', 'two', 'three'])
+    expect(compact).not.toHaveProperty('placeId')
+    expect(compact).not.toHaveProperty('photos')
+  })
+})
+
+describe('buildFindingsContext', () => {
+  const findings = [
+    output(
+      'food-dining',
+      Array.from({ length: 20 }, (_, i) => recommendation(`Food ${i}`, 90 - i))
+    ),
+    output('lodging', [recommendation('Low Fit Hotel', 10)]),
+  ]
+
+  it('stays within the token budget', () => {
+    const context = buildFindingsContext(findings, { maxTokens: 500 })
+
+    expect(context.tokens).toBeLessThanOrEqual(500)
+    expect(context.omitted).toBeGreaterThan(0)
+    expect(context.included + context.omitted).toBe(21)
+    expect(context.text).toContain('Food 0')
+    expect(context.text).not.toContain('Food 19')
+  })
+
+  it("keeps each agent's best recommendation", () => {
+    const context = buildFindingsContext(findings, { maxTokens: 500 })
+
+    expect(context.text).toContain('Low Fit Hotel')
+  })
+
+  it('includes everything when the budget allows', () => {
+    const context = buildFindingsContext(findings, { maxTokens: 100000 })
+
+    expect(context.omitted).toBe(0)
+    expect(context.text).not.toContain('omitted')
+  })
+})
+
+describe('restoreRecommendations', () => {
+  it('restores dropped fields by name', () => {
+    const full = recommendation('Cafe', 90)
+    const itinerary: Itinerary = {
+      destination: 'Paris',
+      duration: '1 day',
+      days: [
+        {
+          day: 1,
+          theme: 'Food',
+          activities: [],
+          meals: [{ ...compactRecommendation(full), name: 'cafe' }],
+        },
+      ],
+      lodging: [],
+      personaNotes: '',
+    } as unknown as Itinerary
+
+    const restored = restoreRecommendations(itinerary, [
+      output('food-dining', [full]),
+    ])
+
+    expect(restored.days[0]!.meals[0]).toMatchObject({
+      name: 'Cafe',
+      placeId: 'place-Cafe',
+      photos: ['a.jpg', 'b.jpg'],
+    })
+  })
+
+  const itineraryWithMeal = (meal: Partial<Recommendation>): Itinerary =>
+    ({
+      destination: 'Paris',
+      duration: '1 day',
+      days: [{ day: 1, theme: 'Food', activities: [], meals: [meal] }],
+      lodging: [],
+      personaNotes: '',
+    }) as unknown as Itinerary
+
+  it('keeps placement fields the model changed', () => {
+    const full = { ...recommendation('Bistro', 80), mealType: ['dinner'] }
+    const compact = compactRecommendation(full)
+
+    const restored = restoreRecommendations(
+      itineraryWithMeal({
+        ...compact,
+        mealType: ['lunch'],
+        description: 'Rewritten for this day',
+      }),
+      [output('food-dining', [full])]
+    )
+
+    expect(restored.days[0]!.meals[0]).toMatchObject({
+      mealType: ['lunch'],
+      description: 'Rewritten for this day',
+      placeId: 'place-Bistro',
+      mustTry: ['one', 'two', 'three', 'four'],
+    })
+  })
+
+  it('ignores research recommendations without a name', () => {
+    const nameless = {
+      ...recommendation('Cafe', 90),
+      name: undefined,
+    } as unknown as Recommendation
+
+    const restored = restoreRecommendations(
+      itineraryWithMeal({ name: 'Cafe' }),
+      [output('food-dining', [nameless])]
+    )
+
+    expect(restored.days[0]!.meals[0]).toEqual({ name: 'Cafe' })
+  })
+})
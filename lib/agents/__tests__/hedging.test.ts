@@ -0,0 +1,87 @@
+/**
+ * Unit Tests for hedged LLM requests
+ */
+
+import { HedgeBudget, getHedgeBudget, hedgedRequest } from '../hedging'
+
+// Attempt that resolves with `value` after `ms`, rejecting if aborted
+const delayed = (ms: number, value: string) => (signal: AbortSignal) =>
+  new Promise<string>((resolve, reject) => {
+    const timer = setTimeout(() => resolve(value), ms)
+    signal.addEventListener('abort', () => {
+      clearTimeout(timer)
+      reject(new Error('aborted'))
+    })
+  })
+
+describe('hedgedRequest', () => {
+  beforeEach(() => {
+    jest.useFakeTimers()
+  })
+
+  afterEach(() => {
+    jest.useRealTimers()
+  })
+
+  it('hedges a slow primary and aborts it', async () => {
+    const budget = new HedgeBudget(1)
+    const signals: AbortSignal[] = []
+
+    const result = hedgedRequest(
+      (signal, hedged) => {
+        signals.push(signal)
+        return hedged
+          ? delayed(100, 'hedge')(signal)
+          : delayed(5000, 'primary')(signal)
+      },
+      { delayMs: 500, budget }
+    )
+
+    await jest.advanceTimersByTimeAsync(600)
+
+    await expect(result).resolves.toBe('hedge')
+    expect(signals).toHaveLength(2)
+    expect(signals[0]!.aborted).toBe(true)
+    expect(budget.getStats()).toMatchObject({ hedgedCalls: 1, hedgeWins: 1 })
+  })
+
+  it('does not hedge calls that finish before the delay', async () => {
+    const budget = new HedgeBudget(1)
+    const attempt = jest.fn(delayed(200, 'primary'))
+
+    const result = hedgedRequest(attempt, { delayMs: 500, budget })
+    await jest.advanceTimersByTimeAsync(1000)
+
+    await expect(result).resolves.toBe('primary')
+    expect(attempt).toHaveBeenCalledTimes(1)
+  })
+
+  it('caps hedges at the configured share of primary calls', async () => {
+    const budget = new HedgeBudget(0.5)
+
+    const results = [1, 2, 3, 4].map(() =>
+      hedgedRequest(delayed(1000, 'done'), { delayMs: 100, budget })
+    )
+    await jest.advanceTimersByTimeAsync(1000)
+    await Promise.all(results)
+
+    expect(budget.getStats()).toMatchObject({
+      primaryCalls: 4,
+      hedgedCalls: 2,
+      deniedHedges: 2,
+    })
+  })
+})
+
+describe('getHedgeBudget', () => {
+  it('allows no hedges when LLM_HEDGE_BUDGET_PERCENT is unset', () => {
+    delete process.env.LLM_HEDGE_BUDGET_PERCENT
+    const budget = getHedgeBudget()
+
+    for (let call = 0; call < 20; call++) {
+      budget.recordPrimary()
+    }
+    expect(budget.ratio).toBe(0)
+    expect(budget.tryAcquire()).toBe(false)
+  })
+})
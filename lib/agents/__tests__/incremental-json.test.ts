@@ -0,0 +1,55 @@
+/**
+ * Unit Tests for the incremental JSON parser
+ */
+
+import { IncrementalJSONParser } from '../incremental-json'
+
+const RESPONSE = `\`\`\`json
+{
+  "reasoning": "Mix of [icons] and {gems}",
+  "highlights": [{ "name": "Not a recommendation" }],
+  "recommendations": [
+    { "name": "Primanti \\"Bros\\" }", "mustTry": ["sandwich"] },
+    { "name": "Pamela's", "hours": { "open": [7, 15] } }
+  ],
+  "notes": { "recommendations": [{ "name": "Nested" }] }
+}
+\`\`\``
+
+function parseInChunks(size: number): unknown[] {
+  const elements: unknown[] = []
+  const parser = new IncrementalJSONParser('recommendations', element =>
+    elements.push(element)
+  )
+  for (let index = 0; index < RESPONSE.length; index += size) {
+    parser.push(RESPONSE.slice(index, index + size))
+  }
+  return elements
+}
+
+describe('IncrementalJSONParser', () => {
+  it('emits each array element however the text is chunked', () => {
+    const expected = [
+      { name: 'Primanti "Bros" }', mustTry: ['sandwich'] },
+      { name: "Pamela's", hours: { open: [7, 15] } },
+    ]
+
+    expect(parseInChunks(1)).toEqual(expected)
+    expect(parseInChunks(7)).toEqual(expected)
+    expect(parseInChunks(RESPONSE.length)).toEqual(expected)
+  })
+
+  it('emits an element as soon as it closes', () => {
+    const emitted: unknown[] = []
+    const parser = new IncrementalJSONParser('recommendations', element =>
+      emitted.push(element)
+    )
+
+    parser.push('{"recommendations": [{"name": "A"}, {"name": "B"')
+    expect(emitted).toEqual([{ name: 'A' }])
+    expect(parser.count).toBe(1)
+
+    parser.push('}]}')
+    expect(emitted).toEqual([{ name: 'A' }, { name: 'B' }])
+  })
+})
@@ -0,0 +1,117 @@
+/**
+ * Unit Tests for cascade model routing
+ */
+
+import { calculateCost } from '../cost-ledger'
+import {
+  getModelCascade,
+  runCascade,
+  type CascadeAttempt,
+} from '../model-router'
+
+const HAIKU = 'claude-3-haiku-20240307'
+const SONNET = 'claude-3-5-sonnet-20241022'
+
+// Attempt that answers with the text given for each model
+const answers =
+  (texts: Record<string, string>) =>
+  async (model: string): Promise<CascadeAttempt> => ({
+    text: texts[model]!,
+    model,
+    inputTokens: 1000,
+    outputTokens: 500,
+  })
+
+const check = {
+  parse: (text: string) => JSON.parse(text) as { confidence: number },
+  confidence: (result: { confidence: number }) => result.confidence,
+  minConfidence: 0.7,
+}
+
+describe('getModelCascade', () => {
+  it('tries cheaper tiers before the top model', () => {
+    expect(getModelCascade(SONNET)).toEqual([HAIKU, SONNET])
+    expect(getModelCascade('claude-3-sonnet-20240229')).toEqual([
+      HAIKU,
+      'claude-3-sonnet-20240229',
+    ])
+    expect(getModelCascade(HAIKU)).toEqual([HAIKU])
+  })
+})
+
+describe('runCascade', () => {
+  it('keeps the cheap model when it meets the quality target', async () => {
+    const attempt = jest.fn(answers({ [HAIKU]: '{"confidence": 0.9}' }))
+
+    const { result, outcome } = await runCascade(
+      [HAIKU, SONNET],
+      attempt,
+      check
+    )
+
+    expect(result.confidence).toBe(0.9)
+    expect(attempt).toHaveBeenCalledTimes(1)
+    expect(outcome).toMatchObject({ model: HAIKU, escalations: [] })
+    expect(outcome.costUsd).toBeCloseTo(calculateCost(HAIKU, 1000, 500))
+    expect(outcome.baselineCostUsd).toBeCloseTo(
+      calculateCost(SONNET, 1000, 500)
+    )
+  })
+
+  it('escalates on low confidence and on schema failures', async () => {
+    const lowConfidence = await runCascade(
+      [HAIKU, SONNET],
+      answers({
+        [HAIKU]: '{"confidence": 0.4}',
+        [SONNET]: '{"confidence": 0.5}',
+      }),
+      check
+    )
+    expect(lowConfidence.result.confidence).toBe(0.5)
+    expect(lowConfidence.outcome.escalations).toEqual([
+      { from: HAIKU, reason: 'confidence' },
+    ])
+
+    const invalid = await runCascade(
+      [HAIKU, SONNET],
+      answers({ [HAIKU]: 'not json', [SONNET]: '{"confidence": 0.8}' }),
+      check
+    )
+    expect(invalid.outcome).toMatchObject({
+      model: SONNET,
+      attempts: 2,
+      escalations: [{ from: HAIKU, reason: 'schema' }],
+    })
+  })
+
+  it('throws when the top model fails validation', async () => {
+    await expect(
+      runCascade([HAIKU, SONNET], answers({}), {
+        ...check,
+        parse: () => {
+          throw new Error('invalid')
+        },
+      })
+    ).rejects.toThrow('invalid')
+  })
+
+  it('keeps the cheap output when there is no time to escalate', async () => {
+    const attempt = jest.fn(
+      answers({
+        [HAIKU]: '{"confidence": 0.4}',
+        [SONNET]: '{"confidence": 0.9}',
+      })
+    )
+    const canEscalate = jest.fn(() => false)
+
+    const { result, outcome } = await runCascade([HAIKU, SONNET], attempt, {
+      ...check,
+      canEscalate,
+    })
+
+    expect(result.confidence).toBe(0.4)
+    expect(attempt).toHaveBeenCalledTimes(1)
+    expect(canEscalate).toHaveBeenCalledWith(expect.any(Number))
+    expect(outcome).toMatchObject({ model: HAIKU, escalations: [] })
+  })
+})
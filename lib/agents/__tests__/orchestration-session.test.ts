@@ -0,0 +1,58 @@
+/**
+ * Unit Tests for request-scoped Orchestration Sessions
+ */
+
+import { OrchestrationSession } from '../orchestration-session'
+
+describe('OrchestrationSession', () => {
+  it('bounds the conversation log to the most recent messages', () => {
+    const session = new OrchestrationSession({ maxMessages: 3 })
+
+    for (let i = 0; i < 5; i++) {
+      session.addMessage({
+        from: 'concierge',
+        to: 'broadcast',
+        type: 'status',
+        payload: { step: i },
+      })
+    }
+
+    const log = session.getConversationLog()
+    expect(log.map(message => message.payload.step)).toEqual([2, 3, 4])
+    expect(session.getDroppedMessageCount()).toBe(2)
+  })
+
+  it('keeps usage separate between concurrent sessions', () => {
+    const first = new OrchestrationSession()
+    const second = new OrchestrationSession()
+    const record = (
+      session: OrchestrationSession,
+      inputTokens: number,
+      outputTokens: number
+    ) => {
+      const plan = session.ledger.planCall({
+        model: 'claude-3-haiku-20240307',
+        maxTokens: 2000,
+        inputTokens,
+      })
+      session.ledger.record(plan, {
+        agentType: 'lodging',
+        phase: 'research',
+        inputTokens,
+        outputTokens,
+      })
+    }
+
+    record(first, 1000, 500)
+    record(first, 200, 100)
+    record(second, 50, 25)
+
+    expect(first.getTokenUsage()).toEqual({
+      prompt: 1200,
+      completion: 600,
+      total: 1800,
+    })
+    expect(second.getCosts().llmTokens).toBe(75)
+    expect(first.sessionId).not.toBe(second.sessionId)
+  })
+})
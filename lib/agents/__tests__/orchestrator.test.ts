@@ -0,0 +1,139 @@
+/**
+ * Unit Tests for the Agent Orchestrator's event stream
+ */
+
+import { Deadline } from '@/lib/resilience'
+
+import { AgentOrchestrator } from '../orchestrator'
+import type {
+  OrchestrationEvent,
+  OrchestrationOptions,
+  OrchestrationResult,
+  TTravelRequirements,
+} from '../types'
+
+// generateItinerary is replaced in each test; avoid building the real
+// agents and their LLM clients
+jest.mock('../concierge-agent', () => ({ ConciergeAgent: jest.fn() }))
+jest.mock('../quality-validator-agent', () => ({
+  QualityValidatorAgent: jest.fn(),
+}))
+jest.mock('../lodging-agent', () => ({ LodgingAgent: jest.fn() }))
+jest.mock('../food-dining-agent', () => ({ FoodDiningAgent: jest.fn() }))
+
+const requirements = {
+  destination: 'Pittsburgh',
+  interests: ['food-dining'],
+} as unknown as TTravelRequirements
+
+const result: OrchestrationResult = { success: true, totalExecutionTime: 10 }
+
+const phase = (status: 'started' | 'completed'): OrchestrationEvent => ({
+  type: 'phase',
+  phase: 'research',
+  status,
+  timestamp: Date.now(),
+})
+
+type Generate = (options: OrchestrationOptions) => Promise<OrchestrationResult>
+
+function createOrchestrator(generate: Generate) {
+  const orchestrator = new AgentOrchestrator()
+  jest
+    .spyOn(orchestrator, 'generateItinerary')
+    .mockImplementation((_requirements, _persona, _constraints, options) =>
+      generate(options || {})
+    )
+  return orchestrator
+}
+
+describe('AgentOrchestrator.streamItinerary', () => {
+  let deadline: Deadline
+
+  beforeEach(() => {
+    deadline = new Deadline(60000)
+  })
+
+  afterEach(() => {
+    deadline.dispose()
+  })
+
+  it('yields events in order and ends once generation finishes', async () => {
+    const onEvent = jest.fn()
+    const orchestrator = createOrchestrator(async options => {
+      options.onEvent?.(phase('started'))
+      await Promise.resolve()
+      options.onEvent?.(phase('completed'))
+      options.onEvent?.({ type: 'complete', result, timestamp: Date.now() })
+      return result
+    })
+
+    const events: OrchestrationEvent[] = []
+    for await (const event of orchestrator.streamItinerary(
+      requirements,
+      undefined,
+      undefined,
+      { deadline, onEvent }
+    )) {
+      events.push(event)
+    }
+
+    expect(events.map(event => event.type)).toEqual([
+      'phase',
+      'phase',
+      'complete',
+    ])
+    expect(onEvent).toHaveBeenCalledTimes(3)
+  })
+
+  it('throws generation errors after the events sent before them', async () => {
+    const orchestrator = createOrchestrator(async options => {
+      options.onEvent?.(phase('started'))
+      throw new Error('Anthropic unavailable')
+    })
+
+    const events: OrchestrationEvent[] = []
+    await expect(
+      (async () => {
+        for await (const event of orchestrator.streamItinerary(
+          requirements,
+          undefined,
+          undefined,
+          { deadline }
+        )) {
+          events.push(event)
+        }
+      })()
+    ).rejects.toThrow('Anthropic unavailable')
+    expect(events).toHaveLength(1)
+  })
+
+  it('aborts generation when the consumer stops early', async () => {
+    let signal: AbortSignal | undefined
+    const orchestrator = createOrchestrator(
+      options =>
+        new Promise(resolve => {
+          signal = options.deadline?.signal
+          options.onEvent?.(phase('started'))
+          signal?.addEventListener('abort', () => {
+            options.onEvent?.(phase('completed'))
+            resolve({ ...result, success: false })
+          })
+        })
+    )
+
+    for await (const event of orchestrator.streamItinerary(
+      requirements,
+      undefined,
+      undefined,
+      { deadline }
+    )) {
+      expect(event).toMatchObject({ type: 'phase', status: 'started' })
+      break
+    }
+
+    expect(signal?.aborted).toBe(true)
+    // Only the stream's own deadline is aborted, not the caller's
+    expect(deadline.signal.aborted).toBe(false)
+  })
+})
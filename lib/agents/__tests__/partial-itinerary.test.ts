@@ -0,0 +1,200 @@
+/**
+ * Unit Tests for Partial Itineraries
+ */
+
+import {
+  createPartialItinerary,
+  describeMissingSections,
+  findMissingSections,
+  parseDayCount,
+  planMeals,
+} from '../partial-itinerary'
+import type {
+  AgentContext,
+  AgentType,
+  Recommendation,
+  ResearchOutput,
+  TaskSpecification,
+} from '../types'
+
+const rec = (
+  name: string,
+  overrides: Partial<Recommendation> = {}
+): Recommendation => ({
+  name,
+  category: 'test',
+  description: `${name} description`,
+  whyRecommended: 'fits the persona',
+  personaFit: 50,
+  ...overrides,
+})
+
+const output = (
+  agentType: AgentType,
+  recommendations: Recommendation[]
+): ResearchOutput => ({
+  agentType,
+  status: 'success',
+  recommendations,
+  confidence: 0.8,
+  reasoning: 'test',
+})
+
+const context = (duration?: string) =>
+  ({
+    userRequirements: { duration },
+    destinationCity: 'Pittsburgh, PA',
+    personaProfile: { primary: 'foodie' },
+    constraints: {},
+    previousFindings: new Map(),
+  }) as unknown as AgentContext
+
+const task = (agentType: AgentType) =>
+  ({ taskId: agentType, agentType }) as TaskSpecification
+
+describe('parseDayCount', () => {
+  it.each<[string | undefined, number]>([
+    ['3 days', 3],
+    ['3-4 days', 3],
+    ['2.5 days', 3],
+    ['1 week', 7],
+    ['a week', 7],
+    ['2 weeks', 14],
+    ['weekend', 2],
+    ['a long weekend', 3],
+    ['4 day weekend', 4],
+    ['0 days', 1],
+    ['30 days', 14],
+    ['a few days', 3],
+    ['', 3],
+    [undefined, 3],
+  ])('parses %p as %p days', (duration, days) => {
+    expect(parseDayCount(duration)).toBe(days)
+  })
+})
+
+describe('planMeals', () => {
+  it('slots meals by meal type before filling gaps', () => {
+    const dinner = rec('Dinner Spot', { mealType: ['Dinner'] })
+    const brunch = rec('Brunch Spot', { mealType: ['breakfast', 'lunch'] })
+    const cafe = rec('Cafe')
+
+    expect(planMeals([dinner, cafe, brunch], 1)).toEqual([
+      [brunch, cafe, dinner],
+    ])
+  })
+
+  it('uses each recommendation once and leaves later days short', () => {
+    const dining = [rec('A'), rec('B'), rec('C'), rec('D')]
+    const days = planMeals(dining, 2)
+
+    expect(days[0]).toHaveLength(3)
+    expect(days[1]).toEqual([dining[3]])
+  })
+
+  it('returns empty days without dining research', () => {
+    expect(planMeals([], 2)).toEqual([[], []])
+  })
+})
+
+describe('findMissingSections', () => {
+  it('reports unfinished research and unvalidated outputs', () => {
+    const results = new Map<AgentType, ResearchOutput>([
+      ['lodging', output('lodging', [])],
+    ])
+
+    expect(
+      findMissingSections(
+        [task('lodging'), task('food-dining')],
+        results,
+        ['lodging']
+      )
+    ).toEqual(['food-dining', 'validation'])
+    expect(findMissingSections([task('lodging')], results, [])).toEqual([])
+  })
+})
+
+describe('describeMissingSections', () => {
+  it('uses known warnings and falls back for other agents', () => {
+    const [lodging, historian] = describeMissingSections([
+      'lodging',
+      'historian',
+    ])
+
+    expect(lodging).toMatch(/no stays are listed/)
+    expect(historian).toBe('historian recommendations did not finish in time.')
+  })
+})
+
+describe('createPartialItinerary', () => {
+  it('builds days from dining and activities when lodging is missing', () => {
+    const results = new Map<AgentType, ResearchOutput>([
+      ['food-dining', output('food-dining', [rec('Diner')])],
+      [
+        'historian',
+        output('historian', [
+          rec('Museum', { personaFit: 40 }),
+          rec('Fort', { personaFit: 90, estimatedTime: '1 hour' }),
+          rec('Bridge', { personaFit: 60 }),
+        ]),
+      ],
+    ])
+
+    const itinerary = createPartialItinerary(context('2 days'), results, [
+      'lodging',
+    ])
+
+    expect(itinerary.partial).toBe(true)
+    expect(itinerary.lodging).toEqual([])
+    expect(itinerary.missingSections).toEqual(['lodging'])
+    expect(itinerary.warnings).toEqual(describeMissingSections(['lodging']))
+    expect(itinerary.days.map(day => day.theme)).toEqual([
+      'Arrival and Exploration',
+      'Final Discoveries',
+    ])
+    expect(itinerary.days[0]!.meals.map(meal => meal.name)).toEqual(['Diner'])
+    expect(itinerary.days[0]!.activities).toEqual([
+      {
+        time: '10:00 AM',
+        activity: expect.objectContaining({ name: 'Fort' }),
+        duration: '1 hour',
+      },
+      {
+        time: '2:00 PM',
+        activity: expect.objectContaining({ name: 'Bridge' }),
+        duration: '2 hours',
+      },
+    ])
+    expect(itinerary.days[1]!.activities.map(a => a.activity.name)).toEqual([
+      'Museum',
+    ])
+  })
+
+  it('keeps the best lodging and empty meals when dining is missing', () => {
+    const results = new Map<AgentType, ResearchOutput>([
+      [
+        'lodging',
+        output('lodging', [
+          rec('Motel', { personaFit: 20 }),
+          rec('Inn', { personaFit: 80 }),
+          rec('Hotel', { personaFit: 60 }),
+        ]),
+      ],
+    ])
+
+    const itinerary = createPartialItinerary(context(), results, [
+      'food-dining',
+    ])
+
+    expect(itinerary.duration).toBe('3 days')
+    expect(itinerary.days).toHaveLength(3)
+    expect(itinerary.lodging.map(stay => stay.name)).toEqual(['Inn', 'Hotel'])
+    expect(itinerary.days.every(day => day.meals.length === 0)).toBe(true)
+    expect(itinerary.days.every(day => day.activities.length === 0)).toBe(
+      true
+    )
+    expect(itinerary.warnings).toEqual([
+      expect.stringMatching(/meals are incomplete/),
+    ])
+  })
+})
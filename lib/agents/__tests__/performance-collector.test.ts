@@ -0,0 +1,102 @@
+/**
+ * Unit Tests for non-blocking metrics collection
+ */
+
+import {
+  AgentPerformanceCollector,
+  MemoryMetricsStorage,
+} from '../performance-collector'
+
+const createCollector = (
+  storage = new MemoryMetricsStorage(),
+  maxQueueSize = 10
+) => new AgentPerformanceCollector(storage, { batchSize: 5, maxQueueSize })
+
+const sample = (collector: AgentPerformanceCollector, index = 0) =>
+  collector.createMetrics({
+    agentType: 'lodging',
+    executionTime: 1000,
+    confidence: 0.9,
+    success: true,
+    requestId: `request_${index}`,
+    sessionId: 'session',
+  })
+
+describe('AgentPerformanceCollector', () => {
+  beforeEach(() => {
+    jest.useFakeTimers()
+  })
+
+  afterEach(() => {
+    jest.useRealTimers()
+    jest.restoreAllMocks()
+  })
+
+  it('stores a full batch off the caller's path', () => {
+    const storage = new MemoryMetricsStorage()
+    const store = jest
+      .spyOn(storage, 'store')
+      .mockReturnValue(new Promise(() => {}))
+    const collector = createCollector(storage)
+
+    for (let i = 0; i < 5; i++) {
+      collector.collectMetrics(sample(collector, i))
+    }
+    expect(store).not.toHaveBeenCalled()
+
+    // The drainer picks the batch up on the next tick and waits on storage
+    jest.advanceTimersByTime(0)
+    expect(collector.getQueueStats()).toMatchObject({ queued: 0, stored: 0 })
+  })
+
+  it('drops and counts metrics when the queue is full', () => {
+    const collector = createCollector(undefined, 2)
+    for (let i = 0; i < 4; i++) {
+      collector.collectMetrics(sample(collector, i))
+    }
+
+    expect(collector.getQueueStats()).toMatchObject({ queued: 2, dropped: 2 })
+  })
+
+  it('stores everything queued on shutdown', async () => {
+    const storage = new MemoryMetricsStorage()
+    const collector = createCollector(storage)
+    for (let i = 0; i < 3; i++) {
+      collector.collectMetrics(sample(collector, i))
+    }
+
+    await collector.flushOnShutdown()
+
+    expect(collector.getQueueStats()).toMatchObject({ queued: 0, stored: 3 })
+    const benchmark = await storage.getBenchmark('lodging', 'day')
+    expect(benchmark?.sampleSize).toBe(3)
+  })
+
+  it('counts failed storage writes without throwing', async () => {
+    const storage = new MemoryMetricsStorage()
+    jest.spyOn(storage, 'store').mockRejectedValue(new Error('down'))
+    jest.spyOn(console, 'error').mockImplementation(() => {})
+    const collector = createCollector(storage)
+
+    collector.collectMetrics(sample(collector))
+    await collector.flushOnShutdown()
+
+    expect(collector.getQueueStats()).toMatchObject({ stored: 0, failed: 1 })
+  })
+
+  it('stops waiting on a slow flush after the timeout', async () => {
+    const storage = new MemoryMetricsStorage()
+    jest.spyOn(storage, 'store').mockReturnValue(new Promise(() => {}))
+    const collector = createCollector(storage)
+    collector.collectMetrics(sample(collector))
+
+    let flushed = false
+    const flush = collector.flushOnShutdown(200).then(() => (flushed = true))
+    await jest.advanceTimersByTimeAsync(199)
+    expect(flushed).toBe(false)
+
+    await jest.advanceTimersByTimeAsync(1)
+    await flush
+    expect(flushed).toBe(true)
+  })
+})
@@ -0,0 +1,186 @@
+/**
+ * Unit Tests for research plan normalization and the Plan Cache
+ */
+
+import {
+  isValidPlan,
+  normalizePlan,
+  PlanCache,
+  getPlanCacheKey,
+  type ResearchPlan,
+} from '../plan-cache'
+import type { AgentContext, TaskSpecification } from '../types'
+
+const createContext = (overrides: Partial<AgentContext> = {}): AgentContext =>
+  ({
+    userRequirements: { duration: '3 days' },
+    destinationCity: 'Pittsburgh',
+    personaProfile: {
+      primary: 'foodie',
+      interests: ['coffee', 'jazz'],
+      travelStyle: 'balanced',
+      activityLevel: 'moderate',
+    },
+    constraints: { budget: 'moderate', dietary: ['vegetarian'] },
+    previousFindings: new Map(),
+    ...overrides,
+  }) as AgentContext
+
+const task = (
+  agentType: string,
+  dependsOn?: string[]
+): Partial<TaskSpecification> =>
+  ({
+    agentType,
+    description: `Research ${agentType}`,
+    dependsOn,
+  }) as Partial<TaskSpecification>
+
+describe('normalizePlan', () => {
+  it('drops malformed tasks and fills in defaults', () => {
+    const plan = normalizePlan([
+      { agentType: 'lodging', description: 'Find a hotel', priority: 'urgent' },
+      { description: 'No agent type' },
+      { agentType: 'food-dining' },
+    ] as Partial<TaskSpecification>[])
+
+    expect(plan).toEqual([
+      {
+        agentType: 'lodging',
+        priority: 'medium',
+        description: 'Find a hotel',
+        constraints: [],
+        expectedOutput: 'Research recommendations',
+        dependsOn: [],
+      },
+    ])
+  })
+
+  it('returns an empty plan for non-array responses', () => {
+    expect(normalizePlan({} as any)).toEqual([])
+  })
+
+  it('keeps only dependencies on other agent types in the plan', () => {
+    const plan = normalizePlan([
+      task('lodging', ['lodging', 'historian', 'food-dining', 'food-dining']),
+      task('food-dining'),
+    ])
+
+    expect(plan[0].dependsOn).toEqual(['food-dining'])
+    expect(plan[1].dependsOn).toEqual([])
+  })
+
+  it('breaks mutual dependencies, keeping the earlier edge', () => {
+    const plan = normalizePlan([
+      task('lodging', ['food-dining']),
+      task('food-dining', ['lodging']),
+    ])
+
+    expect(plan[0].dependsOn).toEqual(['food-dining'])
+    expect(plan[1].dependsOn).toEqual([])
+    expect(isValidPlan(plan)).toBe(true)
+  })
+
+  it('breaks longer cycles', () => {
+    const plan = normalizePlan([
+      task('lodging', ['food-dining']),
+      task('food-dining', ['historian']),
+      task('historian', ['lodging']),
+    ])
+
+    expect(plan.map(t => t.dependsOn)).toEqual([
+      ['food-dining'],
+      ['historian'],
+      [],
+    ])
+    expect(isValidPlan(plan)).toBe(true)
+  })
+})
+
+describe('isValidPlan', () => {
+  const planned = (
+    agentType: TaskSpecification['agentType'],
+    dependsOn: TaskSpecification['agentType'][] = []
+  ): ResearchPlan[number] => ({
+    agentType,
+    priority: 'high',
+    description: `Research ${agentType}`,
+    constraints: [],
+    expectedOutput: 'Research recommendations',
+    dependsOn,
+  })
+
+  it('rejects empty plans, unknown dependencies and cycles', () => {
+    expect(isValidPlan([])).toBe(false)
+    expect(isValidPlan([planned('lodging', ['historian'])])).toBe(false)
+    expect(
+      isValidPlan([
+        planned('lodging', ['food-dining']),
+        planned('food-dining', ['lodging']),
+      ])
+    ).toBe(false)
+  })
+
+  it('accepts acyclic plans', () => {
+    expect(
+      isValidPlan([planned('lodging'), planned('food-dining', ['lodging'])])
+    ).toBe(true)
+  })
+})
+
+describe('PlanCache', () => {
+  const plan = normalizePlan([task('lodging'), task('food-dining')])
+
+  it('shares entries between equivalent trip shapes', () => {
+    const cache = new PlanCache()
+    cache.set(createContext(), plan)
+
+    const equivalent = createContext({
+      destinationCity: '  pittsburgh ',
+      personaProfile: {
+        primary: 'foodie',
+        interests: ['Jazz', 'coffee'],
+        travelStyle: 'balanced',
+        activityLevel: 'moderate',
+      },
+    })
+
+    expect(getPlanCacheKey(equivalent)).toBe(getPlanCacheKey(createContext()))
+    expect(cache.get(equivalent)).toBe(plan)
+  })
+
+  it('keeps different trip shapes apart', () => {
+    const cache = new PlanCache()
+    cache.set(createContext(), plan)
+
+    expect(
+      cache.get(createContext({ constraints: { budget: 'luxury' } }))
+    ).toBeUndefined()
+  })
+
+  it('does not cache invalid plans', () => {
+    const cache = new PlanCache()
+    const cyclic: ResearchPlan = [
+      { ...plan[0], dependsOn: ['food-dining'] },
+      { ...plan[1], dependsOn: ['lodging'] },
+    ]
+
+    expect(cache.set(createContext(), cyclic)).toBe(false)
+    expect(cache.set(createContext(), [])).toBe(false)
+    expect(cache.size).toBe(0)
+    expect(cache.get(createContext())).toBeUndefined()
+  })
+
+  it('expires plans after the TTL', () => {
+    jest.useFakeTimers()
+    try {
+      const cache = new PlanCache(10, 1000)
+      expect(cache.set(createContext(), plan)).toBe(true)
+
+      jest.advanceTimersByTime(1001)
+      expect(cache.get(createContext())).toBeUndefined()
+    } finally {
+      jest.useRealTimers()
+    }
+  })
+})
@@ -0,0 +1,59 @@
+/**
+ * Unit Tests for batch Research Groups
+ */
+
+import { getResearchGroupKey, groupByResearchKey } from '../research-group'
+import type { TTravelRequirements } from '../types'
+
+const request = (overrides: Record<string, unknown>) =>
+  ({
+    originCity: 'Chicago',
+    numberOfAdults: 2,
+    numberOfChildren: 0,
+    childrenAges: [],
+    preferredTravelMethods: ['drive'],
+    interests: ['food-dining'],
+    destination: 'Pittsburgh, PA',
+    ...overrides,
+  }) as unknown as TTravelRequirements
+
+describe('getResearchGroupKey', () => {
+  it('ignores persona-only differences and destination formatting', () => {
+    const foodie = request({ interests: ['food-dining'], pace: 'relaxed' })
+    const family = request({
+      destination: '  pittsburgh, pa ',
+      interests: ['history'],
+      numberOfChildren: 2,
+    })
+
+    expect(getResearchGroupKey(foodie)).toBe(getResearchGroupKey(family))
+  })
+
+  it('separates requests with different budgets or dietary needs', () => {
+    const base = getResearchGroupKey(request({}))
+
+    expect(getResearchGroupKey(request({ budget: 'luxury' }))).not.toBe(base)
+    expect(getResearchGroupKey(request({ dietary: ['vegan'] }))).not.toBe(
+      base
+    )
+  })
+
+  it('treats dietary needs as an unordered set', () => {
+    expect(
+      getResearchGroupKey(request({ dietary: ['Vegan', 'gluten-free'] }))
+    ).toBe(getResearchGroupKey(request({ dietary: ['gluten-free', 'vegan'] })))
+  })
+})
+
+describe('groupByResearchKey', () => {
+  it('groups requests in order of first appearance', () => {
+    const groups = groupByResearchKey([
+      request({ interests: ['arts'] }),
+      request({ destination: 'Asheville, NC' }),
+      request({ interests: ['nature-outdoors'] }),
+      request({ budget: 'moderate' }),
+    ])
+
+    expect(groups.map(group => group.indices)).toEqual([[0, 2, 3], [1]])
+  })
+})
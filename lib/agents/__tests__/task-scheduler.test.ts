@@ -0,0 +1,173 @@
+/**
+ * Unit Tests for the research Task Scheduler
+ */
+
+import { TaskScheduler, type ScheduledTask } from '../task-scheduler'
+
+interface Deferred<T> {
+  promise: Promise<T>
+  resolve: (value: T) => void
+  reject: (reason: unknown) => void
+}
+
+// Resolvable promise for controlling task completion order
+function deferred<T>(): Deferred<T> {
+  let resolve!: (value: T) => void
+  let reject!: (reason: unknown) => void
+  const promise = new Promise<T>((res, rej) => {
+    resolve = res
+    reject = rej
+  })
+  return { promise, resolve, reject }
+}
+
+const flush = () => new Promise(resolve => setTimeout(resolve, 0))
+
+describe('TaskScheduler', () => {
+  it('runs independent tasks concurrently and returns every outcome', async () => {
+    const scheduler = new TaskScheduler()
+    const started: string[] = []
+
+    const tasks: ScheduledTask<string>[] = ['a', 'b', 'c'].map(id => ({
+      id,
+      priority: 'medium',
+      run: async () => {
+        started.push(id)
+        return id.toUpperCase()
+      },
+    }))
+
+    const outcomes = await scheduler.run(tasks)
+
+    expect(started.sort()).toEqual(['a', 'b', 'c'])
+    expect(outcomes.get('b')).toEqual({ status: 'fulfilled', value: 'B' })
+  })
+
+  it('starts a dependent task only after its dependency settles', async () => {
+    const scheduler = new TaskScheduler()
+    const lodging = deferred<string>()
+    const started: string[] = []
+
+    const run = scheduler.run<string>([
+      {
+        id: 'lodging',
+        priority: 'high',
+        run: () => {
+          started.push('lodging')
+          return lodging.promise
+        },
+      },
+      {
+        id: 'dining',
+        priority: 'high',
+        dependsOn: ['lodging'],
+        run: async () => {
+          started.push('dining')
+          return 'dining'
+        },
+      },
+    ])
+
+    await flush()
+    expect(started).toEqual(['lodging'])
+
+    lodging.resolve('lodging')
+    await run
+    expect(started).toEqual(['lodging', 'dining'])
+  })
+
+  it('enforces per-resource concurrency limits in priority order', async () => {
+    const scheduler = new TaskScheduler({
+      concurrencyLimits: { haiku: 1 },
+    })
+    const gates = new Map<string, Deferred<string>>()
+    const started: string[] = []
+
+    const task = (
+      id: string,
+      priority: ScheduledTask<string>['priority']
+    ): ScheduledTask<string> => {
+      gates.set(id, deferred<string>())
+      return {
+        id,
+        priority,
+        resourceKey: 'haiku',
+        run: () => {
+          started.push(id)
+          return gates.get(id)!.promise
+        },
+      }
+    }
+
+    const run = scheduler.run([
+      task('first', 'low'),
+      task('background', 'low'),
+      task('urgent', 'high'),
+    ])
+
+    await flush()
+    expect(started).toEqual(['urgent'])
+    expect(scheduler.getActiveCount('haiku')).toBe(1)
+
+    gates.get('urgent')!.resolve('urgent')
+    await flush()
+    expect(started).toEqual(['urgent', 'first'])
+
+    gates.get('first')!.resolve('first')
+    await flush()
+    gates.get('background')!.resolve('background')
+    await run
+
+    expect(started).toEqual(['urgent', 'first', 'background'])
+    expect(scheduler.getActiveCount('haiku')).toBe(0)
+  })
+
+  it('still runs dependents when a dependency fails', async () => {
+    const scheduler = new TaskScheduler()
+
+    const outcomes = await scheduler.run<string>([
+      {
+        id: 'lodging',
+        priority: 'high',
+        run: async () => {
+          throw new Error('LLM unavailable')
+        },
+      },
+      {
+        id: 'dining',
+        priority: 'high',
+        dependsOn: ['lodging'],
+        run: async () => 'dining',
+      },
+    ])
+
+    expect(outcomes.get('lodging')?.status).toBe('rejected')
+    expect(outcomes.get('dining')).toEqual({
+      status: 'fulfilled',
+      value: 'dining',
+    })
+  })
+
+  it('rejects dependency cycles', async () => {
+    const scheduler = new TaskScheduler()
+
+    await expect(
+      scheduler.run<string>([
+        { id: 'a', priority: 'high', dependsOn: ['b'], run: async () => 'a' },
+        { id: 'b', priority: 'high', dependsOn: ['a'], run: async () => 'b' },
+      ])
+    ).rejects.toThrow('cycle')
+  })
+
+  it('rejects duplicate task ids', async () => {
+    const scheduler = new TaskScheduler()
+
+    await expect(
+      scheduler.run<string>([
+        { id: 'a', priority: 'high', run: async () => 'first' },
+        { id: 'a', priority: 'low', run: async () => 'second' },
+        { id: 'b', priority: 'high', dependsOn: ['a'], run: async () => 'b' },
+      ])
+    ).rejects.toThrow('Duplicate task id a')
+  })
+})
@@ -6,17 +6,49 @@
 import { Anthropic } from '@anthropic-ai/sdk'
 
 import { getServerEnv } from '@/lib/config/env'
-
+import { getAnthropicClient } from '@/lib/llm/client-registry'
+import { withFixture } from '@/lib/llm/fixtures'
+import {
+  classifyError,
+  getAdmissionController,
+  getCircuitBreaker,
+  withRetry,
+  withTimeout,
+  type AdmissionPriority,
+} from '@/lib/resilience'
+
+import { estimateTokens, getMinCacheableTokens } from './cost-ledger'
+import { getHedgeBudget, hedgedRequest } from './hedging'
+import { IncrementalJSONParser } from './incremental-json'
+import { getModelCascade, runCascade, type QualityCheck } from './model-router'
 import { getMetricsCollector } from './performance-collector'
+import type { LLMTokenUsage } from './performance-metrics'
+import {
+  getResearchCache,
+  getResearchCacheKey,
+  type ResearchPayload,
+} from './research-cache'
 import type {
   AgentConfig,
   AgentContext,
   AgentMessage,
   AgentResponse,
   AgentType,
+  LLMCallOptions,
+  Recommendation,
   TaskSpecification,
 } from './types'
 
+// Calls still pending at this latency percentile are hedged
+const HEDGE_PERCENTILE = 0.9
+
+// Loads of a research key tried when shared loads keep being aborted by
+// the requests that started them
+const SHARED_RESEARCH_ATTEMPTS = 3
+
+// Marks the end of a prompt prefix the API may cache (for ~5 minutes)
+const CACHE_CONTROL = { type: 'ephemeral' } as const
+
 export abstract class BaseAgent {
   protected config: AgentConfig
   protected anthropic: Anthropic
@@ -25,9 +57,10 @@ export abstract class BaseAgent {
 
   constructor(config: AgentConfig) {
     this.config = config
-    this.anthropic = new Anthropic({
-      apiKey:
-        getServerEnv().ANTHROPIC_API_KEY || process.env.ANTHROPIC_API_KEY || '',
+    // Borrowed from the process-wide registry so agents share warm
+    // connections
+    this.anthropic = getAnthropicClient({
+      apiKey: getServerEnv().ANTHROPIC_API_KEY,
     })
   }
 
@@ -49,6 +82,19 @@ export abstract class BaseAgent {
     return this.config.name
   }
 
+  // Get the LLM model this agent calls
+  getModel(): string {
+    return this.config.model || 'claude-3-haiku-20240307'
+  }
+
+  // Model calls start on: the bottom of the cascade when this agent has a
+  // quality target, otherwise the configured model
+  getEntryModel(): string {
+    return this.config.qualityTarget === undefined
+      ? this.getModel()
+      : getModelCascade(this.getModel())[0]!
+  }
+
   // Update context
   updateContext(context: AgentContext): void {
     this.context = context
@@ -67,37 +113,154 @@ export abstract class BaseAgent {
   // Call LLM with prompt and track performance metrics
   protected async callLLM(
     prompt: string,
-    systemPrompt?: string
+    systemPrompt?: string,
+    options: LLMCallOptions = {}
   ): Promise<string> {
+    const { text } = await this.sendLLMRequest(prompt, systemPrompt, options)
+    return text
+  }
+
+  // Call the cheapest model that meets this agent's quality target:
+  // start at the bottom of the model cascade and escalate a tier only
+  // when the output fails `check.parse` or scores below
+  // config.qualityTarget. Without a quality target, or with an explicit
+  // model, this is a single call. Only the first attempt streams
+  // recommendations; later tiers replace them in the final result.
+  protected async callLLMCascade<T>(
+    prompt: string,
+    options: LLMCallOptions,
+    check: Omit<QualityCheck<T>, 'minConfidence'>
+  ): Promise<T> {
+    const qualityTarget = this.config.qualityTarget
+    if (qualityTarget === undefined || options.model) {
+      return check.parse(await this.callLLM(prompt, undefined, options))
+    }
+
+    // The next tier is slower than the one just tried, so escalating with
+    // less time left than that attempt took would only time out
+    const deadline = options.context?.deadline
+    const canEscalate = (attemptMs: number) =>
+      !deadline || deadline.remaining() > attemptMs
+
+    const { result, outcome } = await runCascade(
+      getModelCascade(this.getModel()),
+      async (model, index) => {
+        const { text, message } = await this.sendLLMRequest(prompt, undefined, {
+          ...options,
+          model,
+          onRecommendation: index === 0 ? options.onRecommendation : undefined,
+        })
+        return {
+          text,
+          model: message.model,
+          inputTokens: message.usage.input_tokens,
+          outputTokens: message.usage.output_tokens,
+          cacheReadTokens: message.usage.cache_read_input_tokens || 0,
+          cacheWriteTokens: message.usage.cache_creation_input_tokens || 0,
+        }
+      },
+      { canEscalate, ...check, minConfidence: qualityTarget }
+    )
+
+    for (const { from, reason } of outcome.escalations) {
+      this.log(`Escalated from ${from} (${reason})`)
+    }
+    getMetricsCollector().recordRouting(this.config.type, outcome)
+    return result
+  }
+
+  // Send one LLM call, with retries and hedging, and track its metrics
+  private async sendLLMRequest(
+    prompt: string,
+    systemPrompt: string | undefined,
+    options: LLMCallOptions
+  ): Promise<{ text: string; message: Anthropic.Message }> {
     const startTime = Date.now()
     const requestId = `${this.config.type}_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
+    const system = systemPrompt || this.getSystemPrompt()
+    const model = this.selectModel(options)
+
+    // Abort the HTTP request itself when the caller or request deadline
+    // gives up, or when this agent's own timeout elapses
+    const call = withTimeout(
+      this.config.timeout || 30000,
+      options.signal || options.context?.deadline?.signal
+    )
+
+    // Streamed responses surface each recommendation as soon as it parses.
+    // A hedged call streams from both attempts, so recommendations are only
+    // forwarded from the first attempt to produce one; if that attempt
+    // fails, the other takes over.
+    const onRecommendation = options.onRecommendation
+    let streamOwner: AbortSignal | undefined
+    const forwardFrom = (signal: AbortSignal) =>
+      onRecommendation &&
+      ((recommendation: unknown, index: number) => {
+        streamOwner = streamOwner ?? signal
+        if (streamOwner === signal) {
+          onRecommendation(recommendation, index)
+        }
+      })
 
     try {
-      const response = await this.anthropic.messages.create({
-        model: this.config.model || 'claude-3-haiku-20240307',
-        max_tokens: this.config.maxTokens || 2000,
-        temperature: this.config.temperature || 0.7,
-        system: systemPrompt || this.getSystemPrompt(),
-        messages: [
-          {
-            role: 'user',
-            content: prompt,
+      // Transient failures are retried under the shared retry policy,
+      // within this call's timeout
+      const attempt = (signal: AbortSignal, hedged: boolean) =>
+        withRetry(
+          () => {
+            // A retried stream starts over, so parse each try from scratch
+            const forward = forwardFrom(signal)
+            const parser =
+              forward && new IncrementalJSONParser('recommendations', forward)
+
+            return this.requestCompletion(
+              prompt,
+              system,
+              options,
+              signal,
+              {
+                model: hedged ? this.getHedgeModel(options, model) : model,
+                maxTokens: options.maxTokens || this.config.maxTokens || 2000,
+              },
+              parser && (text => parser.push(text))
+            )
           },
-        ],
-      })
+          {
+            maxAttempts: this.config.retryAttempts,
+            signal,
+            onRetry: (error, attemptNumber, delayMs) =>
+              this.log(
+                `LLM attempt ${attemptNumber} failed, retrying in ${Math.round(delayMs)}ms:`,
+                error
+              ),
+          }
+        ).catch(error => {
+          if (streamOwner === signal) {
+            streamOwner = undefined
+          }
+          throw error
+        })
+
+      const hedgeDelay = this.getHedgeDelay(options)
+      const response =
+        hedgeDelay === null
+          ? await attempt(call.signal, false)
+          : await hedgedRequest(attempt, {
+              delayMs: hedgeDelay,
+              budget: getHedgeBudget(),
+              signal: call.signal,
+              onHedge: () =>
+                this.log(`Hedging LLM call after ${Math.round(hedgeDelay)}ms`),
+            })
 
       const executionTime = Date.now() - startTime
 
       // Track successful LLM call metrics
       const tokenUsage = response.usage
-        ? {
-            prompt: response.usage.input_tokens,
-            completion: response.usage.output_tokens,
-            total: response.usage.input_tokens + response.usage.output_tokens,
-          }
+        ? this.getTokenUsage(response.usage)
         : undefined
 
-      await this.trackPerformanceMetrics({
+      this.trackPerformanceMetrics({
         executionTime,
         success: true,
         tokenUsage: tokenUsage || undefined,
@@ -107,7 +270,7 @@ export abstract class BaseAgent {
 
       const content = response.content[0]
       if (content && content.type === 'text') {
-        return content.text
+        return { text: content.text, message: response }
       }
 
       throw new Error('Unexpected response type from LLM')
@@ -115,7 +278,7 @@ export abstract class BaseAgent {
       const executionTime = Date.now() - startTime
 
       // Track failed LLM call metrics
-      await this.trackPerformanceMetrics({
+      this.trackPerformanceMetrics({
         executionTime,
         success: false,
         tokenUsage: undefined,
@@ -125,9 +288,285 @@ export abstract class BaseAgent {
 
       console.error(`LLM call failed for ${this.config.name}:`, error)
       throw error
+    } finally {
+      call.dispose()
     }
   }
 
+  // Send one completion request. Within a session the cost ledger may
+  // downgrade the model or trim max tokens to keep the request inside its
+  // budget, and records what the call actually used. With `onText` the
+  // response is streamed and each text delta passed on as it arrives.
+  private async requestCompletion(
+    prompt: string,
+    system: string,
+    options: LLMCallOptions,
+    signal: AbortSignal,
+    requested: { model: string; maxTokens: number },
+    onText?: (text: string) => void
+  ): Promise<Anthropic.Message> {
+    const ledger = options.context?.session?.ledger
+    const promptContext = options.promptContext
+    const inputTokens = estimateTokens(system + (promptContext || '') + prompt)
+    const plan = ledger?.planCall({ ...requested, inputTokens })
+
+    try {
+      // Static instructions, then the shared persona and destination
+      // context, form the prompt prefix; only the task prompt varies. A
+      // prefix is only marked for caching once it is long enough for the
+      // model to cache it.
+      const model = plan?.model || requested.model
+      const minCacheable = getMinCacheableTokens(model)
+      const systemTokens = estimateTokens(system)
+      const cacheSystem = systemTokens >= minCacheable
+      const cacheContext =
+        !!promptContext &&
+        systemTokens + estimateTokens(promptContext) >= minCacheable
+
+      const params: Anthropic.MessageCreateParamsNonStreaming = {
+        model,
+        max_tokens: plan?.maxTokens || requested.maxTokens,
+        temperature: options.temperature ?? (this.config.temperature || 0.7),
+        system: [
+          {
+            type: 'text',
+            text: system,
+            ...(cacheSystem ? { cache_control: CACHE_CONTROL } : {}),
+          },
+        ],
+        messages: [
+          {
+            role: 'user',
+            content: promptContext
+              ? [
+                  {
+                    type: 'text',
+                    text: promptContext,
+                    ...(cacheContext ? { cache_control: CACHE_CONTROL } : {}),
+                  },
+                  { type: 'text', text: prompt },
+                ]
+              : prompt,
+          },
+        ],
+      }
+      let streamed = false
+      // Fails fast while this model's circuit is open, and otherwise
+      // waits until the call fits within the model's rate limits
+      const response = await withFixture(
+        params,
+        () =>
+          getCircuitBreaker('anthropic', params.model).execute(() =>
+            getAdmissionController('anthropic', params.model).run(
+              {
+                inputTokens,
+                outputTokens: params.max_tokens,
+                priority: this.getPriority(options),
+                signal,
+              },
+              () =>
+                onText
+                  ? this.streamCompletion(params, signal, text => {
+                      streamed = true
+                      onText(text)
+                    })
+                  : this.anthropic.messages.create(params, { signal }),
+              message => ({
+                inputTokens:
+                  message.usage.input_tokens +
+                  (message.usage.cache_creation_input_tokens || 0),
+                outputTokens: message.usage.output_tokens,
+              })
+            )
+          ),
+        signal
+      )
+
+      // Replayed fixtures arrive whole rather than as a stream
+      if (onText && !streamed) {
+        onText(this.getResponseText(response))
+      }
+
+      if (ledger && plan) {
+        ledger.record(plan, {
+          agentType: this.config.type,
+          phase: options.phase,
+          inputTokens: response.usage?.input_tokens || 0,
+          outputTokens: response.usage?.output_tokens || 0,
+          cacheReadTokens: response.usage?.cache_read_input_tokens || 0,
+          cacheWriteTokens: response.usage?.cache_creation_input_tokens || 0,
+        })
+      }
+
+      return response
+    } catch (error) {
+      if (ledger && plan) {
+        ledger.release(plan)
+      }
+      throw error
+    }
+  }
+
+  // Stream a completion through the Messages streaming API, resolving
+  // with the same final message a non-streaming call returns
+  private streamCompletion(
+    params: Anthropic.MessageCreateParamsNonStreaming,
+    signal: AbortSignal,
+    onText: (text: string) => void
+  ): Promise<Anthropic.Message> {
+    const stream = this.anthropic.messages.stream(params, { signal })
+    stream.on('text', onText)
+    return stream.finalMessage()
+  }
+
+  private getTokenUsage(usage: Anthropic.Usage): LLMTokenUsage {
+    const cacheRead = usage.cache_read_input_tokens || 0
+    const cacheWrite = usage.cache_creation_input_tokens || 0
+    return {
+      prompt: usage.input_tokens,
+      completion: usage.output_tokens,
+      total: usage.input_tokens + usage.output_tokens + cacheRead + cacheWrite,
+      cacheRead,
+      cacheWrite,
+    }
+  }
+
+  private getResponseText(response: Anthropic.Message): string {
+    return response.content
+      .map(block => (block.type === 'text' ? block.text : ''))
+      .join('')
+  }
+
+  // Delay after which a duplicate request is sent: this agent's observed
+  // p90 latency, or null when hedging is off or there is too little data
+  private getHedgeDelay(options: LLMCallOptions): number | null {
+    const budgetPercent = getServerEnv().LLM_HEDGE_BUDGET_PERCENT
+    if (!budgetPercent || options.hedge === false) {
+      return null
+    }
+
+    const p90 = getMetricsCollector().getLatencyPercentile(
+      this.config.type,
+      HEDGE_PERCENTILE
+    )
+    // A hedge that can't start well before the timeout only adds cost
+    if (p90 === null || p90 >= (this.config.timeout || 30000) / 2) {
+      return null
+    }
+    return p90
+  }
+
+  private getHedgeModel(options: LLMCallOptions, model: string): string {
+    return options.hedgeModel || getServerEnv().LLM_HEDGE_MODEL || model
+  }
+
+  // Validation runs behind the traveler-facing phases when calls have to
+  // queue for rate limits
+  private getPriority(options: LLMCallOptions): AdmissionPriority {
+    return (
+      options.priority ||
+      (options.phase === 'validation' ? 'background' : 'interactive')
+    )
+  }
+
+  // The requested model, or the hedge model while the requested model's
+  // circuit is open. With no healthy alternative the call goes ahead and
+  // fails fast, leaving the agent to its fallback response.
+  private selectModel(options: LLMCallOptions): string {
+    const model = options.model || this.getModel()
+    if (getCircuitBreaker('anthropic', model).isAvailable()) {
+      return model
+    }
+
+    const alternative = this.getHedgeModel(options, model)
+    if (
+      alternative !== model &&
+      getCircuitBreaker('anthropic', alternative).isAvailable()
+    ) {
+      this.log(`Circuit open for ${model}, using ${alternative}`)
+      return alternative
+    }
+    return model
+  }
+
+  // Research results from the shared research cache, loading (and
+  // caching) them on a miss. Cache hits skip the LLM call entirely.
+  // Concurrent misses share one load, which runs under the deadline of
+  // whichever request started it; if that request aborts, callers whose
+  // own deadline is still live load again rather than inherit the abort.
+  protected async getCachedResearch(
+    context: AgentContext,
+    load: () => Promise<ResearchPayload>
+  ): Promise<{ research: ResearchPayload; cached: boolean }> {
+    const model = this.getModel()
+    const promptVersion = this.config.promptVersion || '1'
+    const key = getResearchCacheKey(
+      this.config.type,
+      context,
+      model,
+      promptVersion
+    )
+
+    for (let attempt = 1; ; attempt++) {
+      let ownLoad = false
+      try {
+        const lookup = await getResearchCache().getOrLoad(
+          key,
+          async () => {
+            ownLoad = true
+            return { ...(await load()), model, promptVersion }
+          },
+          research => research.recommendations?.length > 0
+        )
+
+        return {
+          research: {
+            recommendations: lookup.value.recommendations,
+            reasoning: lookup.value.reasoning,
+          },
+          cached: lookup.status !== 'miss',
+        }
+      } catch (error) {
+        const sharedLoadAborted =
+          !ownLoad &&
+          !context.deadline?.signal.aborted &&
+          classifyError(error).reason === 'aborted'
+        if (!sharedLoadAborted || attempt >= SHARED_RESEARCH_ATTEMPTS) {
+          throw error
+        }
+        this.log('Shared research load was aborted by its owner, reloading')
+      }
+    }
+  }
+
+  // Listener that forwards this agent's streamed recommendations to the
+  // orchestrator, when it is listening. Pass as
+  // LLMCallOptions.onRecommendation.
+  protected streamRecommendations(
+    context: AgentContext
+  ): LLMCallOptions['onRecommendation'] {
+    const listener = context.onRecommendation
+    return (
+      listener &&
+      ((recommendation, index) =>
+        listener(
+          this.config.type,
+          recommendation as Partial<Recommendation>,
+          index
+        ))
+    )
+  }
+
+  // Persona and destination context shared by every call for the same
+  // traveler. Pass as LLMCallOptions.promptContext so it is cached ahead
+  // of the task prompt.
+  protected buildPromptContext(context: AgentContext): string {
+    return `Destination: ${context.destinationCity}
+
+TRAVELER PROFILE:
+${this.formatPersonaContext(context)}`
+  }
+
   // Parse JSON response from LLM
   protected parseJSONResponse<T>(response: string): T {
     try {
@@ -149,6 +588,22 @@ export abstract class BaseAgent {
     }
   }
 
+  // Research JSON with a non-empty recommendations array. Anything else
+  // fails validation, which escalates a cascaded call.
+  protected parseResearchPayload(response: string): ResearchPayload {
+    const payload = this.parseJSONResponse<Partial<ResearchPayload>>(response)
+    if (
+      !Array.isArray(payload.recommendations) ||
+      payload.recommendations.length === 0
+    ) {
+      throw new Error(`No recommendations in response from ${this.config.name}`)
+    }
+    return {
+      recommendations: payload.recommendations,
+      reasoning: payload.reasoning || '',
+    }
+  }
+
   // Get system prompt for the agent
   protected getSystemPrompt(): string {
     return `You are ${this.config.name}, a specialized AI agent in the Cardinal travel planning system.
@@ -159,49 +614,50 @@ Always consider the persona profile and travel constraints when making recommend
 Be creative but realistic, and prioritize quality over quantity in your suggestions.`
   }
 
-  // Execute with timeout
+  // Execute with timeout; the operation receives a signal that aborts
+  // when the timeout (or the parent signal) fires so it can cancel its work
   protected async executeWithTimeout<T>(
-    operation: () => Promise<T>,
-    timeoutMs?: number
+    operation: (signal: AbortSignal) => Promise<T>,
+    timeoutMs?: number,
+    parentSignal?: AbortSignal
   ): Promise<T> {
     const timeout = timeoutMs || this.config.timeout || 30000
+    const { signal, dispose } = withTimeout(timeout, parentSignal)
 
-    return Promise.race([
-      operation(),
-      new Promise<T>((_, reject) =>
-        setTimeout(
-          () => reject(new Error(`Operation timed out after ${timeout}ms`)),
-          timeout
-        )
-      ),
-    ])
+    try {
+      return await Promise.race([
+        operation(signal),
+        new Promise<T>((_, reject) => {
+          const onAbort = () =>
+            reject(new Error(`Operation timed out after ${timeout}ms`))
+          if (signal.aborted) {
+            onAbort()
+          } else {
+            signal.addEventListener('abort', onAbort, { once: true })
+          }
+        }),
+      ])
+    } finally {
+      dispose()
+    }
   }
 
-  // Retry logic for resilience
-  protected async executeWithRetry<T>(
+  // Retry transient failures under the shared retry policy. callLLM
+  // already retries its own requests; don't wrap it in this as well.
+  protected executeWithRetry<T>(
     operation: () => Promise<T>,
-    maxAttempts?: number
+    maxAttempts?: number,
+    signal?: AbortSignal
   ): Promise<T> {
-    const attempts = maxAttempts || this.config.retryAttempts || 3
-    let lastError: Error | undefined
-
-    for (let i = 0; i < attempts; i++) {
-      try {
-        return await operation()
-      } catch (error) {
-        lastError = error as Error
-        console.warn(`Attempt ${i + 1} failed for ${this.config.name}:`, error)
-
-        if (i < attempts - 1) {
-          // Exponential backoff
-          await new Promise(resolve =>
-            setTimeout(resolve, Math.pow(2, i) * 1000)
-          )
-        }
-      }
-    }
-
-    throw lastError || new Error(`Operation failed after ${attempts} attempts`)
+    return withRetry(() => operation(), {
+      maxAttempts: maxAttempts || this.config.retryAttempts || 3,
+      signal,
+      onRetry: (error, attempt) =>
+        console.warn(
+          `Attempt ${attempt} failed for ${this.config.name}:`,
+          error
+        ),
+    })
   }
 
   // Build a partial/fallback response
@@ -270,8 +726,9 @@ Be creative but realistic, and prioritize quality over quantity in your suggesti
     console.log(`[${this.config.name}] ${message}`, data || '')
   }
 
-  // Track performance metrics for agent operations
-  protected async trackPerformanceMetrics({
+  // Track performance metrics for agent operations; queued for the
+  // collector's background drainer, so this never delays the caller
+  protected trackPerformanceMetrics({
     executionTime,
     success,
     tokenUsage,
@@ -282,14 +739,12 @@ Be creative but realistic, and prioritize quality over quantity in your suggesti
   }: {
     executionTime: number
     success: boolean
-    tokenUsage?:
-      | { prompt: number; completion: number; total: number }
-      | undefined
+    tokenUsage?: LLMTokenUsage | undefined
     requestId: string
     confidence: number
     tasksCompleted?: number
     sessionId?: string
-  }): Promise<void> {
+  }): void {
     try {
       const collector = getMetricsCollector()
       const metrics = collector.createMetrics({
@@ -303,7 +758,7 @@ Be creative but realistic, and prioritize quality over quantity in your suggesti
         tasksCompleted,
       })
 
-      await collector.collectMetrics(metrics)
+      collector.collectMetrics(metrics)
     } catch (error) {
       // Don't let metrics collection errors break agent operations
       console.warn(`Failed to collect metrics for ${this.config.name}:`, error)
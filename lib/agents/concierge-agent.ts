@@ -7,7 +7,15 @@
  * - Final itinerary assembly
  */
 
+import { getServerEnv } from '@/lib/config/env'
+
 import { BaseAgent } from './base-agent'
+import {
+  buildFindingsContext,
+  DEFAULT_FINDINGS_TOKEN_BUDGET,
+  restoreRecommendations,
+} from './findings-context'
+import { getPlanCache, normalizePlan } from './plan-cache'
 import type {
   AgentConfig,
   AgentContext,
@@ -19,6 +27,12 @@ import type {
   AgentType,
 } from './types'
 
+// Planning only needs a short JSON task list, so it runs on a cheaper,
+// smaller budget than assembly
+const PLANNING_MODEL = 'claude-3-haiku-20240307'
+const PLANNING_MAX_TOKENS = 1200
+const PLANNING_TEMPERATURE = 0.3
+
 export class ConciergeAgent extends BaseAgent {
   constructor() {
     const config: AgentConfig = {
@@ -26,7 +40,9 @@ export class ConciergeAgent extends BaseAgent {
       name: 'Cardinal Concierge',
       description:
         'Expert travel orchestrator who coordinates specialized agents to craft personalized itineraries',
+      // Haiku first, escalating to Sonnet below the quality target
       model: 'claude-3-sonnet-20240229',
+      qualityTarget: 0.7,
       temperature: 0.7,
       maxTokens: 4000,
       timeout: 60000, // 1 minute total
@@ -44,7 +60,7 @@ export class ConciergeAgent extends BaseAgent {
       this.log('Starting orchestration for:', context.destinationCity)
 
       // Step 1: Analyze requirements and create research tasks
-      const researchTasks = await this.createResearchTasks(context)
+      const researchTasks = await this.planResearchTasks(context)
       this.log(`Created ${researchTasks.length} research tasks`)
 
       // Step 2: Distribute tasks to research agents (simulated for now)
@@ -107,33 +123,59 @@ Return a JSON array of tasks with this structure:
     "priority": "high" | "medium" | "low",
     "description": "Specific research task",
     "constraints": ["specific requirements"],
-    "expectedOutput": "What the agent should return"
+    "expectedOutput": "What the agent should return",
+    "dependsOn": ["agent types whose findings this task needs, if any"]
   }
 ]`
   }
 
-  private async createResearchTasks(
+  /**
+   * Planning-only entry point: returns the research task plan without
+   * running research or assembly. Plans are cached by trip shape, so
+   * repeated requests skip the LLM call entirely.
+   */
+  async planResearchTasks(
     context: AgentContext
   ): Promise<TaskSpecification[]> {
-    const prompt = this.buildPrompt(
-      {
-        taskId: 'orchestrate',
-        agentType: 'concierge',
-        priority: 'high',
-        description: 'Create research tasks',
-        constraints: [],
-        expectedOutput: 'Task list for research agents',
-      },
-      context
-    )
+    const planCache = getPlanCache()
+    let plan = planCache.get(context)
+
+    if (plan) {
+      this.log('Using cached research plan for:', context.destinationCity)
+    } else {
+      const prompt = this.buildPrompt(
+        {
+          taskId: 'orchestrate',
+          agentType: 'concierge',
+          priority: 'high',
+          description: 'Create research tasks',
+          constraints: [],
+          expectedOutput: 'Task list for research agents',
+        },
+        context
+      )
+
+      const response = await this.callLLM(prompt, undefined, {
+        context,
+        phase: 'planning',
+        model: PLANNING_MODEL,
+        maxTokens: PLANNING_MAX_TOKENS,
+        temperature: PLANNING_TEMPERATURE,
+      })
+      plan = normalizePlan(
+        this.parseJSONResponse<Partial<TaskSpecification>[]>(response)
+      )
 
-    const response = await this.callLLM(prompt)
-    const tasks = this.parseJSONResponse<TaskSpecification[]>(response)
+      if (!planCache.set(context, plan)) {
+        this.log('Research plan failed validation; not caching it')
+      }
+    }
 
     // Add unique IDs to each task
-    return tasks.map((task, index) => ({
+    const batchId = Date.now()
+    return plan.map((task, index) => ({
       ...task,
-      taskId: `task_${Date.now()}_${index}`,
+      taskId: `task_${batchId}_${index}`,
     }))
   }
 
@@ -236,8 +278,14 @@ Return JSON matching this structure:
   "reasoning": "Explanation of choices"
 }`
 
-    const response = await this.callLLM(prompt)
-    const parsed = this.parseJSONResponse<any>(response)
+    const parsed = await this.callLLMCascade<any>(
+      prompt,
+      { context, phase: 'research' },
+      {
+        parse: response => this.parseJSONResponse<any>(response),
+        confidence: result => result.confidence || 0.7,
+      }
+    )
 
     return {
       agentType: task.agentType,
@@ -248,24 +296,31 @@ Return JSON matching this structure:
     }
   }
 
-  private async assembleItinerary(
+  /**
+   * Assemble a day-by-day itinerary from research results in one LLM call
+   */
+  async assembleItinerary(
     context: AgentContext,
     research: Map<AgentType, ResearchOutput>
   ): Promise<Itinerary> {
+    const findings = buildFindingsContext(research.values(), {
+      maxTokens:
+        getServerEnv().ASSEMBLY_CONTEXT_TOKENS || DEFAULT_FINDINGS_TOKEN_BUDGET,
+    })
     const prompt = `You are assembling a final itinerary from research results.
 
 Destination: ${context.destinationCity}
 Duration: ${context.userRequirements.duration || '3 days'}
 ${this.formatPersonaContext(context)}
 
-Research Results:
-${JSON.stringify(Array.from(research.values()), null, 2)}
+Research Results (one JSON recommendation per line, grouped by agent):
+${findings.text}
 
 Create a cohesive, day-by-day itinerary that:
 1. Flows naturally with logical geographic and temporal progression
 2. Balances different types of activities
 3. Respects the traveler's pace preference (${context.personaProfile.activityLevel})
-4. Includes specific recommendations from the research
+4. Includes specific recommendations from the research, keeping their exact names
 5. Provides practical timing and logistics
 
 Return JSON matching this structure:
@@ -293,8 +348,16 @@ Return JSON matching this structure:
   "personaNotes": "Overall trip notes for this persona"
 }`
 
-    const response = await this.callLLM(prompt)
-    const itinerary = this.parseJSONResponse<Itinerary>(response)
+    // An itinerary without days is escalated to the next model
+    const assembled = await this.callLLMCascade(
+      prompt,
+      { context, phase: 'assembly' },
+      {
+        parse: response => this.parseJSONResponse<Itinerary>(response),
+        confidence: result => (result.days?.length ? 1 : 0),
+      }
+    )
+    const itinerary = restoreRecommendations(assembled, research.values())
 
     // Ensure all required fields are present
     return {
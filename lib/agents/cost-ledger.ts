@@ -0,0 +1,286 @@
+/**
+ * Cost Ledger
+ * Per-request accounting of real LLM token usage and spend, broken down by
+ * agent, phase and model, with an optional budget that downgrades or trims
+ * remaining calls once projected spend would exceed it
+ */
+
+import type { CostBreakdown, OrchestrationPhase } from './types'
+
+export interface ModelPricing {
+  inputPerMTok: number // USD per million input tokens
+  outputPerMTok: number // USD per million output tokens
+}
+
+export const MODEL_PRICING: Record<string, ModelPricing> = {
+  'claude-3-haiku-20240307': { inputPerMTok: 0.25, outputPerMTok: 1.25 },
+  'claude-3-sonnet-20240229': { inputPerMTok: 3, outputPerMTok: 15 },
+  'claude-3-5-sonnet-20241022': { inputPerMTok: 3, outputPerMTok: 15 },
+}
+
+// Unknown models are priced like Sonnet so projections err on the high side
+const DEFAULT_PRICING: ModelPricing = { inputPerMTok: 3, outputPerMTok: 15 }
+
+const TOKENS_PER_MTOK = 1000000
+
+// Prompt caching prices cached input relative to the model's input rate
+export const CACHE_WRITE_MULTIPLIER = 1.25
+export const CACHE_READ_MULTIPLIER = 0.1
+
+// Shortest prompt prefix, in tokens, the API caches for each model family;
+// shorter prefixes are processed uncached even when marked
+const MIN_CACHEABLE_TOKENS = { haiku: 2048, default: 1024 }
+
+// Cheapest model that calls are downgraded to when over budget
+export const BUDGET_FALLBACK_MODEL = 'claude-3-haiku-20240307'
+
+// Trimming never goes below this, so over-budget calls still return JSON
+const MIN_TRIMMED_MAX_TOKENS = 256
+
+export type LedgerPhase = OrchestrationPhase | 'unattributed'
+
+export interface LedgerEntry {
+  agentType: string
+  phase: LedgerPhase
+  model: string
+  inputTokens: number // uncached input
+  outputTokens: number
+  cacheReadTokens: number
+  cacheWriteTokens: number
+  costUsd: number
+}
+
+// Prompt-cache token counts of a call
+export interface CacheUsage {
+  cacheReadTokens?: number | undefined
+  cacheWriteTokens?: number | undefined
+}
+
+export interface LLMCallPlan {
+  model: string
+  maxTokens: number
+  downgraded: boolean
+  trimmed: boolean
+  reservedUsd: number // worst-case spend held until the call settles
+}
+
+export interface CostLedgerSummary {
+  totals: CostBreakdown
+  byAgent: Record<string, CostBreakdown>
+  byPhase: Record<string, CostBreakdown>
+  byModel: Record<string, CostBreakdown>
+  budgetUsd?: number | undefined
+  downgradedCalls: number
+  trimmedCalls: number
+}
+
+export function getModelPricing(model: string): ModelPricing {
+  return MODEL_PRICING[model] || DEFAULT_PRICING
+}
+
+export function calculateCost(
+  model: string,
+  inputTokens: number,
+  outputTokens: number,
+  cache: CacheUsage = {}
+): number {
+  const pricing = getModelPricing(model)
+  const cachedInputTokens =
+    (cache.cacheReadTokens || 0) * CACHE_READ_MULTIPLIER +
+    (cache.cacheWriteTokens || 0) * CACHE_WRITE_MULTIPLIER
+  return (
+    ((inputTokens + cachedInputTokens) * pricing.inputPerMTok +
+      outputTokens * pricing.outputPerMTok) /
+    TOKENS_PER_MTOK
+  )
+}
+
+/**
+ * Shortest prompt prefix, in tokens, that `model` will cache
+ */
+export function getMinCacheableTokens(model: string): number {
+  return /haiku/i.test(model)
+    ? MIN_CACHEABLE_TOKENS.haiku
+    : MIN_CACHEABLE_TOKENS.default
+}
+
+// Rough prompt size estimate (~4 characters per token) for projections
+export function estimateTokens(text: string): number {
+  return Math.ceil(text.length / 4)
+}
+
+const emptyBreakdown = (): CostBreakdown => ({
+  calls: 0,
+  inputTokens: 0,
+  outputTokens: 0,
+  cacheReadTokens: 0,
+  cacheWriteTokens: 0,
+  costUsd: 0,
+})
+
+// Six decimals, matching ai_generation_sessions.total_cost_usd
+const roundUsd = (value: number) => Math.round(value * 1e6) / 1e6
+
+const addToBreakdown = (bucket: CostBreakdown, entry: LedgerEntry) => {
+  bucket.calls++
+  bucket.inputTokens += entry.inputTokens
+  bucket.outputTokens += entry.outputTokens
+  bucket.cacheReadTokens += entry.cacheReadTokens
+  bucket.cacheWriteTokens += entry.cacheWriteTokens
+  bucket.costUsd = roundUsd(bucket.costUsd + entry.costUsd)
+}
+
+export class CostLedger {
+  readonly budgetUsd: number | undefined
+  private entries: LedgerEntry[] = []
+  private spentUsd = 0
+  private reservedUsd = 0
+  private downgradedCalls = 0
+  private trimmedCalls = 0
+
+  constructor(budgetUsd?: number) {
+    this.budgetUsd = budgetUsd && budgetUsd > 0 ? budgetUsd : undefined
+  }
+
+  /**
+   * Decide the model and max tokens for a call before it is made. Within
+   * budget the request is unchanged; otherwise it drops to the fallback
+   * model and, if that is still too expensive, has its max tokens trimmed
+   * to what the remaining budget affords. The worst-case cost is reserved
+   * so concurrent calls see each other's projected spend.
+   */
+  planCall(request: {
+    model: string
+    maxTokens: number
+    inputTokens: number
+  }): LLMCallPlan {
+    let { model, maxTokens } = request
+    let downgraded = false
+    let trimmed = false
+
+    if (this.budgetUsd !== undefined) {
+      const remaining = this.getRemainingBudget()!
+
+      if (
+        calculateCost(model, request.inputTokens, maxTokens) > remaining &&
+        model !== BUDGET_FALLBACK_MODEL
+      ) {
+        model = BUDGET_FALLBACK_MODEL
+        downgraded = true
+      }
+
+      if (calculateCost(model, request.inputTokens, maxTokens) > remaining) {
+        const pricing = getModelPricing(model)
+        const affordable = Math.floor(
+          ((remaining - calculateCost(model, request.inputTokens, 0)) *
+            TOKENS_PER_MTOK) /
+            pricing.outputPerMTok
+        )
+        const trimmedMaxTokens = Math.max(
+          MIN_TRIMMED_MAX_TOKENS,
+          Math.min(maxTokens, affordable)
+        )
+        trimmed = trimmedMaxTokens < maxTokens
+        maxTokens = trimmedMaxTokens
+      }
+    }
+
+    if (downgraded) {
+      this.downgradedCalls++
+    }
+    if (trimmed) {
+      this.trimmedCalls++
+    }
+
+    const reservedUsd = calculateCost(model, request.inputTokens, maxTokens)
+    this.reservedUsd += reservedUsd
+
+    return { model, maxTokens, downgraded, trimmed, reservedUsd }
+  }
+
+  /**
+   * Record the actual usage of a completed call and release its reservation
+   */
+  record(
+    plan: LLMCallPlan,
+    usage: CacheUsage & {
+      agentType: string
+      phase?: OrchestrationPhase | undefined
+      inputTokens: number
+      outputTokens: number
+    }
+  ): LedgerEntry {
+    this.release(plan)
+
+    const entry: LedgerEntry = {
+      agentType: usage.agentType,
+      phase: usage.phase || 'unattributed',
+      model: plan.model,
+      inputTokens: usage.inputTokens,
+      outputTokens: usage.outputTokens,
+      cacheReadTokens: usage.cacheReadTokens || 0,
+      cacheWriteTokens: usage.cacheWriteTokens || 0,
+      costUsd: calculateCost(
+        plan.model,
+        usage.inputTokens,
+        usage.outputTokens,
+        usage
+      ),
+    }
+
+    this.entries.push(entry)
+    this.spentUsd += entry.costUsd
+    return entry
+  }
+
+  /**
+   * Release the reservation of a call that failed without usage. Safe to
+   * call more than once for the same plan.
+   */
+  release(plan: LLMCallPlan): void {
+    this.reservedUsd = Math.max(0, this.reservedUsd - plan.reservedUsd)
+    plan.reservedUsd = 0
+  }
+
+  getSpentUsd(): number {
+    return roundUsd(this.spentUsd)
+  }
+
+  getRemainingBudget(): number | undefined {
+    if (this.budgetUsd === undefined) {
+      return undefined
+    }
+    return Math.max(0, this.budgetUsd - this.spentUsd - this.reservedUsd)
+  }
+
+  getEntries(): LedgerEntry[] {
+    return [...this.entries]
+  }
+
+  getSummary(): CostLedgerSummary {
+    const totals = emptyBreakdown()
+    const byAgent: Record<string, CostBreakdown> = {}
+    const byPhase: Record<string, CostBreakdown> = {}
+    const byModel: Record<string, CostBreakdown> = {}
+
+    const bucketFor = (buckets: Record<string, CostBreakdown>, key: string) =>
+      (buckets[key] = buckets[key] || emptyBreakdown())
+
+    for (const entry of this.entries) {
+      addToBreakdown(totals, entry)
+      addToBreakdown(bucketFor(byAgent, entry.agentType), entry)
+      addToBreakdown(bucketFor(byPhase, entry.phase), entry)
+      addToBreakdown(bucketFor(byModel, entry.model), entry)
+    }
+
+    return {
+      totals,
+      byAgent,
+      byPhase,
+      byModel,
+      budgetUsd: this.budgetUsd,
+      downgradedCalls: this.downgradedCalls,
+      trimmedCalls: this.trimmedCalls,
+    }
+  }
+}
@@ -0,0 +1,177 @@
+/**
+ * Cost Persistence
+ * Writes an orchestration's token and cost totals to ai_generation_sessions
+ */
+
+import type { CacheStatus } from '@/lib/cache'
+import { createSupabaseServerClient } from '@/lib/database/supabase'
+
+import type { OrchestrationSession } from './orchestration-session'
+import type { OrchestrationResult } from './types'
+
+export interface CostPersistenceTarget {
+  generationSessionId?: string | undefined // existing row to update
+  // Owner of the row: an existing row is only updated when it belongs to
+  // this user, otherwise a new row is created for them
+  userId?: string | undefined
+}
+
+export interface CostPersistenceOutcome {
+  success: boolean
+  errorMessage?: string | undefined
+}
+
+// Model that accounted for the most spend in the session
+function primaryModel(session: OrchestrationSession): string {
+  const byModel = Object.entries(session.ledger.getSummary().byModel)
+  byModel.sort(([, a], [, b]) => b.costUsd - a.costUsd)
+  return byModel[0]?.[0] || 'claude-3-haiku-20240307'
+}
+
+interface GenerationSessionRow {
+  totals: Record<string, unknown>
+  metadata: Record<string, unknown>
+  primaryModel: string
+  startedAt: number
+}
+
+/**
+ * Persist session totals. Updates the given generation session row when
+ * it belongs to the user, or inserts a new one for them. Returns the row
+ * id, or null when there is no user to write for.
+ */
+export async function persistSessionCosts(
+  session: OrchestrationSession,
+  target: CostPersistenceTarget,
+  outcome: CostPersistenceOutcome
+): Promise<string | null> {
+  const summary = session.ledger.getSummary()
+
+  return writeGenerationSession(target, outcome, {
+    totals: {
+      total_tokens_used:
+        summary.totals.inputTokens + summary.totals.outputTokens,
+      total_cost_usd: summary.totals.costUsd,
+      processing_time_seconds: Math.round(session.getElapsedTime() / 1000),
+    },
+    metadata: {
+      orchestrationSessionId: session.sessionId,
+      requestId: session.requestId,
+      costs: session.getCosts(),
+      droppedMessages: session.getDroppedMessageCount(),
+    },
+    primaryModel: primaryModel(session),
+    startedAt: session.startTime,
+  })
+}
+
+/**
+ * Persist the outcome of a request served through the itinerary cache.
+ * The generation that produced the value is not owned by this caller (it
+ * may have been shared or run earlier), so the row records the cache
+ * status and only the costs of a result this request generated itself.
+ */
+export async function persistCacheOutcome(
+  target: CostPersistenceTarget,
+  outcome: CostPersistenceOutcome,
+  served: {
+    cacheStatus: CacheStatus
+    ageMs: number
+    startTime: number
+    // Only set when this request's own load produced the value
+    costs?: OrchestrationResult['costs'] | undefined
+  }
+): Promise<string | null> {
+  const costs = served.costs
+
+  return writeGenerationSession(target, outcome, {
+    totals: {
+      total_tokens_used: costs?.llmTokens ?? 0,
+      total_cost_usd: costs?.estimatedCost ?? 0,
+      processing_time_seconds: Math.round(
+        (Date.now() - served.startTime) / 1000
+      ),
+    },
+    metadata: {
+      cache: { status: served.cacheStatus, ageMs: served.ageMs },
+      ...(costs ? { costs } : {}),
+    },
+    primaryModel: 'claude-3-haiku-20240307',
+    startedAt: served.startTime,
+  })
+}
+
+async function writeGenerationSession(
+  target: CostPersistenceTarget,
+  outcome: CostPersistenceOutcome,
+  row: GenerationSessionRow
+): Promise<string | null> {
+  if (!target.userId) {
+    // The id comes from the request body, so without an owner to check
+    // it against the row could belong to anyone
+    if (target.generationSessionId) {
+      console.warn(
+        `Skipping cost persistence for generation session ${target.generationSessionId}: no user id`
+      )
+    }
+    return null
+  }
+
+  const supabase = createSupabaseServerClient()
+  const now = new Date().toISOString()
+  const totals = {
+    ...row.totals,
+    status: outcome.success ? 'completed' : 'failed',
+    error_message: outcome.errorMessage || null,
+    completed_at: now,
+    last_activity_at: now,
+  }
+
+  if (target.generationSessionId) {
+    // Merge into existing metadata rather than replacing it
+    const { data: existing } = (await supabase
+      .from('ai_generation_sessions')
+      .select('metadata')
+      .eq('id', target.generationSessionId)
+      .eq('user_id', target.userId)
+      .single()) as any
+
+    if (!existing) {
+      throw new Error(
+        `Generation session ${target.generationSessionId} not found for user`
+      )
+    }
+
+    const { error } = await supabase
+      .from('ai_generation_sessions')
+      .update({
+        ...totals,
+        metadata: { ...(existing.metadata || {}), ...row.metadata },
+      } as any)
+      .eq('id', target.generationSessionId)
+      .eq('user_id', target.userId)
+
+    if (error) {
+      throw new Error(`Failed to update generation session: ${error.message}`)
+    }
+    return target.generationSessionId
+  }
+
+  const { data, error } = (await supabase
+    .from('ai_generation_sessions')
+    .insert({
+      ...totals,
+      user_id: target.userId,
+      session_type: 'itinerary_generation',
+      primary_model: row.primaryModel,
+      started_at: new Date(row.startedAt).toISOString(),
+      metadata: row.metadata,
+    } as any)
+    .select('id')
+    .single()) as any
+
+  if (error) {
+    throw new Error(`Failed to record generation session: ${error.message}`)
+  }
+  return data?.id || null
+}
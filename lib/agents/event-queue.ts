@@ -0,0 +1,70 @@
+/**
+ * Async Event Queue
+ * Push-based queue that can be consumed with `for await`, used to turn
+ * orchestration callbacks into an async iterator
+ */
+
+export class AsyncEventQueue<T> implements AsyncIterable<T> {
+  private buffer: T[] = []
+  private waiters: ((result: IteratorResult<T, undefined>) => void)[] = []
+  private closed = false
+
+  /**
+   * Enqueue an item, handing it straight to a waiting consumer if any
+   */
+  push(item: T): void {
+    if (this.closed) {
+      return
+    }
+
+    const waiter = this.waiters.shift()
+    if (waiter) {
+      waiter({ value: item, done: false })
+    } else {
+      this.buffer.push(item)
+    }
+  }
+
+  /**
+   * Stop accepting items; consumers drain the buffer and then finish
+   */
+  close(): void {
+    if (this.closed) {
+      return
+    }
+
+    this.closed = true
+    this.waiters.forEach(waiter => waiter({ value: undefined, done: true }))
+    this.waiters = []
+  }
+
+  isClosed(): boolean {
+    return this.closed
+  }
+
+  [Symbol.asyncIterator](): AsyncIterator<T, undefined> {
+    return {
+      next: () => {
+        if (this.buffer.length > 0) {
+          return Promise.resolve({
+            value: this.buffer.shift() as T,
+            done: false,
+          })
+        }
+
+        if (this.closed) {
+          return Promise.resolve({ value: undefined, done: true })
+        }
+
+        return new Promise(resolve => this.waiters.push(resolve))
+      },
+      // A consumer that stops early (break, return or throw inside
+      // `for await`) closes the queue and drops what is still buffered
+      return: () => {
+        this.buffer = []
+        this.close()
+        return Promise.resolve({ value: undefined, done: true })
+      },
+    }
+  }
+}
@@ -0,0 +1,219 @@
+/**
+ * Findings Context
+ * Compact, token-budgeted serialization of research findings for
+ * downstream prompts. Full ResearchOutputs carry contact details, photos,
+ * hours and validation metadata the model does not need to plan with, so
+ * each recommendation is reduced to its planning fields, long text is
+ * truncated and the best persona fits are kept until the budget is spent.
+ * Prompt size then stays flat as agents and recommendations are added.
+ */
+
+import { estimateTokens } from './cost-ledger'
+import type { Itinerary, Recommendation, ResearchOutput } from './types'
+
+export const DEFAULT_FINDINGS_TOKEN_BUDGET = 3000
+
+export interface FindingsContextOptions {
+  maxTokens?: number | undefined
+  maxTextChars?: number | undefined // per description/whyRecommended
+  maxListItems?: number | undefined // per list field such as mustTry
+}
+
+export interface FindingsContext {
+  text: string
+  tokens: number // estimated
+  included: number
+  omitted: number
+}
+
+// Fields the model plans with; everything else is restored from the full
+// findings by `restoreRecommendations`
+const CONTEXT_FIELDS: (keyof Recommendation)[] = [
+  'name',
+  'category',
+  'description',
+  'whyRecommended',
+  'personaFit',
+  'neighborhood',
+  'estimatedTime',
+  'bestTimeToVisit',
+  'priceRange',
+  'cuisine',
+  'mealType',
+  'mustTry',
+  'walkability',
+]
+
+const DEFAULT_TEXT_CHARS = 160
+const DEFAULT_LIST_ITEMS = 3
+
+const truncate = (text: string, maxChars: number) =>
+  text.length > maxChars ? `${text.slice(0, maxChars - 1).trimEnd()}…` : text
+
+/**
+ * Recommendation reduced to its planning fields, with long text truncated
+ */
+export function compactRecommendation(
+  recommendation: Recommendation,
+  options: FindingsContextOptions = {}
+): Partial<Recommendation> {
+  const maxTextChars = options.maxTextChars ?? DEFAULT_TEXT_CHARS
+  const maxListItems = options.maxListItems ?? DEFAULT_LIST_ITEMS
+  const compact: Record<string, unknown> = {}
+
+  for (const field of CONTEXT_FIELDS) {
+    const value = recommendation[field]
+    if (value === undefined || value === '') {
+      continue
+    }
+    if (typeof value === 'string') {
+      compact[field] = field === 'name' ? value : truncate(value, maxTextChars)
+    } else if (Array.isArray(value)) {
+      compact[field] = value.slice(0, maxListItems)
+    } else {
+      compact[field] = value
+    }
+  }
+  return compact as Partial<Recommendation>
+}
+
+/**
+ * Serialize `findings` within `maxTokens`, one JSON line per
+ * recommendation grouped under its agent. Every agent keeps its best
+ * persona fit; the rest of the budget goes to the highest persona fits
+ * across all agents.
+ */
+export function buildFindingsContext(
+  findings: Iterable<ResearchOutput>,
+  options: FindingsContextOptions = {}
+): FindingsContext {
+  const maxTokens = options.maxTokens ?? DEFAULT_FINDINGS_TOKEN_BUDGET
+  const outputs = Array.from(findings)
+
+  const headers = outputs.map(output => {
+    const reasoning = truncate(
+      output.reasoning || '',
+      options.maxTextChars ?? DEFAULT_TEXT_CHARS
+    )
+    return `## ${output.agentType} (confidence ${output.confidence}): ${reasoning}`
+  })
+  const candidates = outputs.flatMap((output, group) =>
+    [...output.recommendations]
+      .sort((a, b) => (b.personaFit || 0) - (a.personaFit || 0))
+      .map((recommendation, rank) => {
+        const line = JSON.stringify(
+          compactRecommendation(recommendation, options)
+        )
+        return {
+          group,
+          rank,
+          personaFit: recommendation.personaFit || 0,
+          line,
+          tokens: estimateTokens(line) + 1,
+        }
+      })
+  )
+
+  // Each agent's best pick first, then by persona fit
+  const ordered = [...candidates].sort(
+    (a, b) =>
+      Number(a.rank > 0) - Number(b.rank > 0) || b.personaFit - a.personaFit
+  )
+
+  let tokens = headers.reduce((sum, header) => sum + estimateTokens(header), 0)
+  const kept = new Set<(typeof candidates)[number]>()
+  for (const candidate of ordered) {
+    if (tokens + candidate.tokens <= maxTokens) {
+      kept.add(candidate)
+      tokens += candidate.tokens
+    }
+  }
+
+  const omitted = candidates.length - kept.size
+  const sections = headers.map((header, group) =>
+    [
+      header,
+      ...candidates
+        .filter(candidate => candidate.group === group && kept.has(candidate))
+        .map(candidate => candidate.line),
+    ].join('\n')
+  )
+  if (omitted > 0) {
+    sections.push(`(${omitted} lower-fit recommendations omitted)`)
+  }
+
+  return {
+    text: sections.join('\n\n'),
+    tokens,
+    included: kept.size,
+    omitted,
+  }
+}
+
+/**
+ * Restore fields dropped from a compact context onto recommendations the
+ * model copied from it, matched by name, so fields such as placeId and
+ * coordinates survive assembly. Planning fields the model set (e.g. a
+ * restaurant moved to another meal) are kept; only ones it left out or
+ * copied verbatim from the truncated context are replaced.
+ */
+export function restoreRecommendations(
+  itinerary: Itinerary,
+  findings: Iterable<ResearchOutput>,
+  options: FindingsContextOptions = {}
+): Itinerary {
+  const nameKey = (recommendation?: Partial<Recommendation>) =>
+    typeof recommendation?.name === 'string'
+      ? recommendation.name.trim().toLowerCase()
+      : ''
+
+  const byName = new Map<string, Recommendation>()
+  for (const output of findings) {
+    for (const recommendation of output.recommendations || []) {
+      const key = nameKey(recommendation)
+      if (key) {
+        byName.set(key, recommendation)
+      }
+    }
+  }
+
+  const restore = (recommendation: Recommendation) => {
+    const key = nameKey(recommendation)
+    const full = key ? byName.get(key) : undefined
+    if (!full) {
+      return recommendation
+    }
+
+    const compact = compactRecommendation(full, options) as Record<
+      string,
+      unknown
+    >
+    const merged: Record<string, unknown> = { ...recommendation }
+    for (const [field, value] of Object.entries(full)) {
+      const assembled = merged[field]
+      if (
+        // Matched case-insensitively; keep the research spelling
+        field === 'name' ||
+        !CONTEXT_FIELDS.includes(field as keyof Recommendation) ||
+        assembled === undefined ||
+        JSON.stringify(assembled) === JSON.stringify(compact[field])
+      ) {
+        merged[field] = value
+      }
+    }
+    return merged as unknown as Recommendation
+  }
+
+  return {
+    ...itinerary,
+    days: (itinerary.days || []).map(day => ({
+      ...day,
+      activities: (day.activities || []).map(activity => ({
+        ...activity,
+        activity: restore(activity.activity),
+      })),
+      meals: (day.meals || []).map(restore),
+    })),
+    lodging: (itinerary.lodging || []).map(restore),
+  }
+}
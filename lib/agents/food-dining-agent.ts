@@ -20,10 +20,13 @@ export class FoodDiningAgent extends BaseAgent {
       name: 'Food & Dining Curator',
       description:
         'Culinary expert finding authentic, memorable dining experiences',
-      model: 'claude-3-haiku-20240307',
+      // Haiku first, escalating to Sonnet below the quality target
+      model: 'claude-3-5-sonnet-20241022',
+      qualityTarget: 0.7,
       temperature: 0.7,
       maxTokens: 2500,
       timeout: 15000,
+      promptVersion: '2',
     }
     super(config)
   }
@@ -35,17 +38,31 @@ export class FoodDiningAgent extends BaseAgent {
     const startTime = Date.now()
 
     try {
-      const prompt = this.buildPrompt(task, context)
-      const response = await this.executeWithRetry(
-        () => this.callLLM(prompt),
-        2
+      const { research: parsed, cached } = await this.getCachedResearch(
+        context,
+        async () => {
+          const prompt = this.buildPrompt(task, context)
+          return this.callLLMCascade(
+            prompt,
+            {
+              context,
+              phase: 'research',
+              onRecommendation: this.streamRecommendations(context),
+              promptContext: this.buildPromptContext(context),
+            },
+            {
+              parse: response => this.parseResearchPayload(response),
+              // Routing judges the model's picks alone; the dietary penalty
+              // says nothing about the cheaper model's output
+              confidence: research =>
+                this.assessDiningConfidence(
+                  this.categorizeDining(research.recommendations, context)
+                ),
+            }
+          )
+        }
       )
 
-      const parsed = this.parseJSONResponse<{
-        recommendations: Recommendation[]
-        reasoning: string
-      }>(response)
-
       const recommendations = this.categorizeDining(
         parsed.recommendations,
         context
@@ -60,12 +77,16 @@ export class FoodDiningAgent extends BaseAgent {
           agentType: 'food-dining',
           status: 'success',
           recommendations,
-          confidence: this.assessDiningConfidence(recommendations, context),
+          confidence: this.assessDiningConfidence(
+            recommendations,
+            this.getDietaryPenalty(context)
+          ),
           reasoning: parsed.reasoning,
           warnings: this.getDietaryWarnings(context) || [],
         },
         confidence: 0.88,
         executionTime,
+        cached,
       }
     } catch (error) {
       this.log('Food research failed:', error)
@@ -82,26 +103,16 @@ export class FoodDiningAgent extends BaseAgent {
     }
   }
 
-  buildPrompt(task: TaskSpecification, context: AgentContext): string {
-    const { destinationCity, personaProfile, constraints } = context
-
-    return `You are a culinary expert curating dining experiences in ${destinationCity}.
+  // Static instructions and output format, identical for every traveler
+  protected getSystemPrompt(): string {
+    return `${super.getSystemPrompt()}
 
-TRAVELER PROFILE:
-${this.formatPersonaContext(context)}
-
-TASK: ${task.description}
-
-Find 6-8 exceptional dining experiences that match this traveler's style and interests.
-
-For a ${personaProfile.primary} traveler, emphasize:
-${this.getPersonaDiningFocus(personaProfile.primary)}
+You are a culinary expert curating dining experiences. For each request, find 6-8 exceptional dining experiences that match the traveler's style and interests.
 
 REQUIREMENTS:
 - Mix of meal types (breakfast, lunch, dinner, cafes, markets)
 - Range from must-visit icons to hidden local gems
-- Consider dietary restrictions: ${constraints.dietary?.join(', ') || 'None specified'}
-- Budget level: ${constraints.budget || 'moderate'}
+- Respect the traveler's dietary restrictions and budget level
 - Include why each place is special for THIS traveler
 - Practical details (reservations, best times, what to order)
 
@@ -129,6 +140,26 @@ Return JSON with this structure:
 }`
   }
 
+  protected buildPromptContext(context: AgentContext): string {
+    const { personaProfile } = context
+
+    return `${super.buildPromptContext(context)}
+For a ${personaProfile.primary} traveler, emphasize:
+${this.getPersonaDiningFocus(personaProfile.primary)}`
+  }
+
+  // Per-task suffix; the persona context is sent as a cached prefix
+  buildPrompt(task: TaskSpecification, context: AgentContext): string {
+    const { destinationCity, constraints } = context
+
+    return `TASK: ${task.description}
+
+Find dining experiences in ${destinationCity}.
+${this.formatLodgingContext(context)}
+- Dietary restrictions: ${constraints.dietary?.join(', ') || 'None specified'}
+- Budget level: ${constraints.budget || 'moderate'}`
+  }
+
   private getPersonaDiningFocus(persona: string): string {
     const focuses: Record<string, string> = {
       photographer: `
@@ -177,6 +208,27 @@ Return JSON with this structure:
     )
   }
 
+  // Use lodging findings (when that task ran first) to keep meals nearby
+  private formatLodgingContext(context: AgentContext): string {
+    const lodging = context.previousFindings.get('lodging')
+    const neighborhoods = Array.from(
+      new Set(
+        (lodging?.recommendations || [])
+          .map(rec => rec.neighborhood)
+          .filter((neighborhood): neighborhood is string => !!neighborhood)
+      )
+    )
+
+    if (neighborhoods.length === 0) {
+      return ''
+    }
+
+    return `
+LODGING: The traveler is likely staying in ${neighborhoods.join(', ')}.
+Include breakfast and casual options within easy reach of these neighborhoods.
+`
+  }
+
   private categorizeDining(
     recommendations: Recommendation[],
     context: AgentContext
@@ -302,7 +354,7 @@ Return JSON with this structure:
 
   private assessDiningConfidence(
     recommendations: Recommendation[],
-    context: AgentContext
+    dietaryPenalty = 0
   ): number {
     if (recommendations.length < 4) {
       return 0.5
@@ -315,11 +367,14 @@ Return JSON with this structure:
       recommendations.reduce((sum, rec) => sum + (rec.personaFit || 0), 0) /
       recommendations.length
 
+    return Math.max(0.4, Math.min(0.95, avgFit / 100 - dietaryPenalty))
+  }
+
+  // Less confident with restrictions
+  private getDietaryPenalty(context: AgentContext): number {
     const hasDietary =
       context.constraints.dietary && context.constraints.dietary.length > 0
-    const dietaryPenalty = hasDietary ? 0.1 : 0 // Less confident with restrictions
-
-    return Math.max(0.4, Math.min(0.95, avgFit / 100 - dietaryPenalty))
+    return hasDietary ? 0.1 : 0
   }
 
   private getDietaryWarnings(context: AgentContext): string[] | undefined {
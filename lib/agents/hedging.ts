@@ -0,0 +1,172 @@
+/**
+ * Request Hedging
+ * Tail-latency control for LLM calls: when a call is slower than usual, a
+ * duplicate is sent and whichever finishes first wins. A process-wide
+ * budget caps hedges at a fixed share of primary calls.
+ */
+
+import { getServerEnv } from '@/lib/config/env'
+
+// Unspent hedge credit is capped so a quiet period can't fund a burst
+const MAX_HEDGE_CREDIT = 5
+
+export interface HedgeStats {
+  primaryCalls: number
+  hedgedCalls: number
+  hedgeWins: number // hedges that finished before their primary
+  deniedHedges: number // hedges skipped because the budget was spent
+}
+
+export class HedgeBudget {
+  readonly ratio: number
+  private credit = 0
+  private stats: HedgeStats = {
+    primaryCalls: 0,
+    hedgedCalls: 0,
+    hedgeWins: 0,
+    deniedHedges: 0,
+  }
+
+  constructor(ratio: number) {
+    this.ratio = Math.max(0, ratio)
+  }
+
+  /**
+   * Count a primary call; each one earns `ratio` of a hedge
+   */
+  recordPrimary(): void {
+    this.stats.primaryCalls++
+    this.credit = Math.min(MAX_HEDGE_CREDIT, this.credit + this.ratio)
+  }
+
+  /**
+   * Take one hedge from the budget, returning false if none is left
+   */
+  tryAcquire(): boolean {
+    if (this.credit < 1) {
+      this.stats.deniedHedges++
+      return false
+    }
+    this.credit -= 1
+    this.stats.hedgedCalls++
+    return true
+  }
+
+  recordHedgeWin(): void {
+    this.stats.hedgeWins++
+  }
+
+  getStats(): HedgeStats {
+    return { ...this.stats }
+  }
+}
+
+export interface HedgeOptions {
+  delayMs: number // how long the primary runs alone before hedging
+  budget: HedgeBudget
+  signal?: AbortSignal | undefined // aborts both attempts
+  onHedge?: () => void
+}
+
+/**
+ * Run `attempt` and, if it hasn't settled after `delayMs` and the budget
+ * allows, run it again in parallel. Resolves with the first success and
+ * aborts the other attempt. The hedge is only sent while the primary is
+ * still pending, so a fast failure is reported without being duplicated.
+ */
+export function hedgedRequest<T>(
+  attempt: (signal: AbortSignal, hedged: boolean) => Promise<T>,
+  options: HedgeOptions
+): Promise<T> {
+  const { budget, signal } = options
+  budget.recordPrimary()
+
+  return new Promise<T>((resolve, reject) => {
+    const controllers: AbortController[] = []
+    let pending = 0
+    let settled = false
+    let firstError: unknown
+    let timer: ReturnType<typeof setTimeout> | null = null
+
+    const cleanup = () => {
+      if (timer) {
+        clearTimeout(timer)
+      }
+      signal?.removeEventListener('abort', onAbort)
+    }
+
+    const finish = (winner: AbortController | null) => {
+      settled = true
+      cleanup()
+      for (const controller of controllers) {
+        if (controller !== winner) {
+          controller.abort()
+        }
+      }
+    }
+
+    const onAbort = () => {
+      if (!settled) {
+        finish(null)
+        reject(signal?.reason)
+      }
+    }
+
+    const launch = (hedged: boolean) => {
+      const controller = new AbortController()
+      controllers.push(controller)
+      pending++
+
+      attempt(controller.signal, hedged).then(
+        value => {
+          if (settled) {
+            return
+          }
+          if (hedged) {
+            budget.recordHedgeWin()
+          }
+          finish(controller)
+          resolve(value)
+        },
+        error => {
+          pending--
+          firstError = firstError ?? error
+          // Fail only once no other attempt is still in flight; a primary
+          // that fails before the hedge delay is never duplicated
+          if (!settled && pending === 0) {
+            finish(null)
+            reject(firstError)
+          }
+        }
+      )
+    }
+
+    if (signal?.aborted) {
+      onAbort()
+      return
+    }
+    signal?.addEventListener('abort', onAbort, { once: true })
+
+    launch(false)
+
+    timer = setTimeout(() => {
+      timer = null
+      if (settled || pending === 0 || !budget.tryAcquire()) {
+        return
+      }
+      options.onHedge?.()
+      launch(true)
+    }, options.delayMs)
+  })
+}
+
+// Global hedge budget, sized from LLM_HEDGE_BUDGET_PERCENT (unset = off)
+let globalBudget: HedgeBudget | null = null
+
+export function getHedgeBudget(): HedgeBudget {
+  if (!globalBudget) {
+    const percent = getServerEnv().LLM_HEDGE_BUDGET_PERCENT ?? 0
+    globalBudget = new HedgeBudget(percent / 100)
+  }
+  return globalBudget
+}
@@ -0,0 +1,116 @@
+/**
+ * Incremental JSON Parser
+ * Scans an LLM response as it streams in and emits each element of a
+ * top-level array (e.g. `recommendations`) as soon as that element is
+ * syntactically complete, long before the whole response has arrived.
+ * Text before the opening brace, such as a ```json fence, is skipped.
+ */
+
+export type ElementListener = (element: unknown, index: number) => void
+
+export class IncrementalJSONParser {
+  private buffer = ''
+  private position = 0
+  private depth = 0
+  private inString = false
+  private escaped = false
+  private stringStart = -1
+  private lastString: string | null = null
+  private currentKey: string | null = null
+  private arrayDepth: number | null = null // depth inside the target array
+  private elementStart = -1
+  private emitted = 0
+
+  constructor(
+    private arrayKey: string,
+    private onElement: ElementListener
+  ) {}
+
+  /**
+   * Number of elements emitted so far
+   */
+  get count(): number {
+    return this.emitted
+  }
+
+  /**
+   * Feed the next chunk of the response
+   */
+  push(chunk: string): void {
+    this.buffer += chunk
+
+    for (; this.position < this.buffer.length; this.position++) {
+      const char = this.buffer[this.position]!
+
+      if (this.inString) {
+        if (this.escaped) {
+          this.escaped = false
+        } else if (char === '\\') {
+          this.escaped = true
+        } else if (char === '"') {
+          this.inString = false
+          this.lastString = this.buffer.slice(
+            this.stringStart + 1,
+            this.position
+          )
+        }
+        continue
+      }
+
+      switch (char) {
+        case '"':
+          this.inString = true
+          this.stringStart = this.position
+          break
+        case ':':
+          // Keys of the top-level object only
+          if (this.depth === 1) {
+            this.currentKey = this.lastString
+          }
+          break
+        case ',':
+          if (this.depth === 1) {
+            this.currentKey = null
+          }
+          break
+        case '{':
+        case '[':
+          if (this.depth === 1 && char === '[') {
+            if (this.currentKey === this.arrayKey) {
+              this.arrayDepth = 2
+            }
+          } else if (this.depth === this.arrayDepth) {
+            this.elementStart = this.position
+          }
+          this.depth++
+          break
+        case '}':
+        case ']':
+          this.depth--
+          if (this.depth === this.arrayDepth && this.elementStart >= 0) {
+            this.emit(this.buffer.slice(this.elementStart, this.position + 1))
+            this.elementStart = -1
+          } else if (this.depth === 1 && this.arrayDepth !== null) {
+            this.arrayDepth = null
+          }
+          break
+      }
+    }
+  }
+
+  // An element that fails to parse is left for the final, full parse
+  private emit(text: string): void {
+    let element: unknown
+    try {
+      element = JSON.parse(text)
+    } catch {
+      return
+    }
+
+    try {
+      this.onElement(element, this.emitted++)
+    } catch (error) {
+      console.warn('Incremental JSON listener failed:', error)
+    }
+  }
+}
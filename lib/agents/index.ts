@@ -4,11 +4,84 @@
  */
 
 export { orchestrator, AgentOrchestrator } from './orchestrator'
+export { AsyncEventQueue } from './event-queue'
+export {
+  CostLedger,
+  MODEL_PRICING,
+  BUDGET_FALLBACK_MODEL,
+  calculateCost,
+  CACHE_READ_MULTIPLIER,
+  CACHE_WRITE_MULTIPLIER,
+  estimateTokens,
+  getMinCacheableTokens,
+  type CacheUsage,
+  type CostLedgerSummary,
+  type LedgerEntry,
+  type LLMCallPlan,
+} from './cost-ledger'
+export { persistCacheOutcome, persistSessionCosts } from './cost-persistence'
+export {
+  HedgeBudget,
+  hedgedRequest,
+  getHedgeBudget,
+  type HedgeOptions,
+  type HedgeStats,
+} from './hedging'
+export {
+  OrchestrationSession,
+  type OrchestrationSessionOptions,
+  type SessionTokenUsage,
+} from './orchestration-session'
+export {
+  getResearchGroupKey,
+  groupByResearchKey,
+  type ResearchGroup,
+} from './research-group'
+export {
+  createPartialItinerary,
+  describeMissingSections,
+  findMissingSections,
+  parseDayCount,
+  planMeals,
+} from './partial-itinerary'
+export {
+  getResearchCache,
+  getResearchCacheKey,
+  type CachedResearch,
+  type ResearchPayload,
+} from './research-cache'
+export {
+  MODEL_TIERS,
+  getModelCascade,
+  runCascade,
+  type CascadeAttempt,
+  type QualityCheck,
+} from './model-router'
+export {
+  buildFindingsContext,
+  compactRecommendation,
+  restoreRecommendations,
+  DEFAULT_FINDINGS_TOKEN_BUDGET,
+  type FindingsContext,
+  type FindingsContextOptions,
+} from './findings-context'
+export {
+  IncrementalJSONParser,
+  type ElementListener,
+} from './incremental-json'
 export { BaseAgent } from './base-agent'
 export { ConciergeAgent } from './concierge-agent'
 export { LodgingAgent } from './lodging-agent'
 export { FoodDiningAgent } from './food-dining-agent'
 export { QualityValidatorAgent } from './quality-validator-agent'
+export {
+  PlanCache,
+  getPlanCache,
+  getPlanCacheKey,
+  isValidPlan,
+  normalizePlan,
+  type ResearchPlan,
+} from './plan-cache'
 
 // Export test utilities for development
 export {
@@ -27,14 +100,20 @@ export {
   AgentPerformanceCollector,
   MemoryMetricsStorage,
   getMetricsCollector,
+  flushMetricsOnShutdown,
+  RESPONSE_FLUSH_TIMEOUT_MS,
+  type MetricsQueueStats,
 } from './performance-collector'
 export type {
   AgentPerformanceMetrics,
   AgentBenchmark,
   PerformanceAlert,
   AgentPerformanceReport,
+  LLMTokenUsage,
   MetricsCollectionConfig,
   MetricsStorage,
+  ModelRoutingOutcome,
+  ModelRoutingStats,
 } from './performance-metrics'
 
 // Export all types
@@ -44,6 +123,7 @@ export type {
   PersonaProfile,
   TravelConstraints,
   AgentContext,
+  RecommendationListener,
   TaskSpecification,
   ResearchOutput,
   Recommendation,
@@ -56,5 +136,11 @@ export type {
   TransportationInfo,
   AgentResponse,
   AgentConfig,
+  LLMCallOptions,
+  CostBreakdown,
   OrchestrationResult,
+  OrchestrationPhase,
+  OrchestrationEvent,
+  OrchestrationEventListener,
+  OrchestrationOptions,
 } from './types'
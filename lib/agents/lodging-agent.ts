@@ -20,10 +20,13 @@ export class LodgingAgent extends BaseAgent {
       name: 'Lodging Specialist',
       description:
         'Expert in finding unique accommodations that match traveler personas and preferences',
-      model: 'claude-3-haiku-20240307',
+      // Haiku first, escalating to Sonnet below the quality target
+      model: 'claude-3-5-sonnet-20241022',
+      qualityTarget: 0.7,
       temperature: 0.6,
       maxTokens: 2000,
       timeout: 15000,
+      promptVersion: '2',
     }
     super(config)
   }
@@ -35,17 +38,35 @@ export class LodgingAgent extends BaseAgent {
     const startTime = Date.now()
 
     try {
-      const prompt = this.buildPrompt(task, context)
-      const response = await this.executeWithTimeout(
-        () => this.callLLM(prompt),
-        this.config.timeout
+      const { research: parsed, cached } = await this.getCachedResearch(
+        context,
+        async () => {
+          const prompt = this.buildPrompt(task, context)
+          // Each cascade tier gets its own timeout within the request
+          // deadline, so an escalation isn't starved by the first attempt
+          return this.callLLMCascade(
+            prompt,
+            {
+              context,
+              phase: 'research',
+              onRecommendation: this.streamRecommendations(context),
+              promptContext: this.buildPromptContext(context),
+            },
+            {
+              parse: response => this.parseResearchPayload(response),
+              confidence: research =>
+                this.calculateConfidence(
+                  this.enhanceRecommendations(
+                    research.recommendations,
+                    context
+                  ),
+                  context
+                ),
+            }
+          )
+        }
       )
 
-      const parsed = this.parseJSONResponse<{
-        recommendations: Recommendation[]
-        reasoning: string
-      }>(response)
-
       const recommendations = this.enhanceRecommendations(
         parsed.recommendations,
         context
@@ -65,6 +86,7 @@ export class LodgingAgent extends BaseAgent {
         },
         confidence: 0.85,
         executionTime,
+        cached,
       }
     } catch (error) {
       this.log('Lodging research failed:', error)
@@ -81,27 +103,18 @@ export class LodgingAgent extends BaseAgent {
     }
   }
 
-  buildPrompt(task: TaskSpecification, context: AgentContext): string {
-    const { destinationCity, personaProfile, constraints } = context
-
-    return `You are a lodging specialist finding accommodations in ${destinationCity}.
-
-TRAVELER PROFILE:
-${this.formatPersonaContext(context)}
+  // Static instructions and output format, identical for every traveler
+  protected getSystemPrompt(): string {
+    return `${super.getSystemPrompt()}
 
-TASK: ${task.description}
-
-Find 3-5 unique lodging options that perfectly match this traveler's persona and style.
-
-For a ${personaProfile.primary} traveler, prioritize:
-${this.getPersonaLodgingPriorities(personaProfile.primary)}
+You are a lodging specialist finding accommodations. For each request, find 3-5 unique lodging options that perfectly match the traveler's persona and style.
 
 REQUIREMENTS:
 - Mix of accommodation types (boutique hotels, unique stays, local gems)
 - Clear explanation of why each matches the traveler
 - Specific neighborhoods that align with their interests
 - Practical details (transit access, walkability)
-- Price ranges that match ${constraints.budget || 'moderate'} budget
+- Price ranges that match the traveler's budget
 
 Return JSON with this structure:
 {
@@ -124,6 +137,24 @@ Return JSON with this structure:
 }`
   }
 
+  protected buildPromptContext(context: AgentContext): string {
+    const { personaProfile } = context
+
+    return `${super.buildPromptContext(context)}
+For a ${personaProfile.primary} traveler, prioritize:
+${this.getPersonaLodgingPriorities(personaProfile.primary)}`
+  }
+
+  // Per-task suffix; the persona context is sent as a cached prefix
+  buildPrompt(task: TaskSpecification, context: AgentContext): string {
+    const { destinationCity, constraints } = context
+
+    return `TASK: ${task.description}
+
+Find accommodations in ${destinationCity}.
+- Budget level: ${constraints.budget || 'moderate'}`
+  }
+
   private getPersonaLodgingPriorities(persona: string): string {
     const priorities: Record<string, string> = {
       photographer: `
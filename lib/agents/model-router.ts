@@ -0,0 +1,117 @@
+/**
+ * Model Router
+ * Cascade routing for agent LLM calls. A call starts on the cheapest model
+ * and is escalated a tier only when its output fails schema validation or
+ * scores below the agent's quality target, so the expensive model is paid
+ * for only on the calls that need it.
+ */
+
+import { calculateCost, getModelPricing } from './cost-ledger'
+import type { ModelRoutingOutcome } from './performance-metrics'
+
+// Cascade tiers, cheapest first
+export const MODEL_TIERS = [
+  'claude-3-haiku-20240307',
+  'claude-3-5-sonnet-20241022',
+]
+
+/**
+ * Models a cascade ending at `topModel` tries: each cheaper tier, then
+ * `topModel` itself
+ */
+export function getModelCascade(topModel: string): string[] {
+  const topPrice = getModelPricing(topModel).outputPerMTok
+  const cheaper = MODEL_TIERS.filter(
+    model =>
+      model !== topModel && getModelPricing(model).outputPerMTok < topPrice
+  )
+  return [...cheaper, topModel]
+}
+
+// What one attempt returned and the tokens it used
+export interface CascadeAttempt {
+  text: string
+  model: string // model that served the call
+  inputTokens: number
+  outputTokens: number
+  cacheReadTokens?: number | undefined
+  cacheWriteTokens?: number | undefined
+}
+
+export interface QualityCheck<T> {
+  // Parse and validate the response, throwing when it does not match
+  // the expected schema
+  parse: (text: string) => T
+  confidence?: ((result: T) => number) | undefined
+  minConfidence: number // 0-1
+  // Called with how long the last attempt took before escalating past it;
+  // false keeps that attempt's output, e.g. when too little time is left
+  // for a slower model
+  canEscalate?: ((attemptMs: number) => boolean) | undefined
+}
+
+/**
+ * Run `attempt` on each model in `models` until one's output passes
+ * `check`. The last model's output is used whatever its confidence, but a
+ * schema failure there is thrown.
+ */
+export async function runCascade<T>(
+  models: string[],
+  attempt: (model: string, index: number) => Promise<CascadeAttempt>,
+  check: QualityCheck<T>
+): Promise<{ result: T; outcome: ModelRoutingOutcome }> {
+  const topModel = models[models.length - 1]!
+  const escalations: ModelRoutingOutcome['escalations'] = []
+  let costUsd = 0
+
+  for (let index = 0; ; index++) {
+    const model = models[index]!
+    const attemptStart = Date.now()
+    const response = await attempt(model, index)
+    const attemptMs = Date.now() - attemptStart
+    const callCost = (tier: string) =>
+      calculateCost(tier, response.inputTokens, response.outputTokens, {
+        cacheReadTokens: response.cacheReadTokens,
+        cacheWriteTokens: response.cacheWriteTokens,
+      })
+    costUsd += callCost(response.model)
+
+    // A call served by a cheaper model than asked for (a budget
+    // downgrade) would be downgraded again if escalated
+    const final =
+      index === models.length - 1 ||
+      response.model !== model ||
+      (check.canEscalate !== undefined && !check.canEscalate(attemptMs))
+
+    let result: T
+    try {
+      result = check.parse(response.text)
+    } catch (error) {
+      if (final) {
+        throw error
+      }
+      escalations.push({ from: model, reason: 'schema' })
+      continue
+    }
+
+    if (
+      !final &&
+      check.confidence &&
+      check.confidence(result) < check.minConfidence
+    ) {
+      escalations.push({ from: model, reason: 'confidence' })
+      continue
+    }
+
+    return {
+      result,
+      outcome: {
+        model: response.model,
+        attempts: index + 1,
+        escalations,
+        costUsd,
+        baselineCostUsd: callCost(topModel),
+      },
+    }
+  }
+}
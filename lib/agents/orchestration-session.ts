@@ -0,0 +1,114 @@
+/**
+ * Orchestration Session
+ * Request-scoped state for a single itinerary generation: conversation
+ * log, research findings and the LLM cost ledger. Keeping this off the
+ * orchestrator lets one instance serve many concurrent requests.
+ */
+
+import { CostLedger } from './cost-ledger'
+import type {
+  AgentMessage,
+  AgentType,
+  OrchestrationResult,
+  ResearchOutput,
+} from './types'
+
+export interface OrchestrationSessionOptions {
+  sessionId?: string
+  requestId?: string
+  maxMessages?: number // conversation log is bounded to this many entries
+  budgetUsd?: number | undefined // per-request LLM spend cap
+}
+
+export interface SessionTokenUsage {
+  prompt: number
+  completion: number
+  total: number
+}
+
+const DEFAULT_MAX_MESSAGES = 200
+
+const randomSuffix = () => Math.random().toString(36).substr(2, 9)
+
+export class OrchestrationSession {
+  readonly sessionId: string
+  readonly requestId: string
+  readonly startTime: number
+  readonly findings = new Map<AgentType, ResearchOutput>()
+  readonly ledger: CostLedger
+
+  private messages: AgentMessage[] = []
+  private droppedMessages = 0
+  private maxMessages: number
+  private apiCalls = 0
+
+  constructor(options: OrchestrationSessionOptions = {}) {
+    this.startTime = Date.now()
+    this.sessionId =
+      options.sessionId || `orchestration_${this.startTime}_${randomSuffix()}`
+    this.requestId = options.requestId || `gen_itinerary_${this.startTime}`
+    this.maxMessages = options.maxMessages ?? DEFAULT_MAX_MESSAGES
+    this.ledger = new CostLedger(options.budgetUsd)
+  }
+
+  /**
+   * Append a message to the conversation log, dropping the oldest entries
+   * once the log is full
+   */
+  addMessage(message: Omit<AgentMessage, 'id' | 'timestamp'>): void {
+    this.messages.push({
+      ...message,
+      id: `msg_${Date.now()}_${randomSuffix()}`,
+      timestamp: new Date(),
+    })
+
+    const overflow = this.messages.length - this.maxMessages
+    if (overflow > 0) {
+      this.messages.splice(0, overflow)
+      this.droppedMessages += overflow
+    }
+  }
+
+  getConversationLog(): AgentMessage[] {
+    return [...this.messages]
+  }
+
+  getDroppedMessageCount(): number {
+    return this.droppedMessages
+  }
+
+  recordApiCalls(count: number): void {
+    this.apiCalls += count
+  }
+
+  getTokenUsage(): SessionTokenUsage {
+    const { totals } = this.ledger.getSummary()
+    return {
+      prompt: totals.inputTokens,
+      completion: totals.outputTokens,
+      total: totals.inputTokens + totals.outputTokens,
+    }
+  }
+
+  getCosts(): NonNullable<OrchestrationResult['costs']> {
+    const summary = this.ledger.getSummary()
+    return {
+      llmTokens: summary.totals.inputTokens + summary.totals.outputTokens,
+      apiCalls: this.apiCalls,
+      estimatedCost: summary.totals.costUsd,
+      inputTokens: summary.totals.inputTokens,
+      outputTokens: summary.totals.outputTokens,
+      cacheReadTokens: summary.totals.cacheReadTokens,
+      cacheWriteTokens: summary.totals.cacheWriteTokens,
+      byAgent: summary.byAgent,
+      byPhase: summary.byPhase,
+      budgetUsd: summary.budgetUsd,
+      downgradedCalls: summary.downgradedCalls,
+      trimmedCalls: summary.trimmedCalls,
+    }
+  }
+
+  getElapsedTime(): number {
+    return Date.now() - this.startTime
+  }
+}
@@ -4,13 +4,27 @@
  * Coordinates all agents to generate travel itineraries
  */
 
+import { getServerEnv } from '@/lib/config/env'
+import { Deadline } from '@/lib/resilience'
+
 import { ConciergeAgent } from './concierge-agent'
+import { persistSessionCosts } from './cost-persistence'
+import { AsyncEventQueue } from './event-queue'
 import { FoodDiningAgent } from './food-dining-agent'
 import { LodgingAgent } from './lodging-agent'
+import { OrchestrationSession } from './orchestration-session'
+import {
+  createPartialItinerary,
+  describeMissingSections,
+  findMissingSections,
+} from './partial-itinerary'
 import { getMetricsCollector } from './performance-collector'
 import { QualityValidatorAgent } from './quality-validator-agent'
+import { groupByResearchKey } from './research-group'
+import { TaskScheduler, type ScheduledTask } from './task-scheduler'
 import type {
   AgentContext,
+  AgentResponse,
   AgentType,
   TaskSpecification,
   ResearchOutput,
@@ -18,18 +32,62 @@ import type {
   PersonaProfile,
   TravelConstraints,
   Itinerary,
-  AgentMessage,
   QualityValidation,
   TTravelRequirements,
+  OrchestrationEvent,
+  OrchestrationOptions,
+  OrchestrationPhase,
 } from './types'
 
+// Share of the time remaining when a stage starts that the stage may use.
+// Validation that overlaps research is bounded by the request deadline
+// until the validation stage starts.
+const STAGE_BUDGET_SHARES: Record<OrchestrationPhase, number> = {
+  planning: 0.2,
+  research: 0.6,
+  validation: 0.35,
+  assembly: 1,
+}
+
+// With less time than this left, assembly skips the LLM call and builds
+// the itinerary directly from the research results
+const MIN_LLM_ASSEMBLY_MS = 5000
+
+interface ValidationOutcome {
+  agentType: AgentType
+  validations: QualityValidation[]
+  completed: boolean
+}
+
+interface ValidatedResults {
+  validated: Map<AgentType, ResearchOutput>
+  validations: QualityValidation[]
+  unvalidated: AgentType[]
+}
+
+// Output of the planning, research and validation phases, which is all
+// assembly needs and can be shared by requests for the same destination
+interface DestinationResearch {
+  tasks: TaskSpecification[]
+  researchResults: Map<AgentType, ResearchOutput>
+  validatedResults: ValidatedResults
+  missingSections: string[]
+}
+
+/**
+ * Stateless coordinator: all per-request state lives in an
+ * OrchestrationSession, so one instance can serve concurrent requests
+ */
 export class AgentOrchestrator {
   private concierge: ConciergeAgent
   private researchAgents: Map<AgentType, any>
   private qualityValidator: QualityValidatorAgent
-  private messages: AgentMessage[] = []
+  private scheduler: TaskScheduler
 
   constructor() {
+    // Shared across calls so per-model concurrency caps hold process-wide
+    this.scheduler = new TaskScheduler()
+
     // Initialize all agents
     this.concierge = new ConciergeAgent()
     this.qualityValidator = new QualityValidatorAgent()
@@ -48,51 +106,59 @@ export class AgentOrchestrator {
   async generateItinerary(
     requirements: TTravelRequirements,
     personaProfile?: PersonaProfile,
-    constraints?: TravelConstraints
+    constraints?: TravelConstraints,
+    options: OrchestrationOptions = {}
   ): Promise<OrchestrationResult> {
-    const startTime = Date.now()
-    const sessionId = `orchestration_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
-    const requestId = `gen_itinerary_${Date.now()}`
+    const session = new OrchestrationSession({
+      budgetUsd: options.budgetUsd ?? getServerEnv().ORCHESTRATION_BUDGET_USD,
+    })
+    const emit = (event: OrchestrationEvent) => this.emit(options, event)
+
+    // Every LLM and API call made for this request is aborted once the
+    // function's time budget runs out
+    const deadline =
+      options.deadline || Deadline.fromFunctionTimeout(options.signal)
 
     try {
       // Build context for agents
       const context = this.buildContext(
+        session,
         requirements,
         personaProfile,
         constraints
       )
 
       // Log orchestration start
-      this.addMessage({
-        id: this.generateId(),
-        timestamp: new Date(),
+      session.addMessage({
         from: 'concierge',
         to: 'broadcast',
         type: 'status',
-        payload: { message: 'Starting itinerary generation', context },
+        payload: {
+          message: 'Starting itinerary generation',
+          destination: context.destinationCity,
+          persona: context.personaProfile.primary,
+        },
       })
 
-      // Phase 1: Concierge analyzes and creates tasks
-      const tasks = await this.createResearchTasks(context)
-
-      // Phase 2: Execute research tasks in parallel where possible
-      const researchResults = await this.executeResearch(tasks, context)
-
-      // Phase 3: Validate and enrich recommendations
-      const validatedResults = await this.validateRecommendations(
-        researchResults,
-        context
-      )
+      // Phases 1-3: plan, research and validate
+      const research = await this.researchDestination(context, emit, deadline)
+      const { tasks, researchResults, validatedResults } = research
 
       // Phase 4: Assemble final itinerary
-      const itinerary = await this.assembleItinerary(context, validatedResults)
+      const itinerary = await this.runPhase('assembly', emit, deadline, stage =>
+        this.assembleItinerary(
+          { ...context, deadline: stage },
+          validatedResults,
+          research.missingSections
+        )
+      )
 
-      const totalTime = Date.now() - startTime
+      session.recordApiCalls(validatedResults.validations.length)
+      const totalTime = session.getElapsedTime()
 
       // Track orchestration performance metrics
-      await this.trackOrchestrationMetrics({
-        sessionId,
-        requestId,
+      this.trackOrchestrationMetrics({
+        session,
         totalTime,
         success: true,
         tasksCompleted: tasks.length,
@@ -101,39 +167,400 @@ export class AgentOrchestrator {
         ),
       })
 
-      return {
+      const result: OrchestrationResult = {
         success: true,
         itinerary,
         rawResearch: researchResults,
         validationReport: validatedResults.validations,
-        conversationLog: this.messages,
+        conversationLog: session.getConversationLog(),
         totalExecutionTime: totalTime,
-        costs: {
-          llmTokens: this.estimateTokenUsage(),
-          apiCalls: validatedResults.validations.length,
-          estimatedCost: this.estimateCost(),
-        },
+        costs: session.getCosts(),
+      }
+      if (itinerary.partial) {
+        result.partial = true
+        result.missingSections = itinerary.missingSections || []
       }
+
+      await this.persistCosts(session, options, { success: true })
+
+      emit({ type: 'complete', result, timestamp: Date.now() })
+      return result
     } catch (error) {
-      console.error('Orchestration failed:', error)
+      return this.handleFailure(session, options, emit, error)
+    } finally {
+      if (!options.deadline) {
+        deadline.dispose()
+      }
+    }
+  }
+
+  /**
+   * Generate itineraries for a batch of requests
+   * Requests for the same destination, budget and dietary needs share one
+   * planning, research and validation run; only the persona-specific
+   * assembly runs per request. Results come back in request order, and the
+   * costs on each result cover every request in its group.
+   */
+  async generateItineraries(
+    requirementsList: TTravelRequirements[],
+    options: OrchestrationOptions = {}
+  ): Promise<OrchestrationResult[]> {
+    const emit = (event: OrchestrationEvent) => this.emit(options, event)
+    const requestBudgetUsd =
+      options.budgetUsd ?? getServerEnv().ORCHESTRATION_BUDGET_USD
+    const deadline =
+      options.deadline || Deadline.fromFunctionTimeout(options.signal)
+    const results: OrchestrationResult[] = []
+
+    try {
+      await Promise.all(
+        groupByResearchKey(requirementsList).map(async group => {
+          const members = group.indices.map(index => requirementsList[index]!)
+          const groupResults = await this.generateGroup(
+            members,
+            {
+              ...options,
+              // The group's budget covers each request it serves
+              budgetUsd: requestBudgetUsd && requestBudgetUsd * members.length,
+            },
+            emit,
+            deadline
+          )
+
+          group.indices.forEach((index, position) => {
+            results[index] = groupResults[position]!
+          })
+        })
+      )
+
+      return results
+    } finally {
+      if (!options.deadline) {
+        deadline.dispose()
+      }
+    }
+  }
+
+  /**
+   * Streaming variant of generateItinerary
+   * Yields phase transitions, each research output as it lands, validation
+   * verdicts and finally a `complete` (or `error`) event with the result.
+   * Stopping iteration early aborts the generation.
+   */
+  async *streamItinerary(
+    requirements: TTravelRequirements,
+    personaProfile?: PersonaProfile,
+    constraints?: TravelConstraints,
+    options: OrchestrationOptions = {}
+  ): AsyncGenerator<OrchestrationEvent, void, undefined> {
+    const queue = new AsyncEventQueue<OrchestrationEvent>()
+
+    // Aborted if the consumer stops iterating early, so generation doesn't
+    // keep running and spending for nobody
+    const deadline = options.deadline
+      ? options.deadline.child()
+      : Deadline.fromFunctionTimeout(options.signal)
+
+    const streamOptions: OrchestrationOptions = {
+      ...options,
+      deadline,
+      onEvent: event => {
+        options.onEvent?.(event)
+        queue.push(event)
+      },
+    }
+
+    const run = this.generateItinerary(
+      requirements,
+      personaProfile,
+      constraints,
+      streamOptions
+    ).finally(() => queue.close())
+
+    let finished = false
+    try {
+      yield* queue
+      await run
+      finished = true
+    } finally {
+      if (!finished) {
+        deadline.abort(new Error('Itinerary stream consumer stopped'))
+        run.catch(() => undefined)
+      }
+      deadline.dispose()
+    }
+  }
+
+  /**
+   * Research once for a group of requests, then assemble an itinerary per
+   * request from the shared findings
+   */
+  private async generateGroup(
+    members: TTravelRequirements[],
+    options: OrchestrationOptions,
+    emit: (event: OrchestrationEvent) => void,
+    deadline: Deadline
+  ): Promise<OrchestrationResult[]> {
+    const session = new OrchestrationSession({ budgetUsd: options.budgetUsd })
 
-      const totalTime = Date.now() - startTime
+    try {
+      const [lead, ...others] = members.map(requirements =>
+        this.buildContext(session, requirements)
+      )
+      if (!lead) {
+        return []
+      }
+      const contexts = [lead, ...others]
+
+      session.addMessage({
+        from: 'concierge',
+        to: 'broadcast',
+        type: 'status',
+        payload: {
+          message: 'Starting shared destination research',
+          destination: lead.destinationCity,
+          requests: contexts.length,
+        },
+      })
+
+      // Phases 1-3: research for every traveler in the group at once
+      const research = await this.researchDestination(
+        {
+          ...lead,
+          personaProfile: this.mergePersonas(
+            lead.personaProfile,
+            others.map(context => context.personaProfile)
+          ),
+        },
+        emit,
+        deadline
+      )
+      const { tasks, researchResults, validatedResults } = research
+
+      // Phase 4: one assembly per request, each for its own persona
+      const itineraries = await this.runPhase(
+        'assembly',
+        emit,
+        deadline,
+        stage =>
+          Promise.all(
+            contexts.map(context =>
+              this.assembleItinerary(
+                { ...context, deadline: stage },
+                validatedResults,
+                research.missingSections
+              )
+            )
+          )
+      )
+
+      session.recordApiCalls(validatedResults.validations.length)
+      const totalTime = session.getElapsedTime()
 
-      // Track failed orchestration metrics
-      await this.trackOrchestrationMetrics({
-        sessionId,
-        requestId,
+      this.trackOrchestrationMetrics({
+        session,
         totalTime,
-        success: false,
-        tasksCompleted: 0,
-        confidence: 0,
+        success: true,
+        tasksCompleted: tasks.length,
+        confidence: this.calculateOverallConfidence(
+          validatedResults.validations
+        ),
       })
 
-      return {
-        success: false,
-        totalExecutionTime: totalTime,
-        conversationLog: this.messages,
+      // A shared session has no single generation row to update
+      await this.persistCosts(
+        session,
+        { userId: options.userId },
+        { success: true }
+      )
+
+      const costs = session.getCosts()
+      return itineraries.map(itinerary => {
+        const result: OrchestrationResult = {
+          success: true,
+          itinerary,
+          rawResearch: researchResults,
+          validationReport: validatedResults.validations,
+          conversationLog: session.getConversationLog(),
+          totalExecutionTime: totalTime,
+          batchSize: contexts.length,
+          costs,
+        }
+        if (itinerary.partial) {
+          result.partial = true
+          result.missingSections = itinerary.missingSections || []
+        }
+        return result
+      })
+    } catch (error) {
+      const failure = await this.handleFailure(
+        session,
+        { userId: options.userId },
+        emit,
+        error
+      )
+      return members.map(() => ({ ...failure, batchSize: members.length }))
+    }
+  }
+
+  /**
+   * Plan, run and validate the research for a destination (phases 1-3).
+   * Validation of each agent's output starts as soon as it lands, so it
+   * overlaps with slower agents.
+   */
+  private async researchDestination(
+    context: AgentContext,
+    emit: (event: OrchestrationEvent) => void,
+    deadline: Deadline
+  ): Promise<DestinationResearch> {
+    const validationScope = deadline.child()
+
+    try {
+      // Phase 1: Concierge analyzes and creates tasks
+      const tasks = await this.runPhase('planning', emit, deadline, stage =>
+        this.createResearchTasks({ ...context, deadline: stage })
+      )
+
+      // Phase 2: Execute research tasks, validating each agent's output
+      // as soon as it lands
+      const pendingValidations: Promise<ValidationOutcome>[] = []
+      const validationContext = { ...context, deadline: validationScope }
+      const researchResults = await this.runPhase(
+        'research',
+        emit,
+        deadline,
+        stage =>
+          this.executeResearch(
+            tasks,
+            {
+              ...context,
+              deadline: stage,
+              onRecommendation: (agentType, recommendation, index) =>
+                emit({
+                  type: 'recommendation',
+                  agentType,
+                  recommendation,
+                  index,
+                  timestamp: Date.now(),
+                }),
+            },
+            emit,
+            output => {
+              pendingValidations.push(
+                this.validateOutput(output, validationContext, emit)
+              )
+            }
+          )
+      )
+
+      // Phase 3: Wait for validations that are still in flight, no longer
+      // than the validation stage allows
+      const validatedResults = await this.runPhase(
+        'validation',
+        emit,
+        deadline,
+        stage => {
+          validationScope.limit(stage.remaining())
+          return this.validateRecommendations(
+            researchResults,
+            pendingValidations
+          )
+        }
+      )
+
+      // Anything that did not finish in time is reported, not fatal
+      const missingSections = findMissingSections(
+        tasks,
+        researchResults,
+        validatedResults.unvalidated
+      )
+
+      return { tasks, researchResults, validatedResults, missingSections }
+    } finally {
+      validationScope.dispose()
+    }
+  }
+
+  /**
+   * Report a failed orchestration: emit the error, record metrics and
+   * costs, and build the failed result
+   */
+  private async handleFailure(
+    session: OrchestrationSession,
+    options: OrchestrationOptions,
+    emit: (event: OrchestrationEvent) => void,
+    error: unknown
+  ): Promise<OrchestrationResult> {
+    console.error('Orchestration failed:', error)
+    const errorMessage =
+      error instanceof Error ? error.message : 'Unknown error'
+    emit({ type: 'error', error: errorMessage, timestamp: Date.now() })
+
+    const totalTime = session.getElapsedTime()
+
+    // Track failed orchestration metrics
+    this.trackOrchestrationMetrics({
+      session,
+      totalTime,
+      success: false,
+      tasksCompleted: 0,
+      confidence: 0,
+    })
+
+    await this.persistCosts(session, options, {
+      success: false,
+      errorMessage,
+    })
+
+    return {
+      success: false,
+      totalExecutionTime: totalTime,
+      conversationLog: session.getConversationLog(),
+      costs: session.getCosts(),
+    }
+  }
+
+  /**
+   * Run a single orchestration phase under its own share of the request
+   * deadline, emitting start/completion events
+   */
+  private async runPhase<T>(
+    phase: OrchestrationPhase,
+    emit: (event: OrchestrationEvent) => void,
+    deadline: Deadline,
+    operation: (stage: Deadline) => Promise<T>
+  ): Promise<T> {
+    emit({ type: 'phase', phase, status: 'started', timestamp: Date.now() })
+    const stage = deadline.child(STAGE_BUDGET_SHARES[phase])
+
+    try {
+      const result = await operation(stage)
+      if (stage.isExpired()) {
+        console.warn(`Orchestration ${phase} stage ran out of time`)
       }
+      emit({ type: 'phase', phase, status: 'completed', timestamp: Date.now() })
+      return result
+    } finally {
+      stage.dispose()
+    }
+  }
+
+  /**
+   * Deliver an event to the caller's listener without letting listener
+   * errors break the orchestration
+   */
+  private emit(
+    options: OrchestrationOptions,
+    event: OrchestrationEvent
+  ): void {
+    if (!options.onEvent) {
+      return
+    }
+
+    try {
+      options.onEvent(event)
+    } catch (error) {
+      console.warn('Orchestration event listener failed:', error)
     }
   }
 
@@ -141,6 +568,7 @@ export class AgentOrchestrator {
    * Build context object for agents
    */
   private buildContext(
+    session: OrchestrationSession,
     requirements: TTravelRequirements,
     personaProfile?: PersonaProfile,
     constraints?: TravelConstraints
@@ -157,7 +585,8 @@ export class AgentOrchestrator {
       destinationCity: (requirements as any).destination || 'Pittsburgh, PA',
       personaProfile: persona,
       constraints: travelConstraints,
-      previousFindings: new Map(),
+      previousFindings: session.findings,
+      session,
     }
   }
 
@@ -214,6 +643,32 @@ export class AgentOrchestrator {
     return personaProfile
   }
 
+  /**
+   * Persona to research for several travelers at once: their shared
+   * persona if they agree, otherwise a balanced one with every interest
+   */
+  private mergePersonas(
+    lead: PersonaProfile,
+    others: PersonaProfile[]
+  ): PersonaProfile {
+    if (others.length === 0) {
+      return lead
+    }
+
+    const personas = [lead, ...others]
+    const samePrimary = others.every(
+      persona => persona.primary === lead.primary
+    )
+
+    return {
+      ...lead,
+      primary: samePrimary ? lead.primary : 'balanced',
+      interests: Array.from(
+        new Set(personas.flatMap(persona => persona.interests))
+      ),
+    }
+  }
+
   /**
    * Extract travel constraints from requirements
    */
@@ -249,20 +704,36 @@ export class AgentOrchestrator {
   private async createResearchTasks(
     context: AgentContext
   ): Promise<TaskSpecification[]> {
-    await this.concierge.execute(
-      {
-        taskId: 'initial-analysis',
-        agentType: 'concierge',
-        priority: 'high',
-        description: 'Analyze requirements and create research tasks',
-        constraints: [],
-        expectedOutput: 'List of research tasks',
-      },
-      context
+    let planned: TaskSpecification[] = []
+    try {
+      planned = await this.concierge.planResearchTasks(context)
+    } catch (error) {
+      console.warn('Research planning failed, using default tasks:', error)
+    }
+
+    // Keep one task per agent we can actually run
+    const tasks: TaskSpecification[] = []
+    for (const task of planned) {
+      if (
+        this.researchAgents.has(task.agentType) &&
+        !tasks.some(existing => existing.agentType === task.agentType)
+      ) {
+        tasks.push(task)
+      }
+    }
+
+    // Every available research agent gets a task, planned or not
+    const defaults = this.createDefaultTasks(context).filter(
+      task => !tasks.some(existing => existing.agentType === task.agentType)
     )
 
-    // Extract tasks from concierge response
-    // For now, create default tasks
+    return [...tasks, ...defaults]
+  }
+
+  /**
+   * Default research tasks used when the plan omits an agent
+   */
+  private createDefaultTasks(context: AgentContext): TaskSpecification[] {
     return [
       {
         taskId: `task_${Date.now()}_lodging`,
@@ -291,237 +762,247 @@ export class AgentOrchestrator {
    */
   private async executeResearch(
     tasks: TaskSpecification[],
-    context: AgentContext
+    context: AgentContext,
+    emit: (event: OrchestrationEvent) => void,
+    onOutput?: (output: ResearchOutput) => void
   ): Promise<Map<AgentType, ResearchOutput>> {
     const results = new Map<AgentType, ResearchOutput>()
+    const taskIdsByAgent = new Map(
+      tasks.map(task => [task.agentType, task.taskId])
+    )
 
-    // Execute tasks in parallel where possible
-    const promises = tasks.map(async task => {
-      const agent = this.researchAgents.get(task.agentType)
+    // Each task starts once the findings it depends on are available,
+    // subject to per-model concurrency limits
+    const scheduled: ScheduledTask<AgentResponse<ResearchOutput> | null>[] =
+      tasks.map(task => {
+        const agent = this.researchAgents.get(task.agentType)
+
+        return {
+          id: task.taskId,
+          priority: task.priority,
+          dependsOn: (task.dependsOn || [])
+            .map(dependency => taskIdsByAgent.get(dependency))
+            .filter((id): id is string => !!id),
+          resourceKey: agent?.getEntryModel(),
+          run: async () => {
+            if (!agent) {
+              console.warn(`No agent found for type: ${task.agentType}`)
+              return null
+            }
+
+            const response: AgentResponse<ResearchOutput> =
+              await agent.execute(task, context)
+
+            if (
+              response.status === 'success' ||
+              response.status === 'partial'
+            ) {
+              results.set(task.agentType, response.data)
+
+              // Update context with findings
+              context.previousFindings.set(task.agentType, response.data)
+
+              emit({
+                type: 'research',
+                agentType: task.agentType,
+                output: response.data,
+                timestamp: Date.now(),
+              })
+
+              onOutput?.(response.data)
+            }
+
+            return response
+          },
+        }
+      })
 
-      if (!agent) {
-        console.warn(`No agent found for type: ${task.agentType}`)
-        return null
+    await this.scheduler.run(scheduled, (task, outcome) => {
+      if (outcome.status === 'rejected') {
+        console.error(`Research task ${task.id} failed:`, outcome.reason)
       }
+    })
 
-      try {
-        const response = await agent.execute(task, context)
-
-        if (response.status === 'success' || response.status === 'partial') {
-          results.set(task.agentType, response.data)
+    return results
+  }
 
-          // Update context with findings
-          context.previousFindings.set(task.agentType, response.data)
+  /**
+   * Validate one research output using the Quality Validator agent and
+   * merge the enrichment back into its recommendations
+   */
+  private async validateOutput(
+    output: ResearchOutput,
+    context: AgentContext,
+    emit: (event: OrchestrationEvent) => void
+  ): Promise<ValidationOutcome> {
+    try {
+      const validatorResponse = await this.qualityValidator.validateOutput(
+        output,
+        context
+      )
+      const validations: QualityValidation[] = validatorResponse.data || []
+
+      validations.forEach(validation => {
+        if (validation.enrichedData) {
+          output.recommendations = output.recommendations.map(rec => {
+            if (rec.name === validation.originalRecommendation.name) {
+              return { ...rec, ...validation.enrichedData }
+            }
+            return rec
+          })
         }
+      })
 
-        return response
-      } catch (error) {
-        console.error(`Agent ${task.agentType} failed:`, error)
-        return null
-      }
-    })
-
-    await Promise.all(promises)
+      emit({
+        type: 'validation',
+        agentType: output.agentType,
+        validations,
+        timestamp: Date.now(),
+      })
 
-    return results
+      // Individual checks cut off by the deadline come back unverified
+      // rather than throwing, so an expired deadline means incomplete
+      return {
+        agentType: output.agentType,
+        validations,
+        completed: !context.deadline?.isExpired(),
+      }
+    } catch (error) {
+      console.error(`Validation failed for ${output.agentType}:`, error)
+      return { agentType: output.agentType, validations: [], completed: false }
+    }
   }
 
   /**
-   * Validate recommendations using the Quality Validator agent
+   * Collect the per-agent validations started during research
    */
   private async validateRecommendations(
     researchResults: Map<AgentType, ResearchOutput>,
-    context: AgentContext
-  ): Promise<{
-    validated: Map<AgentType, ResearchOutput>
-    validations: QualityValidation[]
-  }> {
-    // Update context with research results
-    context.previousFindings = researchResults
-
-    const validatorResponse = await this.qualityValidator.execute(
-      {
-        taskId: 'validate-all',
-        agentType: 'quality-validator',
-        priority: 'high',
-        description: 'Validate all recommendations',
-        constraints: [],
-        expectedOutput: 'Validation results',
-      },
-      context
-    )
-
-    const validations = validatorResponse.data || []
-
-    // Merge validation results back into research outputs
-    const validated = new Map(researchResults)
-
-    validations.forEach(validation => {
-      if (validation.enrichedData) {
-        // Find and update the original recommendation
-        validated.forEach(output => {
-          if (output.recommendations) {
-            output.recommendations = output.recommendations.map(rec => {
-              if (rec.name === validation.originalRecommendation.name) {
-                return { ...rec, ...validation.enrichedData }
-              }
-              return rec
-            })
-          }
-        })
-      }
-    })
+    pendingValidations: Promise<ValidationOutcome>[]
+  ): Promise<ValidatedResults> {
+    const outcomes = await Promise.all(pendingValidations)
 
-    return { validated, validations }
+    return {
+      validated: new Map(researchResults),
+      validations: outcomes.flatMap(outcome => outcome.validations),
+      unvalidated: outcomes
+        .filter(outcome => !outcome.completed)
+        .map(outcome => outcome.agentType),
+    }
   }
 
   /**
-   * Assemble final itinerary from validated results
+   * Assemble final itinerary from validated results. Near the deadline,
+   * or if the LLM assembly fails, the itinerary is built directly from
+   * whatever research finished so the request still returns in time.
    */
   private async assembleItinerary(
     context: AgentContext,
     validatedResults: {
       validated: Map<AgentType, ResearchOutput>
       validations: QualityValidation[]
-    }
+    },
+    missingSections: string[]
   ): Promise<Itinerary> {
     // Update context with validated results
     context.previousFindings = validatedResults.validated
 
-    // Use concierge to assemble final itinerary
-    const assemblyTask: TaskSpecification = {
-      taskId: 'final-assembly',
-      agentType: 'concierge',
-      priority: 'high',
-      description: 'Assemble final itinerary from validated recommendations',
-      constraints: [],
-      expectedOutput: 'Complete itinerary',
+    const remaining = context.deadline?.remaining() ?? Infinity
+    if (remaining < MIN_LLM_ASSEMBLY_MS) {
+      console.warn(
+        `Only ${remaining}ms left, assembling itinerary from partial results`
+      )
+      return createPartialItinerary(context, validatedResults.validated, [
+        ...missingSections,
+        'schedule',
+      ])
     }
 
-    const conciergeResponse = await this.concierge.execute(
-      assemblyTask,
-      context
-    )
+    try {
+      const itinerary = await this.concierge.assembleItinerary(
+        context,
+        validatedResults.validated
+      )
 
-    if (
-      conciergeResponse.status === 'success' &&
-      conciergeResponse.data?.itinerary
-    ) {
-      return conciergeResponse.data.itinerary
-    }
+      if (missingSections.length === 0) {
+        return itinerary
+      }
 
-    // Fallback: Create basic itinerary structure
-    return this.createFallbackItinerary(context, validatedResults.validated)
+      return {
+        ...itinerary,
+        warnings: [
+          ...(itinerary.warnings || []),
+          ...describeMissingSections(missingSections),
+        ],
+        partial: true,
+        missingSections,
+      }
+    } catch (error) {
+      console.warn('Itinerary assembly failed, using partial results:', error)
+      return createPartialItinerary(context, validatedResults.validated, [
+        ...missingSections,
+        'schedule',
+      ])
+    }
   }
 
   /**
-   * Create a fallback itinerary if assembly fails
+   * Persist the session's cost totals to ai_generation_sessions when the
+   * caller identified a generation session or user
    */
-  private createFallbackItinerary(
-    context: AgentContext,
-    results: Map<AgentType, ResearchOutput>
-  ): Itinerary {
-    const lodging = results.get('lodging')?.recommendations || []
-    const dining = results.get('food-dining')?.recommendations || []
+  private async persistCosts(
+    session: OrchestrationSession,
+    options: OrchestrationOptions,
+    outcome: { success: boolean; errorMessage?: string }
+  ): Promise<void> {
+    if (!options.generationSessionId && !options.userId) {
+      return
+    }
 
-    return {
-      destination: context.destinationCity,
-      duration: context.userRequirements.duration || '3 days',
-      days: [
-        {
-          day: 1,
-          theme: 'Arrival and Exploration',
-          activities: [],
-          meals: dining.slice(0, 3),
-        },
-        {
-          day: 2,
-          theme: 'Full Day Adventures',
-          activities: [],
-          meals: dining.slice(3, 6),
-        },
+    try {
+      await persistSessionCosts(
+        session,
         {
-          day: 3,
-          theme: 'Final Discoveries',
-          activities: [],
-          meals: dining.slice(6, 9),
+          generationSessionId: options.generationSessionId,
+          userId: options.userId,
         },
-      ],
-      lodging: lodging.slice(0, 2),
-      personaNotes: `Curated for a ${context.personaProfile.primary} traveler`,
+        outcome
+      )
+    } catch (error) {
+      console.warn('Failed to persist orchestration costs:', error)
     }
   }
 
-  /**
-   * Add message to conversation log
-   */
-  private addMessage(message: AgentMessage): void {
-    this.messages.push(message)
-  }
-
-  /**
-   * Generate unique ID
-   */
-  private generateId(): string {
-    return `msg_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
-  }
-
-  /**
-   * Estimate token usage (mock implementation)
-   */
-  private estimateTokenUsage(): number {
-    // Rough estimate: 500 tokens per agent call
-    return this.messages.length * 500
-  }
-
-  /**
-   * Estimate cost (mock implementation)
-   */
-  private estimateCost(): number {
-    // Rough estimate based on token usage
-    const tokens = this.estimateTokenUsage()
-    const costPer1kTokens = 0.003 // Haiku pricing
-    return Math.round((tokens / 1000) * costPer1kTokens * 100) / 100
-  }
-
   /**
    * Track orchestration performance metrics
    */
-  private async trackOrchestrationMetrics({
-    sessionId,
-    requestId,
+  private trackOrchestrationMetrics({
+    session,
     totalTime,
     success,
     tasksCompleted,
     confidence,
   }: {
-    sessionId: string
-    requestId: string
+    session: OrchestrationSession
     totalTime: number
     success: boolean
     tasksCompleted: number
     confidence: number
-  }): Promise<void> {
+  }): void {
     try {
       const collector = getMetricsCollector()
-      const tokenUsage = {
-        prompt: this.estimateTokenUsage(),
-        completion: Math.floor(this.estimateTokenUsage() * 0.3), // Estimated completion tokens
-        total: Math.floor(this.estimateTokenUsage() * 1.3),
-      }
-
       const metrics = collector.createMetrics({
         agentType: 'orchestrator',
         executionTime: totalTime,
         confidence,
         success,
-        tokenUsage,
-        requestId,
-        sessionId,
+        tokenUsage: session.getTokenUsage(),
+        requestId: session.requestId,
+        sessionId: session.sessionId,
         tasksCompleted,
       })
 
-      await collector.collectMetrics(metrics)
+      collector.collectMetrics(metrics)
     } catch (error) {
       console.warn('Failed to track orchestration metrics:', error)
     }
@@ -0,0 +1,167 @@
+/**
+ * Partial Itineraries
+ * Builds an itinerary straight from whatever research finished, without
+ * an LLM call, for requests that run out of time or whose assembly fails.
+ * Sections that did not finish are reported to the traveler as warnings.
+ */
+
+import type {
+  AgentContext,
+  AgentType,
+  Itinerary,
+  Recommendation,
+  ResearchOutput,
+  TaskSpecification,
+} from './types'
+
+const MEAL_SLOTS = ['breakfast', 'lunch', 'dinner']
+const ACTIVITY_SLOTS = ['10:00 AM', '2:00 PM', '4:30 PM']
+
+const DEFAULT_DAY_COUNT = 3
+const MAX_DAY_COUNT = 14
+
+// Traveler-facing notes for sections a partial itinerary is missing
+const MISSING_SECTION_WARNINGS: Record<string, string> = {
+  lodging: 'Lodging research did not finish in time, so no stays are listed.',
+  'food-dining':
+    'Dining research did not finish in time, so meals are incomplete.',
+  validation: 'Some recommendations could not be verified in time.',
+  schedule: 'The daily plan was put together from partial results.',
+}
+
+/**
+ * Sections of the itinerary that will be missing or unverified: research
+ * agents that produced nothing and outputs whose validation didn't finish
+ */
+export function findMissingSections(
+  tasks: TaskSpecification[],
+  researchResults: Map<AgentType, ResearchOutput>,
+  unvalidated: AgentType[]
+): string[] {
+  const missing: string[] = tasks
+    .filter(task => !researchResults.has(task.agentType))
+    .map(task => task.agentType)
+
+  if (unvalidated.length > 0) {
+    missing.push('validation')
+  }
+
+  return missing
+}
+
+export function describeMissingSections(missingSections: string[]): string[] {
+  return missingSections.map(
+    section =>
+      MISSING_SECTION_WARNINGS[section] ||
+      `${section} recommendations did not finish in time.`
+  )
+}
+
+/**
+ * Number of days in a duration like "3 days", "1 week" or "a weekend",
+ * between 1 and 14. "week" or "weekend" without a number counts as one;
+ * anything else without a number falls back to the default.
+ */
+export function parseDayCount(duration?: string): number {
+  const text = (duration || '').toLowerCase()
+  const number = text.match(/\d+(\.\d+)?/)
+  const count = number ? parseFloat(number[0]) : undefined
+
+  let days: number
+  if (/weekend/.test(text)) {
+    days = count ?? (/long weekend/.test(text) ? 3 : 2)
+  } else if (/week/.test(text)) {
+    days = (count ?? 1) * 7
+  } else {
+    days = count ?? NaN
+  }
+
+  if (!Number.isFinite(days)) {
+    return DEFAULT_DAY_COUNT
+  }
+  return Math.min(Math.max(Math.round(days), 1), MAX_DAY_COUNT)
+}
+
+/**
+ * Assign dining recommendations to breakfast/lunch/dinner slots, matching
+ * meal types first and then filling gaps with whatever is left
+ */
+export function planMeals(
+  dining: Recommendation[],
+  dayCount: number
+): Recommendation[][] {
+  const unused = [...dining]
+  const take = (slot?: string): Recommendation | undefined => {
+    const index = unused.findIndex(
+      rec =>
+        !slot ||
+        (rec.mealType || []).some(type => type.toLowerCase().includes(slot))
+    )
+    return index >= 0 ? unused.splice(index, 1)[0] : undefined
+  }
+
+  const days = Array.from({ length: dayCount }, () =>
+    MEAL_SLOTS.map(slot => take(slot))
+  )
+
+  return days.map(slots =>
+    slots
+      .map(meal => meal || take())
+      .filter((meal): meal is Recommendation => !!meal)
+  )
+}
+
+/**
+ * Build an itinerary from the research results without an LLM call:
+ * lodging and dining ranked by persona fit, meals slotted by meal type,
+ * and recommendations from other agents spread across the days
+ */
+export function createPartialItinerary(
+  context: AgentContext,
+  results: Map<AgentType, ResearchOutput>,
+  missingSections: string[]
+): Itinerary {
+  const byFit = (recommendations: Recommendation[]) =>
+    [...recommendations].sort(
+      (a, b) => (b.personaFit || 0) - (a.personaFit || 0)
+    )
+
+  const lodging = byFit(results.get('lodging')?.recommendations || [])
+  const dining = byFit(results.get('food-dining')?.recommendations || [])
+  const activities = byFit(
+    Array.from(results.entries())
+      .filter(([type]) => type !== 'lodging' && type !== 'food-dining')
+      .flatMap(([, output]) => output.recommendations)
+  )
+
+  const dayCount = parseDayCount(context.userRequirements.duration)
+  const meals = planMeals(dining, dayCount)
+  const activitiesPerDay = Math.ceil(activities.length / dayCount)
+
+  return {
+    destination: context.destinationCity,
+    duration: context.userRequirements.duration || '3 days',
+    days: Array.from({ length: dayCount }, (_, index) => ({
+      day: index + 1,
+      theme:
+        index === 0
+          ? 'Arrival and Exploration'
+          : index === dayCount - 1
+            ? 'Final Discoveries'
+            : 'Full Day Adventures',
+      activities: activities
+        .slice(index * activitiesPerDay, (index + 1) * activitiesPerDay)
+        .map((activity, slot) => ({
+          time: ACTIVITY_SLOTS[slot % ACTIVITY_SLOTS.length]!,
+          activity,
+          duration: activity.estimatedTime || '2 hours',
+        })),
+      meals: meals[index] || [],
+    })),
+    lodging: lodging.slice(0, 2),
+    personaNotes: `Curated for a ${context.personaProfile.primary} traveler`,
+    warnings: describeMissingSections(missingSections),
+    partial: true,
+    missingSections,
+  }
+}
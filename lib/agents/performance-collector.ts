@@ -8,19 +8,53 @@ import type {
   AgentBenchmark,
   PerformanceAlert,
   AgentPerformanceReport,
+  LLMTokenUsage,
   MetricsCollectionConfig,
   MetricsStorage,
+  ModelRoutingOutcome,
+  ModelRoutingStats,
 } from './performance-metrics'
 import {
   MetricsCalculator,
   DEFAULT_PERFORMANCE_THRESHOLDS,
 } from './performance-metrics'
 
+// Recent successful execution times kept per agent type for percentiles
+const LATENCY_WINDOW_SIZE = 200
+
+// Percentiles from fewer samples than this are too noisy to act on
+const MIN_LATENCY_SAMPLES = 20
+
+// Longest a synchronous response waits on the metrics flush; anything
+// still queued is stored when the instance is next invoked
+export const RESPONSE_FLUSH_TIMEOUT_MS = 200
+
+export interface MetricsQueueStats {
+  queued: number
+  stored: number
+  dropped: number // queue was full
+  failed: number // storage write failed
+}
+
+const emptyRoutingStats = (): ModelRoutingStats => ({
+  calls: 0,
+  escalatedCalls: 0,
+  escalationRate: 0,
+  escalationReasons: {},
+  callsByModel: {},
+  costUsd: 0,
+  savedUsd: 0,
+})
+
 export class AgentPerformanceCollector {
   private config: MetricsCollectionConfig
   private storage: MetricsStorage
-  private metricsBuffer: AgentPerformanceMetrics[] = []
+  private queue: AgentPerformanceMetrics[] = []
+  private draining: Promise<void> | null = null
+  private queueStats = { stored: 0, dropped: 0, failed: 0 }
   private flushTimer?: NodeJS.Timeout | undefined
+  private latencyWindows = new Map<string, number[]>()
+  private routingStats = new Map<string, ModelRoutingStats>()
 
   constructor(
     storage: MetricsStorage,
@@ -32,6 +66,7 @@ export class AgentPerformanceCollector {
       sampleRate: 1.0, // Collect all requests during experimentation phase
       batchSize: 50,
       flushInterval: 10000, // 10 seconds
+      maxQueueSize: 1000,
       retentionPeriod: 30, // 30 days
       alertThresholds: {
         maxExecutionTime: 30000, // 30 seconds default
@@ -41,38 +76,54 @@ export class AgentPerformanceCollector {
       },
       ...config,
     }
-
-    this.startFlushTimer()
   }
 
   /**
-   * Collect performance metrics for an agent execution
+   * Collect performance metrics for an agent execution. Metrics are queued
+   * and stored by a background drainer, so this never waits on alerting or
+   * storage; when the queue is full the metrics are dropped and counted.
    */
-  async collectMetrics(metrics: AgentPerformanceMetrics): Promise<void> {
+  collectMetrics(metrics: AgentPerformanceMetrics): void {
     if (!this.config.enableCollection) {
       return
     }
 
+    // Latency percentiles drive request hedging, so every successful call
+    // is counted even when it is sampled out of storage
+    if (metrics.successRate === 100) {
+      this.recordLatency(metrics.agentType, metrics.executionTime)
+    }
+
     // Sample based on configured rate
     if (Math.random() > this.config.sampleRate) {
       return
     }
 
-    // Add to buffer
-    this.metricsBuffer.push({
+    if (this.queue.length >= this.config.maxQueueSize) {
+      this.queueStats.dropped++
+      return
+    }
+    this.queue.push({
       ...metrics,
       timestamp: new Date(),
     })
 
-    // Check for immediate alerts
-    await this.checkForAlerts(metrics)
-
-    // Flush if buffer is full
-    if (this.metricsBuffer.length >= this.config.batchSize) {
-      await this.flush()
+    // A full batch is drained on the next tick instead of waiting for the
+    // flush timer
+    this.startFlushTimer()
+    if (this.queue.length === this.config.batchSize) {
+      setTimeout(() => this.drain(), 0)
     }
   }
 
+  /**
+   * Queue depth and how many queued metrics were stored, dropped or lost
+   * to storage errors
+   */
+  getQueueStats(): MetricsQueueStats {
+    return { queued: this.queue.length, ...this.queueStats }
+  }
+
   /**
    * Create performance metrics from agent execution data
    */
@@ -90,9 +141,7 @@ export class AgentPerformanceCollector {
     executionTime: number
     confidence: number
     success: boolean
-    tokenUsage?:
-      | { prompt: number; completion: number; total: number }
-      | undefined
+    tokenUsage?: LLMTokenUsage | undefined
     requestId: string
     sessionId: string
     tasksCompleted?: number
@@ -106,6 +155,8 @@ export class AgentPerformanceCollector {
       errorRate: success ? 0 : 100,
       promptTokens: tokenUsage?.prompt ?? 0,
       completionTokens: tokenUsage?.completion ?? 0,
+      cacheReadTokens: tokenUsage?.cacheRead ?? 0,
+      cacheWriteTokens: tokenUsage?.cacheWrite ?? 0,
       averageResponseTime: executionTime,
       agentType,
       tasksCompleted,
@@ -115,6 +166,70 @@ export class AgentPerformanceCollector {
     }
   }
 
+  /**
+   * Execution time at percentile `p` (0-1) over the agent type's recent
+   * successful calls, or null until enough calls have been observed
+   */
+  getLatencyPercentile(agentType: string, p: number): number | null {
+    const window = this.latencyWindows.get(agentType)
+    if (!window || window.length < MIN_LATENCY_SAMPLES) {
+      return null
+    }
+
+    const sorted = [...window].sort((a, b) => a - b)
+    const index = Math.min(
+      sorted.length - 1,
+      Math.max(0, Math.ceil(p * sorted.length) - 1)
+    )
+    return sorted[index]!
+  }
+
+  /**
+   * Record how a cascaded LLM call was routed
+   */
+  recordRouting(agentType: string, outcome: ModelRoutingOutcome): void {
+    const stats = this.routingStats.get(agentType) || emptyRoutingStats()
+    stats.calls++
+    if (outcome.escalations.length > 0) {
+      stats.escalatedCalls++
+    }
+    for (const { reason } of outcome.escalations) {
+      stats.escalationReasons[reason] =
+        (stats.escalationReasons[reason] || 0) + 1
+    }
+    stats.callsByModel[outcome.model] =
+      (stats.callsByModel[outcome.model] || 0) + 1
+    stats.costUsd += outcome.costUsd
+    stats.savedUsd += outcome.baselineCostUsd - outcome.costUsd
+    stats.escalationRate = stats.escalatedCalls / stats.calls
+    this.routingStats.set(agentType, stats)
+  }
+
+  /**
+   * Model routing totals for an agent type, or across all agents
+   */
+  getRoutingStats(agentType?: string): ModelRoutingStats {
+    const total = emptyRoutingStats()
+    for (const [type, stats] of this.routingStats) {
+      if (agentType && type !== agentType) {
+        continue
+      }
+      total.calls += stats.calls
+      total.escalatedCalls += stats.escalatedCalls
+      total.costUsd += stats.costUsd
+      total.savedUsd += stats.savedUsd
+      for (const [reason, count] of Object.entries(stats.escalationReasons)) {
+        total.escalationReasons[reason] =
+          (total.escalationReasons[reason] || 0) + count
+      }
+      for (const [model, count] of Object.entries(stats.callsByModel)) {
+        total.callsByModel[model] = (total.callsByModel[model] || 0) + count
+      }
+    }
+    total.escalationRate = total.calls ? total.escalatedCalls / total.calls : 0
+    return total
+  }
+
   /**
    * Get benchmark data for an agent type
    */
@@ -155,6 +270,15 @@ export class AgentPerformanceCollector {
     this.config = { ...this.config, ...config }
   }
 
+  private recordLatency(agentType: string, executionTime: number): void {
+    const window = this.latencyWindows.get(agentType) || []
+    window.push(executionTime)
+    if (window.length > LATENCY_WINDOW_SIZE) {
+      window.shift()
+    }
+    this.latencyWindows.set(agentType, window)
+  }
+
   /**
    * Check for performance alerts
    */
@@ -252,50 +376,76 @@ export class AgentPerformanceCollector {
   }
 
   /**
-   * Flush buffered metrics to storage
+   * Check alerts for and store queued metrics until the queue is empty.
+   * Only one drain runs at a time; concurrent callers share it.
    */
-  private async flush(): Promise<void> {
-    if (this.metricsBuffer.length === 0) {
-      return
+  private drain(): Promise<void> {
+    if (!this.draining) {
+      this.draining = this.drainQueue().finally(() => {
+        this.draining = null
+      })
     }
+    return this.draining
+  }
 
-    try {
-      // Store each metric
-      for (const metric of this.metricsBuffer) {
-        await this.storage.store(metric)
+  private async drainQueue(): Promise<void> {
+    while (this.queue.length > 0) {
+      const batch = this.queue.splice(0, this.config.batchSize)
+      for (const metric of batch) {
+        try {
+          await this.checkForAlerts(metric)
+          await this.storage.store(metric)
+          this.queueStats.stored++
+        } catch (error) {
+          // Not retried: a failing backend would otherwise fill the queue
+          this.queueStats.failed++
+          console.error('Failed to store metrics:', error)
+        }
       }
-
-      // Clear buffer
-      this.metricsBuffer = []
-    } catch (error) {
-      console.error('Failed to flush metrics:', error)
-      // Keep metrics in buffer for retry
     }
   }
 
   /**
-   * Start the flush timer
+   * Start the flush timer, if it is not running. The timer does not keep
+   * the process alive; call flushOnShutdown before exiting.
    */
   private startFlushTimer(): void {
     if (this.flushTimer) {
-      clearInterval(this.flushTimer)
+      return
     }
 
     this.flushTimer = setInterval(() => {
-      this.flush().catch(console.error)
+      this.drain().catch(console.error)
     }, this.config.flushInterval)
+    this.flushTimer.unref?.()
   }
 
   /**
-   * Stop collecting metrics and flush remaining data
+   * Stop the flush timer and store everything still queued. Metrics
+   * collected afterwards restart the timer, so a reused serverless
+   * instance keeps working. With `timeoutMs`, stops waiting after that
+   * long and leaves the flush running in the background.
    */
-  async shutdown(): Promise<void> {
+  async flushOnShutdown(timeoutMs?: number): Promise<void> {
     if (this.flushTimer) {
       clearInterval(this.flushTimer)
       this.flushTimer = undefined
     }
 
-    await this.flush()
+    const flush = (async () => {
+      while (this.queue.length > 0 || this.draining) {
+        await this.drain()
+      }
+    })()
+    if (timeoutMs === undefined) {
+      return flush
+    }
+
+    let timer: ReturnType<typeof setTimeout> | undefined
+    const timeout = new Promise<void>(resolve => {
+      timer = setTimeout(resolve, timeoutMs)
+    })
+    await Promise.race([flush, timeout]).finally(() => clearTimeout(timer))
   }
 }
 
@@ -398,6 +548,14 @@ export class MemoryMetricsStorage implements MetricsStorage {
           (sum, m) => sum + (m.totalTokensUsed || 0),
           0
         ),
+        cacheReadTokens: agentMetrics.reduce(
+          (sum, m) => sum + (m.cacheReadTokens || 0),
+          0
+        ),
+        cacheWriteTokens: agentMetrics.reduce(
+          (sum, m) => sum + (m.cacheWriteTokens || 0),
+          0
+        ),
       },
       trends: {
         executionTimeHistory: agentMetrics.map(m => ({
@@ -488,6 +646,17 @@ export function getMetricsCollector(): AgentPerformanceCollector {
   return globalCollector
 }
 
+/**
+ * Store the global collector's queued metrics; call before a function or
+ * process exits. Handlers that respond synchronously pass a timeout so a
+ * slow metrics backend can't hold up the response.
+ */
+export async function flushMetricsOnShutdown(
+  timeoutMs?: number
+): Promise<void> {
+  await globalCollector?.flushOnShutdown(timeoutMs)
+}
+
 export function initializeMetricsCollector(
   storage: MetricsStorage,
   config?: Partial<MetricsCollectionConfig>
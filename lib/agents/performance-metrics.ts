@@ -17,6 +17,8 @@ export interface AgentPerformanceMetrics {
   // LLM-Specific Metrics
   promptTokens: number
   completionTokens: number
+  cacheReadTokens: number // prompt tokens served from the prompt cache
+  cacheWriteTokens: number // prompt tokens written to the prompt cache
   averageResponseTime: number // milliseconds
 
   // Agent-Specific Metrics
@@ -30,6 +32,34 @@ export interface AgentPerformanceMetrics {
   requestId: string
 }
 
+// Token usage of one LLM call, as reported by the provider
+export interface LLMTokenUsage {
+  prompt: number // uncached prompt tokens
+  completion: number
+  total: number
+  cacheRead?: number | undefined
+  cacheWrite?: number | undefined
+}
+
+// How one cascaded LLM call was routed (see model-router)
+export interface ModelRoutingOutcome {
+  model: string // model whose output was used
+  attempts: number
+  escalations: { from: string; reason: 'schema' | 'confidence' }[]
+  costUsd: number // every attempt
+  baselineCostUsd: number // the final call's tokens on the top model
+}
+
+export interface ModelRoutingStats {
+  calls: number
+  escalatedCalls: number
+  escalationRate: number // 0-1
+  escalationReasons: Record<string, number>
+  callsByModel: Record<string, number>
+  costUsd: number
+  savedUsd: number // against always calling the top model
+}
+
 export interface AgentBenchmark {
   agentType: string
   period: 'hour' | 'day' | 'week' | 'month'
@@ -82,6 +112,8 @@ export interface AgentPerformanceReport {
     averageConfidence: number
     successRate: number
     totalTokensUsed: number
+    cacheReadTokens: number
+    cacheWriteTokens: number
     estimatedCost?: number
   }
   trends: {
@@ -98,6 +130,7 @@ export interface MetricsCollectionConfig {
   sampleRate: number // 0-1, percentage of requests to collect metrics for
   batchSize: number
   flushInterval: number // milliseconds
+  maxQueueSize: number // metrics beyond this are dropped
   retentionPeriod: number // days
   alertThresholds: {
     maxExecutionTime: number // milliseconds
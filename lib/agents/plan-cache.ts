@@ -0,0 +1,214 @@
+/**
+ * Research Plan Cache
+ * Caches Concierge research plans by trip shape so repeated requests for
+ * the same persona, destination, budget and constraints skip planning
+ */
+
+import { LRUCache } from '@/lib/cache'
+import { getServerEnv } from '@/lib/config/env'
+
+import type { AgentContext, AgentType, TaskSpecification } from './types'
+
+// A plan is stored without task ids; ids are assigned per request
+export type ResearchPlan = Omit<TaskSpecification, 'taskId'>[]
+
+const TASK_PRIORITIES: TaskSpecification['priority'][] = [
+  'high',
+  'medium',
+  'low',
+]
+
+const PLAN_CACHE_MAX_ENTRIES = 500
+const PLAN_CACHE_TTL_MS = 6 * 60 * 60 * 1000 // 6 hours
+
+const normalizeText = (value?: string): string =>
+  (value || '').trim().toLowerCase().replace(/\s+/g, ' ')
+
+const normalizeList = (values?: string[]): string =>
+  (values || []).map(normalizeText).filter(Boolean).sort().join(',')
+
+/**
+ * Build a cache key from the parts of the context that shape the plan.
+ * Lists are sorted and text is case/whitespace normalized so equivalent
+ * requests share an entry.
+ */
+export function getPlanCacheKey(context: AgentContext): string {
+  const { personaProfile, constraints, userRequirements } = context
+
+  return [
+    normalizeText(context.destinationCity),
+    normalizeText(userRequirements.duration || '3 days'),
+    personaProfile.primary,
+    normalizeList(personaProfile.interests),
+    personaProfile.travelStyle,
+    personaProfile.activityLevel,
+    normalizeText(personaProfile.specialContext),
+    constraints.budget || 'moderate',
+    normalizeList(constraints.dietary),
+    normalizeList(constraints.accessibility),
+    normalizeList(constraints.mustAvoid),
+    normalizeList(constraints.mustInclude),
+  ].join('|')
+}
+
+// True when `to` can be reached from `from` along accepted dependency edges
+function dependsTransitively(
+  edges: Map<AgentType, Set<AgentType>>,
+  from: AgentType,
+  to: AgentType
+): boolean {
+  const visited = new Set<AgentType>()
+  const stack = [from]
+
+  while (stack.length > 0) {
+    const current = stack.pop()!
+    if (current === to) {
+      return true
+    }
+    if (visited.has(current)) {
+      continue
+    }
+    visited.add(current)
+    stack.push(...(edges.get(current) || []))
+  }
+
+  return false
+}
+
+/**
+ * Turn an LLM-supplied task list into a runnable plan: drop malformed
+ * tasks, fill in defaults, keep only dependencies on other agent types in
+ * the same plan, and drop any dependency that would close a cycle so the
+ * scheduler always receives a DAG. Earlier tasks win when edges conflict.
+ */
+export function normalizePlan(
+  tasks: Partial<TaskSpecification>[]
+): ResearchPlan {
+  if (!Array.isArray(tasks)) {
+    return []
+  }
+
+  const valid = tasks.filter(
+    task =>
+      typeof task?.agentType === 'string' &&
+      typeof task.description === 'string'
+  )
+  const planned = new Set(valid.map(task => task.agentType as AgentType))
+  const edges = new Map<AgentType, Set<AgentType>>()
+
+  return valid.map(task => {
+    const agentType = task.agentType as AgentType
+    const dependsOn: AgentType[] = []
+
+    const requested = Array.isArray(task.dependsOn) ? task.dependsOn : []
+
+    for (const dependency of requested) {
+      if (
+        dependency === agentType ||
+        !planned.has(dependency) ||
+        dependsOn.includes(dependency) ||
+        dependsTransitively(edges, dependency, agentType)
+      ) {
+        continue
+      }
+
+      dependsOn.push(dependency)
+      edges.set(
+        agentType,
+        (edges.get(agentType) || new Set()).add(dependency)
+      )
+    }
+
+    return {
+      agentType,
+      priority: TASK_PRIORITIES.includes(task.priority!)
+        ? task.priority!
+        : 'medium',
+      description: task.description!,
+      constraints: Array.isArray(task.constraints)
+        ? task.constraints.filter(c => typeof c === 'string')
+        : [],
+      expectedOutput: task.expectedOutput || 'Research recommendations',
+      dependsOn,
+    }
+  })
+}
+
+/**
+ * A plan is cacheable when it has tasks, every dependency names another
+ * agent type in the plan, and the dependencies form no cycle
+ */
+export function isValidPlan(plan: ResearchPlan): boolean {
+  if (!Array.isArray(plan) || plan.length === 0) {
+    return false
+  }
+
+  const planned = new Set(plan.map(task => task.agentType))
+  const edges = new Map<AgentType, Set<AgentType>>()
+
+  for (const task of plan) {
+    for (const dependency of task.dependsOn || []) {
+      if (
+        !planned.has(dependency) ||
+        dependsTransitively(edges, dependency, task.agentType)
+      ) {
+        return false
+      }
+      edges.set(
+        task.agentType,
+        (edges.get(task.agentType) || new Set()).add(dependency)
+      )
+    }
+  }
+
+  return true
+}
+
+export class PlanCache {
+  private cache: LRUCache<string, ResearchPlan>
+
+  constructor(
+    maxEntries = PLAN_CACHE_MAX_ENTRIES,
+    ttlMs = PLAN_CACHE_TTL_MS
+  ) {
+    this.cache = new LRUCache({ maxEntries, ttlMs })
+  }
+
+  get(context: AgentContext): ResearchPlan | undefined {
+    return this.cache.get(getPlanCacheKey(context))
+  }
+
+  /**
+   * Store a plan for this trip shape. Invalid plans are never cached, so a
+   * bad LLM response can't be replayed to every matching request.
+   */
+  set(context: AgentContext, plan: ResearchPlan): boolean {
+    if (!isValidPlan(plan)) {
+      return false
+    }
+    this.cache.set(getPlanCacheKey(context), plan)
+    return true
+  }
+
+  clear(): void {
+    this.cache.clear()
+  }
+
+  get size(): number {
+    return this.cache.size
+  }
+}
+
+// Global plan cache instance, shared by every Concierge in the process
+let globalPlanCache: PlanCache | null = null
+
+export function getPlanCache(): PlanCache {
+  if (!globalPlanCache) {
+    const ttlSeconds = getServerEnv().PLAN_CACHE_TTL_SECONDS
+    globalPlanCache = new PlanCache(
+      PLAN_CACHE_MAX_ENTRIES,
+      ttlSeconds === undefined ? PLAN_CACHE_TTL_MS : ttlSeconds * 1000
+    )
+  }
+  return globalPlanCache
+}
@@ -11,6 +11,7 @@ import type {
   TaskSpecification,
   Recommendation,
   QualityValidation,
+  ResearchOutput,
 } from './types'
 
 export class QualityValidatorAgent extends BaseAgent {
@@ -32,14 +33,35 @@ export class QualityValidatorAgent extends BaseAgent {
   async execute(
     _task: TaskSpecification,
     context: AgentContext
+  ): Promise<AgentResponse<QualityValidation[]>> {
+    // Extract all recommendations from previous findings
+    return this.runValidation(
+      this.extractRecommendations(context.previousFindings),
+      context
+    )
+  }
+
+  /**
+   * Validate a single research agent's output as soon as it lands,
+   * without waiting for the other research agents
+   */
+  async validateOutput(
+    output: ResearchOutput,
+    context: AgentContext
+  ): Promise<AgentResponse<QualityValidation[]>> {
+    return this.runValidation(
+      this.extractRecommendations(new Map([[output.agentType, output]])),
+      context
+    )
+  }
+
+  private async runValidation(
+    allRecommendations: Recommendation[],
+    context: AgentContext
   ): Promise<AgentResponse<QualityValidation[]>> {
     const startTime = Date.now()
 
     try {
-      // Extract all recommendations from previous findings
-      const allRecommendations = this.extractRecommendations(
-        context.previousFindings
-      )
       this.log(`Validating ${allRecommendations.length} recommendations`)
 
       // Validate each recommendation
@@ -84,6 +106,25 @@ Your task is to:
 Focus on factual accuracy and current status.`
   }
 
+  // Static validation instructions, identical for every recommendation
+  protected getSystemPrompt(): string {
+    return `${super.getSystemPrompt()}
+
+Validate this travel recommendation for the destination given. Based on your knowledge, assess:
+1. Does this place likely exist?
+2. Is the location/neighborhood accurate?
+3. Are there any concerns or issues?
+4. If problematic, what's a good alternative?
+
+Return JSON:
+{
+  "status": "verified|probable|unverified|not_found",
+  "confidence": 0.0-1.0,
+  "issues": ["any problems found"],
+  "alternatives": [{"name": "...", "reason": "..."}]
+}`
+  }
+
   private extractRecommendations(
     previousFindings: Map<string, any>
   ): Recommendation[] {
@@ -145,29 +186,19 @@ Focus on factual accuracy and current status.`
     issues?: string[]
     alternatives?: Recommendation[]
   }> {
-    const prompt = `Validate this travel recommendation for ${context.destinationCity}:
-
-Name: ${recommendation.name}
+    // Only the recommendation itself varies between the many validation
+    // calls; instructions and destination are cached prefixes
+    const prompt = `Name: ${recommendation.name}
 Category: ${recommendation.category}
 Address: ${recommendation.address || 'Not provided'}
-Neighborhood: ${recommendation.neighborhood || 'Not specified'}
-
-Based on your knowledge, assess:
-1. Does this place likely exist?
-2. Is the location/neighborhood accurate?
-3. Are there any concerns or issues?
-4. If problematic, what's a good alternative?
-
-Return JSON:
-{
-  "status": "verified|probable|unverified|not_found",
-  "confidence": 0.0-1.0,
-  "issues": ["any problems found"],
-  "alternatives": [{"name": "...", "reason": "..."}]
-}`
+Neighborhood: ${recommendation.neighborhood || 'Not specified'}`
 
     try {
-      const response = await this.callLLM(prompt)
+      const response = await this.callLLM(prompt, undefined, {
+        context,
+        phase: 'validation',
+        promptContext: `Destination: ${context.destinationCity}`,
+      })
       const parsed = this.parseJSONResponse<any>(response)
 
       return {
@@ -0,0 +1,82 @@
+/**
+ * Research Cache
+ * Shares research agents' LLM results across travelers. Restaurant and
+ * hotel lists for a destination barely change day to day, so results are
+ * keyed by destination, persona, budget and dietary needs, plus the model
+ * and prompt version so a prompt change never serves old entries.
+ */
+
+import {
+  MemoryCacheBackend,
+  PostgresCacheBackend,
+  SWRCache,
+  TieredCacheBackend,
+  type CacheBackend,
+} from '@/lib/cache'
+import { getServerEnv } from '@/lib/config/env'
+
+import type { AgentContext, AgentType, Recommendation } from './types'
+
+// Parsed LLM output, before any per-request adjustments
+export interface ResearchPayload {
+  recommendations: Recommendation[]
+  reasoning: string
+}
+
+export interface CachedResearch extends ResearchPayload {
+  model: string
+  promptVersion: string
+}
+
+const DEFAULT_TTL_SECONDS = 24 * 60 * 60
+const MEMORY_MAX_ENTRIES = 500
+
+const normalize = (value?: string) => (value || '').trim().toLowerCase()
+
+const normalizeList = (values?: string[]) =>
+  Array.from(new Set((values || []).map(normalize)))
+    .filter(Boolean)
+    .sort()
+    .join(',')
+
+export function getResearchCacheKey(
+  agentType: AgentType,
+  context: AgentContext,
+  model: string,
+  promptVersion: string
+): string {
+  return [
+    agentType,
+    model,
+    promptVersion,
+    normalize(context.destinationCity),
+    context.personaProfile.primary,
+    context.constraints.budget || 'moderate',
+    normalizeList(context.constraints.dietary),
+  ].join('|')
+}
+
+let globalResearchCache: SWRCache<CachedResearch> | null = null
+
+/**
+ * Research cache shared by every agent in the process. Entries live in
+ * memory and, with RESEARCH_CACHE_BACKEND=postgres, in response_cache too.
+ */
+export function getResearchCache(): SWRCache<CachedResearch> {
+  if (!globalResearchCache) {
+    const env = getServerEnv()
+    const memory = new MemoryCacheBackend<CachedResearch>(MEMORY_MAX_ENTRIES)
+    const backend: CacheBackend<CachedResearch> =
+      env.RESEARCH_CACHE_BACKEND === 'postgres'
+        ? new TieredCacheBackend(memory, new PostgresCacheBackend('research'))
+        : memory
+
+    // No stale window: a stale entry would be refreshed in the background
+    // with the LLM call of a request that has already finished
+    globalResearchCache = new SWRCache(backend, {
+      ttlMs: (env.RESEARCH_CACHE_TTL_SECONDS ?? DEFAULT_TTL_SECONDS) * 1000,
+      staleTtlMs: 0,
+    })
+  }
+  return globalResearchCache
+}
@@ -0,0 +1,53 @@
+/**
+ * Research Groups
+ * Batched itinerary requests that would produce the same destination
+ * research share one research run. Requests are grouped by destination,
+ * budget and dietary needs; everything else only affects assembly.
+ */
+
+import type { TTravelRequirements } from './types'
+
+export interface ResearchGroup {
+  key: string
+  // Positions of the group's requests in the original batch
+  indices: number[]
+}
+
+const normalize = (value: string) => value.trim().toLowerCase()
+
+/**
+ * Key identifying the research a request needs
+ */
+export function getResearchGroupKey(requirements: TTravelRequirements): string {
+  const { destination, budget, dietary } = requirements as any
+  const dietaryNeeds: string[] = Array.isArray(dietary)
+    ? Array.from(new Set<string>(dietary.map(normalize))).sort()
+    : []
+
+  return [
+    normalize(destination || 'Pittsburgh, PA'),
+    budget || 'moderate',
+    dietaryNeeds.join(','),
+  ].join('|')
+}
+
+/**
+ * Group requests that can share research, in order of first appearance
+ */
+export function groupByResearchKey(
+  requirementsList: TTravelRequirements[]
+): ResearchGroup[] {
+  const groups = new Map<string, ResearchGroup>()
+
+  requirementsList.forEach((requirements, index) => {
+    const key = getResearchGroupKey(requirements)
+    const group = groups.get(key)
+    if (group) {
+      group.indices.push(index)
+    } else {
+      groups.set(key, { key, indices: [index] })
+    }
+  })
+
+  return Array.from(groups.values())
+}
@@ -0,0 +1,228 @@
+/**
+ * Task Scheduler
+ * Dependency-aware, priority-ordered scheduler for research tasks with
+ * per-resource (per-model) concurrency limits
+ */
+
+import type { TaskSpecification } from './types'
+
+export type TaskPriority = TaskSpecification['priority']
+
+export interface ScheduledTask<T> {
+  id: string
+  priority: TaskPriority
+  dependsOn?: string[] | undefined // ids of tasks that must settle first
+  resourceKey?: string | undefined // concurrency bucket, e.g. the LLM model
+  run: () => Promise<T>
+}
+
+export type TaskOutcome<T> =
+  | { status: 'fulfilled'; value: T }
+  | { status: 'rejected'; reason: unknown }
+
+export interface TaskSchedulerConfig {
+  concurrencyLimits: Record<string, number>
+  defaultConcurrency: number
+}
+
+// Conservative caps that keep fan-out under Anthropic rate limits
+export const DEFAULT_MODEL_CONCURRENCY: Record<string, number> = {
+  'claude-3-haiku-20240307': 8,
+  'claude-3-sonnet-20240229': 4,
+  'claude-3-5-sonnet-20241022': 4,
+}
+
+const PRIORITY_ORDER: Record<TaskPriority, number> = {
+  high: 0,
+  medium: 1,
+  low: 2,
+}
+
+interface ReadyEntry {
+  priority: number
+  sequence: number
+  resourceKey: string
+  start: () => void
+}
+
+export class TaskScheduler {
+  private config: TaskSchedulerConfig
+  private active = new Map<string, number>()
+  private ready: ReadyEntry[] = []
+  private sequence = 0
+
+  constructor(config?: Partial<TaskSchedulerConfig>) {
+    this.config = {
+      concurrencyLimits: DEFAULT_MODEL_CONCURRENCY,
+      defaultConcurrency: 4,
+      ...config,
+    }
+  }
+
+  /**
+   * Run a graph of tasks. Each task starts as soon as all of its
+   * dependencies have settled and a slot for its resource is free.
+   * A failed dependency does not block its dependents; they run with
+   * whatever inputs are available.
+   */
+  async run<T>(
+    tasks: ScheduledTask<T>[],
+    onSettled?: (task: ScheduledTask<T>, outcome: TaskOutcome<T>) => void
+  ): Promise<Map<string, TaskOutcome<T>>> {
+    const outcomes = new Map<string, TaskOutcome<T>>()
+    if (tasks.length === 0) {
+      return outcomes
+    }
+
+    this.assertUniqueIds(tasks)
+
+    const byId = new Map(tasks.map(task => [task.id, task]))
+    const dependencies = new Map<string, Set<string>>()
+    const dependents = new Map<string, string[]>()
+
+    for (const task of tasks) {
+      const deps = new Set<string>()
+      for (const dep of task.dependsOn || []) {
+        if (!byId.has(dep)) {
+          console.warn(`Task ${task.id} depends on unknown task ${dep}`)
+          continue
+        }
+        deps.add(dep)
+        dependents.set(dep, [...(dependents.get(dep) || []), task.id])
+      }
+      dependencies.set(task.id, deps)
+    }
+
+    this.assertAcyclic(tasks, dependencies)
+
+    return new Promise(resolve => {
+      const settle = (task: ScheduledTask<T>, outcome: TaskOutcome<T>) => {
+        outcomes.set(task.id, outcome)
+
+        try {
+          onSettled?.(task, outcome)
+        } catch (error) {
+          console.warn(`Task settle handler failed for ${task.id}:`, error)
+        }
+
+        for (const dependentId of dependents.get(task.id) || []) {
+          const remaining = dependencies.get(dependentId)
+          remaining?.delete(task.id)
+          if (remaining && remaining.size === 0) {
+            enqueue(byId.get(dependentId)!)
+          }
+        }
+
+        if (outcomes.size === tasks.length) {
+          resolve(outcomes)
+        }
+      }
+
+      const enqueue = (task: ScheduledTask<T>) => {
+        const resourceKey = task.resourceKey || 'default'
+        this.ready.push({
+          priority: PRIORITY_ORDER[task.priority] ?? PRIORITY_ORDER.medium,
+          sequence: this.sequence++,
+          resourceKey,
+          start: () => {
+            Promise.resolve()
+              .then(() => task.run())
+              .then(
+                value => ({ status: 'fulfilled' as const, value }),
+                reason => ({ status: 'rejected' as const, reason })
+              )
+              .then(outcome => {
+                // Settle first so newly unblocked dependents are queued
+                // before the freed slot is handed out
+                settle(task, outcome)
+                this.release(resourceKey)
+              })
+          },
+        })
+      }
+
+      tasks
+        .filter(task => dependencies.get(task.id)?.size === 0)
+        .forEach(enqueue)
+
+      this.pump()
+    })
+  }
+
+  /**
+   * Number of tasks currently running for a resource
+   */
+  getActiveCount(resourceKey: string): number {
+    return this.active.get(resourceKey) || 0
+  }
+
+  private limitFor(resourceKey: string): number {
+    return (
+      this.config.concurrencyLimits[resourceKey] ??
+      this.config.defaultConcurrency
+    )
+  }
+
+  private release(resourceKey: string): void {
+    this.active.set(
+      resourceKey,
+      Math.max(0, this.getActiveCount(resourceKey) - 1)
+    )
+    this.pump()
+  }
+
+  // Start every ready task that has a free slot, best priority first
+  private pump(): void {
+    this.ready.sort(
+      (a, b) => a.priority - b.priority || a.sequence - b.sequence
+    )
+
+    let index = 0
+    while (index < this.ready.length) {
+      const entry = this.ready[index]!
+      const activeCount = this.getActiveCount(entry.resourceKey)
+      if (activeCount < this.limitFor(entry.resourceKey)) {
+        this.ready.splice(index, 1)
+        this.active.set(entry.resourceKey, activeCount + 1)
+        entry.start()
+      } else {
+        index++
+      }
+    }
+  }
+
+  // A repeated id would shadow a task in the lookups, leaving its
+  // dependents waiting on a completion that never comes
+  private assertUniqueIds<T>(tasks: ScheduledTask<T>[]): void {
+    const seen = new Set<string>()
+    for (const task of tasks) {
+      if (seen.has(task.id)) {
+        throw new Error(`Duplicate task id ${task.id}`)
+      }
+      seen.add(task.id)
+    }
+  }
+
+  private assertAcyclic<T>(
+    tasks: ScheduledTask<T>[],
+    dependencies: Map<string, Set<string>>
+  ): void {
+    const visiting = new Set<string>()
+    const visited = new Set<string>()
+
+    const visit = (id: string) => {
+      if (visited.has(id)) {
+        return
+      }
+      if (visiting.has(id)) {
+        throw new Error(`Task dependency cycle detected at ${id}`)
+      }
+      visiting.add(id)
+      dependencies.get(id)?.forEach(visit)
+      visiting.delete(id)
+      visited.add(id)
+    }
+
+    tasks.forEach(task => visit(task.id))
+  }
+}
@@ -59,7 +59,10 @@ async function testMetricsCollection(): Promise<void> {
   })
 
   // Collect metrics
-  await collector.collectMetrics(testMetrics)
+  collector.collectMetrics(testMetrics)
+
+  // Metrics are stored by the background drainer
+  await collector.flushOnShutdown()
 
   // Verify storage
   const benchmark = await collector.getBenchmark('test-agent', 'day')
@@ -100,7 +103,7 @@ async function testPerformanceAlerts(): Promise<void> {
   const collector = new AgentPerformanceCollector(storage, config)
 
   // Test slow execution alert
-  await collector.collectMetrics(
+  collector.collectMetrics(
     collector.createMetrics({
       agentType: 'slow-agent',
       executionTime: 15000, // Exceeds threshold
@@ -112,7 +115,7 @@ async function testPerformanceAlerts(): Promise<void> {
   )
 
   // Test low confidence alert
-  await collector.collectMetrics(
+  collector.collectMetrics(
     collector.createMetrics({
       agentType: 'uncertain-agent',
       executionTime: 5000,
@@ -124,7 +127,7 @@ async function testPerformanceAlerts(): Promise<void> {
   )
 
   // Test high token usage alert
-  await collector.collectMetrics(
+  collector.collectMetrics(
     collector.createMetrics({
       agentType: 'verbose-agent',
       executionTime: 8000,
@@ -136,6 +139,8 @@ async function testPerformanceAlerts(): Promise<void> {
     })
   )
 
+  await collector.flushOnShutdown()
+
   console.log(
     '  ✓ Performance alerts generated correctly (check console warnings)'
   )
@@ -166,9 +171,11 @@ async function testBenchmarkingAndReporting(): Promise<void> {
       sessionId: 'benchmark_session',
     })
 
-    await collector.collectMetrics(metrics)
+    collector.collectMetrics(metrics)
   }
 
+  await collector.flushOnShutdown()
+
   // Test benchmark retrieval
   const benchmark = await collector.getBenchmark('benchmark-agent', 'day')
   if (!benchmark) {
@@ -261,7 +268,7 @@ async function testDashboardDataPreparation(): Promise<void> {
 
   for (const agentType of agentTypes) {
     for (let i = 0; i < 5; i++) {
-      await collector.collectMetrics(
+      collector.collectMetrics(
         collector.createMetrics({
           agentType,
           executionTime: 2000 + Math.random() * 8000,
@@ -279,6 +286,8 @@ async function testDashboardDataPreparation(): Promise<void> {
     }
   }
 
+  await collector.flushOnShutdown()
+
   // Verify all agent benchmarks are available
   for (const agentType of agentTypes) {
     const benchmark = await collector.getBenchmark(agentType, 'day')
@@ -3,6 +3,10 @@
  * Core interfaces and types for agent orchestration
  */
 
+import type { AdmissionPriority, Deadline } from '@/lib/resilience'
+
+import type { OrchestrationSession } from './orchestration-session'
+
 // Travel Requirements type - matches the actual schema
 export interface TTravelRequirements {
   originCity: string
@@ -79,8 +83,21 @@ export interface AgentContext {
   constraints: TravelConstraints
   previousFindings: Map<AgentType, ResearchOutput>
   conversationHistory?: string[]
+  session?: OrchestrationSession // request-scoped state, set by orchestrator
+  deadline?: Deadline // current stage's deadline; LLM calls abort with it
+  // Receives research recommendations as they stream in, before the agent
+  // has finished (set by the orchestrator during the research phase)
+  onRecommendation?: RecommendationListener | undefined
 }
 
+// A recommendation parsed mid-stream: raw model output, not yet
+// normalized by its agent or validated
+export type RecommendationListener = (
+  agentType: AgentType,
+  recommendation: Partial<Recommendation>,
+  index: number
+) => void
+
 // Task specification from Concierge to Research Agents
 export interface TaskSpecification {
   taskId: string
@@ -90,6 +107,7 @@ export interface TaskSpecification {
   constraints: string[]
   expectedOutput: string
   timeout?: number // milliseconds
+  dependsOn?: AgentType[] // agents whose findings this task builds on
 }
 
 // Research Output from Research Agents
@@ -185,6 +203,8 @@ export interface Itinerary {
   totalEstimatedCost?: string
   personaNotes: string
   warnings?: string[]
+  partial?: boolean // assembled without some research, validation or LLM pass
+  missingSections?: string[]
 }
 
 export interface ItineraryDay {
@@ -221,6 +241,7 @@ export interface AgentResponse<T = any> {
   missingComponents?: string[]
   fallbackReason?: string
   suggestions?: string[]
+  cached?: boolean // served from the research cache without an LLM call
 }
 
 // Agent Configuration
@@ -228,12 +249,39 @@ export interface AgentConfig {
   type: AgentType
   name: string
   description: string
-  model?: string // LLM model to use
+  model?: string // LLM model to use (the top of the cascade, if any)
+  // Minimum confidence (0-1) for a cheaper model's output. Set to route
+  // calls through the model cascade (see BaseAgent.callLLMCascade).
+  qualityTarget?: number
   temperature?: number
   maxTokens?: number
   timeout?: number
   retryAttempts?: number
   tools?: string[] // Available tools/APIs
+  promptVersion?: string // bump on prompt changes to invalidate cached research
+}
+
+// Per-call overrides for an agent's configured LLM settings
+export interface LLMCallOptions {
+  context?: AgentContext // usage is recorded on its session, if any
+  phase?: OrchestrationPhase // phase the call is attributed to in the ledger
+  signal?: AbortSignal // overrides the context deadline's signal
+  model?: string
+  maxTokens?: number
+  temperature?: number
+  hedge?: boolean // false opts this call out of request hedging
+  hedgeModel?: string // model for the duplicate request, if different
+  // Queue position when rate limited; validation defaults to background
+  priority?: AdmissionPriority | undefined
+  // Persona and destination context shared across calls, sent as a cached
+  // block ahead of the prompt (see BaseAgent.buildPromptContext)
+  promptContext?: string | undefined
+  // Streams the response and is called with each `recommendations[]`
+  // element as soon as it is complete. A hedged call forwards elements
+  // from one of its attempts only.
+  onRecommendation?:
+    | ((recommendation: unknown, index: number) => void)
+    | undefined
 }
 
 // Orchestration Result
@@ -244,9 +292,92 @@ export interface OrchestrationResult {
   validationReport?: QualityValidation[]
   conversationLog?: AgentMessage[]
   totalExecutionTime: number
+  partial?: boolean
+  missingSections?: string[]
+  // Requests that shared this result's research (and its costs) in a batch
+  batchSize?: number
   costs?: {
     llmTokens: number
     apiCalls: number
-    estimatedCost: number
+    estimatedCost: number // USD, from actual token usage
+    inputTokens?: number
+    outputTokens?: number
+    cacheReadTokens?: number
+    cacheWriteTokens?: number
+    byAgent?: Record<string, CostBreakdown>
+    byPhase?: Record<string, CostBreakdown>
+    budgetUsd?: number | undefined
+    downgradedCalls?: number // calls moved to a cheaper model by the budget
+    trimmedCalls?: number // calls whose max tokens the budget reduced
   }
 }
+
+// Token usage and spend for one slice of an orchestration
+export interface CostBreakdown {
+  calls: number
+  inputTokens: number // uncached input
+  outputTokens: number
+  cacheReadTokens: number // input served from the prompt cache
+  cacheWriteTokens: number // input written to the prompt cache
+  costUsd: number
+}
+
+// Orchestration phases, in execution order
+export type OrchestrationPhase =
+  | 'planning'
+  | 'research'
+  | 'validation'
+  | 'assembly'
+
+// Events emitted while an itinerary is being generated
+export type OrchestrationEvent =
+  | {
+      type: 'phase'
+      phase: OrchestrationPhase
+      status: 'started' | 'completed'
+      timestamp: number
+    }
+  | {
+      type: 'research'
+      agentType: AgentType
+      output: ResearchOutput
+      timestamp: number
+    }
+  | {
+      // Preliminary: superseded by the agent's 'research' event
+      type: 'recommendation'
+      agentType: AgentType
+      recommendation: Partial<Recommendation>
+      index: number
+      timestamp: number
+    }
+  | {
+      type: 'validation'
+      agentType: AgentType
+      validations: QualityValidation[]
+      timestamp: number
+    }
+  | {
+      type: 'complete'
+      result: OrchestrationResult
+      timestamp: number
+    }
+  | {
+      type: 'error'
+      error: string
+      timestamp: number
+    }
+
+export type OrchestrationEventListener = (event: OrchestrationEvent) => void
+
+// Per-call orchestration options
+export interface OrchestrationOptions {
+  onEvent?: OrchestrationEventListener
+  budgetUsd?: number | undefined // overrides ORCHESTRATION_BUDGET_USD
+  // ai_generation_sessions row to update with totals, or user to create
+  // one; an existing row is only updated when it belongs to userId
+  generationSessionId?: string | undefined
+  userId?: string | undefined
+  deadline?: Deadline | undefined // defaults to the function timeout
+  signal?: AbortSignal | undefined // e.g. client disconnect
+}
@@ -0,0 +1,81 @@
+/**
+ * Unit Tests for the in-memory LRU cache
+ */
+
+import { LRUCache } from '../lru-cache'
+
+describe('LRUCache', () => {
+  afterEach(() => {
+    jest.useRealTimers()
+  })
+
+  it('evicts the least recently used entry past maxEntries', () => {
+    const cache = new LRUCache<string, number>({ maxEntries: 2 })
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    // Reading `a` makes `b` the oldest entry
+    expect(cache.get('a')).toBe(1)
+    cache.set('c', 3)
+
+    expect(cache.get('b')).toBeUndefined()
+    expect(cache.get('a')).toBe(1)
+    expect(cache.get('c')).toBe(3)
+    expect(cache.size).toBe(2)
+  })
+
+  it('refreshes recency when an existing key is overwritten', () => {
+    const cache = new LRUCache<string, number>({ maxEntries: 2 })
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.set('a', 10)
+    cache.set('c', 3)
+
+    expect(cache.get('a')).toBe(10)
+    expect(cache.has('b')).toBe(false)
+  })
+
+  it('expires entries after the default TTL', () => {
+    jest.useFakeTimers()
+    const cache = new LRUCache<string, number>({ maxEntries: 5, ttlMs: 1000 })
+    cache.set('a', 1)
+
+    jest.advanceTimersByTime(999)
+    expect(cache.get('a')).toBe(1)
+
+    jest.advanceTimersByTime(1)
+    expect(cache.get('a')).toBeUndefined()
+    expect(cache.size).toBe(0)
+  })
+
+  it('lets a per-entry TTL override the default', () => {
+    jest.useFakeTimers()
+    const cache = new LRUCache<string, number>({ maxEntries: 5, ttlMs: 1000 })
+    cache.set('short', 1, 100)
+    cache.set('long', 2)
+
+    jest.advanceTimersByTime(500)
+    expect(cache.has('short')).toBe(false)
+    expect(cache.has('long')).toBe(true)
+  })
+
+  it('never expires entries without a TTL', () => {
+    jest.useFakeTimers()
+    const cache = new LRUCache<string, number>({ maxEntries: 5 })
+    cache.set('a', 1)
+
+    jest.advanceTimersByTime(365 * 24 * 60 * 60 * 1000)
+    expect(cache.get('a')).toBe(1)
+  })
+
+  it('deletes and clears entries', () => {
+    const cache = new LRUCache<string, number>({ maxEntries: 5 })
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    expect(cache.delete('a')).toBe(true)
+    expect(cache.delete('a')).toBe(false)
+    cache.clear()
+    expect(cache.size).toBe(0)
+  })
+})
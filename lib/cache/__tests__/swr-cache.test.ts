@@ -0,0 +1,161 @@
+/**
+ * Unit Tests for the stale-while-revalidate cache
+ */
+
+import { getRequirementsFingerprint } from '../itinerary-cache'
+import { MemoryCacheBackend, SWRCache, type CachedValue } from '../swr-cache'
+import { TieredCacheBackend } from '../tiered-backend'
+
+// Let a background refresh run to completion
+const flushPromises = async () => {
+  for (let i = 0; i < 10; i++) {
+    await Promise.resolve()
+  }
+}
+
+describe('SWRCache', () => {
+  beforeEach(() => {
+    jest.useFakeTimers()
+  })
+
+  afterEach(() => {
+    jest.useRealTimers()
+  })
+
+  const createCache = () =>
+    new SWRCache<string>(new MemoryCacheBackend(), {
+      ttlMs: 1000,
+      staleTtlMs: 5000,
+    })
+
+  it('serves fresh entries without reloading', async () => {
+    const cache = createCache()
+    const load = jest.fn(async () => 'itinerary')
+
+    const first = await cache.getOrLoad('key', load)
+    const second = await cache.getOrLoad('key', load)
+
+    expect(first.status).toBe('miss')
+    expect(second).toMatchObject({ status: 'hit', value: 'itinerary' })
+    expect(load).toHaveBeenCalledTimes(1)
+    expect(cache.getStats()).toMatchObject({ hits: 1, misses: 1, hitRate: 0.5 })
+  })
+
+  it('serves stale entries while refreshing in the background', async () => {
+    const cache = createCache()
+    await cache.getOrLoad('key', async () => 'old')
+
+    jest.advanceTimersByTime(2000)
+    const stale = await cache.getOrLoad('key', async () => 'new')
+    expect(stale).toMatchObject({ status: 'stale', value: 'old' })
+
+    await flushPromises()
+    const refreshed = await cache.getOrLoad('key', async () => 'newer')
+    expect(refreshed).toMatchObject({ status: 'hit', value: 'new' })
+  })
+
+  it('reloads once entries are past the stale window', async () => {
+    const cache = createCache()
+    await cache.getOrLoad('key', async () => 'old')
+
+    jest.advanceTimersByTime(7000)
+    const result = await cache.getOrLoad('key', async () => 'new')
+
+    expect(result).toMatchObject({ status: 'miss', value: 'new' })
+  })
+
+  it('does not store values rejected by shouldCache', async () => {
+    const cache = createCache()
+    const load = jest.fn(async () => 'fallback')
+
+    await cache.getOrLoad('key', load, () => false)
+    await cache.getOrLoad('key', load, () => false)
+
+    expect(load).toHaveBeenCalledTimes(2)
+  })
+
+  it('shares one load between concurrent misses', async () => {
+    const cache = createCache()
+    const load = jest.fn(async () => 'itinerary')
+
+    await Promise.all([
+      cache.getOrLoad('key', load),
+      cache.getOrLoad('key', load),
+    ])
+
+    expect(load).toHaveBeenCalledTimes(1)
+  })
+})
+
+describe('getRequirementsFingerprint', () => {
+  const base = {
+    destination: 'Pittsburgh',
+    interests: ['food-dining', 'arts'],
+    numberOfAdults: 2,
+    numberOfChildren: 0,
+  }
+
+  it('ignores interest order, case and defaulted fields', () => {
+    expect(
+      getRequirementsFingerprint({
+        ...base,
+        destination: ' pittsburgh ',
+        interests: ['Arts', 'food-dining'],
+        budget: 'moderate',
+        pace: 'moderate',
+      })
+    ).toBe(getRequirementsFingerprint(base))
+  })
+
+  it('buckets party size but separates different trips', () => {
+    const group = { ...base, numberOfAdults: 3 }
+
+    expect(getRequirementsFingerprint(group)).toBe(
+      getRequirementsFingerprint({ ...base, numberOfAdults: 4 })
+    )
+    expect(getRequirementsFingerprint(group)).not.toBe(
+      getRequirementsFingerprint(base)
+    )
+    expect(getRequirementsFingerprint({ ...base, budget: 'luxury' })).not.toBe(
+      getRequirementsFingerprint(base)
+    )
+  })
+})
+
+describe('TieredCacheBackend', () => {
+  const entry = (value: string): CachedValue<string> => ({
+    value,
+    createdAt: Date.now(),
+    freshUntil: Date.now() + 60_000,
+    staleUntil: Date.now() + 60_000,
+    loadTimeMs: 100,
+  })
+
+  it('copies shared-tier hits into the local tier', async () => {
+    const near = new MemoryCacheBackend<string>()
+    const far = new MemoryCacheBackend<string>()
+    await far.set('key', entry('research'))
+
+    const backend = new TieredCacheBackend(near, far)
+    const farGet = jest.spyOn(far, 'get')
+
+    expect((await backend.get('key'))?.value).toBe('research')
+    expect((await near.get('key'))?.value).toBe('research')
+
+    await backend.get('key')
+    expect(farGet).toHaveBeenCalledTimes(1)
+  })
+
+  it('writes and deletes in both tiers', async () => {
+    const near = new MemoryCacheBackend<string>()
+    const far = new MemoryCacheBackend<string>()
+    const backend = new TieredCacheBackend(near, far)
+
+    await backend.set('key', entry('research'))
+    expect(await far.get('key')).not.toBeNull()
+
+    await backend.delete('key')
+    expect(await near.get('key')).toBeNull()
+    expect(await far.get('key')).toBeNull()
+  })
+})
@@ -0,0 +1,23 @@
+/**
+ * Cardinal Cache Module
+ * Shared caching primitives
+ */
+
+export { LRUCache, type LRUCacheOptions } from './lru-cache'
+export {
+  SWRCache,
+  MemoryCacheBackend,
+  type CacheBackend,
+  type CachedValue,
+  type CacheLookup,
+  type CacheStats,
+  type CacheStatus,
+  type SWRCacheOptions,
+} from './swr-cache'
+export { PostgresCacheBackend } from './postgres-backend'
+export { TieredCacheBackend } from './tiered-backend'
+export {
+  getItineraryCache,
+  getRequirementsFingerprint,
+  type ItineraryFingerprintInput,
+} from './itinerary-cache'
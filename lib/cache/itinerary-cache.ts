@@ -0,0 +1,92 @@
+/**
+ * Itinerary Cache
+ * Caches generated itineraries under a canonical fingerprint of the trip
+ * requirements, so near-identical requests skip the LLM pipeline
+ */
+
+import { getServerEnv } from '@/lib/config/env'
+
+import { PostgresCacheBackend } from './postgres-backend'
+import { MemoryCacheBackend, SWRCache, type CacheBackend } from './swr-cache'
+
+// Requirement fields that shape a generated itinerary
+export interface ItineraryFingerprintInput {
+  destination: string
+  duration?: string | undefined
+  interests: string[]
+  numberOfAdults: number
+  numberOfChildren: number
+  budget?: string | undefined
+  pace?: string | undefined
+  dietary?: string[] | undefined
+  accessibility?: string[] | undefined
+}
+
+const DEFAULT_TTL_SECONDS = 6 * 60 * 60
+const DEFAULT_STALE_SECONDS = 24 * 60 * 60
+const MEMORY_MAX_ENTRIES = 500
+
+const normalize = (value: string) => value.trim().toLowerCase()
+
+const normalizeList = (values: string[] = []) =>
+  Array.from(new Set(values.map(normalize))).sort().join(',')
+
+// Party sizes that get the same recommendations share a bucket
+function partyBucket(adults: number, children: number): string {
+  const adultBucket =
+    adults <= 1
+      ? 'solo'
+      : adults === 2
+        ? 'couple'
+        : adults <= 4
+          ? 'small-group'
+          : 'large-group'
+  const childBucket =
+    children === 0 ? 'no-kids' : children <= 2 ? 'kids' : 'many-kids'
+  return `${adultBucket}+${childBucket}`
+}
+
+/**
+ * Canonical cache key for a set of requirements: interest order, letter
+ * case and exact party size don't produce a different itinerary
+ */
+export function getRequirementsFingerprint(
+  requirements: ItineraryFingerprintInput
+): string {
+  return [
+    normalize(requirements.destination),
+    normalize(requirements.duration || '3 days'),
+    normalizeList(requirements.interests),
+    partyBucket(requirements.numberOfAdults, requirements.numberOfChildren),
+    requirements.budget || 'moderate',
+    requirements.pace || 'moderate',
+    normalizeList(requirements.dietary),
+    normalizeList(requirements.accessibility),
+  ].join('|')
+}
+
+// One cache per namespace, e.g. orchestrated vs. single-prompt itineraries
+const caches = new Map<string, SWRCache<unknown>>()
+
+/**
+ * Itinerary cache for a namespace, backed by memory or the response_cache
+ * table depending on ITINERARY_CACHE_BACKEND
+ */
+export function getItineraryCache<V>(namespace = 'itinerary'): SWRCache<V> {
+  let cache = caches.get(namespace)
+  if (!cache) {
+    const env = getServerEnv()
+    const backend: CacheBackend<unknown> =
+      env.ITINERARY_CACHE_BACKEND === 'postgres'
+        ? new PostgresCacheBackend(namespace)
+        : new MemoryCacheBackend(MEMORY_MAX_ENTRIES)
+
+    cache = new SWRCache(backend, {
+      ttlMs: (env.ITINERARY_CACHE_TTL_SECONDS ?? DEFAULT_TTL_SECONDS) * 1000,
+      staleTtlMs:
+        (env.ITINERARY_CACHE_STALE_SECONDS ?? DEFAULT_STALE_SECONDS) * 1000,
+    })
+    caches.set(namespace, cache)
+  }
+  return cache as SWRCache<V>
+}
@@ -0,0 +1,76 @@
+/**
+ * LRU Cache
+ * In-memory least-recently-used cache with optional per-entry TTL
+ */
+
+export interface LRUCacheOptions {
+  maxEntries: number
+  ttlMs?: number // default time-to-live; entries never expire when omitted
+}
+
+interface CacheEntry<V> {
+  value: V
+  expiresAt: number
+}
+
+export class LRUCache<K, V> {
+  private entries = new Map<K, CacheEntry<V>>()
+  private options: LRUCacheOptions
+
+  constructor(options: LRUCacheOptions) {
+    this.options = options
+  }
+
+  /**
+   * Return a live entry and mark it as most recently used
+   */
+  get(key: K): V | undefined {
+    const entry = this.entries.get(key)
+    if (!entry) {
+      return undefined
+    }
+
+    if (entry.expiresAt <= Date.now()) {
+      this.entries.delete(key)
+      return undefined
+    }
+
+    // Map preserves insertion order, so re-inserting moves it to the end
+    this.entries.delete(key)
+    this.entries.set(key, entry)
+    return entry.value
+  }
+
+  set(key: K, value: V, ttlMs?: number): void {
+    const ttl = ttlMs ?? this.options.ttlMs
+    this.entries.delete(key)
+    this.entries.set(key, {
+      value,
+      expiresAt: ttl === undefined ? Infinity : Date.now() + ttl,
+    })
+
+    while (this.entries.size > this.options.maxEntries) {
+      const oldest = this.entries.keys().next()
+      if (oldest.done) {
+        break
+      }
+      this.entries.delete(oldest.value)
+    }
+  }
+
+  has(key: K): boolean {
+    return this.get(key) !== undefined
+  }
+
+  delete(key: K): boolean {
+    return this.entries.delete(key)
+  }
+
+  clear(): void {
+    this.entries.clear()
+  }
+
+  get size(): number {
+    return this.entries.size
+  }
+}
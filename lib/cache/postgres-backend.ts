@@ -0,0 +1,78 @@
+/**
+ * Postgres Cache Backend
+ * Stores cache entries in the response_cache table so they are shared
+ * across serverless instances and survive cold starts
+ */
+
+import { createSupabaseServerClient } from '@/lib/database/supabase'
+
+import type { CacheBackend, CachedValue } from './swr-cache'
+
+export class PostgresCacheBackend<V> implements CacheBackend<V> {
+  private namespace: string
+
+  /**
+   * @param namespace prefix that keeps different caches' keys apart
+   */
+  constructor(namespace: string) {
+    this.namespace = namespace
+  }
+
+  async get(key: string): Promise<CachedValue<V> | null> {
+    const supabase = createSupabaseServerClient()
+    const { data, error } = (await supabase
+      .from('response_cache' as any)
+      .select('value, created_at, fresh_until, stale_until, load_time_ms')
+      .eq('cache_key', this.rowKey(key))
+      .gt('stale_until', new Date().toISOString())
+      .maybeSingle()) as any
+
+    if (error) {
+      throw new Error(`Failed to read cache entry: ${error.message}`)
+    }
+    if (!data) {
+      return null
+    }
+
+    return {
+      value: data.value as V,
+      createdAt: Date.parse(data.created_at),
+      freshUntil: Date.parse(data.fresh_until),
+      staleUntil: Date.parse(data.stale_until),
+      loadTimeMs: data.load_time_ms || 0,
+    }
+  }
+
+  async set(key: string, entry: CachedValue<V>): Promise<void> {
+    const supabase = createSupabaseServerClient()
+    const { error } = await supabase.from('response_cache' as any).upsert({
+      cache_key: this.rowKey(key),
+      namespace: this.namespace,
+      value: entry.value,
+      created_at: new Date(entry.createdAt).toISOString(),
+      fresh_until: new Date(entry.freshUntil).toISOString(),
+      stale_until: new Date(entry.staleUntil).toISOString(),
+      load_time_ms: Math.round(entry.loadTimeMs),
+    } as any)
+
+    if (error) {
+      throw new Error(`Failed to write cache entry: ${error.message}`)
+    }
+  }
+
+  async delete(key: string): Promise<void> {
+    const supabase = createSupabaseServerClient()
+    const { error } = await supabase
+      .from('response_cache' as any)
+      .delete()
+      .eq('cache_key', this.rowKey(key))
+
+    if (error) {
+      throw new Error(`Failed to delete cache entry: ${error.message}`)
+    }
+  }
+
+  private rowKey(key: string): string {
+    return `${this.namespace}:${key}`
+  }
+}
@@ -0,0 +1,183 @@
+/**
+ * Stale-While-Revalidate Cache
+ * Async cache over a pluggable backend. Fresh entries are served as-is,
+ * stale entries are served while a single background refresh replaces
+ * them, and concurrent misses for one key share a single load.
+ */
+
+import { LRUCache } from './lru-cache'
+
+export interface CachedValue<V> {
+  value: V
+  createdAt: number
+  freshUntil: number // served without revalidation until this time
+  staleUntil: number // served while revalidating until this time
+  loadTimeMs: number // how long the value took to produce
+}
+
+export interface CacheBackend<V> {
+  get(key: string): Promise<CachedValue<V> | null>
+  set(key: string, entry: CachedValue<V>): Promise<void>
+  delete(key: string): Promise<void>
+}
+
+export type CacheStatus = 'hit' | 'stale' | 'miss'
+
+export interface CacheLookup<V> {
+  value: V
+  status: CacheStatus
+  ageMs: number
+  latencySavedMs: number // producing the value again would have cost this
+}
+
+export interface CacheStats {
+  hits: number
+  staleHits: number
+  misses: number
+  hitRate: number // share of lookups served from cache, fresh or stale
+  latencySavedMs: number
+}
+
+export interface SWRCacheOptions {
+  ttlMs: number // how long an entry stays fresh
+  staleTtlMs: number // how long after that it may still be served
+}
+
+/**
+ * In-process backend on top of the shared LRU cache
+ */
+export class MemoryCacheBackend<V> implements CacheBackend<V> {
+  private cache: LRUCache<string, CachedValue<V>>
+
+  constructor(maxEntries = 500) {
+    this.cache = new LRUCache({ maxEntries })
+  }
+
+  async get(key: string): Promise<CachedValue<V> | null> {
+    return this.cache.get(key) || null
+  }
+
+  async set(key: string, entry: CachedValue<V>): Promise<void> {
+    this.cache.set(key, entry, entry.staleUntil - Date.now())
+  }
+
+  async delete(key: string): Promise<void> {
+    this.cache.delete(key)
+  }
+}
+
+export class SWRCache<V> {
+  private backend: CacheBackend<V>
+  private options: SWRCacheOptions
+  private inFlight = new Map<string, Promise<CachedValue<V>>>()
+  private stats = { hits: 0, staleHits: 0, misses: 0, latencySavedMs: 0 }
+
+  constructor(backend: CacheBackend<V>, options: SWRCacheOptions) {
+    this.backend = backend
+    this.options = options
+  }
+
+  /**
+   * Return the cached value for `key`, calling `load` on a miss. Stale
+   * values are returned immediately and refreshed in the background.
+   * `shouldCache` can reject values (e.g. degraded results) from storage.
+   */
+  async getOrLoad(
+    key: string,
+    load: () => Promise<V>,
+    shouldCache: (value: V) => boolean = () => true
+  ): Promise<CacheLookup<V>> {
+    const startTime = Date.now()
+    const cached = await this.readBackend(key)
+
+    if (cached && cached.staleUntil > Date.now()) {
+      const status: CacheStatus =
+        cached.freshUntil > Date.now() ? 'hit' : 'stale'
+
+      if (status === 'stale') {
+        // Best effort: on serverless the refresh only completes if the
+        // instance stays warm, otherwise the next request retries it
+        this.refresh(key, load, shouldCache).catch(error =>
+          console.warn(`Cache revalidation failed for ${key}:`, error)
+        )
+      }
+
+      const latencySavedMs = Math.max(
+        0,
+        cached.loadTimeMs - (Date.now() - startTime)
+      )
+      this.stats[status === 'hit' ? 'hits' : 'staleHits']++
+      this.stats.latencySavedMs += latencySavedMs
+
+      return {
+        value: cached.value,
+        status,
+        ageMs: Date.now() - cached.createdAt,
+        latencySavedMs,
+      }
+    }
+
+    this.stats.misses++
+    const entry = await this.refresh(key, load, shouldCache)
+    return { value: entry.value, status: 'miss', ageMs: 0, latencySavedMs: 0 }
+  }
+
+  async invalidate(key: string): Promise<void> {
+    await this.backend.delete(key)
+  }
+
+  getStats(): CacheStats {
+    const lookups = this.stats.hits + this.stats.staleHits + this.stats.misses
+    return {
+      ...this.stats,
+      hitRate:
+        lookups > 0 ? (this.stats.hits + this.stats.staleHits) / lookups : 0,
+    }
+  }
+
+  // Load a value once per key at a time and store it if it qualifies
+  private refresh(
+    key: string,
+    load: () => Promise<V>,
+    shouldCache: (value: V) => boolean
+  ): Promise<CachedValue<V>> {
+    const pending = this.inFlight.get(key)
+    if (pending) {
+      return pending
+    }
+
+    const run = async (): Promise<CachedValue<V>> => {
+      const startTime = Date.now()
+      const value = await load()
+      const now = Date.now()
+      const entry: CachedValue<V> = {
+        value,
+        createdAt: now,
+        freshUntil: now + this.options.ttlMs,
+        staleUntil: now + this.options.ttlMs + this.options.staleTtlMs,
+        loadTimeMs: now - startTime,
+      }
+
+      if (shouldCache(value)) {
+        await this.backend
+          .set(key, entry)
+          .catch(error => console.warn(`Cache write failed for ${key}:`, error))
+      }
+      return entry
+    }
+
+    const promise = run().finally(() => this.inFlight.delete(key))
+    this.inFlight.set(key, promise)
+    return promise
+  }
+
+  // A failing backend degrades to a miss rather than failing the request
+  private async readBackend(key: string): Promise<CachedValue<V> | null> {
+    try {
+      return await this.backend.get(key)
+    } catch (error) {
+      console.warn(`Cache read failed for ${key}:`, error)
+      return null
+    }
+  }
+}
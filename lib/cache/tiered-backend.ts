@@ -0,0 +1,39 @@
+/**
+ * Tiered Cache Backend
+ * Reads from a fast near tier (in-process memory) before a shared far tier
+ * (Postgres), copying far hits into the near tier. Writes go to both.
+ */
+
+import type { CacheBackend, CachedValue } from './swr-cache'
+
+export class TieredCacheBackend<V> implements CacheBackend<V> {
+  private near: CacheBackend<V>
+  private far: CacheBackend<V>
+
+  constructor(near: CacheBackend<V>, far: CacheBackend<V>) {
+    this.near = near
+    this.far = far
+  }
+
+  async get(key: string): Promise<CachedValue<V> | null> {
+    const local = await this.near.get(key)
+    if (local) {
+      return local
+    }
+
+    const shared = await this.far.get(key)
+    if (shared) {
+      await this.near.set(key, shared)
+    }
+    return shared
+  }
+
+  async set(key: string, entry: CachedValue<V>): Promise<void> {
+    await this.near.set(key, entry)
+    await this.far.set(key, entry)
+  }
+
+  async delete(key: string): Promise<void> {
+    await Promise.all([this.near.delete(key), this.far.delete(key)])
+  }
+}
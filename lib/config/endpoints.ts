@@ -0,0 +1,31 @@
+/**
+ * Provider Endpoints
+ * Base URLs of the external APIs we call. Each can be overridden through
+ * the environment, e.g. to point at the local mock providers server
+ * (npm run mock:providers) for offline load testing.
+ */
+
+export const ANTHROPIC_API_URL = 'https://api.anthropic.com'
+export const GOOGLE_PLACES_API_URL = 'https://maps.googleapis.com'
+export const GOOGLE_ROUTES_API_URL = 'https://routes.googleapis.com'
+
+const withoutTrailingSlash = (url: string) => url.replace(/\/+$/, '')
+
+// Read at call time so scripts can set the variables before first use
+export function getAnthropicBaseUrl(): string {
+  return withoutTrailingSlash(
+    process.env.ANTHROPIC_BASE_URL || ANTHROPIC_API_URL
+  )
+}
+
+export function getGooglePlacesBaseUrl(): string {
+  return withoutTrailingSlash(
+    process.env.GOOGLE_PLACES_BASE_URL || GOOGLE_PLACES_API_URL
+  )
+}
+
+export function getGoogleRoutesBaseUrl(): string {
+  return withoutTrailingSlash(
+    process.env.GOOGLE_ROUTES_BASE_URL || GOOGLE_ROUTES_API_URL
+  )
+}
@@ -16,8 +16,9 @@ import { z } from 'zod'
 
 // Server-side environment schema (secrets, never exposed to client)
 const serverEnvSchema = z.object({
+  // Jest runs with NODE_ENV=test
   NODE_ENV: z
-    .enum(['development', 'staging', 'production'])
+    .enum(['development', 'staging', 'production', 'test'])
     .default('development'),
 
   // Database
@@ -43,10 +44,29 @@ const serverEnvSchema = z.object({
   OPENAI_ORG_ID: z.string().optional(),
   GOOGLE_AI_API_KEY: z.string().optional(),
   ANTHROPIC_API_KEY: z.string().optional(),
+  ANTHROPIC_BASE_URL: z.string().url().optional(),
+  ORCHESTRATION_BUDGET_USD: z.coerce.number().positive().optional(),
+  FUNCTION_TIMEOUT_MS: z.coerce.number().positive().optional(),
+  LLM_HEDGE_BUDGET_PERCENT: z.coerce.number().min(0).max(100).optional(),
+  LLM_HEDGE_MODEL: z.string().optional(),
+  ASSEMBLY_CONTEXT_TOKENS: z.coerce.number().int().positive().optional(),
+  LLM_FIXTURE_MODE: z.enum(['record', 'replay']).optional(),
+  LLM_FIXTURE_FILE: z.string().optional(),
+  LLM_FIXTURE_LATENCY_SCALE: z.coerce.number().min(0).optional(),
+  ITINERARY_CACHE_BACKEND: z.enum(['memory', 'postgres']).optional(),
+  ITINERARY_CACHE_TTL_SECONDS: z.coerce.number().min(0).optional(),
+  ITINERARY_CACHE_STALE_SECONDS: z.coerce.number().min(0).optional(),
+  RESEARCH_CACHE_BACKEND: z.enum(['memory', 'postgres']).optional(),
+  RESEARCH_CACHE_TTL_SECONDS: z.coerce.number().min(0).optional(),
+  PLAN_CACHE_TTL_SECONDS: z.coerce.number().min(0).optional(),
+  JOB_RUNNER: z.enum(['background', 'local']).optional(),
+  JOB_CONCURRENCY: z.coerce.number().int().positive().optional(),
 
   // Google Services
   GOOGLE_MAPS_API_KEY: z.string().optional(),
   GOOGLE_PLACES_API_KEY: z.string().optional(),
+  GOOGLE_PLACES_BASE_URL: z.string().url().optional(),
+  GOOGLE_ROUTES_BASE_URL: z.string().url().optional(),
   GOOGLE_CLOUD_PROJECT_ID: z.string().optional(),
   GOOGLE_CLOUD_CREDENTIALS: z.string().optional(),
 
@@ -105,12 +125,23 @@ const clientEnvSchema = z.object({
 // ENVIRONMENT VALIDATION
 // =============================================================================
 
+// Blank entries (`KEY=` as in .env.example) count as unset, so they fall
+// back to their defaults instead of coercing to 0 or failing validation
+function withoutBlankValues(env: NodeJS.ProcessEnv): Record<string, string> {
+  return Object.fromEntries(
+    Object.entries(env).filter(
+      (entry): entry is [string, string] =>
+        entry[1] !== undefined && entry[1].trim() !== ''
+    )
+  )
+}
+
 /**
  * Validates and parses server environment variables
  * Only call this on the server side!
  */
 export function getServerEnv() {
-  const parsed = serverEnvSchema.safeParse(process.env)
+  const parsed = serverEnvSchema.safeParse(withoutBlankValues(process.env))
 
   if (!parsed.success) {
     // In CI environments, be more lenient with server env validation
@@ -5,6 +5,20 @@
 
 import { z } from 'zod'
 
+import { getGooglePlacesBaseUrl } from '@/lib/config/endpoints'
+import {
+  HttpStatusError,
+  withRetry,
+  type AbortOptions,
+} from '@/lib/resilience'
+
+// Places statuses reported in a 200 response that are worth retrying,
+// mapped to the HTTP status the retry policy treats them as
+const TRANSIENT_PLACES_STATUSES: Record<string, number> = {
+  OVER_QUERY_LIMIT: 429,
+  UNKNOWN_ERROR: 503,
+}
+
 // Place search request schema
 export const placeSearchRequestSchema = z.object({
   query: z.string().min(1),
@@ -78,7 +92,7 @@ export type TPlaceSearchResponse = z.infer<typeof placeSearchResponseSchema>
 // Google Places API client
 export class GooglePlacesClient {
   private apiKey: string
-  private baseUrl = 'https://maps.googleapis.com/maps/api/place'
+  private baseUrl = `${getGooglePlacesBaseUrl()}/maps/api/place`
 
   constructor(apiKey?: string) {
     this.apiKey = apiKey || process.env.GOOGLE_PLACES_API_KEY || ''
@@ -91,7 +105,10 @@ export class GooglePlacesClient {
   }
 
   // Search for places using Text Search API
-  async searchPlaces(request: TPlaceSearchRequest): Promise<TPlaceDetails[]> {
+  async searchPlaces(
+    request: TPlaceSearchRequest,
+    options: AbortOptions = {}
+  ): Promise<TPlaceDetails[]> {
     const validatedRequest = placeSearchRequestSchema.parse(request)
 
     const params = new URLSearchParams({
@@ -110,15 +127,10 @@ export class GooglePlacesClient {
       params.append('type', validatedRequest.type)
     }
 
-    const response = await fetch(`${this.baseUrl}/textsearch/json?${params}`)
-
-    if (!response.ok) {
-      throw new Error(
-        `Google Places API error: ${response.status} ${response.statusText}`
-      )
-    }
-
-    const data = await response.json()
+    const data = await this.fetchJson(
+      `${this.baseUrl}/textsearch/json?${params}`,
+      options
+    )
 
     if (data.status !== 'OK' && data.status !== 'ZERO_RESULTS') {
       throw new Error(
@@ -130,7 +142,10 @@ export class GooglePlacesClient {
   }
 
   // Get place details by place ID
-  async getPlaceDetails(placeId: string): Promise<TPlaceDetails | null> {
+  async getPlaceDetails(
+    placeId: string,
+    options: AbortOptions = {}
+  ): Promise<TPlaceDetails | null> {
     const params = new URLSearchParams({
       key: this.apiKey,
       place_id: placeId,
@@ -151,15 +166,10 @@ export class GooglePlacesClient {
       ].join(','),
     })
 
-    const response = await fetch(`${this.baseUrl}/details/json?${params}`)
-
-    if (!response.ok) {
-      throw new Error(
-        `Google Places API error: ${response.status} ${response.statusText}`
-      )
-    }
-
-    const data = await response.json()
+    const data = await this.fetchJson(
+      `${this.baseUrl}/details/json?${params}`,
+      options
+    )
 
     if (data.status !== 'OK') {
       if (data.status === 'NOT_FOUND') {
@@ -177,7 +187,8 @@ export class GooglePlacesClient {
   async getNearbyPlaces(
     location: { lat: number; lng: number },
     radius: number = 5000,
-    type?: string
+    type?: string,
+    options: AbortOptions = {}
   ): Promise<TPlaceDetails[]> {
     const params = new URLSearchParams({
       key: this.apiKey,
@@ -200,15 +211,10 @@ export class GooglePlacesClient {
       params.append('type', type)
     }
 
-    const response = await fetch(`${this.baseUrl}/nearbysearch/json?${params}`)
-
-    if (!response.ok) {
-      throw new Error(
-        `Google Places API error: ${response.status} ${response.statusText}`
-      )
-    }
-
-    const data = await response.json()
+    const data = await this.fetchJson(
+      `${this.baseUrl}/nearbysearch/json?${params}`,
+      options
+    )
 
     if (data.status !== 'OK' && data.status !== 'ZERO_RESULTS') {
       throw new Error(
@@ -219,6 +225,35 @@ export class GooglePlacesClient {
     return this.transformPlacesResponse(data.results || [])
   }
 
+  // GET a Places endpoint, retrying transient failures under the shared
+  // retry policy. Other non-OK statuses are left to the caller.
+  private fetchJson(url: string, options: AbortOptions): Promise<any> {
+    return withRetry(
+      async () => {
+        const response = await fetch(url, { signal: options.signal ?? null })
+
+        if (!response.ok) {
+          throw await HttpStatusError.fromResponse(
+            response,
+            'Google Places API'
+          )
+        }
+
+        const data = await response.json()
+        const transientStatus = TRANSIENT_PLACES_STATUSES[data.status]
+        if (transientStatus) {
+          throw new HttpStatusError(
+            `Google Places API error: ${data.status} - ${data.error_message || 'Unknown error'}`,
+            transientStatus
+          )
+        }
+
+        return data
+      },
+      { signal: options.signal }
+    )
+  }
+
   // Transform raw Google Places API response to our schema
   private transformPlacesResponse(places: any[]): TPlaceDetails[] {
     return places.map(place => this.transformPlaceDetails(place))
@@ -5,6 +5,13 @@
 
 import { z } from 'zod'
 
+import { getGoogleRoutesBaseUrl } from '@/lib/config/endpoints'
+import {
+  HttpStatusError,
+  withRetry,
+  type AbortOptions,
+} from '@/lib/resilience'
+
 // Route request schema
 export const routeRequestSchema = z.object({
   origin: z.object({
@@ -89,9 +96,9 @@ export type TRouteMatrixResponse = z.infer<typeof routeMatrixResponseSchema>
 // Google Routes API client
 export class GoogleRoutesClient {
   private apiKey: string
-  private baseUrl = 'https://routes.googleapis.com/directions/v2:computeRoutes'
+  private baseUrl = `${getGoogleRoutesBaseUrl()}/directions/v2:computeRoutes`
   private matrixUrl =
-    'https://routes.googleapis.com/distanceMatrix/v2:computeRouteMatrix'
+    `${getGoogleRoutesBaseUrl()}/distanceMatrix/v2:computeRouteMatrix`
 
   constructor(apiKey?: string) {
     this.apiKey = apiKey || process.env.GOOGLE_PLACES_API_KEY || ''
@@ -104,7 +111,10 @@ export class GoogleRoutesClient {
   }
 
   // Calculate route between two points
-  async calculateRoute(request: TRouteRequest): Promise<TRouteResponse> {
+  async calculateRoute(
+    request: TRouteRequest,
+    options: AbortOptions = {}
+  ): Promise<TRouteResponse> {
     const validatedRequest = routeRequestSchema.parse(request)
 
     const requestBody = {
@@ -135,24 +145,12 @@ export class GoogleRoutesClient {
       units: 'IMPERIAL',
     }
 
-    const response = await fetch(this.baseUrl, {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-        'X-Goog-Api-Key': this.apiKey,
-        'X-Goog-FieldMask':
-          'routes.duration,routes.distanceMeters,routes.polyline.encodedPolyline,routes.viewport',
-      },
-      body: JSON.stringify(requestBody),
-    })
-
-    if (!response.ok) {
-      throw new Error(
-        `Google Routes API error: ${response.status} ${response.statusText}`
-      )
-    }
-
-    const data = await response.json()
+    const data = await this.postJson(
+      this.baseUrl,
+      requestBody,
+      'routes.duration,routes.distanceMeters,routes.polyline.encodedPolyline,routes.viewport',
+      options
+    )
 
     if (!data.routes || data.routes.length === 0) {
       throw new Error('No route found between the specified locations')
@@ -189,7 +187,8 @@ export class GoogleRoutesClient {
 
   // Calculate route matrix for multiple origins and destinations
   async calculateRouteMatrix(
-    request: TRouteMatrixRequest
+    request: TRouteMatrixRequest,
+    options: AbortOptions = {}
   ): Promise<TRouteMatrixResponse> {
     const validatedRequest = routeMatrixRequestSchema.parse(request)
 
@@ -224,23 +223,7 @@ export class GoogleRoutesClient {
       units: 'IMPERIAL',
     }
 
-    const response = await fetch(this.matrixUrl, {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-        'X-Goog-Api-Key': this.apiKey,
-        'X-Goog-FieldMask': '*',
-      },
-      body: JSON.stringify(requestBody),
-    })
-
-    if (!response.ok) {
-      throw new Error(
-        `Google Routes API error: ${response.status} ${response.statusText}`
-      )
-    }
-
-    const data = await response.json()
+    const data = await this.postJson(this.matrixUrl, requestBody, '*', options)
 
     if (!data || data.length === 0) {
       throw new Error('No route matrix data available')
@@ -277,11 +260,46 @@ export class GoogleRoutesClient {
     return { matrix }
   }
 
+  // POST to a Routes endpoint, retrying transient failures under the
+  // shared retry policy
+  private postJson(
+    url: string,
+    body: unknown,
+    fieldMask: string,
+    options: AbortOptions
+  ): Promise<any> {
+    return withRetry(
+      async () => {
+        const response = await fetch(url, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+            'X-Goog-Api-Key': this.apiKey,
+            'X-Goog-FieldMask': fieldMask,
+          },
+          body: JSON.stringify(body),
+          signal: options.signal ?? null,
+        })
+
+        if (!response.ok) {
+          throw await HttpStatusError.fromResponse(
+            response,
+            'Google Routes API'
+          )
+        }
+
+        return response.json()
+      },
+      { signal: options.signal }
+    )
+  }
+
   // Optimize route order for multiple destinations
   async optimizeRoute(
     origin: { lat: number; lng: number },
     destinations: { lat: number; lng: number }[],
-    returnToOrigin: boolean = false
+    returnToOrigin: boolean = false,
+    options: AbortOptions = {}
   ): Promise<{
     optimizedOrder: number[]
     totalDistance: number
@@ -321,14 +339,17 @@ export class GoogleRoutesClient {
       // Calculate distance to all unvisited destinations
       for (const index of unvisited) {
         try {
-          const route = await this.calculateRoute({
-            origin: currentLocation!,
-            destination: destinations[index]!,
-            travelMode: 'DRIVING',
-            optimize: false,
-            avoidTolls: false,
-            avoidHighways: false,
-          })
+          const route = await this.calculateRoute(
+            {
+              origin: currentLocation!,
+              destination: destinations[index]!,
+              travelMode: 'DRIVING',
+              optimize: false,
+              avoidTolls: false,
+              avoidHighways: false,
+            },
+            options
+          )
 
           if (route.distance.meters < nearestDistance) {
             nearestDistance = route.distance.meters
@@ -336,6 +357,10 @@ export class GoogleRoutesClient {
             nearestIndex = index
           }
         } catch (error) {
+          // Stop optimizing once the caller has given up
+          if (options.signal?.aborted) {
+            throw error
+          }
           console.error(
             `Error calculating route to destination ${index}:`,
             error
@@ -359,14 +384,17 @@ export class GoogleRoutesClient {
     // Add return to origin if requested
     if (returnToOrigin && optimizedOrder.length > 0) {
       try {
-        const returnRoute = await this.calculateRoute({
-          origin: currentLocation!,
-          destination: origin,
-          travelMode: 'DRIVING',
-          optimize: false,
-          avoidTolls: false,
-          avoidHighways: false,
-        })
+        const returnRoute = await this.calculateRoute(
+          {
+            origin: currentLocation!,
+            destination: origin,
+            travelMode: 'DRIVING',
+            optimize: false,
+            avoidTolls: false,
+            avoidHighways: false,
+          },
+          options
+        )
         totalDistance += returnRoute.distance.meters
         totalDuration += returnRoute.duration.seconds
       } catch (error) {
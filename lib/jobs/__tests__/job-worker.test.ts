@@ -0,0 +1,170 @@
+/**
+ * Unit Tests for the itinerary Job Worker
+ */
+
+import type {
+  OrchestrationOptions,
+  OrchestrationResult,
+  TTravelRequirements,
+} from '../../agents/types'
+import { MemoryJobStore } from '../job-store'
+import { JobWorker, STALE_JOB_MS, expireStaleJobs } from '../job-worker'
+
+// The worker is always given an orchestrator here; avoid building the real
+// agents on import
+jest.mock('../../agents/orchestrator', () => ({ orchestrator: {} }))
+
+const requirements = {
+  destination: 'Pittsburgh',
+  interests: ['food-dining'],
+  numberOfAdults: 2,
+  numberOfChildren: 0,
+} as unknown as TTravelRequirements
+
+const itinerary = {
+  destination: 'Pittsburgh',
+  duration: '3 days',
+  days: [],
+  lodging: [],
+  personaNotes: 'Curated for a foodie traveler',
+}
+
+// Orchestrator that reports research for lodging and then completes
+function createOrchestrator(delayMs = 0) {
+  return {
+    generateItinerary: jest.fn(
+      async (
+        _requirements: TTravelRequirements,
+        _persona?: unknown,
+        _constraints?: unknown,
+        options: OrchestrationOptions = {}
+      ): Promise<OrchestrationResult> => {
+        options.onEvent?.({
+          type: 'research',
+          agentType: 'lodging',
+          output: {
+            agentType: 'lodging',
+            status: 'success',
+            recommendations: [],
+            confidence: 0.8,
+            reasoning: 'Boutique stays near the Strip District',
+          },
+          timestamp: Date.now(),
+        })
+        options.onEvent?.({
+          type: 'phase',
+          phase: 'research',
+          status: 'completed',
+          timestamp: Date.now(),
+        })
+        await new Promise(resolve => setTimeout(resolve, delayMs))
+        return { success: true, itinerary, totalExecutionTime: delayMs }
+      }
+    ),
+  }
+}
+
+describe('JobWorker', () => {
+  it('runs a queued job and persists progress and the itinerary', async () => {
+    const store = new MemoryJobStore()
+    const worker = new JobWorker({
+      store,
+      orchestrator: createOrchestrator(),
+    })
+    const job = await store.create('user-1', requirements)
+
+    await expect(worker.runJob(job.id)).resolves.toBe(true)
+
+    const finished = await store.get(job.id)
+    expect(finished).toMatchObject({
+      status: 'completed',
+      itinerary,
+      progress: { percent: 100, completedAgents: ['lodging'] },
+    })
+    expect(finished?.partialResults.lodging).toEqual([])
+  })
+
+  it('runs each job only once', async () => {
+    const store = new MemoryJobStore()
+    const orchestrator = createOrchestrator()
+    const worker = new JobWorker({ store, orchestrator })
+    const job = await store.create('user-1', requirements)
+
+    const claims = await Promise.all([
+      worker.runJob(job.id),
+      worker.runJob(job.id),
+    ])
+
+    expect(claims.filter(Boolean)).toHaveLength(1)
+    expect(orchestrator.generateItinerary).toHaveBeenCalledTimes(1)
+  })
+
+  it('limits the number of jobs running at once', async () => {
+    const store = new MemoryJobStore()
+    const worker = new JobWorker({
+      store,
+      orchestrator: createOrchestrator(20),
+      concurrency: 2,
+    })
+    const jobs = await Promise.all(
+      [1, 2, 3].map(() => store.create('user-1', requirements))
+    )
+
+    let maxActive = 0
+    const runs = jobs.map(job => worker.runJob(job.id))
+    const sampler = setInterval(() => {
+      maxActive = Math.max(maxActive, worker.getActiveJobCount())
+    }, 1)
+    await Promise.all(runs)
+    clearInterval(sampler)
+
+    expect(maxActive).toBeLessThanOrEqual(2)
+    for (const job of jobs) {
+      expect((await store.get(job.id))?.status).toBe('completed')
+    }
+  })
+
+  it('marks the job failed when orchestration fails', async () => {
+    const store = new MemoryJobStore()
+    const worker = new JobWorker({
+      store,
+      orchestrator: {
+        generateItinerary: async () => {
+          throw new Error('Anthropic unavailable')
+        },
+      },
+    })
+    const job = await store.create('user-1', requirements)
+
+    await worker.runJob(job.id)
+
+    expect(await store.get(job.id)).toMatchObject({
+      status: 'failed',
+      error: 'Anthropic unavailable',
+    })
+  })
+
+  it('times out jobs whose worker stopped reporting', async () => {
+    jest.useFakeTimers({ now: Date.parse('2025-01-01T12:00:00Z') })
+    try {
+      const store = new MemoryJobStore()
+      const abandoned = await store.create('user-1', requirements)
+      await store.claim(abandoned.id)
+      const queued = await store.create('user-1', requirements)
+
+      jest.advanceTimersByTime(STALE_JOB_MS - 1000)
+      const running = await store.create('user-1', requirements)
+      await store.claim(running.id)
+      await expect(expireStaleJobs(store)).resolves.toEqual([])
+
+      jest.advanceTimersByTime(2000)
+      await expect(expireStaleJobs(store)).resolves.toEqual([abandoned.id])
+
+      expect((await store.get(abandoned.id))?.status).toBe('timed_out')
+      expect((await store.get(queued.id))?.status).toBe('initialized')
+      expect((await store.get(running.id))?.status).toBe('in_progress')
+    } finally {
+      jest.useRealTimers()
+    }
+  })
+})
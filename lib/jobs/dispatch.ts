@@ -0,0 +1,57 @@
+/**
+ * Job Dispatch
+ * Starts deployed itinerary jobs by invoking the background worker
+ * function, keeping the number of running jobs under JOB_CONCURRENCY
+ */
+
+import { getServerEnv } from '@/lib/config/env'
+
+import { getJobStore, type JobStore } from './job-store'
+import {
+  DEFAULT_JOB_CONCURRENCY,
+  DEFAULT_JOB_TIMEOUT_MS,
+  expireStaleJobs,
+} from './job-worker'
+
+export const BACKGROUND_WORKER_PATH =
+  '/.netlify/functions/itinerary-job-worker-background'
+
+/**
+ * Hand a queued job to a background worker if a slot is free. Returns
+ * false when the job stays queued: it is picked up by the next worker to
+ * finish, or by the local runner when JOB_RUNNER=local.
+ */
+export async function dispatchJob(
+  jobId: string,
+  siteUrl: string,
+  store: JobStore = getJobStore()
+): Promise<boolean> {
+  const env = getServerEnv()
+  if (env.JOB_RUNNER === 'local') {
+    return false
+  }
+
+  // Jobs whose worker died would otherwise never finish
+  await expireStaleJobs(store).catch(error =>
+    console.error('Failed to expire stale itinerary jobs:', error)
+  )
+
+  const active = await store.countInProgress(
+    new Date(Date.now() - DEFAULT_JOB_TIMEOUT_MS)
+  )
+  if (active >= (env.JOB_CONCURRENCY ?? DEFAULT_JOB_CONCURRENCY)) {
+    return false
+  }
+
+  // Background functions acknowledge with 202 and keep running on their own
+  const response = await fetch(new URL(BACKGROUND_WORKER_PATH, siteUrl), {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ jobId }),
+  })
+
+  if (!response.ok) {
+    throw new Error(`Failed to start job worker: ${response.status}`)
+  }
+  return true
+}
@@ -0,0 +1,26 @@
+/**
+ * Cardinal Jobs Module
+ * Asynchronous itinerary generation jobs
+ */
+
+export {
+  MemoryJobStore,
+  SupabaseJobStore,
+  TERMINAL_JOB_STATUSES,
+  getJobStore,
+  type ItineraryJob,
+  type JobProgress,
+  type JobStatus,
+  type JobStore,
+  type JobUpdate,
+} from './job-store'
+export {
+  JobWorker,
+  DEFAULT_JOB_CONCURRENCY,
+  DEFAULT_JOB_TIMEOUT_MS,
+  STALE_JOB_MS,
+  expireStaleJobs,
+  isJobStale,
+  type JobWorkerOptions,
+} from './job-worker'
+export { dispatchJob, BACKGROUND_WORKER_PATH } from './dispatch'
@@ -0,0 +1,376 @@
+/**
+ * Itinerary Job Store
+ * Persists asynchronous itinerary generation jobs, their progress and
+ * partial results. Jobs are rows in ai_generation_sessions: the row status
+ * tracks the job lifecycle and metadata.job holds everything else.
+ */
+
+import { randomUUID } from 'node:crypto'
+
+import type {
+  AgentType,
+  Itinerary,
+  OrchestrationPhase,
+  OrchestrationResult,
+  Recommendation,
+  TTravelRequirements,
+} from '@/lib/agents/types'
+import { createSupabaseServerClient } from '@/lib/database/supabase'
+
+// Mirrors the ai_generation_sessions status check constraint
+export type JobStatus =
+  | 'initialized'
+  | 'in_progress'
+  | 'completed'
+  | 'failed'
+  | 'cancelled'
+  | 'timed_out'
+
+export const TERMINAL_JOB_STATUSES: JobStatus[] = [
+  'completed',
+  'failed',
+  'cancelled',
+  'timed_out',
+]
+
+export interface JobProgress {
+  phase?: OrchestrationPhase | undefined
+  completedPhases: OrchestrationPhase[]
+  completedAgents: AgentType[]
+  percent: number // 0-100
+}
+
+export interface ItineraryJob {
+  id: string
+  userId: string
+  status: JobStatus
+  requirements: TTravelRequirements
+  progress: JobProgress
+  // Recommendations from each research agent, available before completion
+  partialResults: Partial<Record<AgentType, Recommendation[]>>
+  itinerary?: Itinerary | undefined
+  costs?: OrchestrationResult['costs'] | undefined
+  error?: string | undefined
+  // Credential for the job's event stream, which EventSource can't send
+  // headers to; never included in job responses
+  eventsToken?: string | undefined
+  createdAt: string
+  updatedAt: string
+  completedAt?: string | undefined
+}
+
+export type JobUpdate = Partial<
+  Pick<
+    ItineraryJob,
+    'status' | 'progress' | 'partialResults' | 'itinerary' | 'costs' | 'error'
+  >
+>
+
+export interface JobStore {
+  create(
+    userId: string,
+    requirements: TTravelRequirements
+  ): Promise<ItineraryJob>
+  get(id: string): Promise<ItineraryJob | null>
+  update(id: string, update: JobUpdate): Promise<void>
+  // Atomically move a queued job to in_progress; null if already taken
+  claim(id: string): Promise<ItineraryJob | null>
+  // Ids of queued jobs, oldest first
+  listQueued(limit: number): Promise<string[]>
+  // Jobs in progress with activity since `activeSince` (older ones are
+  // assumed to belong to a worker that died)
+  countInProgress(activeSince: Date): Promise<number>
+  // Time out jobs in progress with no activity since `inactiveSince`;
+  // returns their ids
+  expireStale(inactiveSince: Date, reason: string): Promise<string[]>
+}
+
+export const emptyProgress = (): JobProgress => ({
+  completedPhases: [],
+  completedAgents: [],
+  percent: 0,
+})
+
+const isTerminal = (status: JobStatus) => TERMINAL_JOB_STATUSES.includes(status)
+
+/**
+ * Job store backed by ai_generation_sessions
+ */
+export class SupabaseJobStore implements JobStore {
+  async create(
+    userId: string,
+    requirements: TTravelRequirements
+  ): Promise<ItineraryJob> {
+    const supabase = createSupabaseServerClient()
+    const { data, error } = (await supabase
+      .from('ai_generation_sessions')
+      .insert({
+        user_id: userId,
+        session_type: 'itinerary_generation',
+        status: 'initialized',
+        primary_model: 'claude-3-haiku-20240307',
+        metadata: {
+          job: {
+            requirements,
+            progress: emptyProgress(),
+            partialResults: {},
+            eventsToken: randomUUID(),
+          },
+        },
+      } as any)
+      .select('*')
+      .single()) as any
+
+    if (error) {
+      throw new Error(`Failed to create itinerary job: ${error.message}`)
+    }
+    return this.toJob(data)
+  }
+
+  async get(id: string): Promise<ItineraryJob | null> {
+    const supabase = createSupabaseServerClient()
+    const { data, error } = (await supabase
+      .from('ai_generation_sessions')
+      .select('*')
+      .eq('id', id)
+      .eq('session_type', 'itinerary_generation')
+      .maybeSingle()) as any
+
+    if (error) {
+      throw new Error(`Failed to load itinerary job: ${error.message}`)
+    }
+    return data ? this.toJob(data) : null
+  }
+
+  async update(id: string, update: JobUpdate): Promise<void> {
+    const supabase = createSupabaseServerClient()
+
+    // Merge into existing metadata rather than replacing it
+    const { data: existing } = (await supabase
+      .from('ai_generation_sessions')
+      .select('metadata')
+      .eq('id', id)
+      .single()) as any
+
+    const { status, error: jobError, costs, ...jobFields } = update
+    const now = new Date().toISOString()
+    const row: Record<string, unknown> = {
+      last_activity_at: now,
+      metadata: {
+        ...(existing?.metadata || {}),
+        job: { ...(existing?.metadata?.job || {}), ...jobFields },
+        ...(costs ? { costs } : {}),
+      },
+    }
+
+    if (status) {
+      row.status = status
+      if (isTerminal(status)) {
+        row.completed_at = now
+      }
+    }
+    if (jobError !== undefined) {
+      row.error_message = jobError
+    }
+    if (costs) {
+      row.total_tokens_used = costs.llmTokens
+      row.total_cost_usd = costs.estimatedCost
+    }
+
+    const { error } = await supabase
+      .from('ai_generation_sessions')
+      .update(row as any)
+      .eq('id', id)
+
+    if (error) {
+      throw new Error(`Failed to update itinerary job: ${error.message}`)
+    }
+  }
+
+  async claim(id: string): Promise<ItineraryJob | null> {
+    const supabase = createSupabaseServerClient()
+    const { data, error } = (await supabase
+      .from('ai_generation_sessions')
+      .update({
+        status: 'in_progress',
+        last_activity_at: new Date().toISOString(),
+      } as any)
+      .eq('id', id)
+      .eq('status', 'initialized')
+      .select('*')
+      .maybeSingle()) as any
+
+    if (error) {
+      throw new Error(`Failed to claim itinerary job: ${error.message}`)
+    }
+    return data ? this.toJob(data) : null
+  }
+
+  async listQueued(limit: number): Promise<string[]> {
+    const supabase = createSupabaseServerClient()
+    const { data, error } = (await supabase
+      .from('ai_generation_sessions')
+      .select('id')
+      .eq('session_type', 'itinerary_generation')
+      .eq('status', 'initialized')
+      .order('started_at', { ascending: true })
+      .limit(limit)) as any
+
+    if (error) {
+      throw new Error(`Failed to list queued jobs: ${error.message}`)
+    }
+    return (data || []).map((row: { id: string }) => row.id)
+  }
+
+  async countInProgress(activeSince: Date): Promise<number> {
+    const supabase = createSupabaseServerClient()
+    const { count, error } = (await supabase
+      .from('ai_generation_sessions')
+      .select('id', { count: 'exact', head: true })
+      .eq('session_type', 'itinerary_generation')
+      .eq('status', 'in_progress')
+      .gte('last_activity_at', activeSince.toISOString())) as any
+
+    if (error) {
+      throw new Error(`Failed to count running jobs: ${error.message}`)
+    }
+    return count || 0
+  }
+
+  async expireStale(inactiveSince: Date, reason: string): Promise<string[]> {
+    const supabase = createSupabaseServerClient()
+    const now = new Date().toISOString()
+    const { data, error } = (await supabase
+      .from('ai_generation_sessions')
+      .update({
+        status: 'timed_out',
+        error_message: reason,
+        completed_at: now,
+        last_activity_at: now,
+      } as any)
+      .eq('session_type', 'itinerary_generation')
+      .eq('status', 'in_progress')
+      .lt('last_activity_at', inactiveSince.toISOString())
+      .select('id')) as any
+
+    if (error) {
+      throw new Error(`Failed to expire stale jobs: ${error.message}`)
+    }
+    return (data || []).map((row: { id: string }) => row.id)
+  }
+
+  private toJob(row: any): ItineraryJob {
+    const job = row.metadata?.job || {}
+    return {
+      id: row.id,
+      userId: row.user_id,
+      status: row.status,
+      requirements: job.requirements,
+      progress: job.progress || emptyProgress(),
+      partialResults: job.partialResults || {},
+      itinerary: job.itinerary,
+      costs: row.metadata?.costs,
+      error: row.error_message || undefined,
+      eventsToken: job.eventsToken,
+      createdAt: row.started_at,
+      updatedAt: row.last_activity_at,
+      completedAt: row.completed_at || undefined,
+    }
+  }
+}
+
+/**
+ * In-process job store for tests and single-process development
+ */
+export class MemoryJobStore implements JobStore {
+  private jobs = new Map<string, ItineraryJob>()
+  private sequence = 0
+
+  async create(
+    userId: string,
+    requirements: TTravelRequirements
+  ): Promise<ItineraryJob> {
+    const now = new Date().toISOString()
+    const job: ItineraryJob = {
+      id: `job_${Date.now()}_${++this.sequence}`,
+      userId,
+      status: 'initialized',
+      requirements,
+      progress: emptyProgress(),
+      partialResults: {},
+      eventsToken: randomUUID(),
+      createdAt: now,
+      updatedAt: now,
+    }
+    this.jobs.set(job.id, job)
+    return { ...job }
+  }
+
+  async get(id: string): Promise<ItineraryJob | null> {
+    const job = this.jobs.get(id)
+    return job ? { ...job } : null
+  }
+
+  async update(id: string, update: JobUpdate): Promise<void> {
+    const job = this.jobs.get(id)
+    if (!job) {
+      throw new Error(`Unknown itinerary job: ${id}`)
+    }
+
+    const now = new Date().toISOString()
+    Object.assign(job, update, { updatedAt: now })
+    if (update.status && isTerminal(update.status)) {
+      job.completedAt = now
+    }
+  }
+
+  async claim(id: string): Promise<ItineraryJob | null> {
+    const job = this.jobs.get(id)
+    if (!job || job.status !== 'initialized') {
+      return null
+    }
+    job.status = 'in_progress'
+    job.updatedAt = new Date().toISOString()
+    return { ...job }
+  }
+
+  async listQueued(limit: number): Promise<string[]> {
+    return Array.from(this.jobs.values())
+      .filter(job => job.status === 'initialized')
+      .slice(0, limit)
+      .map(job => job.id)
+  }
+
+  async countInProgress(activeSince: Date): Promise<number> {
+    return Array.from(this.jobs.values()).filter(
+      job =>
+        job.status === 'in_progress' &&
+        Date.parse(job.updatedAt) >= activeSince.getTime()
+    ).length
+  }
+
+  async expireStale(inactiveSince: Date, reason: string): Promise<string[]> {
+    const now = new Date().toISOString()
+    const stale = Array.from(this.jobs.values()).filter(
+      job =>
+        job.status === 'in_progress' &&
+        Date.parse(job.updatedAt) < inactiveSince.getTime()
+    )
+    for (const job of stale) {
+      job.status = 'timed_out'
+      job.error = reason
+      job.updatedAt = now
+      job.completedAt = now
+    }
+    return stale.map(job => job.id)
+  }
+}
+
+let globalStore: JobStore | null = null
+
+export function getJobStore(): JobStore {
+  if (!globalStore) {
+    globalStore = new SupabaseJobStore()
+  }
+  return globalStore
+}
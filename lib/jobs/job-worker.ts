@@ -0,0 +1,249 @@
+/**
+ * Itinerary Job Worker
+ * Executes queued itinerary jobs with bounded concurrency, persisting
+ * progress and partial results as the orchestration reports them. Jobs
+ * run independently of the client that submitted them.
+ */
+
+import {
+  orchestrator as defaultOrchestrator,
+  type AgentOrchestrator,
+} from '@/lib/agents/orchestrator'
+import type { OrchestrationEvent, OrchestrationPhase } from '@/lib/agents/types'
+import { Deadline, sleep } from '@/lib/resilience'
+
+import { getJobStore, type ItineraryJob, type JobStore } from './job-store'
+
+// Netlify background functions run for up to 15 minutes
+export const DEFAULT_JOB_TIMEOUT_MS = 14 * 60 * 1000
+
+// A job in progress without activity for longer than a background function
+// can live has lost its worker
+export const STALE_JOB_MS = 15 * 60 * 1000
+
+const STALE_JOB_ERROR = 'Job worker stopped before the job finished'
+
+// Jobs run at once per worker, and across background functions
+export const DEFAULT_JOB_CONCURRENCY = 2
+
+const DEFAULT_POLL_INTERVAL_MS = 2000
+
+// Progress reached when each orchestration phase completes
+const PHASE_PROGRESS: Record<OrchestrationPhase, number> = {
+  planning: 10,
+  research: 60,
+  validation: 80,
+  assembly: 95,
+}
+
+export interface JobWorkerOptions {
+  store?: JobStore
+  orchestrator?: Pick<AgentOrchestrator, 'generateItinerary'>
+  concurrency?: number | undefined
+  jobTimeoutMs?: number | undefined
+  pollIntervalMs?: number | undefined
+}
+
+/**
+ * Whether a job is still marked in progress although its worker can no
+ * longer be running it
+ */
+export function isJobStale(job: ItineraryJob, now = Date.now()): boolean {
+  return (
+    job.status === 'in_progress' && now - Date.parse(job.updatedAt) > STALE_JOB_MS
+  )
+}
+
+/**
+ * Time out jobs left in progress by a worker that died, so clients
+ * polling them or streaming their events see them finish
+ */
+export function expireStaleJobs(
+  store: JobStore = getJobStore()
+): Promise<string[]> {
+  return store.expireStale(new Date(Date.now() - STALE_JOB_MS), STALE_JOB_ERROR)
+}
+
+export class JobWorker {
+  private store: JobStore
+  private orchestrator: Pick<AgentOrchestrator, 'generateItinerary'>
+  private concurrency: number
+  private jobTimeoutMs: number
+  private pollIntervalMs: number
+  private running = new Map<string, Promise<void>>()
+  private waiters: (() => void)[] = []
+  private stopped = true
+
+  constructor(options: JobWorkerOptions = {}) {
+    this.store = options.store || getJobStore()
+    this.orchestrator = options.orchestrator || defaultOrchestrator
+    this.concurrency = Math.max(
+      1,
+      options.concurrency ?? DEFAULT_JOB_CONCURRENCY
+    )
+    this.jobTimeoutMs = options.jobTimeoutMs ?? DEFAULT_JOB_TIMEOUT_MS
+    this.pollIntervalMs = options.pollIntervalMs ?? DEFAULT_POLL_INTERVAL_MS
+  }
+
+  /**
+   * Claim and run one job, waiting for a free slot first. Returns false if
+   * the job was already taken by another worker.
+   */
+  async runJob(jobId: string): Promise<boolean> {
+    await this.acquireSlot()
+
+    // Already running in this worker; hand the slot on to the next waiter
+    if (this.running.has(jobId)) {
+      this.waiters.shift()?.()
+      return false
+    }
+
+    let claimed = false
+    const run = (async () => {
+      const job = await this.store.claim(jobId)
+      if (!job) {
+        return
+      }
+      claimed = true
+      await this.execute(job)
+    })()
+
+    this.running.set(jobId, run)
+    try {
+      await run
+    } finally {
+      this.running.delete(jobId)
+      this.waiters.shift()?.()
+    }
+    return claimed
+  }
+
+  /**
+   * Poll the store for queued jobs until stopped (local development
+   * runner; deployed jobs are started by the background function)
+   */
+  async start(): Promise<void> {
+    this.stopped = false
+
+    while (!this.stopped) {
+      await expireStaleJobs(this.store).catch(error =>
+        console.error('Failed to expire stale itinerary jobs:', error)
+      )
+
+      const free = this.concurrency - this.running.size
+      const queued =
+        free > 0
+          ? await this.store.listQueued(free).catch(error => {
+              console.error('Failed to poll itinerary jobs:', error)
+              return [] as string[]
+            })
+          : []
+
+      for (const jobId of queued) {
+        if (!this.running.has(jobId)) {
+          this.runJob(jobId).catch(error =>
+            console.error(`Itinerary job ${jobId} crashed:`, error)
+          )
+        }
+      }
+
+      await sleep(this.pollIntervalMs)
+    }
+  }
+
+  /**
+   * Stop polling and wait for jobs in flight to finish
+   */
+  async stop(): Promise<void> {
+    this.stopped = true
+    await Promise.allSettled(this.running.values())
+  }
+
+  getActiveJobCount(): number {
+    return this.running.size
+  }
+
+  private async acquireSlot(): Promise<void> {
+    while (this.running.size >= this.concurrency) {
+      await new Promise<void>(resolve => this.waiters.push(resolve))
+    }
+  }
+
+  private async execute(job: ItineraryJob): Promise<void> {
+    const deadline = new Deadline(this.jobTimeoutMs)
+    const progress = { ...job.progress }
+    const partialResults = { ...job.partialResults }
+    let failure: string | undefined
+
+    // Progress writes are chained so they land in order and never race
+    // the final update
+    let writes = Promise.resolve()
+    const persist = () => {
+      const snapshot = {
+        progress: { ...progress },
+        partialResults: { ...partialResults },
+      }
+      writes = writes
+        .then(() => this.store.update(job.id, snapshot))
+        .catch(error =>
+          console.warn(`Failed to save progress for job ${job.id}:`, error)
+        )
+    }
+
+    const onEvent = (event: OrchestrationEvent) => {
+      if (event.type === 'phase') {
+        progress.phase = event.phase
+        if (event.status === 'completed') {
+          progress.completedPhases = [...progress.completedPhases, event.phase]
+          progress.percent = PHASE_PROGRESS[event.phase]
+        }
+        persist()
+      } else if (event.type === 'research') {
+        progress.completedAgents = [
+          ...progress.completedAgents,
+          event.agentType,
+        ]
+        partialResults[event.agentType] = event.output.recommendations
+        persist()
+      } else if (event.type === 'error') {
+        failure = event.error
+      }
+    }
+
+    try {
+      const result = await this.orchestrator.generateItinerary(
+        job.requirements,
+        undefined,
+        undefined,
+        { onEvent, deadline }
+      )
+      await writes
+
+      if (result.success && result.itinerary) {
+        await this.store.update(job.id, {
+          status: 'completed',
+          progress: { ...progress, percent: 100 },
+          partialResults,
+          itinerary: result.itinerary,
+          costs: result.costs,
+        })
+      } else {
+        await this.store.update(job.id, {
+          status: deadline.isExpired() ? 'timed_out' : 'failed',
+          progress,
+          partialResults,
+          costs: result.costs,
+          error: failure || 'Failed to generate itinerary',
+        })
+      }
+    } catch (error) {
+      await writes
+      await this.store.update(job.id, {
+        status: deadline.isExpired() ? 'timed_out' : 'failed',
+        error: error instanceof Error ? error.message : 'Unknown error',
+      })
+    } finally {
+      deadline.dispose()
+    }
+  }
+}
@@ -7,6 +7,9 @@ import { ChatAnthropic } from '@langchain/anthropic'
 import { ChatOpenAI } from '@langchain/openai'
 import { z } from 'zod'
 
+import { rateLimitedFetch } from '@/lib/llm/client-registry'
+import { getCircuitBreaker, type CircuitBreaker } from '@/lib/resilience'
+
 // LangChain provider configuration
 export const langChainConfigSchema = z.object({
   anthropic: z.object({
@@ -26,6 +29,9 @@ export const langChainConfigSchema = z.object({
 
 export type TLangChainConfig = z.infer<typeof langChainConfigSchema>
 
+// LangChain calls are user-facing and are admitted at the fetch layer
+const ADMIT = { admit: true, priority: 'interactive' } as const
+
 // Error types for LangChain operations
 export type LangChainErrorType =
   | 'initialization'
@@ -81,6 +87,11 @@ export class LangChainManager {
           model: this.config.anthropic.model,
           temperature: this.config.anthropic.temperature,
           maxTokens: this.config.anthropic.maxTokens,
+          // LangChain manages its own client and retries; share the
+          // registry's keep-alive connections, and admit each request
+          // against the model's rate limits
+          clientOptions: { fetch: rateLimitedFetch('anthropic', ADMIT) },
+          callbacks: [this.circuitCallbacks('anthropic')],
         })
       }
     } catch (error) {
@@ -95,6 +106,8 @@ export class LangChainManager {
           model: this.config.openai.model,
           temperature: this.config.openai.temperature,
           maxTokens: this.config.openai.maxTokens,
+          configuration: { fetch: rateLimitedFetch('openai', ADMIT) },
+          callbacks: [this.circuitCallbacks('openai')],
         })
       }
     } catch (error) {
@@ -108,20 +121,44 @@ export class LangChainManager {
     }
   }
 
-  // Get the preferred chat model
+  // Shared circuit breaker for a provider's configured model
+  private getCircuit(provider: 'anthropic' | 'openai'): CircuitBreaker {
+    return getCircuitBreaker(provider, this.config[provider].model)
+  }
+
+  // Report each model call's outcome to the provider's circuit breaker
+  private circuitCallbacks(provider: 'anthropic' | 'openai') {
+    return {
+      handleLLMEnd: () => this.getCircuit(provider).recordSuccess(),
+      handleLLMError: (error: unknown) =>
+        this.getCircuit(provider).recordFailure(error),
+    }
+  }
+
+  // Get the preferred chat model. A provider whose circuit is open is
+  // skipped; with no healthy provider there is no model, so callers fail
+  // fast.
   getChatModel(provider?: 'anthropic' | 'openai') {
     const requestedProvider = provider || this.config.defaultProvider
-
-    if (requestedProvider === 'anthropic' && this.anthropicChat) {
-      return this.anthropicChat
+    const anthropicChat =
+      this.anthropicChat && this.getCircuit('anthropic').isAvailable()
+        ? this.anthropicChat
+        : null
+    const openaiChat =
+      this.openaiChat && this.getCircuit('openai').isAvailable()
+        ? this.openaiChat
+        : null
+
+    if (requestedProvider === 'anthropic' && anthropicChat) {
+      return anthropicChat
     }
 
-    if (requestedProvider === 'openai' && this.openaiChat) {
-      return this.openaiChat
+    if (requestedProvider === 'openai' && openaiChat) {
+      return openaiChat
     }
 
     // Fallback to available provider
-    return this.anthropicChat || this.openaiChat
+    return anthropicChat || openaiChat
   }
 
   // Get available providers
@@ -0,0 +1,79 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * Unit Tests for the LLM client registry
+ */
+
+import { createServer, type Server } from 'node:http'
+import type { AddressInfo } from 'node:net'
+
+import {
+  getAnthropicClient,
+  keepAliveFetch,
+  resetClientRegistry,
+} from '../client-registry'
+
+describe('getAnthropicClient', () => {
+  afterEach(() => {
+    resetClientRegistry()
+  })
+
+  it('shares one client per API key and base URL', () => {
+    const client = getAnthropicClient({ apiKey: 'key-a' })
+
+    expect(getAnthropicClient({ apiKey: 'key-a' })).toBe(client)
+    expect(getAnthropicClient({ apiKey: 'key-b' })).not.toBe(client)
+    expect(
+      getAnthropicClient({ apiKey: 'key-a', baseURL: 'http://localhost:8787' })
+    ).not.toBe(client)
+  })
+})
+
+describe('keepAliveFetch', () => {
+  let server: Server
+  let baseUrl: string
+  let connections: number
+
+  beforeEach(done => {
+    connections = 0
+    server = createServer((request, response) => {
+      let body = ''
+      request.on('data', chunk => (body += chunk))
+      request.on('end', () => {
+        response.setHeader('content-type', 'application/json')
+        response.end(JSON.stringify({ method: request.method, body }))
+      })
+    })
+    server.on('connection', () => connections++)
+    server.listen(0, () => {
+      baseUrl = `http://127.0.0.1:${(server.address() as AddressInfo).port}`
+      done()
+    })
+  })
+
+  afterEach(done => {
+    server.closeAllConnections()
+    server.close(() => done())
+  })
+
+  it('returns fetch responses and reuses the connection', async () => {
+    for (const text of ['first', 'second']) {
+      const response = await keepAliveFetch(`${baseUrl}/v1/messages`, {
+        method: 'POST',
+        headers: { 'content-type': 'application/json' },
+        body: text,
+      })
+
+      expect(response.status).toBe(200)
+      expect(response.headers.get('content-type')).toBe('application/json')
+      await expect(response.json()).resolves.toEqual({
+        method: 'POST',
+        body: text,
+      })
+    }
+
+    expect(connections).toBe(1)
+  })
+})
@@ -0,0 +1,58 @@
+/**
+ * Unit Tests for the LLM record/replay fixtures
+ */
+
+import { mkdtempSync, rmSync } from 'node:fs'
+import { tmpdir } from 'node:os'
+import { join } from 'node:path'
+
+import { FixtureStore, getFixtureKey } from '../fixtures'
+
+describe('getFixtureKey', () => {
+  it('ignores property order but not content', () => {
+    expect(getFixtureKey({ model: 'haiku', prompt: 'Pittsburgh' })).toBe(
+      getFixtureKey({ prompt: 'Pittsburgh', model: 'haiku' })
+    )
+    expect(getFixtureKey({ prompt: 'Pittsburgh' })).not.toBe(
+      getFixtureKey({ prompt: 'Asheville' })
+    )
+  })
+})
+
+describe('FixtureStore', () => {
+  let dir: string
+  let file: string
+
+  beforeEach(() => {
+    dir = mkdtempSync(join(tmpdir(), 'llm-fixtures-'))
+    file = join(dir, 'fixtures.json')
+  })
+
+  afterEach(() => {
+    rmSync(dir, { recursive: true, force: true })
+  })
+
+  it('replays recorded responses without calling the provider', async () => {
+    const request = { model: 'haiku', prompt: 'Find lodging in Pittsburgh' }
+    const response = { content: [{ type: 'text', text: '{"ok":true}' }] }
+
+    const recorder = new FixtureStore('record', file)
+    await expect(recorder.run(request, async () => response)).resolves.toBe(
+      response
+    )
+
+    const replayer = new FixtureStore('replay', file, 0)
+    const send = jest.fn(async () => ({ content: [] }))
+    await expect(replayer.run(request, send)).resolves.toEqual(response)
+    expect(send).not.toHaveBeenCalled()
+  })
+
+  it('fails replay for requests that were never recorded', async () => {
+    await new FixtureStore('record', file).run({ prompt: 'a' }, async () => 'a')
+
+    const replayer = new FixtureStore('replay', file, 0)
+    await expect(
+      replayer.run({ prompt: 'b' }, async () => 'b')
+    ).rejects.toThrow('No LLM fixture recorded')
+  })
+})
@@ -6,6 +6,10 @@
 import Anthropic from '@anthropic-ai/sdk'
 import { z } from 'zod'
 
+import type { AbortOptions } from '@/lib/resilience'
+
+import { getAnthropicClient } from './client-registry'
+
 // Claude request schema
 export const claudeRequestSchema = z.object({
   messages: z.array(
@@ -69,13 +73,14 @@ export class AnthropicClient {
       )
     }
 
-    this.client = new Anthropic({
-      apiKey: key,
-    })
+    this.client = getAnthropicClient({ apiKey: key })
   }
 
   // Generate text using Claude
-  async generateText(request: TClaudeRequest): Promise<TClaudeResponse> {
+  async generateText(
+    request: TClaudeRequest,
+    options: AbortOptions = {}
+  ): Promise<TClaudeResponse> {
     const validatedRequest = claudeRequestSchema.parse(request)
 
     try {
@@ -93,7 +98,10 @@ export class AnthropicClient {
         requestParams.system = validatedRequest.system
       }
 
-      const response = await this.client.messages.create(requestParams)
+      const response = await this.client.messages.create(
+        requestParams,
+        options.signal ? { signal: options.signal } : undefined
+      )
 
       // Extract content from response
       const content = response.content
@@ -0,0 +1,242 @@
+/**
+ * LLM Client Registry
+ * Process-wide Anthropic SDK clients, one per API key and base URL, so
+ * agents and warm function invocations reuse the same client instead of
+ * building their own. Every client sends through a shared keep-alive
+ * HTTP agent with a capped socket pool and a DNS cache, so requests reuse
+ * warm TLS connections rather than handshaking on every call, and reports
+ * each response's rate-limit headers to the model's admission controller.
+ */
+
+import { lookup as dnsLookup, type LookupAddress } from 'node:dns'
+import http from 'node:http'
+import https from 'node:https'
+import type { LookupFunction } from 'node:net'
+import { Readable } from 'node:stream'
+
+import Anthropic from '@anthropic-ai/sdk'
+
+import { getAnthropicBaseUrl } from '@/lib/config/endpoints'
+import {
+  getAdmissionController,
+  type AdmissionPriority,
+} from '@/lib/resilience'
+
+// Sockets per origin; beyond this requests queue on the agent
+const MAX_SOCKETS = 50
+const MAX_FREE_SOCKETS = 10
+const DNS_TTL_MS = 60_000
+
+interface CachedAddresses {
+  addresses: LookupAddress[]
+  expiresAt: number
+}
+
+const dnsCache = new Map<string, CachedAddresses>()
+
+/**
+ * dns.lookup with a short-lived cache, so a burst of new connections to
+ * the same host resolves it once
+ */
+const cachedLookup: LookupFunction = (hostname, options, callback) => {
+  const family = Number(options.family) || 0
+
+  const respond = (addresses: LookupAddress[]) => {
+    const matching = family
+      ? addresses.filter(address => address.family === family)
+      : addresses
+    const first = matching[0]
+    if (!first) {
+      dnsLookup(hostname, options, callback)
+    } else if (options.all) {
+      callback(null, matching)
+    } else {
+      callback(null, first.address, first.family)
+    }
+  }
+
+  const cached = dnsCache.get(hostname)
+  if (cached && cached.expiresAt > Date.now()) {
+    respond(cached.addresses)
+    return
+  }
+
+  dnsLookup(hostname, { all: true }, (error, addresses) => {
+    if (error) {
+      callback(error, '')
+      return
+    }
+    dnsCache.set(hostname, {
+      addresses,
+      expiresAt: Date.now() + DNS_TTL_MS,
+    })
+    respond(addresses)
+  })
+}
+
+const agentOptions = {
+  keepAlive: true,
+  maxSockets: MAX_SOCKETS,
+  maxFreeSockets: MAX_FREE_SOCKETS,
+  // Reuse the most recently used socket, which is least likely to have
+  // been closed by the server while idle
+  scheduling: 'lifo' as const,
+  lookup: cachedLookup,
+}
+
+const httpsAgent = new https.Agent(agentOptions)
+// Plain HTTP is only used against the local mock providers server
+const httpAgent = new http.Agent(agentOptions)
+
+/**
+ * fetch implementation for the SDK that sends through the shared agents.
+ * Bodies other than strings and bytes (e.g. file uploads) fall back to
+ * the global fetch.
+ */
+export function keepAliveFetch(
+  input: string | URL | Request,
+  init: RequestInit = {}
+): Promise<Response> {
+  const body = init.body
+  if (
+    input instanceof Request ||
+    (body != null && typeof body !== 'string' && !(body instanceof Uint8Array))
+  ) {
+    return fetch(input, init)
+  }
+
+  const url = new URL(input)
+  const method = (init.method || 'GET').toUpperCase()
+  const transport = url.protocol === 'http:' ? http : https
+
+  return new Promise((resolve, reject) => {
+    const request = transport.request(
+      url,
+      {
+        method,
+        headers: Object.fromEntries(new Headers(init.headers).entries()),
+        agent: url.protocol === 'http:' ? httpAgent : httpsAgent,
+        signal: init.signal ?? undefined,
+      },
+      response => {
+        const headers = new Headers()
+        for (const [name, value] of Object.entries(response.headers)) {
+          for (const item of [value ?? []].flat()) {
+            headers.append(name, item)
+          }
+        }
+
+        const status = response.statusCode || 500
+        const hasBody = method !== 'HEAD' && status !== 204 && status !== 304
+        resolve(
+          new Response(
+            hasBody
+              ? (Readable.toWeb(response) as unknown as ReadableStream)
+              : null,
+            { status, statusText: response.statusMessage || '', headers }
+          )
+        )
+      }
+    )
+
+    request.on('error', reject)
+    request.end(body ?? undefined)
+  })
+}
+
+// Top-level fields of a JSON request body. Quotes inside prompt text are
+// escaped, so they cannot match.
+const MODEL_FIELD = /"model"\s*:\s*"([^"]+)"/
+const MAX_TOKENS_FIELD = /"max_(?:completion_)?tokens"\s*:\s*(\d+)/
+
+export interface RateLimitedFetchOptions {
+  // Also wait for admission before sending, estimating usage from the
+  // body. For clients, like LangChain's, that cannot be admitted at the
+  // call site.
+  admit?: boolean
+  priority?: AdmissionPriority
+}
+
+/**
+ * keepAliveFetch that keeps the admission controller for the request's
+ * model in step with the rate-limit headers on each response
+ */
+export function rateLimitedFetch(
+  provider: string,
+  options: RateLimitedFetchOptions = {}
+): typeof keepAliveFetch {
+  return async (input, init = {}) => {
+    const body = typeof init.body === 'string' ? init.body : ''
+    const model = MODEL_FIELD.exec(body)?.[1]
+    if (!model) {
+      return keepAliveFetch(input, init)
+    }
+
+    const controller = getAdmissionController(provider, model)
+    const ticket = options.admit
+      ? await controller.acquire({
+          inputTokens: Math.ceil(body.length / 4),
+          outputTokens: Number(MAX_TOKENS_FIELD.exec(body)?.[1] ?? 0),
+          priority: options.priority,
+          signal: init.signal ?? undefined,
+        })
+      : null
+
+    let response: Response
+    try {
+      response = await keepAliveFetch(input, init)
+    } catch (error) {
+      ticket?.settle()
+      throw error
+    }
+    // The headers count this call's usage, so settling afterwards only
+    // releases its reservation. Without a ticket of its own the call is
+    // the one its admission controller is running, if any.
+    controller.updateFromHeaders(response.headers, ticket ?? undefined)
+    ticket?.settle()
+    return response
+  }
+}
+
+const anthropicFetch = rateLimitedFetch('anthropic')
+
+export interface AnthropicClientOptions {
+  apiKey?: string | undefined
+  baseURL?: string | undefined
+}
+
+const anthropicClients = new Map<string, Anthropic>()
+
+/**
+ * Shared Anthropic client for an API key and base URL. Defaults to
+ * ANTHROPIC_API_KEY and the configured Anthropic endpoint.
+ */
+export function getAnthropicClient(
+  options: AnthropicClientOptions = {}
+): Anthropic {
+  const apiKey = options.apiKey || process.env.ANTHROPIC_API_KEY || ''
+  const baseURL = options.baseURL || getAnthropicBaseUrl()
+  const key = `${baseURL}|${apiKey}`
+
+  let client = anthropicClients.get(key)
+  if (!client) {
+    // Retries are left to the shared retry policy (lib/resilience) so they
+    // are not stacked on top of the SDK's own
+    client = new Anthropic({
+      apiKey,
+      baseURL,
+      fetch: anthropicFetch,
+      maxRetries: 0,
+    })
+    anthropicClients.set(key, client)
+  }
+  return client
+}
+
+/**
+ * Drop every registered client and cached DNS entry (used by tests)
+ */
+export function resetClientRegistry(): void {
+  anthropicClients.clear()
+  dnsCache.clear()
+}
@@ -0,0 +1,137 @@
+/**
+ * LLM Fixtures
+ * Record/replay layer for deterministic, offline benchmarks. In record mode
+ * every LLM response is saved with its observed latency under a hash of
+ * the request; in replay mode the saved response is served after the
+ * recorded latency (optionally scaled) without calling the provider.
+ *
+ *   LLM_FIXTURE_MODE=record|replay   (unset = off)
+ *   LLM_FIXTURE_FILE=fixtures/llm.json
+ *   LLM_FIXTURE_LATENCY_SCALE=1      (0 replays instantly)
+ */
+
+import { createHash } from 'node:crypto'
+import { existsSync, mkdirSync, readFileSync, writeFileSync } from 'node:fs'
+import { dirname } from 'node:path'
+
+import { sleep } from '@/lib/resilience'
+
+export type FixtureMode = 'record' | 'replay'
+
+export interface LLMFixture {
+  response: unknown
+  latencyMs: number
+  recordedAt: string
+}
+
+const DEFAULT_FIXTURE_FILE = 'fixtures/llm-fixtures.json'
+
+/**
+ * Stable hash of a request: object keys are sorted so equivalent
+ * requests match regardless of property order
+ */
+export function getFixtureKey(request: unknown): string {
+  const canonical = JSON.stringify(request, (_key, value) =>
+    value && typeof value === 'object' && !Array.isArray(value)
+      ? Object.fromEntries(
+          Object.entries(value).sort(([a], [b]) => a.localeCompare(b))
+        )
+      : value
+  )
+  return createHash('sha256').update(canonical).digest('hex')
+}
+
+export class FixtureStore {
+  readonly mode: FixtureMode
+  private file: string
+  private latencyScale: number
+  private fixtures: Record<string, LLMFixture> = {}
+
+  constructor(mode: FixtureMode, file: string, latencyScale = 1) {
+    this.mode = mode
+    this.file = file
+    this.latencyScale = latencyScale
+
+    if (existsSync(file)) {
+      this.fixtures = JSON.parse(readFileSync(file, 'utf8'))
+    } else if (mode === 'replay') {
+      throw new Error(`LLM fixture file not found: ${file}`)
+    }
+  }
+
+  /**
+   * Serve `request` from the fixture file (replay) or send it and save the
+   * response (record)
+   */
+  async run<T>(
+    request: unknown,
+    send: () => Promise<T>,
+    signal?: AbortSignal
+  ): Promise<T> {
+    const key = getFixtureKey(request)
+
+    if (this.mode === 'replay') {
+      const fixture = this.fixtures[key]
+      if (!fixture) {
+        throw new Error(`No LLM fixture recorded for request ${key}`)
+      }
+      await sleep(fixture.latencyMs * this.latencyScale, signal)
+      // Callers may modify the response; keep the fixture intact
+      return JSON.parse(JSON.stringify(fixture.response)) as T
+    }
+
+    const startTime = Date.now()
+    const response = await send()
+    this.fixtures[key] = {
+      response,
+      latencyMs: Date.now() - startTime,
+      recordedAt: new Date().toISOString(),
+    }
+    this.save()
+    return response
+  }
+
+  get size(): number {
+    return Object.keys(this.fixtures).length
+  }
+
+  // Written after every recording so an interrupted run keeps its fixtures
+  private save(): void {
+    mkdirSync(dirname(this.file), { recursive: true })
+    writeFileSync(this.file, JSON.stringify(this.fixtures, null, 2))
+  }
+}
+
+let globalFixtureStore: FixtureStore | null | undefined
+
+/**
+ * Fixture store configured by LLM_FIXTURE_MODE, or null when fixtures are
+ * off. Reads process.env directly so the simple functions can use it.
+ */
+export function getFixtureStore(): FixtureStore | null {
+  if (globalFixtureStore === undefined) {
+    const mode = process.env.LLM_FIXTURE_MODE
+    globalFixtureStore =
+      mode === 'record' || mode === 'replay'
+        ? new FixtureStore(
+            mode,
+            process.env.LLM_FIXTURE_FILE || DEFAULT_FIXTURE_FILE,
+            // A blank value, as in .env.example, keeps the default
+            Number(process.env.LLM_FIXTURE_LATENCY_SCALE || 1)
+          )
+        : null
+  }
+  return globalFixtureStore
+}
+
+/**
+ * Send an LLM request through the fixture store when one is configured
+ */
+export function withFixture<T>(
+  request: unknown,
+  send: () => Promise<T>,
+  signal?: AbortSignal
+): Promise<T> {
+  const store = getFixtureStore()
+  return store ? store.run(request, send, signal) : send()
+}
@@ -5,7 +5,16 @@
 
 import { z } from 'zod'
 
+import {
+  CircuitOpenError,
+  getAdmissionController,
+  getCircuitBreaker,
+  withRetry,
+  type AbortOptions,
+} from '@/lib/resilience'
+
 import { AnthropicClient, ClaudeError } from './anthropic'
+import { withFixture } from './fixtures'
 import { OpenAIClient, OpenAIError } from './openai'
 
 // Unified request schema
@@ -41,6 +50,12 @@ export type TLLMResponse = z.infer<typeof llmResponseSchema>
 // Provider preference
 export type LLMProvider = 'anthropic' | 'openai' | 'auto'
 
+// Model used for each provider
+const PROVIDER_MODELS = {
+  anthropic: 'claude-3-5-sonnet-20241022',
+  openai: 'gpt-4',
+} as const
+
 // Error types
 export type LLMErrorType =
   | 'authentication'
@@ -96,50 +111,42 @@ export class LLMManager {
   // Main text generation method with automatic fallback
   async generateText(
     request: TLLMRequest,
-    provider: LLMProvider = 'auto'
+    provider: LLMProvider = 'auto',
+    options: AbortOptions = {}
   ): Promise<TLLMResponse> {
     const validatedRequest = llmRequestSchema.parse(request)
-    let attempts = 0
     let lastError: LLMError | null = null
 
     const providers = this.getProviderOrder(provider)
 
     for (const providerName of providers) {
-      attempts++
       try {
-        const response = await this.callProvider(providerName, validatedRequest)
-        return response
+        // Rate limit and server errors are retried per the shared retry
+        // policy; authentication and invalid requests are not
+        return await withRetry(
+          () => this.callProvider(providerName, validatedRequest, options),
+          {
+            maxAttempts: this.retryAttempts + 1,
+            signal: options.signal,
+            onRetry: (_error, _attempt, delayMs) =>
+              console.warn(
+                `${providerName} error, retrying in ${Math.round(delayMs)}ms...`
+              ),
+          }
+        )
       } catch (error) {
         lastError = this.normalizeError(error, providerName)
 
-        // Don't retry on authentication or invalid request errors
-        if (
-          lastError.type === 'authentication' ||
-          lastError.type === 'invalid_request'
-        ) {
-          if (this.fallbackEnabled && providers.length > 1) {
-            console.warn(
-              `${providerName} error (${lastError.type}), trying fallback...`
-            )
-            continue
-          }
+        // The caller gave up; don't fall back
+        if (options.signal?.aborted) {
           throw lastError
         }
 
-        // Retry on rate limit or server errors
-        if (
-          (lastError.type === 'rate_limit' ||
-            lastError.type === 'server_error') &&
-          attempts <= this.retryAttempts
-        ) {
-          console.warn(`${providerName} error, retrying in 1s...`)
-          await new Promise(resolve => setTimeout(resolve, 1000))
-          continue
-        }
-
         // Try fallback provider
         if (this.fallbackEnabled && providers.length > 1) {
-          console.warn(`${providerName} failed, trying fallback...`)
+          console.warn(
+            `${providerName} error (${lastError.type}), trying fallback...`
+          )
           continue
         }
 
@@ -157,14 +164,16 @@ export class LLMManager {
   async generateJson<T>(
     request: TLLMRequest,
     schema: z.ZodType<T>,
-    provider: LLMProvider = 'auto'
+    provider: LLMProvider = 'auto',
+    options: AbortOptions = {}
   ): Promise<{ data: T; response: TLLMResponse }> {
     const response = await this.generateText(
       {
         ...request,
         systemPrompt: `${request.systemPrompt || ''}\n\nIMPORTANT: Respond with valid JSON only. No additional text or explanation.`,
       },
-      provider
+      provider,
+      options
     )
 
     try {
@@ -190,7 +199,8 @@ export class LLMManager {
   async chat(
     message: string,
     systemPrompt?: string,
-    provider: LLMProvider = 'auto'
+    provider: LLMProvider = 'auto',
+    options: AbortOptions = {}
   ): Promise<string> {
     const response = await this.generateText(
       {
@@ -199,7 +209,8 @@ export class LLMManager {
         maxTokens: 2000,
         temperature: 0.7,
       },
-      provider
+      provider,
+      options
     )
 
     return response.content
@@ -283,10 +294,44 @@ Focus on distinctive, less obvious choices that match their interests.`
     }
   }
 
-  // Provider-specific call handler
+  // Provider-specific call handler; served from LLM fixtures when
+  // LLM_FIXTURE_MODE is set
   private async callProvider(
     provider: 'anthropic' | 'openai',
-    request: TLLMRequest
+    request: TLLMRequest,
+    options: AbortOptions = {}
+  ): Promise<TLLMResponse> {
+    const model = PROVIDER_MODELS[provider]
+    const promptLength = request.messages.reduce(
+      (length, message) => length + message.content.length,
+      request.systemPrompt?.length || 0
+    )
+
+    // While the provider's circuit is open this fails fast, so
+    // generateText moves straight on to the fallback provider. Otherwise
+    // the call waits until it fits within the model's rate limits.
+    return withFixture(
+      { provider, request },
+      () =>
+        getCircuitBreaker(provider, model).execute(() =>
+          getAdmissionController(provider, model).run(
+            {
+              inputTokens: Math.ceil(promptLength / 4),
+              outputTokens: request.maxTokens,
+              signal: options.signal,
+            },
+            () => this.sendToProvider(provider, request, options),
+            response => response.usage
+          )
+        ),
+      options.signal
+    )
+  }
+
+  private async sendToProvider(
+    provider: 'anthropic' | 'openai',
+    request: TLLMRequest,
+    options: AbortOptions
   ): Promise<TLLMResponse> {
     if (provider === 'anthropic') {
       if (!this.anthropicClient) {
@@ -294,13 +339,16 @@ Focus on distinctive, less obvious choices that match their interests.`
       }
 
       const messages = request.messages.filter(m => m.role !== 'system')
-      const claudeResponse = await this.anthropicClient.generateText({
-        messages: messages as any,
-        system: request.systemPrompt,
-        max_tokens: request.maxTokens,
-        temperature: request.temperature,
-        model: 'claude-3-5-sonnet-20241022',
-      })
+      const claudeResponse = await this.anthropicClient.generateText(
+        {
+          messages: messages as any,
+          system: request.systemPrompt,
+          max_tokens: request.maxTokens,
+          temperature: request.temperature,
+          model: PROVIDER_MODELS.anthropic,
+        },
+        options
+      )
 
       return {
         content: claudeResponse.content,
@@ -328,12 +376,15 @@ Focus on distinctive, less obvious choices that match their interests.`
         messages.unshift({ role: 'system', content: request.systemPrompt })
       }
 
-      const openAIResponse = await this.openAIClient.generateText({
-        messages: messages as any,
-        max_tokens: request.maxTokens,
-        temperature: request.temperature,
-        model: 'gpt-4',
-      })
+      const openAIResponse = await this.openAIClient.generateText(
+        {
+          messages: messages as any,
+          max_tokens: request.maxTokens,
+          temperature: request.temperature,
+          model: PROVIDER_MODELS.openai,
+        },
+        options
+      )
 
       return {
         content: openAIResponse.content,
@@ -384,7 +435,9 @@ Focus on distinctive, less obvious choices that match their interests.`
 
     llmError.provider = provider
 
-    if (error.type) {
+    if (error instanceof CircuitOpenError) {
+      llmError.type = 'provider_unavailable'
+    } else if (error.type) {
       llmError.type = error.type
     } else if (error.statusCode) {
       llmError.statusCode = error.statusCode
@@ -6,6 +6,10 @@
 import OpenAI from 'openai'
 import { z } from 'zod'
 
+import type { AbortOptions } from '@/lib/resilience'
+
+import { rateLimitedFetch } from './client-registry'
+
 // OpenAI request schema
 export const openAIRequestSchema = z.object({
   messages: z.array(
@@ -65,22 +69,31 @@ export class OpenAIClient {
       )
     }
 
+    // Retries are left to the shared retry policy (lib/resilience)
     this.client = new OpenAI({
       apiKey: key,
+      maxRetries: 0,
+      fetch: rateLimitedFetch('openai'),
     })
   }
 
   // Generate text using GPT
-  async generateText(request: TOpenAIRequest): Promise<TOpenAIResponse> {
+  async generateText(
+    request: TOpenAIRequest,
+    options: AbortOptions = {}
+  ): Promise<TOpenAIResponse> {
     const validatedRequest = openAIRequestSchema.parse(request)
 
     try {
-      const response = await this.client.chat.completions.create({
-        model: validatedRequest.model,
-        messages: validatedRequest.messages,
-        max_tokens: validatedRequest.max_tokens,
-        temperature: validatedRequest.temperature,
-      })
+      const response = await this.client.chat.completions.create(
+        {
+          model: validatedRequest.model,
+          messages: validatedRequest.messages,
+          max_tokens: validatedRequest.max_tokens,
+          temperature: validatedRequest.temperature,
+        },
+        options.signal ? { signal: options.signal } : undefined
+      )
 
       const choice = response.choices[0]
       if (!choice?.message?.content) {
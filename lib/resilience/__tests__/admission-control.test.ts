@@ -0,0 +1,140 @@
+/**
+ * Unit Tests for LLM admission control
+ */
+
+import { AdmissionController } from '../admission-control'
+
+const limits = {
+  requestsPerMinute: 1,
+  inputTokensPerMinute: 1000,
+  outputTokensPerMinute: 1000,
+}
+
+const call = { inputTokens: 100, outputTokens: 100 }
+
+const headers = (values: Record<string, string>) => ({
+  get: (name: string) => values[name] ?? null,
+})
+
+describe('AdmissionController', () => {
+  beforeEach(() => {
+    jest.useFakeTimers()
+  })
+
+  afterEach(() => {
+    jest.useRealTimers()
+  })
+
+  it('queues calls until the request bucket refills', async () => {
+    const controller = new AdmissionController('anthropic:test', limits)
+    await controller.acquire(call)
+
+    let admitted = false
+    const pending = controller.acquire(call).then(() => (admitted = true))
+    await Promise.resolve()
+    expect(admitted).toBe(false)
+    expect(controller.getStats().queued).toBe(1)
+
+    jest.advanceTimersByTime(60000)
+    await pending
+    expect(admitted).toBe(true)
+  })
+
+  it('admits interactive calls ahead of background calls', async () => {
+    const controller = new AdmissionController('anthropic:test', limits)
+    await controller.acquire(call)
+
+    const order: string[] = []
+    for (const priority of ['background', 'interactive'] as const) {
+      controller.acquire({ ...call, priority }).then(() => order.push(priority))
+    }
+
+    jest.advanceTimersByTime(60000)
+    await Promise.resolve()
+    expect(order).toEqual(['interactive'])
+  })
+
+  it('returns unused output tokens when a call settles', async () => {
+    const controller = new AdmissionController('anthropic:test', {
+      ...limits,
+      requestsPerMinute: 10,
+    })
+    const ticket = await controller.acquire({ ...call, outputTokens: 800 })
+    expect(controller.getStats().available.outputTokens).toBe(200)
+
+    ticket.settle({ inputTokens: 100, outputTokens: 50 })
+    expect(controller.getStats().available.outputTokens).toBe(950)
+  })
+
+  it('follows the headers of the call being run instead of its reservation', async () => {
+    const controller = new AdmissionController('anthropic:test', {
+      ...limits,
+      requestsPerMinute: 10,
+    })
+
+    // The SDK's fetch applies the response headers before the caller
+    // settles with the usage it read from the result
+    await controller.run(
+      { ...call, outputTokens: 800 },
+      async () => {
+        expect(controller.getStats().available.outputTokens).toBe(200)
+        controller.updateFromHeaders(
+          headers({ 'anthropic-ratelimit-output-tokens-remaining': '950' })
+        )
+        return { inputTokens: 100, outputTokens: 50 }
+      },
+      usage => usage
+    )
+
+    expect(controller.getStats().available.outputTokens).toBe(950)
+  })
+
+  it('holds back calls the headers do not count yet', async () => {
+    const controller = new AdmissionController('anthropic:test', {
+      ...limits,
+      requestsPerMinute: 10,
+    })
+    const first = await controller.acquire({ ...call, outputTokens: 300 })
+    const second = await controller.acquire({ ...call, outputTokens: 300 })
+
+    // The second call's response counts its own 50 tokens, not the first
+    // call's, which is still in flight
+    controller.updateFromHeaders(
+      headers({ 'anthropic-ratelimit-output-tokens-remaining': '950' }),
+      second
+    )
+    expect(controller.getStats().available.outputTokens).toBe(650)
+
+    second.settle({ inputTokens: 100, outputTokens: 50 })
+    first.settle({ inputTokens: 100, outputTokens: 100 })
+    expect(controller.getStats().available.outputTokens).toBe(850)
+  })
+
+  it('follows the rate-limit headers', () => {
+    const controller = new AdmissionController('anthropic:test', limits)
+    controller.updateFromHeaders(
+      headers({
+        'anthropic-ratelimit-requests-limit': '4000',
+        'anthropic-ratelimit-requests-remaining': '12',
+        'anthropic-ratelimit-input-tokens-remaining': '500',
+      })
+    )
+
+    const { available } = controller.getStats()
+    expect(available.requests).toBe(12)
+    expect(available.inputTokens).toBe(500)
+    expect(available.outputTokens).toBe(1000)
+  })
+
+  it('drops queued calls whose signal aborts', async () => {
+    const controller = new AdmissionController('anthropic:test', limits)
+    await controller.acquire(call)
+
+    const abort = new AbortController()
+    const pending = controller.acquire({ ...call, signal: abort.signal })
+    abort.abort(new Error('gave up'))
+
+    await expect(pending).rejects.toThrow('gave up')
+    expect(controller.getStats().queued).toBe(0)
+  })
+})
@@ -0,0 +1,96 @@
+/**
+ * Unit Tests for circuit breakers
+ */
+
+import {
+  CircuitBreaker,
+  CircuitOpenError,
+  getCircuitBreaker,
+  resetCircuitBreakers,
+} from '../circuit-breaker'
+
+const apiError = (status: number) =>
+  Object.assign(new Error(`HTTP ${status}`), { status })
+
+const fail = (breaker: CircuitBreaker, status = 529) =>
+  breaker.execute(() => Promise.reject(apiError(status))).catch(error => error)
+
+describe('CircuitBreaker', () => {
+  beforeEach(() => {
+    jest.useFakeTimers()
+  })
+
+  afterEach(() => {
+    jest.useRealTimers()
+  })
+
+  it('opens after consecutive failures and then fails fast', async () => {
+    const breaker = new CircuitBreaker('anthropic:test', {
+      failureThreshold: 3,
+    })
+    for (let i = 0; i < 3; i++) {
+      await fail(breaker)
+    }
+
+    const operation = jest.fn().mockResolvedValue('ok')
+    const error = await breaker.execute(operation).catch(error => error)
+
+    expect(breaker.getState()).toBe('open')
+    expect(error).toBeInstanceOf(CircuitOpenError)
+    expect(operation).not.toHaveBeenCalled()
+  })
+
+  it('ignores client errors', async () => {
+    const breaker = new CircuitBreaker('anthropic:test', {
+      failureThreshold: 2,
+    })
+    await fail(breaker, 400)
+    await fail(breaker, 400)
+
+    expect(breaker.getState()).toBe('closed')
+  })
+
+  it('lets one probe through after the cool-down', async () => {
+    const breaker = new CircuitBreaker('anthropic:test', {
+      failureThreshold: 1,
+      openMs: 1000,
+    })
+    await fail(breaker)
+    jest.advanceTimersByTime(1000)
+
+    expect(breaker.getState()).toBe('half_open')
+    expect(breaker.tryAcquire()).toBe(true)
+    expect(breaker.tryAcquire()).toBe(false)
+
+    breaker.recordSuccess()
+    expect(breaker.getState()).toBe('closed')
+  })
+
+  it('reopens when the probe fails', async () => {
+    const breaker = new CircuitBreaker('anthropic:test', {
+      failureThreshold: 1,
+      openMs: 1000,
+    })
+    await fail(breaker)
+    jest.advanceTimersByTime(1000)
+    await fail(breaker)
+
+    expect(breaker.getState()).toBe('open')
+    expect(breaker.isAvailable()).toBe(false)
+  })
+})
+
+describe('getCircuitBreaker', () => {
+  afterEach(() => {
+    resetCircuitBreakers()
+  })
+
+  it('shares one breaker per provider and model', () => {
+    const breaker = getCircuitBreaker('anthropic', 'claude-3-haiku')
+
+    expect(getCircuitBreaker('anthropic', 'claude-3-haiku')).toBe(breaker)
+    expect(getCircuitBreaker('anthropic', 'claude-3-5-sonnet')).not.toBe(
+      breaker
+    )
+  })
+})
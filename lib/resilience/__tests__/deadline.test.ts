@@ -0,0 +1,67 @@
+/**
+ * Unit Tests for request Deadlines
+ */
+
+import { Deadline, DeadlineExceededError, sleep } from '../deadline'
+
+describe('Deadline', () => {
+  beforeEach(() => {
+    jest.useFakeTimers()
+  })
+
+  afterEach(() => {
+    jest.useRealTimers()
+  })
+
+  it('aborts its signal when the time runs out', () => {
+    const deadline = new Deadline(1000)
+
+    jest.advanceTimersByTime(999)
+    expect(deadline.signal.aborted).toBe(false)
+
+    jest.advanceTimersByTime(1)
+    expect(deadline.signal.aborted).toBe(true)
+    expect(deadline.signal.reason).toBeInstanceOf(DeadlineExceededError)
+    expect(deadline.remaining()).toBe(0)
+  })
+
+  it('gives a child stage a share of the remaining time', () => {
+    const deadline = new Deadline(10000)
+    const stage = deadline.child(0.25)
+
+    jest.advanceTimersByTime(2500)
+    expect(stage.signal.aborted).toBe(true)
+    expect(deadline.signal.aborted).toBe(false)
+
+    deadline.dispose()
+  })
+
+  it('aborts children when the parent is aborted', () => {
+    const deadline = new Deadline(10000)
+    const stage = deadline.child()
+
+    deadline.abort(new Error('client disconnected'))
+
+    expect(stage.signal.aborted).toBe(true)
+    expect((stage.signal.reason as Error).message).toBe('client disconnected')
+  })
+
+  it('can be pulled in but never extended', () => {
+    const deadline = new Deadline(5000)
+
+    deadline.limit(10000)
+    expect(deadline.remaining()).toBeLessThanOrEqual(5000)
+
+    deadline.limit(1000)
+    jest.advanceTimersByTime(1000)
+    expect(deadline.signal.aborted).toBe(true)
+  })
+
+  it('cuts sleeps short when the signal aborts', async () => {
+    const deadline = new Deadline(100)
+    const pending = sleep(5000, deadline.signal)
+
+    jest.advanceTimersByTime(100)
+    await expect(pending).rejects.toBeInstanceOf(DeadlineExceededError)
+  })
+})
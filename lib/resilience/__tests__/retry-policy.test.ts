@@ -0,0 +1,110 @@
+/**
+ * Unit Tests for the retry policy
+ */
+
+import {
+  HttpStatusError,
+  RetryBudget,
+  classifyError,
+  parseRetryAfter,
+  withRetry,
+} from '../retry-policy'
+
+// Shaped like the Anthropic SDK's APIError
+const apiError = (status: number, headers: Record<string, string> = {}) =>
+  Object.assign(new Error(`HTTP ${status}`), { status, headers })
+
+const fast = { baseDelayMs: 1, maxDelayMs: 1, budget: null }
+
+describe('classifyError', () => {
+  it('retries rate limits, overload and server errors only', () => {
+    expect(classifyError(apiError(429))).toMatchObject({
+      retryable: true,
+      reason: 'rate_limited',
+    })
+    expect(classifyError(apiError(529)).reason).toBe('overloaded')
+    expect(classifyError(apiError(500)).retryable).toBe(true)
+    expect(classifyError(apiError(400))).toMatchObject({
+      retryable: false,
+      reason: 'client_error',
+    })
+    expect(classifyError(new SyntaxError('Unexpected token')).retryable).toBe(
+      false
+    )
+  })
+
+  it('finds the status of a wrapped provider error', () => {
+    const wrapped = Object.assign(new Error('Claude error'), {
+      type: 'rate_limit',
+      details: apiError(429, { 'retry-after': '2' }),
+    })
+
+    expect(classifyError(wrapped)).toMatchObject({
+      retryable: true,
+      status: 429,
+      retryAfterMs: 2000,
+    })
+  })
+
+  it('never retries aborted calls', () => {
+    const abort = Object.assign(new Error('aborted'), { name: 'AbortError' })
+    expect(classifyError(abort).reason).toBe('aborted')
+  })
+})
+
+describe('parseRetryAfter', () => {
+  it('reads milliseconds, seconds and HTTP dates', () => {
+    expect(parseRetryAfter({ 'retry-after-ms': '1500' })).toBe(1500)
+    expect(parseRetryAfter({ 'retry-after': '3' })).toBe(3000)
+    const later = new Date(Date.now() + 60000).toUTCString()
+    expect(parseRetryAfter({ 'retry-after': later })).toBeGreaterThan(50000)
+    expect(parseRetryAfter({})).toBeUndefined()
+  })
+})
+
+describe('withRetry', () => {
+  it('retries transient failures until the call succeeds', async () => {
+    const operation = jest
+      .fn()
+      .mockRejectedValueOnce(apiError(503))
+      .mockResolvedValueOnce('ok')
+    const onRetry = jest.fn()
+
+    await expect(withRetry(operation, { ...fast, onRetry })).resolves.toBe(
+      'ok'
+    )
+    expect(operation).toHaveBeenCalledTimes(2)
+    expect(onRetry).toHaveBeenCalledTimes(1)
+  })
+
+  it('fails immediately on errors that would repeat', async () => {
+    const operation = jest.fn().mockRejectedValue(apiError(400))
+
+    await expect(withRetry(operation, fast)).rejects.toThrow('HTTP 400')
+    expect(operation).toHaveBeenCalledTimes(1)
+  })
+
+  it('does not wait out a Retry-After beyond the limit', async () => {
+    const error = new HttpStatusError('Too many requests', 429)
+    Object.assign(error, { headers: { 'retry-after': '60' } })
+    const operation = jest.fn().mockRejectedValue(error)
+
+    await expect(withRetry(operation, fast)).rejects.toBe(error)
+    expect(operation).toHaveBeenCalledTimes(1)
+  })
+
+  it('stops retrying once the budget is spent', async () => {
+    const budget = new RetryBudget({
+      ratio: 0,
+      capacity: 1,
+      refillPerSecond: 0,
+    })
+    const operation = jest.fn().mockRejectedValue(apiError(500))
+
+    await expect(
+      withRetry(operation, { ...fast, budget, maxAttempts: 5 })
+    ).rejects.toThrow('HTTP 500')
+    expect(operation).toHaveBeenCalledTimes(2)
+    expect(budget.getStats()).toMatchObject({ retries: 1, denied: 1 })
+  })
+})
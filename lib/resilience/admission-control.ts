@@ -0,0 +1,410 @@
+/**
+ * Admission Control
+ * Keeps LLM calls inside the provider's rate limits instead of discovering
+ * them through 429s. Each provider and model has token buckets for
+ * requests, input tokens and output tokens per minute. A call reserves its
+ * estimated usage before it is sent and queues, interactive work ahead of
+ * background work, until the buckets can cover it. Buckets start from
+ * conservative defaults and then follow the limits and remaining counts
+ * the provider reports in its rate-limit headers.
+ */
+
+import { AsyncLocalStorage } from 'node:async_hooks'
+
+import { DeadlineExceededError } from './deadline'
+
+export type AdmissionPriority = 'interactive' | 'background'
+
+export interface RateLimits {
+  requestsPerMinute: number
+  inputTokensPerMinute: number
+  outputTokensPerMinute: number
+}
+
+// Anthropic's entry-tier limits; replaced by the first response's headers
+export const DEFAULT_RATE_LIMITS: RateLimits = {
+  requestsPerMinute: 50,
+  inputTokensPerMinute: 30000,
+  outputTokensPerMinute: 8000,
+}
+
+export interface TokenUsage {
+  inputTokens: number
+  outputTokens: number
+}
+
+export interface AdmissionRequest {
+  inputTokens: number // estimated from the prompt
+  outputTokens: number // max_tokens
+  priority?: AdmissionPriority | undefined // default 'interactive'
+  signal?: AbortSignal | undefined
+}
+
+export interface AdmissionTicket {
+  waitMs: number // time spent queued
+  /**
+   * Replace the reservation with the call's actual usage; without usage
+   * (a failed call) the reservation is returned. Once the call's own
+   * response headers have been applied they already count its usage, so
+   * settling only releases the reservation.
+   */
+  settle(usage?: TokenUsage): void
+}
+
+// Usage reserved by an admitted call that hasn't settled yet
+interface Reservation {
+  inputTokens: number
+  outputTokens: number
+  accounted: boolean // the provider's remaining counts include this call
+}
+
+// Ticket of the call `run` is executing, so the rate-limit headers of the
+// call's own response can be matched to its reservation
+const activeTicket = new AsyncLocalStorage<AdmissionTicket>()
+
+// Limit and remaining header pairs per bucket. OpenAI reports a single
+// token limit, which is applied to input tokens.
+const RATE_LIMIT_HEADERS = {
+  requests: [
+    'anthropic-ratelimit-requests-limit',
+    'anthropic-ratelimit-requests-remaining',
+    'x-ratelimit-limit-requests',
+    'x-ratelimit-remaining-requests',
+  ],
+  inputTokens: [
+    'anthropic-ratelimit-input-tokens-limit',
+    'anthropic-ratelimit-input-tokens-remaining',
+    'x-ratelimit-limit-tokens',
+    'x-ratelimit-remaining-tokens',
+  ],
+  outputTokens: [
+    'anthropic-ratelimit-output-tokens-limit',
+    'anthropic-ratelimit-output-tokens-remaining',
+  ],
+} as const
+
+const PRIORITY_RANK: Record<AdmissionPriority, number> = {
+  interactive: 0,
+  background: 1,
+}
+
+/**
+ * Bucket refilled continuously at `capacity` tokens per minute. It can go
+ * negative when a call uses more than it reserved; the debt is paid back
+ * by the refill.
+ */
+class TokenBucket {
+  private tokens: number
+  private lastRefill = Date.now()
+
+  constructor(private capacity: number) {
+    this.tokens = capacity
+  }
+
+  adjust(amount: number): void {
+    this.refill()
+    this.tokens = Math.min(this.capacity, this.tokens + amount)
+  }
+
+  /**
+   * Milliseconds until `amount` tokens are available. Requests larger
+   * than the bucket only wait for it to fill.
+   */
+  waitTime(amount: number): number {
+    this.refill()
+    const missing = Math.min(amount, this.capacity) - this.tokens
+    return missing > 0 ? Math.ceil((missing * 60000) / this.capacity) : 0
+  }
+
+  /**
+   * Follow the provider's counts. `pending` is reserved by in-flight calls
+   * the provider hasn't counted yet, and is held back from `remaining`.
+   */
+  update(
+    limit: number | undefined,
+    remaining: number | undefined,
+    pending: number
+  ): void {
+    this.refill()
+    if (limit && limit > 0) {
+      this.capacity = limit
+    }
+    this.tokens = Math.min(
+      remaining === undefined ? this.tokens : remaining - pending,
+      this.capacity
+    )
+  }
+
+  getAvailable(): number {
+    this.refill()
+    return Math.floor(this.tokens)
+  }
+
+  private refill(): void {
+    const now = Date.now()
+    this.tokens = Math.min(
+      this.capacity,
+      this.tokens + ((now - this.lastRefill) / 60000) * this.capacity
+    )
+    this.lastRefill = now
+  }
+}
+
+interface Waiter {
+  inputTokens: number
+  outputTokens: number
+  rank: number
+  enqueuedAt: number
+  resolve: (ticket: AdmissionTicket) => void
+  unlink: () => void
+}
+
+export class AdmissionController {
+  readonly key: string
+  private requests: TokenBucket
+  private inputTokens: TokenBucket
+  private outputTokens: TokenBucket
+  private queue: Waiter[] = []
+  private timer: ReturnType<typeof setTimeout> | null = null
+  private admitted = 0
+  private delayed = 0
+  private totalWaitMs = 0
+  private reservations = new Map<AdmissionTicket, Reservation>()
+
+  constructor(key: string, limits: RateLimits = DEFAULT_RATE_LIMITS) {
+    this.key = key
+    this.requests = new TokenBucket(limits.requestsPerMinute)
+    this.inputTokens = new TokenBucket(limits.inputTokensPerMinute)
+    this.outputTokens = new TokenBucket(limits.outputTokensPerMinute)
+  }
+
+  /**
+   * Wait until the call fits within the rate limits and reserve its
+   * estimated usage. Rejects if the signal aborts while queued.
+   */
+  acquire(request: AdmissionRequest): Promise<AdmissionTicket> {
+    const signal = request.signal
+    if (signal?.aborted) {
+      return Promise.reject(signal.reason ?? new DeadlineExceededError())
+    }
+
+    return new Promise((resolve, reject) => {
+      const onAbort = () => {
+        this.queue = this.queue.filter(queued => queued !== waiter)
+        reject(signal?.reason ?? new DeadlineExceededError())
+        this.drain()
+      }
+      const waiter: Waiter = {
+        inputTokens: Math.max(0, request.inputTokens),
+        outputTokens: Math.max(0, request.outputTokens),
+        rank: PRIORITY_RANK[request.priority || 'interactive'],
+        enqueuedAt: Date.now(),
+        resolve,
+        unlink: () => signal?.removeEventListener('abort', onAbort),
+      }
+      signal?.addEventListener('abort', onAbort, { once: true })
+
+      // Behind every waiter of the same or higher priority
+      const position = this.queue.findIndex(queued => queued.rank > waiter.rank)
+      if (position < 0) {
+        this.queue.push(waiter)
+      } else {
+        this.queue.splice(position, 0, waiter)
+      }
+      this.drain()
+    })
+  }
+
+  /**
+   * Run `operation` once admitted, settling the reservation with the
+   * usage `getUsage` reads from its result
+   */
+  async run<T>(
+    request: AdmissionRequest,
+    operation: () => Promise<T>,
+    getUsage?: (result: T) => TokenUsage | undefined
+  ): Promise<T> {
+    const ticket = await this.acquire(request)
+    try {
+      const result = await activeTicket.run(ticket, operation)
+      ticket.settle(getUsage?.(result))
+      return result
+    } catch (error) {
+      ticket.settle()
+      throw error
+    }
+  }
+
+  /**
+   * Follow the limits and remaining counts in a response's rate-limit
+   * headers. `ticket` is the call the response belongs to, by default the
+   * one `run` is executing; its usage is counted by the headers from now on.
+   */
+  updateFromHeaders(
+    headers: Pick<Headers, 'get'>,
+    ticket: AdmissionTicket | undefined = activeTicket.getStore()
+  ): void {
+    const read = (name: string) => {
+      const value = Number(headers.get(name) ?? NaN)
+      return Number.isFinite(value) ? value : undefined
+    }
+    const update = (
+      bucket: TokenBucket,
+      names: readonly string[],
+      pending: number
+    ) => {
+      for (let index = 0; index < names.length; index += 2) {
+        const limit = read(names[index]!)
+        const remaining = read(names[index + 1]!)
+        if (limit !== undefined || remaining !== undefined) {
+          bucket.update(limit, remaining, pending)
+          return
+        }
+      }
+    }
+
+    const reservation = ticket && this.reservations.get(ticket)
+    if (reservation) {
+      reservation.accounted = true
+    }
+    // Calls still in flight elsewhere aren't in the provider's counts yet
+    const pending = { requests: 0, inputTokens: 0, outputTokens: 0 }
+    for (const other of this.reservations.values()) {
+      if (!other.accounted) {
+        pending.requests++
+        pending.inputTokens += other.inputTokens
+        pending.outputTokens += other.outputTokens
+      }
+    }
+
+    update(this.requests, RATE_LIMIT_HEADERS.requests, pending.requests)
+    update(
+      this.inputTokens,
+      RATE_LIMIT_HEADERS.inputTokens,
+      pending.inputTokens
+    )
+    update(
+      this.outputTokens,
+      RATE_LIMIT_HEADERS.outputTokens,
+      pending.outputTokens
+    )
+    this.drain()
+  }
+
+  getStats() {
+    return {
+      key: this.key,
+      queued: this.queue.length,
+      admitted: this.admitted,
+      delayed: this.delayed,
+      averageWaitMs: this.delayed
+        ? Math.round(this.totalWaitMs / this.delayed)
+        : 0,
+      available: {
+        requests: this.requests.getAvailable(),
+        inputTokens: this.inputTokens.getAvailable(),
+        outputTokens: this.outputTokens.getAvailable(),
+      },
+    }
+  }
+
+  // Admit waiters in queue order while the buckets cover them; the head
+  // of the queue is never overtaken, so background calls cannot starve
+  // interactive ones
+  private drain(): void {
+    if (this.timer) {
+      clearTimeout(this.timer)
+      this.timer = null
+    }
+
+    for (let waiter = this.queue[0]; waiter; waiter = this.queue[0]) {
+      const waitMs = Math.max(
+        this.requests.waitTime(1),
+        this.inputTokens.waitTime(waiter.inputTokens),
+        this.outputTokens.waitTime(waiter.outputTokens)
+      )
+      if (waitMs > 0) {
+        this.timer = setTimeout(() => this.drain(), waitMs)
+        return
+      }
+
+      this.queue.shift()
+      waiter.unlink()
+      waiter.resolve(this.admit(waiter))
+    }
+  }
+
+  private admit(waiter: Waiter): AdmissionTicket {
+    this.requests.adjust(-1)
+    this.inputTokens.adjust(-waiter.inputTokens)
+    this.outputTokens.adjust(-waiter.outputTokens)
+
+    const waitMs = Date.now() - waiter.enqueuedAt
+    this.admitted++
+    if (waitMs > 0) {
+      this.delayed++
+      this.totalWaitMs += waitMs
+    }
+
+    const reservation: Reservation = {
+      inputTokens: waiter.inputTokens,
+      outputTokens: waiter.outputTokens,
+      accounted: false,
+    }
+    const ticket: AdmissionTicket = {
+      waitMs,
+      settle: usage => {
+        if (!this.reservations.delete(ticket)) {
+          return
+        }
+        // Once its response headers were applied the buckets already
+        // reflect the call's usage rather than its reservation
+        if (!reservation.accounted) {
+          this.inputTokens.adjust(
+            reservation.inputTokens - (usage?.inputTokens ?? 0)
+          )
+          this.outputTokens.adjust(
+            reservation.outputTokens - (usage?.outputTokens ?? 0)
+          )
+        }
+        this.drain()
+      },
+    }
+    this.reservations.set(ticket, reservation)
+    return ticket
+  }
+}
+
+const admissionControllers = new Map<string, AdmissionController>()
+
+/**
+ * Admission controller shared by every caller of `model` on `provider`
+ */
+export function getAdmissionController(
+  provider: string,
+  model: string
+): AdmissionController {
+  const key = `${provider}:${model}`
+  let controller = admissionControllers.get(key)
+  if (!controller) {
+    controller = new AdmissionController(key)
+    admissionControllers.set(key, controller)
+  }
+  return controller
+}
+
+/**
+ * Stats for every admission controller created so far
+ */
+export function getAdmissionStats() {
+  return Array.from(admissionControllers.values(), controller =>
+    controller.getStats()
+  )
+}
+
+/**
+ * Drop every admission controller (used by tests)
+ */
+export function resetAdmissionControllers(): void {
+  admissionControllers.clear()
+}
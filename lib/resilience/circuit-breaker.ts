@@ -0,0 +1,246 @@
+/**
+ * Circuit Breakers
+ * Process-wide breakers keyed by provider and model. When a model keeps
+ * failing with transient errors its circuit opens and every caller fails
+ * fast, so they can move to a fallback instead of spending the request
+ * deadline on it. After a cool-down a few probe requests are let through
+ * (half-open); a successful probe closes the circuit again.
+ */
+
+import { classifyError } from './retry-policy'
+
+export type CircuitState = 'closed' | 'open' | 'half_open'
+
+export interface CircuitBreakerOptions {
+  failureThreshold?: number // consecutive failures that open the circuit
+  failureRate?: number // share of failures in the window that opens it
+  minimumRequests?: number // calls in the window before the rate applies
+  windowMs?: number
+  openMs?: number // cool-down before probing again
+  halfOpenProbes?: number // concurrent probes while half-open
+}
+
+export class CircuitOpenError extends Error {
+  readonly key: string
+  readonly retryAfterMs: number
+
+  constructor(key: string, retryAfterMs: number) {
+    super(`Circuit open for ${key}`)
+    this.name = 'CircuitOpenError'
+    this.key = key
+    this.retryAfterMs = retryAfterMs
+  }
+}
+
+// Failures that say something about the provider's health; client errors
+// and cancellations do not
+const HEALTH_FAILURES = new Set([
+  'rate_limited',
+  'overloaded',
+  'server_error',
+  'network',
+])
+
+interface Outcome {
+  at: number
+  failed: boolean
+}
+
+export class CircuitBreaker {
+  readonly key: string
+  private failureThreshold: number
+  private failureRate: number
+  private minimumRequests: number
+  private windowMs: number
+  private openMs: number
+  private halfOpenProbes: number
+  private state: CircuitState = 'closed'
+  private outcomes: Outcome[] = []
+  private consecutiveFailures = 0
+  private openedAt = 0
+  private probesInFlight = 0
+  private rejected = 0
+
+  constructor(key: string, options: CircuitBreakerOptions = {}) {
+    this.key = key
+    this.failureThreshold = options.failureThreshold ?? 5
+    this.failureRate = options.failureRate ?? 0.5
+    this.minimumRequests = options.minimumRequests ?? 10
+    this.windowMs = options.windowMs ?? 30000
+    this.openMs = options.openMs ?? 30000
+    this.halfOpenProbes = options.halfOpenProbes ?? 1
+  }
+
+  getState(): CircuitState {
+    if (this.state === 'open' && this.coolDownRemaining() === 0) {
+      this.state = 'half_open'
+      this.probesInFlight = 0
+    }
+    return this.state
+  }
+
+  /**
+   * Whether a request would be let through right now, without claiming
+   * a half-open probe
+   */
+  isAvailable(): boolean {
+    const state = this.getState()
+    return (
+      state === 'closed' ||
+      (state === 'half_open' && this.probesInFlight < this.halfOpenProbes)
+    )
+  }
+
+  /**
+   * Claim permission for one request. Every granted request must be
+   * followed by recordSuccess or recordFailure.
+   */
+  tryAcquire(): boolean {
+    const state = this.getState()
+    if (state === 'closed') {
+      return true
+    }
+    if (state === 'half_open' && this.probesInFlight < this.halfOpenProbes) {
+      this.probesInFlight++
+      return true
+    }
+    this.rejected++
+    return false
+  }
+
+  recordSuccess(): void {
+    this.record(false)
+    this.consecutiveFailures = 0
+    if (this.state !== 'closed') {
+      this.close()
+    }
+  }
+
+  /**
+   * Record a failed request. Errors that do not reflect the provider's
+   * health (bad requests, cancellations) only release a claimed probe.
+   */
+  recordFailure(error: unknown): void {
+    const { reason } = classifyError(error)
+    if (reason === 'client_error') {
+      // The provider answered, so it is up
+      this.recordSuccess()
+      return
+    }
+    if (!HEALTH_FAILURES.has(reason)) {
+      this.probesInFlight = Math.max(0, this.probesInFlight - 1)
+      return
+    }
+
+    this.record(true)
+    this.consecutiveFailures++
+    if (this.state === 'half_open' || this.shouldOpen()) {
+      this.open()
+    }
+  }
+
+  /**
+   * Run `operation` through the breaker, failing fast with
+   * CircuitOpenError while the circuit is open
+   */
+  async execute<T>(operation: () => Promise<T>): Promise<T> {
+    if (!this.tryAcquire()) {
+      throw new CircuitOpenError(this.key, this.coolDownRemaining())
+    }
+
+    try {
+      const result = await operation()
+      this.recordSuccess()
+      return result
+    } catch (error) {
+      this.recordFailure(error)
+      throw error
+    }
+  }
+
+  getStats() {
+    this.prune()
+    return {
+      key: this.key,
+      state: this.getState(),
+      requests: this.outcomes.length,
+      failures: this.outcomes.filter(outcome => outcome.failed).length,
+      consecutiveFailures: this.consecutiveFailures,
+      rejected: this.rejected,
+    }
+  }
+
+  private shouldOpen(): boolean {
+    if (this.consecutiveFailures >= this.failureThreshold) {
+      return true
+    }
+    this.prune()
+    const failures = this.outcomes.filter(outcome => outcome.failed).length
+    return (
+      this.outcomes.length >= this.minimumRequests &&
+      failures / this.outcomes.length >= this.failureRate
+    )
+  }
+
+  private open(): void {
+    this.state = 'open'
+    this.openedAt = Date.now()
+    this.probesInFlight = 0
+    console.warn(`Circuit opened for ${this.key}`)
+  }
+
+  private close(): void {
+    this.state = 'closed'
+    this.outcomes = []
+    this.probesInFlight = 0
+    console.info(`Circuit closed for ${this.key}`)
+  }
+
+  private coolDownRemaining(): number {
+    return Math.max(0, this.openedAt + this.openMs - Date.now())
+  }
+
+  private record(failed: boolean): void {
+    this.outcomes.push({ at: Date.now(), failed })
+    this.prune()
+  }
+
+  private prune(): void {
+    const cutoff = Date.now() - this.windowMs
+    while (this.outcomes.length && this.outcomes[0]!.at < cutoff) {
+      this.outcomes.shift()
+    }
+  }
+}
+
+const circuitBreakers = new Map<string, CircuitBreaker>()
+
+/**
+ * Breaker shared by every caller of `model` on `provider`
+ */
+export function getCircuitBreaker(
+  provider: string,
+  model: string
+): CircuitBreaker {
+  const key = `${provider}:${model}`
+  let breaker = circuitBreakers.get(key)
+  if (!breaker) {
+    breaker = new CircuitBreaker(key)
+    circuitBreakers.set(key, breaker)
+  }
+  return breaker
+}
+
+/**
+ * Stats for every breaker created so far
+ */
+export function getCircuitStats() {
+  return Array.from(circuitBreakers.values(), breaker => breaker.getStats())
+}
+
+/**
+ * Drop every breaker (used by tests)
+ */
+export function resetCircuitBreakers(): void {
+  circuitBreakers.clear()
+}
@@ -0,0 +1,171 @@
+/**
+ * Request Deadlines
+ * An absolute point in time after which work for a request is abandoned,
+ * exposed as an AbortSignal so that in-flight HTTP calls are cancelled
+ * rather than left running in the background
+ */
+
+import { getServerEnv } from '@/lib/config/env'
+
+// Netlify synchronous functions can run for at most 26 seconds
+export const DEFAULT_FUNCTION_TIMEOUT_MS = 26000
+
+// Time kept back to serialize and send a response before the platform
+// kills the function
+export const DEFAULT_RESPONSE_MARGIN_MS = 1500
+
+// Options accepted by any call that can be cancelled
+export interface AbortOptions {
+  signal?: AbortSignal | undefined
+}
+
+export class DeadlineExceededError extends Error {
+  constructor(message = 'Request deadline exceeded') {
+    super(message)
+    this.name = 'DeadlineExceededError'
+  }
+}
+
+export class Deadline {
+  private controller = new AbortController()
+  private timer: ReturnType<typeof setTimeout> | null = null
+  private unlinkParent: (() => void) | null = null
+  private expiresAt: number
+
+  /**
+   * @param timeoutMs time from now until the deadline expires
+   * @param parent signal that aborts this deadline early, e.g. the
+   *   enclosing request's deadline or a client disconnect
+   */
+  constructor(timeoutMs: number, parent?: AbortSignal) {
+    this.expiresAt = Date.now() + Math.max(0, timeoutMs)
+
+    if (parent) {
+      if (parent.aborted) {
+        this.abort(parent.reason)
+        return
+      }
+      const onAbort = () => this.abort(parent.reason)
+      parent.addEventListener('abort', onAbort, { once: true })
+      this.unlinkParent = () => parent.removeEventListener('abort', onAbort)
+    }
+
+    this.schedule()
+  }
+
+  /**
+   * Deadline for a serverless invocation, derived from FUNCTION_TIMEOUT_MS
+   * (or the Netlify default) minus a margin for writing the response
+   */
+  static fromFunctionTimeout(parent?: AbortSignal): Deadline {
+    const timeoutMs =
+      getServerEnv().FUNCTION_TIMEOUT_MS ?? DEFAULT_FUNCTION_TIMEOUT_MS
+
+    return new Deadline(
+      Math.max(0, timeoutMs - DEFAULT_RESPONSE_MARGIN_MS),
+      parent
+    )
+  }
+
+  get signal(): AbortSignal {
+    return this.controller.signal
+  }
+
+  remaining(): number {
+    return this.signal.aborted ? 0 : Math.max(0, this.expiresAt - Date.now())
+  }
+
+  isExpired(): boolean {
+    return this.remaining() === 0
+  }
+
+  throwIfExpired(): void {
+    if (this.isExpired()) {
+      throw new DeadlineExceededError()
+    }
+  }
+
+  /**
+   * Derive a deadline for one stage: it gets `share` of the time that
+   * remains (optionally capped at `maxMs`) and is aborted with its parent
+   */
+  child(share = 1, maxMs?: number): Deadline {
+    let timeoutMs = this.remaining() * Math.min(1, Math.max(0, share))
+    if (maxMs !== undefined) {
+      timeoutMs = Math.min(timeoutMs, maxMs)
+    }
+    return new Deadline(timeoutMs, this.signal)
+  }
+
+  /**
+   * Pull the deadline in so it expires no later than `timeoutMs` from now
+   */
+  limit(timeoutMs: number): void {
+    const expiresAt = Date.now() + Math.max(0, timeoutMs)
+    if (expiresAt < this.expiresAt && !this.signal.aborted) {
+      this.expiresAt = expiresAt
+      this.schedule()
+    }
+  }
+
+  abort(reason?: unknown): void {
+    if (!this.signal.aborted) {
+      this.controller.abort(reason ?? new DeadlineExceededError())
+    }
+    this.dispose()
+  }
+
+  /**
+   * Release timers and parent listeners without aborting
+   */
+  dispose(): void {
+    if (this.timer) {
+      clearTimeout(this.timer)
+      this.timer = null
+    }
+    this.unlinkParent?.()
+    this.unlinkParent = null
+  }
+
+  private schedule(): void {
+    if (this.timer) {
+      clearTimeout(this.timer)
+    }
+    this.timer = setTimeout(() => this.abort(), this.remaining())
+  }
+}
+
+/**
+ * Sleep that resolves early, with a rejection, when the signal aborts
+ */
+export function sleep(ms: number, signal?: AbortSignal): Promise<void> {
+  return new Promise((resolve, reject) => {
+    if (signal?.aborted) {
+      reject(signal.reason ?? new DeadlineExceededError())
+      return
+    }
+
+    const onAbort = () => {
+      clearTimeout(timer)
+      reject(signal?.reason ?? new DeadlineExceededError())
+    }
+    const timer = setTimeout(() => {
+      signal?.removeEventListener('abort', onAbort)
+      resolve()
+    }, ms)
+
+    signal?.addEventListener('abort', onAbort, { once: true })
+  })
+}
+
+/**
+ * Combine an optional parent signal with a timeout into one signal that
+ * aborts on whichever happens first. Call `dispose` once the work settles.
+ */
+export function withTimeout(
+  timeoutMs: number,
+  parent?: AbortSignal
+): { signal: AbortSignal; dispose: () => void } {
+  const deadline = new Deadline(timeoutMs, parent)
+  return { signal: deadline.signal, dispose: () => deadline.dispose() }
+}
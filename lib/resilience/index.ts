@@ -0,0 +1,49 @@
+/**
+ * Cardinal Resilience Module
+ * Deadlines, cancellation, retries, circuit breakers and admission control
+ * for outbound calls
+ */
+
+export {
+  AdmissionController,
+  DEFAULT_RATE_LIMITS,
+  getAdmissionController,
+  getAdmissionStats,
+  resetAdmissionControllers,
+  type AdmissionPriority,
+  type AdmissionRequest,
+  type AdmissionTicket,
+  type RateLimits,
+  type TokenUsage,
+} from './admission-control'
+export {
+  CircuitBreaker,
+  CircuitOpenError,
+  getCircuitBreaker,
+  getCircuitStats,
+  resetCircuitBreakers,
+  type CircuitBreakerOptions,
+  type CircuitState,
+} from './circuit-breaker'
+export {
+  Deadline,
+  DeadlineExceededError,
+  DEFAULT_FUNCTION_TIMEOUT_MS,
+  DEFAULT_RESPONSE_MARGIN_MS,
+  sleep,
+  withTimeout,
+  type AbortOptions,
+} from './deadline'
+export {
+  HttpStatusError,
+  RetryBudget,
+  classifyError,
+  getRetryBudget,
+  nextBackoffDelay,
+  parseRetryAfter,
+  withRetry,
+  type ErrorClassification,
+  type RetryBudgetOptions,
+  type RetryOptions,
+  type RetryReason,
+} from './retry-policy'
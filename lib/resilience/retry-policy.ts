@@ -0,0 +1,320 @@
+/**
+ * Retry Policy
+ * The single retry layer for outbound LLM and Google calls. Errors are
+ * classified so only transient failures (429, 5xx, overloaded, network)
+ * are retried; delays use decorrelated jitter and honor Retry-After; and
+ * a process-wide retry budget caps retries to a fraction of traffic so
+ * they cannot multiply load during an outage.
+ */
+
+import { sleep } from './deadline'
+
+export type RetryReason =
+  | 'rate_limited'
+  | 'overloaded'
+  | 'server_error'
+  | 'network'
+  | 'client_error'
+  | 'aborted'
+  | 'unknown'
+
+export interface ErrorClassification {
+  retryable: boolean
+  reason: RetryReason
+  status?: number | undefined
+  retryAfterMs?: number | undefined // from Retry-After, when present
+}
+
+/**
+ * Non-2xx HTTP response from a provider called with plain fetch
+ */
+export class HttpStatusError extends Error {
+  readonly status: number
+  readonly headers: Headers | undefined
+
+  constructor(message: string, status: number, headers?: Headers) {
+    super(message)
+    this.name = 'HttpStatusError'
+    this.status = status
+    this.headers = headers
+  }
+
+  static async fromResponse(
+    response: Response,
+    service: string
+  ): Promise<HttpStatusError> {
+    const body = await response.text().catch(() => '')
+    return new HttpStatusError(
+      `${service} error: ${response.status} ${body || response.statusText}`,
+      response.status,
+      response.headers
+    )
+  }
+}
+
+// Transient statuses: timeout, conflict, too early, rate limit, 5xx
+const RETRYABLE_STATUSES = new Set([408, 409, 425, 429])
+
+const NETWORK_ERROR_CODES = new Set([
+  'ECONNRESET',
+  'ECONNREFUSED',
+  'ETIMEDOUT',
+  'EPIPE',
+  'EAI_AGAIN',
+  'ENOTFOUND',
+  'UND_ERR_SOCKET',
+  'UND_ERR_CONNECT_TIMEOUT',
+])
+
+const ABORT_ERROR_NAMES = new Set([
+  'AbortError',
+  'APIUserAbortError',
+  'DeadlineExceededError',
+])
+
+const NETWORK_ERROR_NAMES = new Set([
+  'APIConnectionError',
+  'APIConnectionTimeoutError',
+  'FetchError',
+])
+
+// Provider clients wrap the original error in `details` or `cause`; look
+// a few levels down for the status and headers
+function* errorChain(error: unknown): Generator<any> {
+  let current: any = error
+  for (let depth = 0; current && depth < 4; depth++) {
+    yield current
+    current = current.cause ?? current.details
+  }
+}
+
+function readHeader(headers: unknown, name: string): string | null {
+  if (!headers) {
+    return null
+  }
+  if (typeof (headers as Headers).get === 'function') {
+    return (headers as Headers).get(name)
+  }
+  const value = (headers as Record<string, unknown>)[name]
+  return typeof value === 'string' ? value : null
+}
+
+/**
+ * Delay requested by retry-after-ms or Retry-After (seconds or HTTP date)
+ */
+export function parseRetryAfter(headers: unknown): number | undefined {
+  const milliseconds = Number(readHeader(headers, 'retry-after-ms'))
+  if (milliseconds > 0) {
+    return milliseconds
+  }
+
+  const retryAfter = readHeader(headers, 'retry-after')
+  if (!retryAfter) {
+    return undefined
+  }
+  const seconds = Number(retryAfter)
+  if (!Number.isNaN(seconds)) {
+    return Math.max(0, seconds * 1000)
+  }
+  const date = Date.parse(retryAfter)
+  return Number.isNaN(date) ? undefined : Math.max(0, date - Date.now())
+}
+
+export function classifyError(error: unknown): ErrorClassification {
+  let status: number | undefined
+  let retryAfterMs: number | undefined
+  let networkError = false
+
+  for (const link of errorChain(error)) {
+    if (ABORT_ERROR_NAMES.has(link.name)) {
+      return { retryable: false, reason: 'aborted' }
+    }
+    status ??= [link.status, link.statusCode].find(
+      value => typeof value === 'number'
+    )
+    retryAfterMs ??= parseRetryAfter(link.headers)
+    networkError ||=
+      NETWORK_ERROR_NAMES.has(link.name) ||
+      NETWORK_ERROR_CODES.has(link.code) ||
+      (link.name === 'TypeError' && link.message === 'fetch failed')
+  }
+
+  if (status !== undefined) {
+    if (status === 429) {
+      return { retryable: true, reason: 'rate_limited', status, retryAfterMs }
+    }
+    if (status === 529 || status === 503) {
+      return { retryable: true, reason: 'overloaded', status, retryAfterMs }
+    }
+    if (status >= 500 || RETRYABLE_STATUSES.has(status)) {
+      return { retryable: true, reason: 'server_error', status, retryAfterMs }
+    }
+    if (status >= 400) {
+      return { retryable: false, reason: 'client_error', status }
+    }
+  }
+
+  if (networkError) {
+    return { retryable: true, reason: 'network' }
+  }
+
+  // Parse failures, validation errors and anything unrecognized would
+  // most likely fail the same way again
+  return { retryable: false, reason: 'unknown', status }
+}
+
+export interface RetryBudgetOptions {
+  ratio?: number // retry tokens earned per request
+  capacity?: number // most retries that can be saved up
+  refillPerSecond?: number // floor so low-traffic callers can still retry
+}
+
+/**
+ * Token bucket limiting retries to roughly `ratio` of requests. Every
+ * request deposits `ratio` tokens and every retry spends one, so when
+ * most calls are failing retries dry up instead of multiplying load.
+ */
+export class RetryBudget {
+  private ratio: number
+  private capacity: number
+  private refillPerSecond: number
+  private tokens: number
+  private lastRefill = Date.now()
+  private spent = 0
+  private denied = 0
+
+  constructor(options: RetryBudgetOptions = {}) {
+    this.ratio = options.ratio ?? 0.2
+    this.capacity = options.capacity ?? 10
+    this.refillPerSecond = options.refillPerSecond ?? 0.5
+    this.tokens = this.capacity
+  }
+
+  recordRequest(): void {
+    this.refill()
+    this.tokens = Math.min(this.capacity, this.tokens + this.ratio)
+  }
+
+  tryAcquire(): boolean {
+    this.refill()
+    if (this.tokens < 1) {
+      this.denied++
+      return false
+    }
+    this.tokens -= 1
+    this.spent++
+    return true
+  }
+
+  getStats() {
+    this.refill()
+    return {
+      tokens: Math.floor(this.tokens * 100) / 100,
+      retries: this.spent,
+      denied: this.denied,
+    }
+  }
+
+  private refill(): void {
+    const now = Date.now()
+    this.tokens = Math.min(
+      this.capacity,
+      this.tokens + ((now - this.lastRefill) / 1000) * this.refillPerSecond
+    )
+    this.lastRefill = now
+  }
+}
+
+export interface RetryOptions {
+  maxAttempts?: number | undefined // including the first (default 3)
+  baseDelayMs?: number | undefined
+  maxDelayMs?: number | undefined
+  // A longer Retry-After than this fails immediately instead of waiting
+  maxRetryAfterMs?: number | undefined
+  signal?: AbortSignal | undefined
+  budget?: RetryBudget | null | undefined // null disables the budget
+  classify?: ((error: unknown) => ErrorClassification) | undefined
+  onRetry?:
+    | ((error: unknown, attempt: number, delayMs: number) => void)
+    | undefined
+}
+
+const DEFAULT_MAX_ATTEMPTS = 3
+const DEFAULT_BASE_DELAY_MS = 250
+const DEFAULT_MAX_DELAY_MS = 8000
+const DEFAULT_MAX_RETRY_AFTER_MS = 20000
+
+/**
+ * Decorrelated jitter: a random delay between the base and three times
+ * the previous delay, capped
+ */
+export function nextBackoffDelay(
+  previousMs: number,
+  baseMs = DEFAULT_BASE_DELAY_MS,
+  maxMs = DEFAULT_MAX_DELAY_MS
+): number {
+  const upper = Math.max(baseMs, previousMs * 3)
+  return Math.min(maxMs, baseMs + Math.random() * (upper - baseMs))
+}
+
+/**
+ * Run `operation`, retrying transient failures per the policy. The
+ * operation receives the attempt number, starting at 1.
+ */
+export async function withRetry<T>(
+  operation: (attempt: number) => Promise<T>,
+  options: RetryOptions = {}
+): Promise<T> {
+  const maxAttempts = Math.max(1, options.maxAttempts ?? DEFAULT_MAX_ATTEMPTS)
+  const baseDelayMs = options.baseDelayMs ?? DEFAULT_BASE_DELAY_MS
+  const maxDelayMs = options.maxDelayMs ?? DEFAULT_MAX_DELAY_MS
+  const maxRetryAfterMs = options.maxRetryAfterMs ?? DEFAULT_MAX_RETRY_AFTER_MS
+  const budget =
+    options.budget === undefined ? getRetryBudget() : options.budget
+  const classify = options.classify || classifyError
+
+  budget?.recordRequest()
+  let delayMs = baseDelayMs
+
+  for (let attempt = 1; ; attempt++) {
+    try {
+      return await operation(attempt)
+    } catch (error) {
+      const classification = classify(error)
+      const retryAfterMs = classification.retryAfterMs
+
+      if (
+        !classification.retryable ||
+        attempt >= maxAttempts ||
+        options.signal?.aborted ||
+        (retryAfterMs !== undefined && retryAfterMs > maxRetryAfterMs) ||
+        (budget && !budget.tryAcquire())
+      ) {
+        throw error
+      }
+
+      delayMs = nextBackoffDelay(delayMs, baseDelayMs, maxDelayMs)
+      const waitMs = Math.max(retryAfterMs ?? 0, delayMs)
+      options.onRetry?.(error, attempt, waitMs)
+
+      // Abandoned while waiting: surface the failure, not the abort
+      try {
+        await sleep(waitMs, options.signal)
+      } catch {
+        throw error
+      }
+    }
+  }
+}
+
+let globalRetryBudget: RetryBudget | null = null
+
+/**
+ * Retry budget shared by every call site in the process
+ */
+export function getRetryBudget(): RetryBudget {
+  if (!globalRetryBudget) {
+    globalRetryBudget = new RetryBudget()
+  }
+  return globalRetryBudget
+}
@@ -6,6 +6,15 @@
 import { Handler } from '@netlify/functions'
 import { z } from 'zod'
 
+import { getAnthropicBaseUrl } from '../../lib/config/endpoints'
+import { withFixture } from '../../lib/llm/fixtures'
+import {
+  CircuitOpenError,
+  getCircuitBreaker,
+  HttpStatusError,
+  withRetry,
+} from '../../lib/resilience'
+
 // Request schema
 const requestSchema = z.object({
   requirements: z.object({
@@ -82,39 +91,62 @@ Generate 3-5 destination recommendations within reasonable travel distance. Retu
   ]
 }`
 
-    // Call Claude API
-    const response = await fetch('https://api.anthropic.com/v1/messages', {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-        'x-api-key': apiKey,
-        'anthropic-version': '2023-06-01',
-      },
-      body: JSON.stringify({
-        model: 'claude-3-haiku-20240307',
-        max_tokens: 2000,
-        messages: [
-          {
-            role: 'user',
-            content: prompt,
-          },
-        ],
-      }),
-    })
-
-    if (!response.ok) {
-      const error = await response.text()
-      throw new Error(`Claude API error: ${error}`)
+    // Call Claude API (or its recorded fixture)
+    const claudeRequest = {
+      model: 'claude-3-haiku-20240307',
+      max_tokens: 2000,
+      messages: [
+        {
+          role: 'user',
+          content: prompt,
+        },
+      ],
+    }
+    let content: string | undefined
+    try {
+      const aiResponse = await withFixture(claudeRequest, () =>
+        withRetry(() =>
+          getCircuitBreaker('anthropic', claudeRequest.model).execute(
+            async () => {
+              const response = await fetch(
+                `${getAnthropicBaseUrl()}/v1/messages`,
+                {
+                  method: 'POST',
+                  headers: {
+                    'Content-Type': 'application/json',
+                    'x-api-key': apiKey,
+                    'anthropic-version': '2023-06-01',
+                  },
+                  body: JSON.stringify(claudeRequest),
+                }
+              )
+
+              if (!response.ok) {
+                throw await HttpStatusError.fromResponse(
+                  response,
+                  'Claude API'
+                )
+              }
+
+              return response.json()
+            }
+          )
+        )
+      )
+      content = aiResponse.content[0].text
+    } catch (error) {
+      // An open circuit goes straight to the fallback destinations
+      if (!(error instanceof CircuitOpenError)) {
+        throw error
+      }
+      console.warn('Claude circuit open, using fallback destinations')
     }
-
-    const aiResponse = await response.json()
-    const content = aiResponse.content[0].text
 
     // Parse destinations from response
     let destinations
     try {
       // Extract JSON from response
-      const jsonMatch = content.match(/\{[\s\S]*\}/)
+      const jsonMatch = content?.match(/\{[\s\S]*\}/)
       if (jsonMatch) {
         const parsed = JSON.parse(jsonMatch[0])
         destinations = parsed.destinations || []
@@ -0,0 +1,141 @@
+/**
+ * Generate Itineraries (batch)
+ * Netlify function that generates several itineraries in one call, e.g.
+ * for group planning or comparing trip styles. Requests for the same
+ * destination, budget and dietary needs share their destination research.
+ */
+
+import { Handler } from '@netlify/functions'
+import { z } from 'zod'
+import { AgentOrchestrator } from '../../lib/agents/orchestrator'
+import {
+  RESPONSE_FLUSH_TIMEOUT_MS,
+  flushMetricsOnShutdown,
+} from '../../lib/agents/performance-collector'
+import { getResearchGroupKey } from '../../lib/agents/research-group'
+import type { TTravelRequirements } from '../../lib/agents/types'
+
+// Larger batches would not finish within the function timeout
+const MAX_BATCH_SIZE = 5
+
+const requirementsSchema = z.object({
+  originCity: z.string(),
+  numberOfAdults: z.number().positive(),
+  numberOfChildren: z.number().min(0),
+  childrenAges: z.array(z.object({ age: z.number(), id: z.string() })),
+  preferredTravelMethods: z.array(z.enum(['drive', 'rail', 'air'])),
+  interests: z.array(z.string()),
+  destination: z.string(), // Selected destination
+  duration: z.string().optional(),
+  budget: z.enum(['budget', 'moderate', 'luxury']).optional(),
+  pace: z.enum(['relaxed', 'moderate', 'packed']).optional(),
+  dietary: z.array(z.string()).optional(),
+})
+
+// Request schema
+const requestSchema = z.object({
+  requests: z.array(requirementsSchema).min(1).max(MAX_BATCH_SIZE),
+})
+
+const headers = {
+  'Content-Type': 'application/json',
+  'Access-Control-Allow-Origin': '*',
+}
+
+// Module scope so warm invocations reuse the agents and their clients
+const orchestrator = new AgentOrchestrator()
+
+export const handler: Handler = async event => {
+  // Handle CORS
+  if (event.httpMethod === 'OPTIONS') {
+    return {
+      statusCode: 200,
+      headers: {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+        'Access-Control-Allow-Methods': 'POST, OPTIONS',
+      },
+    }
+  }
+
+  if (event.httpMethod !== 'POST') {
+    return {
+      statusCode: 405,
+      body: JSON.stringify({ error: 'Method not allowed' }),
+    }
+  }
+
+  try {
+    const startTime = Date.now()
+
+    // Parse and validate request
+    const body = requestSchema.parse(JSON.parse(event.body || '{}'))
+    const requests = body.requests as unknown as TTravelRequirements[]
+
+    const results = await orchestrator.generateItineraries(requests, {
+      userId: event.headers?.['x-user-id'],
+    })
+
+    const researchGroups = new Set(
+      requests.map(requirements => getResearchGroupKey(requirements))
+    )
+    const succeeded = results.filter(
+      result => result.success && result.itinerary
+    ).length
+
+    return {
+      // Partial success still returns every itinerary that was generated
+      statusCode: succeeded > 0 ? 200 : 500,
+      headers,
+      body: JSON.stringify({
+        status: succeeded === results.length ? 'success' : 'partial',
+        data: results.map(result =>
+          result.success && result.itinerary
+            ? {
+                status: 'success',
+                data: result.itinerary,
+                partial: result.itinerary.partial || false,
+                missingSections: result.itinerary.missingSections || [],
+              }
+            : { status: 'error', error: 'Failed to generate itinerary' }
+        ),
+        metadata: {
+          executionTime: Date.now() - startTime,
+          requests: results.length,
+          researchGroups: researchGroups.size,
+          // Costs are shared by the requests in each research group
+          costs: results.map(result => result.costs),
+        },
+      }),
+    }
+  } catch (error) {
+    console.error('Batch itinerary generation error:', error)
+
+    if (error instanceof z.ZodError) {
+      return {
+        statusCode: 400,
+        headers,
+        body: JSON.stringify({
+          status: 'error',
+          error: 'Invalid request',
+          details: error.issues || (error as any).errors || error.message,
+        }),
+      }
+    }
+
+    return {
+      statusCode: 500,
+      headers,
+      body: JSON.stringify({
+        status: 'error',
+        error: 'Internal server error',
+      }),
+    }
+  } finally {
+    // Store queued metrics before the function is frozen, without letting
+    // a slow metrics backend delay the response
+    await flushMetricsOnShutdown(RESPONSE_FLUSH_TIMEOUT_MS).catch(error =>
+      console.warn('Failed to flush agent metrics:', error)
+    )
+  }
+}
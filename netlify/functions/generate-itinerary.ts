@@ -5,7 +5,17 @@
 
 import { Handler } from '@netlify/functions'
 import { z } from 'zod'
+import { persistCacheOutcome } from '../../lib/agents/cost-persistence'
 import { AgentOrchestrator } from '../../lib/agents/orchestrator'
+import {
+  RESPONSE_FLUSH_TIMEOUT_MS,
+  flushMetricsOnShutdown,
+} from '../../lib/agents/performance-collector'
+import type { Itinerary, OrchestrationResult } from '../../lib/agents/types'
+import {
+  getItineraryCache,
+  getRequirementsFingerprint,
+} from '../../lib/cache'
 
 // Request schema
 const requestSchema = z.object({
@@ -21,8 +31,13 @@ const requestSchema = z.object({
     budget: z.enum(['budget', 'moderate', 'luxury']).optional(),
     pace: z.enum(['relaxed', 'moderate', 'packed']).optional(),
   }),
+  // ai_generation_sessions row that receives the token and cost totals
+  generationSessionId: z.string().uuid().optional(),
 })
 
+// Module scope so warm invocations reuse the agents and their clients
+const orchestrator = new AgentOrchestrator()
+
 export const handler: Handler = async event => {
   // Handle CORS
   if (event.httpMethod === 'OPTIONS') {
@@ -44,17 +59,55 @@ export const handler: Handler = async event => {
   }
 
   try {
+    const startTime = Date.now()
+
     // Parse and validate request
     const body = requestSchema.parse(JSON.parse(event.body || '{}'))
     const requirements = body.requirements
 
-    // Create orchestrator
-    const orchestrator = new AgentOrchestrator()
+    // Generate itinerary for the selected destination, reusing a cached one
+    // for equivalent requirements. Partial itineraries are never cached.
+    const cache = getItineraryCache<Itinerary | null>()
+    let generated: OrchestrationResult | undefined
+    const lookup = await cache.getOrLoad(
+      getRequirementsFingerprint(requirements),
+      async () => {
+        // Session-less: the load may be shared with concurrent callers or
+        // run as a stale entry's background refresh after this response,
+        // so it must not write to this caller's generation session
+        const result = await orchestrator.generateItinerary(
+          requirements as any
+        )
+        generated = result
+        return result.success && result.itinerary ? result.itinerary : null
+      },
+      itinerary => !!itinerary && !itinerary.partial
+    )
+    // A stale hit's background refresh must not leak into this response
+    const result = lookup.status === 'miss' ? generated : undefined
+    const itinerary = lookup.value
 
-    // Generate itinerary for the selected destination
-    const result = await orchestrator.generateItinerary(requirements as any)
+    // Record how this caller was served, hit or miss, on their own row
+    await persistCacheOutcome(
+      {
+        generationSessionId: body.generationSessionId,
+        userId: event.headers?.['x-user-id'],
+      },
+      {
+        success: !!itinerary,
+        errorMessage: itinerary ? undefined : 'Failed to generate itinerary',
+      },
+      {
+        cacheStatus: lookup.status,
+        ageMs: lookup.ageMs,
+        startTime,
+        costs: result?.costs,
+      }
+    ).catch(error =>
+      console.warn('Failed to record itinerary generation outcome:', error)
+    )
 
-    if (result.success && result.itinerary) {
+    if (itinerary) {
       return {
         statusCode: 200,
         headers: {
@@ -63,10 +116,18 @@ export const handler: Handler = async event => {
         },
         body: JSON.stringify({
           status: 'success',
-          data: result.itinerary,
+          data: itinerary,
           metadata: {
-            executionTime: result.totalExecutionTime,
-            costs: result.costs,
+            executionTime: result?.totalExecutionTime ?? Date.now() - startTime,
+            costs: result?.costs,
+            partial: itinerary.partial || false,
+            missingSections: itinerary.missingSections || [],
+            cache: {
+              status: lookup.status,
+              ageMs: lookup.ageMs,
+              latencySavedMs: lookup.latencySavedMs,
+              hitRate: cache.getStats().hitRate,
+            },
           },
         }),
       }
@@ -112,5 +173,11 @@ export const handler: Handler = async event => {
         error: 'Internal server error',
       }),
     }
+  } finally {
+    // Store queued metrics before the function is frozen, without letting
+    // a slow metrics backend delay the response
+    await flushMetricsOnShutdown(RESPONSE_FLUSH_TIMEOUT_MS).catch(error =>
+      console.warn('Failed to flush agent metrics:', error)
+    )
   }
 }
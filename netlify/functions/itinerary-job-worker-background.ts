@@ -0,0 +1,42 @@
+/**
+ * Itinerary Job Worker (background)
+ * Netlify background function that runs one queued itinerary job. Netlify
+ * acknowledges the invocation with 202 immediately and gives the function
+ * up to 15 minutes, independent of the client that submitted the job.
+ */
+
+import { Handler } from '@netlify/functions'
+import { z } from 'zod'
+
+import { flushMetricsOnShutdown } from '../../lib/agents/performance-collector'
+import { JobWorker, dispatchJob, getJobStore } from '../../lib/jobs'
+
+const requestSchema = z.object({
+  jobId: z.string().min(1),
+})
+
+const worker = new JobWorker()
+
+export const handler: Handler = async event => {
+  if (event.httpMethod !== 'POST') {
+    return { statusCode: 405 }
+  }
+
+  try {
+    const { jobId } = requestSchema.parse(JSON.parse(event.body || '{}'))
+    await worker.runJob(jobId)
+
+    // Keep the queue moving: start the oldest job that was left queued
+    // while all worker slots were busy
+    const [nextJobId] = await getJobStore().listQueued(1)
+    if (nextJobId && process.env.URL) {
+      await dispatchJob(nextJobId, process.env.URL)
+    }
+  } catch (error) {
+    console.error('Itinerary job worker error:', error)
+  } finally {
+    await flushMetricsOnShutdown()
+  }
+
+  return { statusCode: 202 }
+}
@@ -0,0 +1,292 @@
+/**
+ * Itinerary Jobs
+ * Asynchronous itinerary generation API. POST enqueues a job and returns
+ * its id right away; clients then poll the job or subscribe to its
+ * progress as Server-Sent Events while a background worker runs it.
+ *
+ *   POST /api/itinerary-jobs              enqueue a job
+ *   GET  /api/itinerary-jobs/:id          job status, progress and result
+ *   GET  /api/itinerary-jobs/:id/events   progress stream (SSE)
+ *
+ * Jobs are only visible to the user who submitted them: requests send
+ * x-user-id, or for the event stream the token in the returned eventsUrl.
+ */
+
+import { timingSafeEqual } from 'node:crypto'
+
+import type { Config, Context } from '@netlify/functions'
+import { z } from 'zod'
+
+import type { TTravelRequirements } from '../../lib/agents/types'
+import {
+  TERMINAL_JOB_STATUSES,
+  dispatchJob,
+  expireStaleJobs,
+  getJobStore,
+  isJobStale,
+  type ItineraryJob,
+  type JobStore,
+} from '../../lib/jobs'
+import { Deadline, sleep } from '../../lib/resilience'
+
+// Request schema
+const requestSchema = z.object({
+  requirements: z.object({
+    originCity: z.string(),
+    numberOfAdults: z.number().positive(),
+    numberOfChildren: z.number().min(0),
+    childrenAges: z.array(z.object({ age: z.number(), id: z.string() })),
+    preferredTravelMethods: z.array(z.enum(['drive', 'rail', 'air'])),
+    interests: z.array(z.string()),
+    destination: z.string(), // Selected destination
+    duration: z.string().optional(),
+    budget: z.enum(['budget', 'moderate', 'luxury']).optional(),
+    pace: z.enum(['relaxed', 'moderate', 'packed']).optional(),
+  }),
+})
+
+const JSON_HEADERS = {
+  'Content-Type': 'application/json',
+  'Access-Control-Allow-Origin': '*',
+}
+
+const SSE_HEADERS = {
+  'Content-Type': 'text/event-stream',
+  'Cache-Control': 'no-cache',
+  Connection: 'keep-alive',
+  'Access-Control-Allow-Origin': '*',
+}
+
+// How often the event stream checks the job for progress
+const EVENT_POLL_INTERVAL_MS = 1000
+
+// Clients reconnect after this long when the stream ends before the job
+const SSE_RETRY_MS = 2000
+
+const json = (body: unknown, status = 200) =>
+  new Response(JSON.stringify(body), { status, headers: JSON_HEADERS })
+
+// Client-facing view of a job
+function toJobResponse(job: ItineraryJob) {
+  return {
+    jobId: job.id,
+    status: job.status,
+    progress: job.progress,
+    partialResults: job.partialResults,
+    itinerary: job.itinerary,
+    costs: job.costs,
+    error: job.error,
+    createdAt: job.createdAt,
+    updatedAt: job.updatedAt,
+    completedAt: job.completedAt,
+  }
+}
+
+// Load a job, timing it out first if its worker died mid-run
+async function loadJob(
+  store: JobStore,
+  jobId: string
+): Promise<ItineraryJob | null> {
+  const job = await store.get(jobId)
+  if (job && isJobStale(job)) {
+    await expireStaleJobs(store)
+    return store.get(jobId)
+  }
+  return job
+}
+
+// EventSource can't send headers, so the event stream also accepts the
+// token issued with the job's eventsUrl
+function canReadJob(request: Request, job: ItineraryJob): boolean {
+  const userId = request.headers.get('x-user-id')
+  if (userId) {
+    return job.userId === userId
+  }
+
+  const token = new URL(request.url).searchParams.get('token')
+  if (!token || !job.eventsToken) {
+    return false
+  }
+  const expected = Buffer.from(job.eventsToken)
+  const actual = Buffer.from(token)
+  return (
+    actual.length === expected.length && timingSafeEqual(actual, expected)
+  )
+}
+
+async function createJob(request: Request): Promise<Response> {
+  const userId = request.headers.get('x-user-id')
+  if (!userId) {
+    return json({ error: 'x-user-id header is required' }, 401)
+  }
+
+  let body: z.infer<typeof requestSchema>
+  try {
+    body = requestSchema.parse(await request.json())
+  } catch (error) {
+    return json(
+      {
+        error: 'Invalid request',
+        details:
+          error instanceof z.ZodError
+            ? error.issues
+            : 'Request body must be valid JSON',
+      },
+      400
+    )
+  }
+
+  const store = getJobStore()
+  const job = await store.create(
+    userId,
+    body.requirements as unknown as TTravelRequirements
+  )
+
+  try {
+    await dispatchJob(job.id, new URL(request.url).origin, store)
+  } catch (error) {
+    console.error(`Failed to dispatch itinerary job ${job.id}:`, error)
+    await store.update(job.id, {
+      status: 'failed',
+      error: 'Could not start job worker',
+    })
+    return json({ error: 'Could not start itinerary job' }, 503)
+  }
+
+  const jobUrl = `/api/itinerary-jobs/${job.id}`
+  return json(
+    {
+      jobId: job.id,
+      status: job.status,
+      statusUrl: jobUrl,
+      eventsUrl: `${jobUrl}/events?token=${job.eventsToken}`,
+    },
+    202
+  )
+}
+
+/**
+ * Stream job progress until the job finishes or the function is about to
+ * time out. Each event carries the job's update time as its id, so an
+ * EventSource that reconnects picks up from where it left off.
+ */
+async function streamJob(request: Request, jobId: string): Promise<Response> {
+  const encoder = new TextEncoder()
+  const store = getJobStore()
+  const lastEventId = request.headers.get('last-event-id')
+
+  const owned = await store.get(jobId)
+  if (!owned || !canReadJob(request, owned)) {
+    return json({ error: 'Job not found' }, 404)
+  }
+
+  const stream = new ReadableStream({
+    async start(controller) {
+      const deadline = Deadline.fromFunctionTimeout(request.signal)
+      const send = (event: string, data: unknown, id?: string) =>
+        controller.enqueue(
+          encoder.encode(
+            `${id ? `id: ${id}\n` : ''}event: ${event}\ndata: ${JSON.stringify(data)}\n\n`
+          )
+        )
+
+      try {
+        controller.enqueue(encoder.encode(`retry: ${SSE_RETRY_MS}\n\n`))
+        let lastSeen = lastEventId
+
+        while (!deadline.isExpired()) {
+          const job = await loadJob(store, jobId)
+          if (!job) {
+            send('error', { error: 'Job not found' })
+            return
+          }
+
+          if (job.updatedAt !== lastSeen) {
+            lastSeen = job.updatedAt
+            const terminal = TERMINAL_JOB_STATUSES.includes(job.status)
+            send(
+              terminal ? 'complete' : 'progress',
+              toJobResponse(job),
+              job.updatedAt
+            )
+            if (terminal) {
+              return
+            }
+          }
+
+          await sleep(EVENT_POLL_INTERVAL_MS, deadline.signal).catch(
+            () => undefined
+          )
+        }
+      } catch (error) {
+        console.error(`Itinerary job stream error for ${jobId}:`, error)
+        send('error', {
+          error: error instanceof Error ? error.message : 'Unknown error',
+        })
+      } finally {
+        deadline.dispose()
+        controller.close()
+      }
+    },
+  })
+
+  return new Response(stream, { headers: SSE_HEADERS })
+}
+
+export default async (request: Request, context: Context) => {
+  if (request.method === 'OPTIONS') {
+    return new Response(null, {
+      headers: {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Headers':
+          'Content-Type, Authorization, X-User-Id, Last-Event-ID',
+        'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+      },
+    })
+  }
+
+  const jobId = context.params?.id
+
+  try {
+    if (!jobId) {
+      return request.method === 'POST'
+        ? await createJob(request)
+        : json({ error: 'Method not allowed' }, 405)
+    }
+
+    if (request.method !== 'GET') {
+      return json({ error: 'Method not allowed' }, 405)
+    }
+
+    if (new URL(request.url).pathname.endsWith('/events')) {
+      return await streamJob(request, jobId)
+    }
+
+    if (!request.headers.get('x-user-id')) {
+      return json({ error: 'x-user-id header is required' }, 401)
+    }
+
+    const job = await loadJob(getJobStore(), jobId)
+    if (!job || !canReadJob(request, job)) {
+      return json({ error: 'Job not found' }, 404)
+    }
+    return json(toJobResponse(job))
+  } catch (error) {
+    console.error('Itinerary jobs error:', error)
+    return json(
+      {
+        error: 'Internal server error',
+        details: error instanceof Error ? error.message : 'Unknown error',
+      },
+      500
+    )
+  }
+}
+
+export const config: Config = {
+  path: [
+    '/api/itinerary-jobs',
+    '/api/itinerary-jobs/:id',
+    '/api/itinerary-jobs/:id/events',
+  ],
+}
@@ -0,0 +1,144 @@
+/**
+ * Orchestrate Stream
+ * Streaming Netlify function that runs the multi-agent orchestration and
+ * forwards each orchestration event to the client as Server-Sent Events
+ */
+
+import type { Config } from '@netlify/functions'
+import { z } from 'zod'
+
+import { AgentOrchestrator } from '../../lib/agents/orchestrator'
+import { flushMetricsOnShutdown } from '../../lib/agents/performance-collector'
+import type {
+  OrchestrationEvent,
+  PersonaProfile,
+  TTravelRequirements,
+} from '../../lib/agents/types'
+
+// Request schema
+const requestSchema = z.object({
+  requirements: z
+    .object({
+      destination: z.string(),
+      interests: z.array(z.string()).default([]),
+      numberOfAdults: z.number().positive().default(2),
+      numberOfChildren: z.number().min(0).default(0),
+      duration: z.string().optional(),
+      budget: z.enum(['budget', 'moderate', 'luxury']).optional(),
+      pace: z.enum(['relaxed', 'moderate', 'packed']).optional(),
+    })
+    .passthrough(),
+  personaProfile: z.any().optional(),
+  // ai_generation_sessions row that receives the token and cost totals
+  generationSessionId: z.string().uuid().optional(),
+})
+
+const SSE_HEADERS = {
+  'Content-Type': 'text/event-stream',
+  'Cache-Control': 'no-cache',
+  Connection: 'keep-alive',
+  'Access-Control-Allow-Origin': '*',
+}
+
+const orchestrator = new AgentOrchestrator()
+
+// Convert an orchestration event into a JSON-safe SSE frame
+function toSSE(event: OrchestrationEvent): string {
+  if (event.type === 'complete') {
+    const { result } = event
+    return `data: ${JSON.stringify({
+      type: 'complete',
+      itinerary: result.itinerary,
+      metadata: {
+        executionTime: result.totalExecutionTime,
+        costs: result.costs,
+        recommendationCount: Array.from(
+          result.rawResearch?.values() || []
+        ).reduce((sum, r) => sum + (r.recommendations?.length || 0), 0),
+        validationCount: result.validationReport?.length || 0,
+        partial: result.partial || false,
+        missingSections: result.missingSections || [],
+      },
+      timestamp: event.timestamp,
+    })}\n\n`
+  }
+
+  return `data: ${JSON.stringify(event)}\n\n`
+}
+
+export default async (request: Request) => {
+  if (request.method === 'OPTIONS') {
+    return new Response(null, {
+      headers: {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+        'Access-Control-Allow-Methods': 'POST, OPTIONS',
+      },
+    })
+  }
+
+  if (request.method !== 'POST') {
+    return new Response(JSON.stringify({ error: 'Method not allowed' }), {
+      status: 405,
+      headers: { 'Content-Type': 'application/json' },
+    })
+  }
+
+  let body: z.infer<typeof requestSchema>
+  try {
+    body = requestSchema.parse(await request.json())
+  } catch (error) {
+    return new Response(
+      JSON.stringify({
+        error: 'Invalid request',
+        details:
+          error instanceof z.ZodError
+            ? error.issues
+            : 'Request body must be valid JSON',
+      }),
+      { status: 400, headers: { 'Content-Type': 'application/json' } }
+    )
+  }
+
+  const encoder = new TextEncoder()
+  const stream = new ReadableStream({
+    async start(controller) {
+      try {
+        for await (const event of orchestrator.streamItinerary(
+          body.requirements as unknown as TTravelRequirements,
+          body.personaProfile as PersonaProfile | undefined,
+          undefined,
+          {
+            generationSessionId: body.generationSessionId,
+            userId: request.headers.get('x-user-id') || undefined,
+            // Stop spending tokens once the client disconnects
+            signal: request.signal,
+          }
+        )) {
+          controller.enqueue(encoder.encode(toSSE(event)))
+        }
+      } catch (error) {
+        console.error('Orchestration stream error:', error)
+        controller.enqueue(
+          encoder.encode(
+            toSSE({
+              type: 'error',
+              error: error instanceof Error ? error.message : 'Unknown error',
+              timestamp: Date.now(),
+            })
+          )
+        )
+      } finally {
+        controller.close()
+        // The client has everything; store metrics before the function ends
+        await flushMetricsOnShutdown()
+      }
+    },
+  })
+
+  return new Response(stream, { headers: SSE_HEADERS })
+}
+
+export const config: Config = {
+  path: '/api/orchestrate-stream',
+}
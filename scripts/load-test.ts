@@ -0,0 +1,428 @@
+/**
+ * Orchestration Load Test
+ * Drives concurrent itinerary generations at a target arrival rate and
+ * reports latency percentiles, throughput, error rate, token usage and
+ * memory growth per phase. Results are written as JSON so runs can be
+ * compared. Pair with the mock providers server to run offline:
+ *
+ *   npm run mock:providers -- --latency lognormal:900:0.4 &
+ *   ANTHROPIC_BASE_URL=http://localhost:8787 npm run load:test -- \
+ *     --requests 50 --concurrency 10 --rate 2
+ *
+ * Options:
+ *   --target <name>      orchestrator (default) or a Netlify function:
+ *                        generate-itinerary, generate-itinerary-simple
+ *   --requests <n>       total requests (default 20)
+ *   --concurrency <n>    max requests in flight (default 5)
+ *   --rate <n>           arrivals per second; omit to queue every request
+ *                        at once and let the concurrency limit pace them
+ *   --arrivals <kind>    uniform (default) or poisson inter-arrival times
+ *   --no-cache           disable the plan, research and itinerary caches
+ *                        so every request measures a full generation;
+ *                        concurrent identical requests still share loads
+ *   --output <file>      JSON report path (default load-test-<time>.json)
+ *
+ * Each sample records how it was served: hit, stale or miss from the
+ * itinerary cache, shared when it waited on another request's load, and
+ * for the orchestrator target hit/partial/miss by whether planning and
+ * research made LLM calls. Latency is also reported per cache status.
+ */
+
+import { writeFileSync } from 'node:fs'
+
+import type {
+  OrchestrationEvent,
+  OrchestrationPhase,
+  TTravelRequirements,
+} from '../lib/agents/types'
+
+type Target =
+  | 'orchestrator'
+  | 'generate-itinerary'
+  | 'generate-itinerary-simple'
+
+interface RunOptions {
+  target: Target
+  requests: number
+  concurrency: number
+  rate?: number | undefined
+  arrivals: 'uniform' | 'poisson'
+  cache: boolean
+  output: string
+}
+
+type SampleCacheStatus = 'hit' | 'stale' | 'miss' | 'shared' | 'partial'
+
+interface RequestSample {
+  index: number
+  ok: boolean
+  error?: string | undefined
+  queuedMs: number // waiting for a concurrency slot
+  latencyMs: number
+  tokens: number
+  inputTokens: number
+  outputTokens: number
+  costUsd: number
+  cacheStatus?: SampleCacheStatus | undefined
+  phaseMs: Partial<Record<OrchestrationPhase, number>>
+  phaseHeapDeltaBytes: Partial<Record<OrchestrationPhase, number>>
+}
+
+// Requests rotate through these trips; all pass the function schemas
+const TRIPS = [
+  { interests: ['arts', 'history'], pace: 'moderate', budget: 'moderate' },
+  { interests: ['food-dining'], pace: 'packed', budget: 'moderate' },
+  { interests: ['nature-outdoors'], pace: 'relaxed', budget: 'budget' },
+  {
+    interests: ['culture-local-experiences'],
+    pace: 'moderate',
+    budget: 'luxury',
+  },
+].map((trip, index) => {
+  const childrenAges =
+    index === 2
+      ? [
+          { age: 6, id: 'a' },
+          { age: 9, id: 'b' },
+        ]
+      : []
+
+  return {
+    originCity: 'Chicago, IL',
+    numberOfAdults: 2,
+    numberOfChildren: childrenAges.length,
+    childrenAges,
+    preferredTravelMethods: ['drive'],
+    destination: 'Pittsburgh, PA',
+    duration: '3 days',
+    ...trip,
+  }
+})
+
+function parseOptions(argv: string[]): RunOptions {
+  const option = (name: string) => {
+    const index = argv.indexOf(`--${name}`)
+    return index >= 0 ? argv[index + 1] : undefined
+  }
+
+  return {
+    target: (option('target') as Target) || 'orchestrator',
+    requests: Number(option('requests') || 20),
+    concurrency: Math.max(1, Number(option('concurrency') || 5)),
+    rate: option('rate') ? Number(option('rate')) : undefined,
+    arrivals: option('arrivals') === 'poisson' ? 'poisson' : 'uniform',
+    cache: !argv.includes('--no-cache'),
+    output: option('output') || `load-test-${Date.now()}.json`,
+  }
+}
+
+// Sample count and latency per cache status
+function cacheBreakdown(samples: RequestSample[]) {
+  const byStatus = new Map<string, number[]>()
+  for (const sample of samples) {
+    const status = sample.cacheStatus || 'unknown'
+    byStatus.set(status, [...(byStatus.get(status) || []), sample.latencyMs])
+  }
+
+  return Object.fromEntries(
+    Array.from(byStatus, ([status, latencies]) => [
+      status,
+      { count: latencies.length, latencyMs: summarize(latencies) },
+    ])
+  )
+}
+
+function percentile(values: number[], p: number): number | null {
+  if (values.length === 0) {
+    return null
+  }
+  const sorted = [...values].sort((a, b) => a - b)
+  const index = Math.min(sorted.length - 1, Math.ceil(p * sorted.length) - 1)
+  return Math.round(sorted[Math.max(0, index)]!)
+}
+
+function summarize(values: number[]) {
+  return {
+    p50: percentile(values, 0.5),
+    p95: percentile(values, 0.95),
+    p99: percentile(values, 0.99),
+    max: values.length > 0 ? Math.round(Math.max(...values)) : null,
+  }
+}
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms))
+
+/**
+ * One request against the target, recording per-phase time and heap growth
+ */
+async function runOne(
+  target: Target,
+  requirements: (typeof TRIPS)[number],
+  sample: RequestSample
+): Promise<void> {
+  const startTime = Date.now()
+
+  if (target === 'orchestrator') {
+    const { orchestrator } = await import('../lib/agents/orchestrator')
+    const phaseStarts = new Map<OrchestrationPhase, [number, number]>()
+
+    const onEvent = (event: OrchestrationEvent) => {
+      if (event.type !== 'phase') {
+        return
+      }
+      const heap = process.memoryUsage().heapUsed
+      if (event.status === 'started') {
+        phaseStarts.set(event.phase, [event.timestamp, heap])
+        return
+      }
+      const started = phaseStarts.get(event.phase)
+      if (started) {
+        sample.phaseMs[event.phase] = event.timestamp - started[0]
+        sample.phaseHeapDeltaBytes[event.phase] = heap - started[1]
+      }
+    }
+
+    const result = await orchestrator.generateItinerary(
+      requirements as unknown as TTravelRequirements,
+      undefined,
+      undefined,
+      { onEvent }
+    )
+    sample.ok = result.success
+    sample.tokens = result.costs?.llmTokens || 0
+    sample.inputTokens = result.costs?.inputTokens || 0
+    sample.outputTokens = result.costs?.outputTokens || 0
+    sample.costUsd = result.costs?.estimatedCost || 0
+    // Cached plans and research make no LLM calls in their phase
+    const byPhase = result.costs?.byPhase || {}
+    const calledLLM = (phase: OrchestrationPhase) =>
+      (byPhase[phase]?.calls || 0) > 0
+    sample.cacheStatus =
+      calledLLM('planning') && calledLLM('research')
+        ? 'miss'
+        : calledLLM('planning') || calledLLM('research')
+          ? 'partial'
+          : 'hit'
+    if (!result.success) {
+      sample.error = 'Orchestration failed'
+    }
+  } else {
+    const { handler } = await import(`../netlify/functions/${target}`)
+    const response = await handler(
+      {
+        httpMethod: 'POST',
+        headers: {},
+        body: JSON.stringify({ requirements }),
+      },
+      {}
+    )
+    const body = JSON.parse(response?.body || '{}')
+    const costs = body.metadata?.costs
+    sample.ok = response?.statusCode === 200
+    sample.tokens = costs?.llmTokens || 0
+    sample.inputTokens = costs?.inputTokens || 0
+    sample.outputTokens = costs?.outputTokens || 0
+    sample.costUsd = costs?.estimatedCost || 0
+    // An orchestrated miss without costs waited on another request's load
+    const cacheStatus = body.metadata?.cache?.status
+    sample.cacheStatus =
+      target === 'generate-itinerary' && cacheStatus === 'miss' && !costs
+        ? 'shared'
+        : cacheStatus
+    if (!sample.ok) {
+      sample.error = body.error || `HTTP ${response?.statusCode}`
+    }
+  }
+
+  sample.latencyMs = Date.now() - startTime
+}
+
+// Zero TTLs expire entries as soon as they are written. Must run before
+// the agents and caches are first imported.
+function disableCaches(): void {
+  process.env.ITINERARY_CACHE_TTL_SECONDS = '0'
+  process.env.ITINERARY_CACHE_STALE_SECONDS = '0'
+  process.env.RESEARCH_CACHE_TTL_SECONDS = '0'
+  process.env.PLAN_CACHE_TTL_SECONDS = '0'
+}
+
+async function main() {
+  const options = parseOptions(process.argv.slice(2))
+  if (!options.cache) {
+    disableCaches()
+  }
+  const samples: RequestSample[] = []
+  const memoryStart = process.memoryUsage()
+  let peakRss = memoryStart.rss
+  const memorySampler = setInterval(() => {
+    peakRss = Math.max(peakRss, process.memoryUsage().rss)
+  }, 100)
+
+  console.log(
+    `🚦 ${options.requests} requests to ${options.target}, ` +
+      `concurrency ${options.concurrency}` +
+      (options.rate ? `, ${options.rate}/s ${options.arrivals}` : '') +
+      (options.cache ? '' : ', caches disabled')
+  )
+
+  let inFlight = 0
+  const waiters: (() => void)[] = []
+  const acquire = async () => {
+    while (inFlight >= options.concurrency) {
+      await new Promise<void>(resolve => waiters.push(resolve))
+    }
+    inFlight++
+  }
+  const release = () => {
+    inFlight--
+    waiters.shift()?.()
+  }
+
+  const startTime = Date.now()
+  const runs: Promise<void>[] = []
+
+  for (let index = 0; index < options.requests; index++) {
+    // Without a rate every request arrives at once and the concurrency
+    // limit paces them
+    if (options.rate && index > 0) {
+      await sleep(
+        options.arrivals === 'poisson'
+          ? (-Math.log(1 - Math.random()) / options.rate) * 1000
+          : 1000 / options.rate
+      )
+    }
+
+    const sample: RequestSample = {
+      index,
+      ok: false,
+      queuedMs: 0,
+      latencyMs: 0,
+      tokens: 0,
+      inputTokens: 0,
+      outputTokens: 0,
+      costUsd: 0,
+      phaseMs: {},
+      phaseHeapDeltaBytes: {},
+    }
+    samples.push(sample)
+
+    const arrivedAt = Date.now()
+    runs.push(
+      (async () => {
+        await acquire()
+        sample.queuedMs = Date.now() - arrivedAt
+        try {
+          await runOne(options.target, TRIPS[index % TRIPS.length]!, sample)
+        } catch (error) {
+          sample.ok = false
+          sample.error = error instanceof Error ? error.message : String(error)
+          sample.latencyMs = Date.now() - arrivedAt - sample.queuedMs
+        } finally {
+          release()
+        }
+      })()
+    )
+  }
+
+  await Promise.all(runs)
+  clearInterval(memorySampler)
+
+  const elapsedMs = Date.now() - startTime
+  const memoryEnd = process.memoryUsage()
+  const succeeded = samples.filter(sample => sample.ok)
+  const phases: OrchestrationPhase[] = [
+    'planning',
+    'research',
+    'validation',
+    'assembly',
+  ]
+  const phaseValues = (
+    phase: OrchestrationPhase,
+    field: 'phaseMs' | 'phaseHeapDeltaBytes'
+  ) =>
+    samples
+      .map(sample => sample[field][phase])
+      .filter((value): value is number => value !== undefined)
+
+  const report = {
+    options,
+    startedAt: new Date(startTime).toISOString(),
+    elapsedMs,
+    requests: samples.length,
+    succeeded: succeeded.length,
+    errorRate: samples.length
+      ? (samples.length - succeeded.length) / samples.length
+      : 0,
+    throughputPerSecond: succeeded.length / (elapsedMs / 1000),
+    latencyMs: summarize(succeeded.map(sample => sample.latencyMs)),
+    queuedMs: summarize(samples.map(sample => sample.queuedMs)),
+    cache: cacheBreakdown(succeeded),
+    tokens: {
+      total: samples.reduce((sum, sample) => sum + sample.tokens, 0),
+      input: samples.reduce((sum, sample) => sum + sample.inputTokens, 0),
+      output: samples.reduce((sum, sample) => sum + sample.outputTokens, 0),
+      perRequest: succeeded.length
+        ? succeeded.reduce((sum, sample) => sum + sample.tokens, 0) /
+          succeeded.length
+        : 0,
+    },
+    costUsd: samples.reduce((sum, sample) => sum + sample.costUsd, 0),
+    phases: Object.fromEntries(
+      phases.map(phase => {
+        const heapDeltas = phaseValues(phase, 'phaseHeapDeltaBytes')
+        return [
+          phase,
+          {
+            latencyMs: summarize(phaseValues(phase, 'phaseMs')),
+            meanHeapDeltaBytes: heapDeltas.length
+              ? Math.round(
+                  heapDeltas.reduce((sum, value) => sum + value, 0) /
+                    heapDeltas.length
+                )
+              : null,
+          },
+        ]
+      })
+    ),
+    memory: {
+      heapUsedStartBytes: memoryStart.heapUsed,
+      heapUsedEndBytes: memoryEnd.heapUsed,
+      heapGrowthBytes: memoryEnd.heapUsed - memoryStart.heapUsed,
+      peakRssBytes: peakRss,
+    },
+    errors: samples
+      .filter(sample => !sample.ok)
+      .map(sample => ({ index: sample.index, error: sample.error })),
+  }
+
+  writeFileSync(options.output, JSON.stringify(report, null, 2))
+
+  console.log(
+    `✅ ${report.succeeded}/${report.requests} succeeded in ${elapsedMs}ms, ` +
+      `${report.throughputPerSecond.toFixed(2)} req/s`
+  )
+  console.log(
+    `   latency p50 ${report.latencyMs.p50}ms, p95 ${report.latencyMs.p95}ms, ` +
+      `p99 ${report.latencyMs.p99}ms; ${report.tokens.total} tokens`
+  )
+  console.log(
+    `   cache: ${
+      Object.entries(report.cache)
+        .map(([status, { count }]) => `${count} ${status}`)
+        .join(', ') || 'no samples'
+    }`
+  )
+  console.log(`   Report written to ${options.output}`)
+
+  // Queued agent metrics are only stored on flush
+  const { flushMetricsOnShutdown } = await import(
+    '../lib/agents/performance-collector'
+  )
+  await flushMetricsOnShutdown()
+  process.exit(0)
+}
+
+main().catch(error => {
+  console.error('Load test failed:', error)
+  process.exit(1)
+})
@@ -0,0 +1,626 @@
+/**
+ * Mock Providers Server
+ * Local stand-in for the Anthropic Messages API and the Google Places and
+ * Routes endpoints, for load testing without network access or quota.
+ * Latency, error rate and 429 injection are configurable per provider, and
+ * responses are canned payloads templated with the destination from the
+ * request (or your own, matched by prompt pattern).
+ *
+ * Usage: npm run mock:providers -- [options]
+ *   --port <n>                 listen port (default 8787)
+ *   --latency <spec>           latency for every provider, e.g.
+ *                              fixed:200, uniform:100:400, normal:800:150,
+ *                              lognormal:900:0.4 (median ms, sigma)
+ *   --error-rate <0-1>         share of requests that fail with a 500
+ *   --rate-limit-rate <0-1>    share of requests rejected with a 429
+ *   --config <file>            JSON with per-provider settings (see
+ *                              providerSchema) and custom responses
+ *
+ * Then point the app at it:
+ *   ANTHROPIC_BASE_URL=http://localhost:8787
+ *   GOOGLE_PLACES_BASE_URL=http://localhost:8787
+ *   GOOGLE_ROUTES_BASE_URL=http://localhost:8787
+ */
+
+import { randomUUID } from 'node:crypto'
+import { readFileSync } from 'node:fs'
+import {
+  createServer,
+  type IncomingMessage,
+  type ServerResponse,
+} from 'node:http'
+
+import { z } from 'zod'
+
+type Provider = 'anthropic' | 'places' | 'routes'
+
+const latencySchema = z.string().regex(/^(fixed|uniform|normal|lognormal):/)
+
+const providerSchema = z.object({
+  latency: latencySchema.optional(),
+  // Extra latency per generated output token (Anthropic only)
+  msPerOutputToken: z.number().min(0).optional(),
+  errorRate: z.number().min(0).max(1).optional(),
+  rateLimitRate: z.number().min(0).max(1).optional(),
+  retryAfterSeconds: z.number().min(0).optional(),
+})
+
+const configSchema = z.object({
+  port: z.number().int().positive().optional(),
+  anthropic: providerSchema.optional(),
+  places: providerSchema.optional(),
+  routes: providerSchema.optional(),
+  // Custom Anthropic responses, first match wins; {{destination}} is
+  // replaced with the destination found in the prompt
+  responses: z
+    .array(z.object({ match: z.string(), response: z.unknown() }))
+    .optional(),
+})
+
+type ProviderConfig = z.infer<typeof providerSchema>
+type MockConfig = z.infer<typeof configSchema>
+
+const DEFAULTS: Record<Provider, Required<ProviderConfig>> = {
+  anthropic: {
+    latency: 'lognormal:900:0.4',
+    msPerOutputToken: 0,
+    errorRate: 0,
+    rateLimitRate: 0,
+    retryAfterSeconds: 1,
+  },
+  places: {
+    latency: 'lognormal:120:0.3',
+    msPerOutputToken: 0,
+    errorRate: 0,
+    rateLimitRate: 0,
+    retryAfterSeconds: 1,
+  },
+  routes: {
+    latency: 'lognormal:150:0.3',
+    msPerOutputToken: 0,
+    errorRate: 0,
+    rateLimitRate: 0,
+    retryAfterSeconds: 1,
+  },
+}
+
+// Standard normal sample (Box-Muller)
+function gaussian(): number {
+  const u = 1 - Math.random()
+  const v = Math.random()
+  return Math.sqrt(-2 * Math.log(u)) * Math.cos(2 * Math.PI * v)
+}
+
+/**
+ * Draw a latency in ms from a spec such as "lognormal:900:0.4"
+ */
+function sampleLatency(spec: string): number {
+  const [type, ...params] = spec.split(':')
+  const [a = 0, b = 0] = params.map(Number)
+
+  switch (type) {
+    case 'fixed':
+      return a
+    case 'uniform':
+      return a + Math.random() * (b - a)
+    case 'normal':
+      return Math.max(0, a + gaussian() * b)
+    case 'lognormal':
+      return a * Math.exp(gaussian() * b)
+    default:
+      throw new Error(`Unknown latency distribution: ${spec}`)
+  }
+}
+
+function parseArgs(argv: string[]): MockConfig {
+  const option = (name: string) => {
+    const index = argv.indexOf(`--${name}`)
+    return index >= 0 ? argv[index + 1] : undefined
+  }
+
+  const fromFile: MockConfig = option('config')
+    ? configSchema.parse(JSON.parse(readFileSync(option('config')!, 'utf8')))
+    : {}
+
+  // Command line settings apply to every provider, over the config file
+  const overrides: ProviderConfig = {}
+  if (option('latency')) {
+    overrides.latency = latencySchema.parse(option('latency'))
+  }
+  if (option('error-rate')) {
+    overrides.errorRate = Number(option('error-rate'))
+  }
+  if (option('rate-limit-rate')) {
+    overrides.rateLimitRate = Number(option('rate-limit-rate'))
+  }
+
+  return {
+    ...fromFile,
+    port: option('port') ? Number(option('port')) : fromFile.port,
+    anthropic: { ...fromFile.anthropic, ...overrides },
+    places: { ...fromFile.places, ...overrides },
+    routes: { ...fromFile.routes, ...overrides },
+  }
+}
+
+// ---------------------------------------------------------------------------
+// Canned payloads
+// ---------------------------------------------------------------------------
+
+const recommendation = (
+  name: string,
+  category: string,
+  destination: string,
+  extra: Record<string, unknown> = {}
+) => ({
+  name,
+  category,
+  description: `A well-loved ${category} in ${destination}`,
+  whyRecommended: `Matches the traveler's interests in ${destination}`,
+  personaFit: 85,
+  neighborhood: 'Downtown',
+  address: `100 Main St, ${destination}`,
+  priceRange: '$$',
+  ...extra,
+})
+
+const cannedResponses: {
+  pattern: RegExp
+  respond: (destination: string) => unknown
+}[] = [
+  {
+    pattern: /task list for research agents/,
+    respond: () => [
+      {
+        agentType: 'lodging',
+        priority: 'high',
+        description: 'Find lodging that fits the traveler',
+        constraints: [],
+        expectedOutput: '3-5 lodging recommendations',
+      },
+      {
+        agentType: 'food-dining',
+        priority: 'high',
+        description: 'Find memorable dining',
+        constraints: [],
+        expectedOutput: '6-8 dining recommendations',
+        dependsOn: ['lodging'],
+      },
+    ],
+  },
+  {
+    pattern: /lodging specialist/,
+    respond: destination => ({
+      recommendations: [1, 2, 3].map(i =>
+        recommendation(
+          `${destination} Boutique Hotel ${i}`,
+          'boutique-hotel',
+          destination
+        )
+      ),
+      reasoning: 'Central, walkable stays',
+    }),
+  },
+  {
+    pattern: /culinary expert/,
+    respond: destination => ({
+      recommendations: ['breakfast', 'lunch', 'dinner', 'dinner'].map(
+        (mealType, i) =>
+          recommendation(
+            `${destination} Kitchen ${i + 1}`,
+            'casual',
+            destination,
+            { mealType }
+          )
+      ),
+      reasoning: 'A mix of local favorites',
+    }),
+  },
+  {
+    pattern: /Validate this travel recommendation/,
+    respond: () => ({
+      status: 'verified',
+      confidence: 0.9,
+      issues: [],
+      alternatives: [],
+    }),
+  },
+  {
+    pattern: /assembling a final itinerary|personalized 3-day itinerary/,
+    respond: destination => ({
+      destination,
+      duration: '3 days',
+      personaNotes: 'Mock itinerary',
+      lodging: [
+        recommendation(
+          `${destination} Boutique Hotel 1`,
+          'boutique-hotel',
+          destination
+        ),
+      ],
+      days: [1, 2, 3].map(day => ({
+        day,
+        theme: `Day ${day} in ${destination}`,
+        activities: [
+          {
+            time: '10:00 AM',
+            activity: recommendation(
+              `${destination} Museum ${day}`,
+              'museum',
+              destination
+            ),
+            duration: '2 hours',
+          },
+        ],
+        meals: [
+          recommendation(`${destination} Kitchen ${day}`, 'casual', destination),
+        ],
+      })),
+    }),
+  },
+  {
+    pattern: /recommending destinations|weekend getaway destination/,
+    respond: () => ({
+      destinations: ['Asheville', 'Savannah', 'Burlington'].map(city => ({
+        city,
+        state: 'US',
+        vibe: 'Walkable and creative',
+        rationale: 'Fits the requested interests',
+        highlights: ['Food scene', 'Architecture', 'Parks'],
+        perfectFor: ['food-dining', 'arts'],
+        distance: { miles: 250, driveTime: '4 hours' },
+      })),
+    }),
+  },
+]
+
+function findDestination(prompt: string): string {
+  const match =
+    prompt.match(/Destination: ([^\n]+)/) ||
+    prompt.match(/(?:accommodations in|experiences in|trip to) ([^.\n]+)/) ||
+    prompt.match(/recommendation for ([^:\n]+):/)
+  return match?.[1]?.trim() || 'Pittsburgh, PA'
+}
+
+function completionText(prompt: string, config: MockConfig): string {
+  const destination = findDestination(prompt)
+
+  for (const custom of config.responses || []) {
+    if (new RegExp(custom.match).test(prompt)) {
+      const text =
+        typeof custom.response === 'string'
+          ? custom.response
+          : JSON.stringify(custom.response)
+      return text.replace(/\{\{destination\}\}/g, destination)
+    }
+  }
+
+  const canned = cannedResponses.find(entry => entry.pattern.test(prompt))
+  return JSON.stringify(
+    canned ? canned.respond(destination) : { text: 'Mock response' }
+  )
+}
+
+// ---------------------------------------------------------------------------
+// HTTP handling
+// ---------------------------------------------------------------------------
+
+const estimateTokens = (text: string) => Math.ceil(text.length / 4)
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms))
+
+const stats = {
+  requests: 0,
+  errors: 0,
+  rateLimited: 0,
+  byProvider: {} as Record<string, number>,
+}
+
+function sendJson(res: ServerResponse, status: number, body: unknown) {
+  res.writeHead(status, { 'Content-Type': 'application/json' })
+  res.end(JSON.stringify(body))
+}
+
+async function readBody(req: IncomingMessage): Promise<any> {
+  const chunks: Buffer[] = []
+  for await (const chunk of req) {
+    chunks.push(chunk as Buffer)
+  }
+  const raw = Buffer.concat(chunks).toString('utf8')
+  return raw ? JSON.parse(raw) : {}
+}
+
+function providerFor(path: string): Provider | null {
+  if (path.startsWith('/v1/messages')) {
+    return 'anthropic'
+  }
+  if (path.startsWith('/maps/api/place')) {
+    return 'places'
+  }
+  if (path.startsWith('/directions/') || path.startsWith('/distanceMatrix/')) {
+    return 'routes'
+  }
+  return null
+}
+
+// Injected failure for this request, if any
+function injectFailure(
+  res: ServerResponse,
+  provider: Provider,
+  settings: Required<ProviderConfig>
+): boolean {
+  const roll = Math.random()
+
+  if (roll < settings.rateLimitRate) {
+    stats.rateLimited++
+    res.setHeader('retry-after', String(settings.retryAfterSeconds))
+    sendJson(res, 429, {
+      type: 'error',
+      error: { type: 'rate_limit_error', message: `Mock ${provider} 429` },
+    })
+    return true
+  }
+
+  if (roll < settings.rateLimitRate + settings.errorRate) {
+    stats.errors++
+    sendJson(res, 500, {
+      type: 'error',
+      error: { type: 'api_error', message: `Mock ${provider} failure` },
+    })
+    return true
+  }
+
+  return false
+}
+
+// System prompts and message content may be a string or content blocks
+const contentBlocks = (content: unknown): any[] =>
+  typeof content === 'string'
+    ? [{ type: 'text', text: content }]
+    : Array.isArray(content)
+      ? content
+      : []
+
+const blocksText = (blocks: any[]) =>
+  blocks.map(block => block.text || '').join('\n')
+
+// Prompt prefixes seen with cache_control, and when their cache expires
+const promptCache = new Map<string, number>()
+const PROMPT_CACHE_TTL_MS = 5 * 60 * 1000
+
+// Shorter prefixes are processed uncached, as by the real API
+const minCacheableTokens = (model: string) =>
+  /haiku/i.test(model) ? 2048 : 1024
+
+/**
+ * Input token usage with prompt caching: the prefix up to the last
+ * cache_control block is written on first sight and read afterwards, if
+ * it is long enough for the model to cache
+ */
+function promptCacheUsage(blocks: any[], model: string) {
+  let cachedBlocks = 0
+  blocks.forEach((block, index) => {
+    if (block.cache_control) {
+      cachedBlocks = index + 1
+    }
+  })
+
+  const prefix = blocksText(blocks.slice(0, cachedBlocks))
+  if (estimateTokens(prefix) < minCacheableTokens(model)) {
+    return { input_tokens: estimateTokens(blocksText(blocks)) }
+  }
+  const inputTokens = estimateTokens(blocksText(blocks.slice(cachedBlocks)))
+
+  const now = Date.now()
+  const hit = (promptCache.get(prefix) || 0) > now
+  promptCache.set(prefix, now + PROMPT_CACHE_TTL_MS)
+  return {
+    input_tokens: inputTokens,
+    cache_creation_input_tokens: hit ? 0 : estimateTokens(prefix),
+    cache_read_input_tokens: hit ? estimateTokens(prefix) : 0,
+  }
+}
+
+async function handleMessages(
+  req: IncomingMessage,
+  res: ServerResponse,
+  settings: Required<ProviderConfig>,
+  config: MockConfig
+) {
+  const body = await readBody(req)
+  const system = contentBlocks(body.system)
+  const messages = (body.messages || []).flatMap((message: any) =>
+    contentBlocks(message.content)
+  )
+  const prompt = messages.map((block: any) => block.text || '').join('\n')
+
+  const text = completionText(`${blocksText(system)}\n${prompt}`, config)
+  const usage = {
+    ...promptCacheUsage(
+      [...system, ...messages],
+      body.model || 'claude-3-haiku-20240307'
+    ),
+    output_tokens: estimateTokens(text),
+  }
+  await sleep(
+    sampleLatency(settings.latency) +
+      usage.output_tokens * settings.msPerOutputToken
+  )
+
+  const message = {
+    id: `msg_mock_${randomUUID()}`,
+    type: 'message',
+    role: 'assistant',
+    model: body.model || 'claude-3-haiku-20240307',
+    stop_reason: 'end_turn',
+    stop_sequence: null,
+  }
+
+  if (!body.stream) {
+    sendJson(res, 200, {
+      ...message,
+      content: [{ type: 'text', text }],
+      usage,
+    })
+    return
+  }
+
+  // Server-sent events in the Messages streaming format
+  res.writeHead(200, { 'Content-Type': 'text/event-stream' })
+  const send = (event: string, data: unknown) =>
+    res.write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`)
+
+  send('message_start', {
+    type: 'message_start',
+    message: {
+      ...message,
+      content: [],
+      stop_reason: null,
+      usage: { ...usage, output_tokens: 1 },
+    },
+  })
+  send('content_block_start', {
+    type: 'content_block_start',
+    index: 0,
+    content_block: { type: 'text', text: '' },
+  })
+  for (let i = 0; i < text.length; i += 64) {
+    send('content_block_delta', {
+      type: 'content_block_delta',
+      index: 0,
+      delta: { type: 'text_delta', text: text.slice(i, i + 64) },
+    })
+  }
+  send('content_block_stop', { type: 'content_block_stop', index: 0 })
+  send('message_delta', {
+    type: 'message_delta',
+    delta: { stop_reason: 'end_turn', stop_sequence: null },
+    usage: { output_tokens: usage.output_tokens },
+  })
+  send('message_stop', { type: 'message_stop' })
+  res.end()
+}
+
+const place = (query: string, index: number) => ({
+  place_id: `mock_place_${index}`,
+  name: `${query} ${index + 1}`,
+  formatted_address: `${100 + index} Main St`,
+  geometry: { location: { lat: 40.44 + index / 100, lng: -79.99 } },
+  rating: 4.5,
+  user_ratings_total: 120,
+  price_level: 2,
+  types: ['point_of_interest'],
+  opening_hours: { open_now: true },
+})
+
+function handlePlaces(url: URL, res: ServerResponse) {
+  const query = url.searchParams.get('query') || 'Mock Place'
+
+  if (url.pathname.endsWith('/details/json')) {
+    sendJson(res, 200, {
+      status: 'OK',
+      result: {
+        ...place(query, 0),
+        place_id: url.searchParams.get('place_id'),
+        website: 'https://example.com',
+        formatted_phone_number: '(412) 555-0100',
+        reviews: [],
+      },
+    })
+    return
+  }
+
+  sendJson(res, 200, {
+    status: 'OK',
+    results: [0, 1, 2, 3, 4].map(index => place(query, index)),
+  })
+}
+
+async function handleRoutes(
+  req: IncomingMessage,
+  url: URL,
+  res: ServerResponse
+) {
+  const body = await readBody(req)
+
+  if (url.pathname.startsWith('/distanceMatrix/')) {
+    const origins: unknown[] = body.origins || []
+    const destinations: unknown[] = body.destinations || []
+    sendJson(
+      res,
+      200,
+      origins.map(() => ({
+        elements: destinations.map(() => ({
+          status: 'OK',
+          distanceMeters: 3200,
+          duration: '600s',
+        })),
+      }))
+    )
+    return
+  }
+
+  sendJson(res, 200, {
+    routes: [
+      {
+        distanceMeters: 3200,
+        duration: '600s',
+        polyline: { encodedPolyline: '' },
+      },
+    ],
+  })
+}
+
+function main() {
+  const config = parseArgs(process.argv.slice(2))
+  const port = config.port || 8787
+
+  const server = createServer(async (req, res) => {
+    const url = new URL(req.url || '/', `http://localhost:${port}`)
+
+    if (url.pathname === '/__stats') {
+      sendJson(res, 200, stats)
+      return
+    }
+
+    const provider = providerFor(url.pathname)
+    if (!provider) {
+      sendJson(res, 404, { error: `No mock for ${url.pathname}` })
+      return
+    }
+
+    stats.requests++
+    stats.byProvider[provider] = (stats.byProvider[provider] || 0) + 1
+    const settings = { ...DEFAULTS[provider], ...config[provider] }
+
+    try {
+      if (injectFailure(res, provider, settings)) {
+        return
+      }
+
+      if (provider === 'anthropic') {
+        await handleMessages(req, res, settings, config)
+        return
+      }
+
+      await sleep(sampleLatency(settings.latency))
+      if (provider === 'places') {
+        handlePlaces(url, res)
+      } else {
+        await handleRoutes(req, url, res)
+      }
+    } catch (error) {
+      console.error(`Mock ${provider} handler failed:`, error)
+      if (!res.headersSent) {
+        sendJson(res, 500, { error: 'Mock handler failed' })
+      }
+    }
+  })
+
+  server.listen(port, () => {
+    console.log(`🧪 Mock providers listening on http://localhost:${port}`)
+    console.log(`   Request counts: http://localhost:${port}/__stats`)
+  })
+}
+
+main()
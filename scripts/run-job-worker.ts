@@ -0,0 +1,33 @@
+/**
+ * Local Job Runner
+ * Runs queued itinerary jobs in development, where there is no background
+ * function to dispatch them to. Set JOB_RUNNER=local so the jobs API leaves
+ * jobs queued for this runner.
+ *
+ * Usage: npm run jobs:worker
+ */
+
+import { flushMetricsOnShutdown } from '../lib/agents/performance-collector'
+import { getServerEnv } from '../lib/config/env'
+import { JobWorker } from '../lib/jobs'
+
+const worker = new JobWorker({
+  concurrency: getServerEnv().JOB_CONCURRENCY,
+})
+
+async function shutdown(signal: string) {
+  console.log(`\n${signal} received, waiting for running jobs to finish...`)
+  await worker.stop()
+  await flushMetricsOnShutdown()
+  process.exit(0)
+}
+
+process.on('SIGINT', () => void shutdown('SIGINT'))
+process.on('SIGTERM', () => void shutdown('SIGTERM'))
+
+console.log('🛠️  Itinerary job runner started, polling for queued jobs')
+worker.start().catch(async error => {
+  console.error('Job runner failed:', error)
+  await flushMetricsOnShutdown()
+  process.exit(1)
+})